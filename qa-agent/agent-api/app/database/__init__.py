@@ -1,5 +1,5 @@
 """Database package."""
 
-from app.database.connection import get_db, init_db, close_db, engine
+from app.database.connection import get_db, get_read_db, init_db, close_db, engine, read_engine
 
-__all__ = ["get_db", "init_db", "close_db", "engine"]
+__all__ = ["get_db", "get_read_db", "init_db", "close_db", "engine", "read_engine"]
@@ -1,16 +1,88 @@
 """Database repositories for CRUD operations."""
 
+import os
+import json
 import logging
 from datetime import datetime
 from typing import List, Optional, Dict, Any
-from sqlalchemy import select, and_, or_, desc, func
+from sqlalchemy import select, insert, update, and_, or_, desc, func, JSON
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import selectinload
 
-from app.models.database import Run, Page, TestCase, RunComparison, UploadedImage
+from app.models.database import (
+    Run,
+    Page,
+    TestCase,
+    RunComparison,
+    UploadedImage,
+    TestExecutionResult
+)
+from app.services.run_diff import normalize_route, structural_fingerprint, run_content_hash
 
 logger = logging.getLogger(__name__)
 
+# Rows per INSERT/COPY batch on the bulk persistence paths
+BULK_CHUNK_SIZE = int(os.getenv("DB_BULK_CHUNK_SIZE", "1000"))
+
+
+async def bulk_insert(
+    db: AsyncSession,
+    model,
+    rows: List[Dict[str, Any]],
+    chunk_size: Optional[int] = None
+) -> int:
+    """
+    Insert many rows with Core statements, bypassing the ORM unit of work.
+
+    Uses COPY on PostgreSQL (asyncpg) and executemany ``INSERT`` batches
+    elsewhere (and as the fallback when COPY fails). Every row must carry the
+    same keys. The caller's session transaction is reused; the caller commits.
+
+    Returns:
+        Number of rows written
+    """
+    if not rows:
+        return 0
+
+    chunk_size = chunk_size or BULK_CHUNK_SIZE
+    table = model.__table__
+    columns = list(rows[0].keys())
+    dialect = db.bind.dialect.name if db.bind is not None else ""
+
+    if dialect == "postgresql":
+        try:
+            # A failed COPY aborts the transaction: the savepoint rolls back it and
+            # any chunks already copied, so the fallback below starts clean
+            async with db.begin_nested():
+                await _copy_rows(db, table, columns, rows, chunk_size)
+            return len(rows)
+        except Exception as e:
+            logger.warning(f"COPY into {table.name} failed, falling back to INSERT batches: {e}")
+
+    # executemany form: the driver batches rows itself (insertmanyvalues), no per-chunk VALUES statement
+    statement = insert(table)
+    for start in range(0, len(rows), chunk_size):
+        await db.execute(statement, rows[start:start + chunk_size])
+    return len(rows)
+
+
+async def _copy_rows(db: AsyncSession, table, columns: List[str], rows: List[Dict[str, Any]], chunk_size: int):
+    """Stream rows into a PostgreSQL table with COPY over the session's asyncpg connection."""
+    connection = await db.connection()
+    raw_connection = await connection.get_raw_connection()
+    driver_connection = raw_connection.driver_connection
+
+    json_columns = {c.name for c in table.columns if isinstance(c.type, JSON)}
+    for start in range(0, len(rows), chunk_size):
+        records = [
+            tuple(
+                json.dumps(row[c], default=str) if c in json_columns and row[c] is not None else row[c]
+                for c in columns
+            )
+            for row in rows[start:start + chunk_size]
+        ]
+        await driver_connection.copy_records_to_table(table.name, records=records, columns=columns)
+
 
 class RunRepository:
     """Repository for Run operations."""
@@ -103,6 +175,30 @@ class RunRepository:
         )
         return result.scalar_one_or_none()
 
+    @staticmethod
+    async def get_content_hash(db: AsyncSession, run_id: str) -> Optional[str]:
+        """Get the stored content hash of a run, computing it if missing."""
+        content_hash = await db.scalar(select(Run.content_hash).where(Run.run_id == run_id))
+        if content_hash is None:
+            content_hash = await RunRepository.refresh_content_hash(db, run_id)
+        return content_hash
+
+    @staticmethod
+    async def refresh_content_hash(db: AsyncSession, run_id: str) -> str:
+        """Recompute a run's content hash from its page fingerprints and test case IDs."""
+        await PageRepository.backfill_fingerprints(db, run_id)
+        page_rows = await db.execute(
+            select(Page.route_template, Page.fingerprint).where(Page.run_id == run_id)
+        )
+        test_ids = await TestCaseRepository.get_test_ids_by_run(db, run_id)
+        content_hash = run_content_hash(
+            [(row.route_template or "", row.fingerprint or "") for row in page_rows],
+            test_ids
+        )
+        await db.execute(update(Run).where(Run.run_id == run_id).values(content_hash=content_hash))
+        await db.commit()
+        return content_hash
+
 
 class PageRepository:
     """Repository for Page operations."""
@@ -117,6 +213,8 @@ class PageRepository:
             nav_text=page_data.get("nav_text", ""),
             breadcrumb=page_data.get("breadcrumb", ""),
             page_signature=page_data.get("page_signature"),
+            route_template=normalize_route(page_data.get("url", "")),
+            fingerprint=structural_fingerprint(page_data),
             page_data=page_data,
             forms_count=len(page_data.get("forms", [])),
             tables_count=len(page_data.get("tables", [])),
@@ -132,28 +230,38 @@ class PageRepository:
         return page
 
     @staticmethod
-    async def bulk_create_pages(db: AsyncSession, run_id: str, pages_data: List[Dict[str, Any]]):
+    async def bulk_create_pages(
+        db: AsyncSession,
+        run_id: str,
+        pages_data: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None
+    ):
         """Bulk create pages for a run."""
-        pages = [
-            Page(
-                run_id=run_id,
-                url=p.get("url", ""),
-                title=p.get("title", ""),
-                nav_text=p.get("nav_text", ""),
-                breadcrumb=p.get("page_signature", {}).get("breadcrumb", ""),
-                page_signature=p.get("page_signature"),
-                page_data=p,
-                forms_count=len(p.get("forms", [])),
-                tables_count=len(p.get("tables", [])),
-                buttons_count=len(p.get("primary_actions", [])),
-                links_count=len(p.get("navigation_items", [])),
-                discovered_at=datetime.utcnow()
-            )
+        discovered_at = datetime.utcnow()
+        rows = [
+            {
+                "run_id": run_id,
+                "url": p.get("url", ""),
+                "title": p.get("title", ""),
+                "nav_text": p.get("nav_text", ""),
+                "breadcrumb": (p.get("page_signature") or {}).get("breadcrumb", ""),
+                "page_signature": p.get("page_signature"),
+                "route_template": normalize_route(p.get("url", "")),
+                "fingerprint": structural_fingerprint(p),
+                "page_data": p,
+                "forms_count": len(p.get("forms", [])),
+                "tables_count": len(p.get("tables", [])),
+                "buttons_count": len(p.get("primary_actions", [])),
+                "links_count": len(p.get("navigation_items", [])),
+                "discovered_at": discovered_at,
+                "discovery_depth": p.get("depth", 0),
+                "screenshot_path": p.get("screenshot")
+            }
             for p in pages_data
         ]
-        db.add_all(pages)
+        count = await bulk_insert(db, Page, rows, chunk_size)
         await db.commit()
-        logger.info(f"Created {len(pages)} pages for run: {run_id}")
+        logger.info(f"Created {count} pages for run: {run_id}")
 
     @staticmethod
     async def get_pages_by_run(db: AsyncSession, run_id: str) -> List[Page]:
@@ -161,6 +269,51 @@ class PageRepository:
         result = await db.execute(select(Page).where(Page.run_id == run_id))
         return list(result.scalars().all())
 
+    @staticmethod
+    async def get_page_summaries(db: AsyncSession, run_id: str) -> List[Dict[str, Any]]:
+        """Get the lightweight columns used for run diffs (no page_data)."""
+        result = await db.execute(
+            select(
+                Page.id,
+                Page.url,
+                Page.title,
+                Page.route_template,
+                Page.fingerprint,
+                Page.forms_count,
+                Page.tables_count,
+                Page.buttons_count
+            ).where(Page.run_id == run_id).order_by(Page.id)
+        )
+        return [dict(row._mapping) for row in result]
+
+    @staticmethod
+    async def get_page_data(db: AsyncSession, page_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+        """Get full page_data for specific pages, keyed by page ID."""
+        if not page_ids:
+            return {}
+        result = await db.execute(select(Page.id, Page.page_data).where(Page.id.in_(page_ids)))
+        return {row.id: row.page_data or {} for row in result}
+
+    @staticmethod
+    async def backfill_fingerprints(db: AsyncSession, run_id: str) -> int:
+        """Compute route templates and fingerprints for pages stored before they existed."""
+        result = await db.execute(
+            select(Page.id, Page.url, Page.page_data).where(
+                and_(Page.run_id == run_id, Page.fingerprint.is_(None))
+            )
+        )
+        rows = result.all()
+        for row in rows:
+            await db.execute(
+                update(Page).where(Page.id == row.id).values(
+                    route_template=normalize_route(row.url or ""),
+                    fingerprint=structural_fingerprint(row.page_data or {})
+                )
+            )
+        if rows:
+            logger.info(f"Backfilled fingerprints for {len(rows)} pages of run: {run_id}")
+        return len(rows)
+
 
 class TestCaseRepository:
     """Repository for TestCase operations."""
@@ -188,24 +341,29 @@ class TestCaseRepository:
         return test_case
 
     @staticmethod
-    async def bulk_create_test_cases(db: AsyncSession, run_id: str, test_cases_data: List[Dict[str, Any]]):
+    async def bulk_create_test_cases(
+        db: AsyncSession,
+        run_id: str,
+        test_cases_data: List[Dict[str, Any]],
+        chunk_size: Optional[int] = None
+    ):
         """Bulk create test cases for a run."""
-        test_cases = [
-            TestCase(
-                run_id=run_id,
-                test_id=tc.get("test_id", ""),
-                test_name=tc.get("test_name", ""),
-                test_type=tc.get("test_type", ""),
-                feature_name=tc.get("feature_name"),
-                priority=tc.get("priority", "medium"),
-                steps=tc.get("steps"),
-                status=tc.get("status", "pending")
-            )
+        rows = [
+            {
+                "run_id": run_id,
+                "test_id": tc.get("test_id", ""),
+                "test_name": tc.get("test_name", ""),
+                "test_type": tc.get("test_type", ""),
+                "feature_name": tc.get("feature_name"),
+                "priority": tc.get("priority", "medium"),
+                "steps": tc.get("steps"),
+                "status": tc.get("status", "pending")
+            }
             for tc in test_cases_data
         ]
-        db.add_all(test_cases)
+        count = await bulk_insert(db, TestCase, rows, chunk_size)
         await db.commit()
-        logger.info(f"Created {len(test_cases)} test cases for run: {run_id}")
+        logger.info(f"Created {count} test cases for run: {run_id}")
 
     @staticmethod
     async def get_test_cases_by_run(db: AsyncSession, run_id: str) -> List[TestCase]:
@@ -213,6 +371,12 @@ class TestCaseRepository:
         result = await db.execute(select(TestCase).where(TestCase.run_id == run_id))
         return list(result.scalars().all())
 
+    @staticmethod
+    async def get_test_ids_by_run(db: AsyncSession, run_id: str) -> List[str]:
+        """Get only the test case IDs for a run."""
+        result = await db.execute(select(TestCase.test_id).where(TestCase.run_id == run_id))
+        return list(result.scalars().all())
+
     @staticmethod
     async def get_test_cases_by_feature(db: AsyncSession, run_id: str, feature_name: str) -> List[TestCase]:
         """Get test cases for a specific feature."""
@@ -224,6 +388,43 @@ class TestCaseRepository:
         return list(result.scalars().all())
 
 
+class TestExecutionResultRepository:
+    """Repository for TestExecutionResult operations."""
+
+    @staticmethod
+    async def bulk_create_results(
+        db: AsyncSession,
+        execution_id: str,
+        test_results: List[Dict[str, Any]],
+        executed_at: Optional[datetime] = None,
+        chunk_size: Optional[int] = None
+    ) -> int:
+        """
+        Bulk insert per-test results from an execution report.
+
+        Does not commit, so the results land in the same transaction as the
+        execution run update.
+        """
+        executed_at = executed_at or datetime.utcnow()
+        rows = []
+        for test_result in test_results:
+            evidence = test_result.get("evidence")
+            rows.append({
+                "execution_id": execution_id,
+                "test_id": test_result.get("test_id", ""),
+                "test_name": test_result.get("name", ""),
+                "test_type": test_result.get("test_type", test_result.get("type", "")),
+                "status": test_result.get("status", "failed"),
+                "duration_ms": test_result.get("duration_ms", 0),
+                "executed_at": executed_at,
+                "steps": test_result.get("steps", []),
+                "error_message": test_result.get("error"),
+                "screenshot_path": evidence[0].get("path") if evidence else None,
+                "evidence": evidence
+            })
+        return await bulk_insert(db, TestExecutionResult, rows, chunk_size)
+
+
 class ComparisonRepository:
     """Repository for RunComparison operations."""
 
@@ -260,7 +461,28 @@ class ComparisonRepository:
                 )
             ).order_by(desc(RunComparison.compared_at))
         )
-        return result.scalar_one_or_none()
+        return result.scalars().first()
+
+    @staticmethod
+    async def get_current_comparison(
+        db: AsyncSession,
+        run_id_a: str,
+        run_id_b: str,
+        run_a_hash: str,
+        run_b_hash: str
+    ) -> Optional[RunComparison]:
+        """Get the latest stored A-vs-B comparison made while both runs had the given content hashes."""
+        result = await db.execute(
+            select(RunComparison).where(
+                and_(
+                    RunComparison.run_id_a == run_id_a,
+                    RunComparison.run_id_b == run_id_b,
+                    RunComparison.run_a_hash == run_a_hash,
+                    RunComparison.run_b_hash == run_b_hash
+                )
+            ).order_by(desc(RunComparison.compared_at)).limit(1)
+        )
+        return result.scalars().first()
 
     @staticmethod
     async def get_comparisons_for_run(db: AsyncSession, run_id: str) -> List[RunComparison]:
@@ -3,13 +3,15 @@
 import logging
 from pathlib import Path
 from contextlib import asynccontextmanager
-from fastapi import FastAPI, HTTPException
+from fastapi import FastAPI, HTTPException, Query
 from fastapi.middleware.cors import CORSMiddleware
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, PlainTextResponse
 
 from app.routers import interactive_qa
 from app.database import init_db, close_db
+from app.services.metrics import get_metrics_registry, CONTENT_TYPE_LATEST
+from app.services.retention_service import get_retention_service
 
 logging.basicConfig(
     level=logging.INFO,
@@ -42,9 +44,20 @@ async def lifespan(app: FastAPI):
         logger.warning(f"Playwright browser check failed: {e}")
         # Continue anyway - will be handled on first use
 
+    # Background artifact retention
+    try:
+        get_retention_service().start()
+    except Exception as e:
+        logger.warning(f"Failed to start retention service: {e}")
+
     yield
 
     # Shutdown
+    await get_retention_service().stop()
+
+    from app.services.image_analyzer import get_image_analyzer
+    get_image_analyzer().shutdown()
+
     logger.info("Closing database connections...")
     await close_db()
     logger.info("Application shutdown complete")
@@ -101,7 +114,9 @@ async def root():
         "docs": "/docs",
         "endpoints": {
             "interactive_qa": "/runs",
-            "ui": "/ui"
+            "ui": "/ui",
+            "metrics": "/metrics",
+            "retention": "/admin/retention"
         }
     }
 
@@ -110,3 +125,25 @@ async def root():
 async def health():
     """Health check endpoint."""
     return {"status": "healthy"}
+
+
+@app.get("/metrics", response_class=PlainTextResponse)
+async def metrics():
+    """Prometheus metrics endpoint."""
+    return PlainTextResponse(get_metrics_registry().render(), media_type=CONTENT_TYPE_LATEST)
+
+
+@app.get("/admin/retention")
+async def retention_status():
+    """Artifact retention policy, reclaimed bytes and the last sweep report."""
+    return get_retention_service().stats()
+
+
+@app.post("/admin/retention/sweep")
+async def retention_sweep(dry_run: bool = Query(False, description="Only report what would be removed")):
+    """Run a retention sweep now and return its report."""
+    service = get_retention_service()
+    if service.sweep_running:
+        raise HTTPException(status_code=409, detail="A retention sweep is already running")
+    report = await service.sweep(dry_run=dry_run)
+    return report.to_dict()
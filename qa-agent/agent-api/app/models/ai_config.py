@@ -45,6 +45,10 @@ class AIConfig(BaseModel):
         ge=1,
         description="Request timeout in seconds"
     )
+    cache_enabled: bool = Field(
+        default=True,
+        description="Reuse cached responses for identical prompts (disable to always call the provider)"
+    )
     
     class Config:
         json_schema_extra = {
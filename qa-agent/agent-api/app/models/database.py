@@ -2,9 +2,9 @@
 
 from datetime import datetime
 from typing import Optional
-from sqlalchemy import Column, String, Integer, DateTime, JSON, Text, Boolean, Float, ForeignKey
+from sqlalchemy import Column, String, Integer, DateTime, JSON, Text, Boolean, Float, ForeignKey, Index
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import relationship
+from sqlalchemy.orm import relationship, deferred
 
 Base = declarative_base()
 
@@ -41,6 +41,9 @@ class Run(Base):
     tables_found = Column(Integer, default=0)
     api_calls_captured = Column(Integer, default=0)
 
+    # Hash of stored pages (route, fingerprint) and test case IDs; changes whenever the stored run changes
+    content_hash = Column(String(64), nullable=True)
+
     # Relationships
     pages = relationship("Page", back_populates="run", cascade="all, delete-orphan")
     test_cases = relationship("TestCase", back_populates="run", cascade="all, delete-orphan")
@@ -52,6 +55,9 @@ class Run(Base):
 class Page(Base):
     """Discovered page details."""
     __tablename__ = "pages"
+    __table_args__ = (
+        Index("ix_pages_run_route_template", "run_id", "route_template"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     run_id = Column(String(50), ForeignKey("runs.run_id", ondelete="CASCADE"), nullable=False, index=True)
@@ -65,14 +71,18 @@ class Page(Base):
     # Page signature (for comparison)
     page_signature = Column(JSON, nullable=True)
 
+    # Route template (IDs collapsed) and structural fingerprint (forms/fields/actions/tables) for run diffs
+    route_template = Column(String(1000), nullable=True)
+    fingerprint = Column(String(32), nullable=True)
+
     # Page content summary
     forms_count = Column(Integer, default=0)
     tables_count = Column(Integer, default=0)
     buttons_count = Column(Integer, default=0)
     links_count = Column(Integer, default=0)
 
-    # Full page data (JSONB)
-    page_data = Column(JSON, nullable=True)
+    # Full page data (JSONB) - loaded only on request
+    page_data = deferred(Column(JSON, nullable=True))
 
     # Discovery metadata
     discovered_at = Column(DateTime, default=datetime.utcnow)
@@ -114,6 +124,9 @@ class TestCase(Base):
 class RunComparison(Base):
     """Comparison between two runs."""
     __tablename__ = "run_comparisons"
+    __table_args__ = (
+        Index("ix_run_comparisons_pair", "run_id_a", "run_id_b", "compared_at"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
 
@@ -138,6 +151,10 @@ class RunComparison(Base):
     test_cases_added = Column(Integer, default=0)
     test_cases_removed = Column(Integer, default=0)
 
+    # Run content hashes at comparison time; the stored comparison is reused while they still match
+    run_a_hash = Column(String(64), nullable=True)
+    run_b_hash = Column(String(64), nullable=True)
+
     # Relationship
     run_a = relationship("Run", foreign_keys=[run_id_a])
     run_b = relationship("Run", foreign_keys=[run_id_b])
@@ -173,6 +190,11 @@ class UploadedImage(Base):
 class TestExecutionRun(Base):
     """Test execution run metadata and results."""
     __tablename__ = "test_execution_runs"
+    __table_args__ = (
+        # Keyset pagination for the executions list (ORDER BY started_at DESC, execution_id DESC)
+        Index("ix_test_execution_runs_started_at_execution_id", "started_at", "execution_id"),
+        Index("ix_test_execution_runs_discovery_run_started_at", "discovery_run_id", "started_at"),
+    )
 
     execution_id = Column(String(50), primary_key=True, index=True)
     discovery_run_id = Column(String(50), ForeignKey("runs.run_id", ondelete="SET NULL"), nullable=True, index=True)
@@ -200,8 +222,8 @@ class TestExecutionRun(Base):
     # Status
     status = Column(String(20), default="running", index=True)  # running, completed, failed
     
-    # Results data (JSONB for detailed results)
-    execution_results = Column(JSON, nullable=True)
+    # Results data (JSONB for detailed results) - can be several MB, loaded only on request
+    execution_results = deferred(Column(JSON, nullable=True), group="blobs")
     
     # Artifacts path
     artifacts_path = Column(String(500), nullable=False)
@@ -216,6 +238,9 @@ class TestExecutionRun(Base):
 class TestExecutionResult(Base):
     """Individual test execution results."""
     __tablename__ = "test_execution_results"
+    __table_args__ = (
+        Index("ix_test_execution_results_execution_status", "execution_id", "status"),
+    )
 
     id = Column(Integer, primary_key=True, autoincrement=True)
     execution_id = Column(String(50), ForeignKey("test_execution_runs.execution_id", ondelete="CASCADE"), nullable=False, index=True)
@@ -231,10 +256,10 @@ class TestExecutionResult(Base):
     executed_at = Column(DateTime, default=datetime.utcnow)
     
     # Test details
-    steps = Column(JSON, nullable=True)  # Array of step results
+    steps = deferred(Column(JSON, nullable=True), group="blobs")  # Array of step results
     error_message = Column(Text, nullable=True)
     screenshot_path = Column(String(500), nullable=True)
-    evidence = Column(JSON, nullable=True)  # Additional evidence
+    evidence = deferred(Column(JSON, nullable=True), group="blobs")  # Additional evidence
     
     # Relationship
     execution_run = relationship("TestExecutionRun", back_populates="test_results")
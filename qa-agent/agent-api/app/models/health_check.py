@@ -67,4 +67,6 @@ class HealthCheckReport(BaseModel):
     checks_passed: int = 0
     checks_failed: int = 0
     checks_skipped: int = 0
+    pages_from_discovery: int = 0  # Pages reported from discovery observations (not re-navigated)
+    concurrency: Dict[str, Any] = {}  # Adaptive concurrency stats for the run
     pages: List[PageHealthCheck] = []
@@ -3,22 +3,21 @@
 import uuid
 import json
 import logging
-import shutil
 import asyncio
 from datetime import datetime
 from pathlib import Path
 from typing import Optional, List, Dict, Any
-from fastapi import APIRouter, HTTPException, Body, UploadFile, File, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Body, UploadFile, File, Depends, Request
+from fastapi.responses import JSONResponse, Response
 from pydantic import BaseModel, Field
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy import desc
 
 from app.models.run_context import RunContext, AuthConfig, Question, AnswerRequest
 from app.models.ai_config import AIConfig
-from app.database import get_db
+from app.database import get_db, get_read_db
 from app.models.run_state import RunState
-from app.services.run_store import RunStore
+from app.services.run_store import RunStore, TEMP_UPLOADS_DIR, resolve_data_dir
 from app.services.browser_manager import get_browser_manager
 from app.services.session_checker import get_session_checker
 from app.services.login_detector import get_login_detector
@@ -31,6 +30,20 @@ from app.services.test_plan_builder import get_test_plan_builder
 from app.services.test_executor import get_test_executor
 from app.services.report_generator import get_report_generator
 from app.services.image_analyzer import get_image_analyzer
+from app.services.test_case_index import get_test_case_index_cache
+from app.services.retention_service import get_retention_service
+from app.services.event_bus import get_event_bus, close_event_bus
+from app.services.artifact_io import (
+    read_artifact,
+    write_artifact,
+    decode_artifact,
+    decompress_bytes,
+    detect_compression,
+    is_binary_artifact,
+    iter_artifact_lines,
+    artifact_log_exists,
+    compressed_log_path
+)
 
 logger = logging.getLogger(__name__)
 
@@ -168,8 +181,7 @@ async def _load_image_analysis_hints(
 
         if analysis_file.exists():
             try:
-                with open(analysis_file, 'r') as f:
-                    analysis = json.load(f)
+                analysis = read_artifact(analysis_file)
 
                 # Extract GET operation hints
                 if "get_operation_hints" in analysis:
@@ -209,8 +221,7 @@ async def _load_document_analysis(
         for analysis_file in possible_files:
             if analysis_file.exists():
                 try:
-                    with open(analysis_file, 'r') as f:
-                        analysis = json.load(f)
+                    analysis = read_artifact(analysis_file)
 
                     combined_analysis["features"].extend(analysis.get("features", []))
                     combined_analysis["workflows"].extend(analysis.get("workflows", []))
@@ -252,17 +263,9 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
             artifacts_path=context.artifacts_path
         )
 
-        # Log execution start
-        events_file = Path(context.artifacts_path) / "events.jsonl"
-        with open(events_file, "a") as f:
-            event = {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "type": "free_text_execution_started",
-                "data": {
-                    "instruction": instruction
-                }
-            }
-            f.write(json.dumps(event) + "\n")
+        # Log execution start (through the run's event bus, ordered with every other producer)
+        bus = get_event_bus(run_id, context.artifacts_path)
+        bus.emit("free_text_execution_started", {"instruction": instruction}, source="free_text")
 
         # Execute the instruction based on keywords
         instruction_lower = instruction.lower()
@@ -288,13 +291,7 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
             # Test table rows
             if "click" in instruction_lower and "row" in instruction_lower:
                 # Emit test started event
-                with open(events_file, "a") as f:
-                    event = {
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "type": "free_text_test_started",
-                        "data": {"test": "table_rows"}
-                    }
-                    f.write(json.dumps(event) + "\n")
+                bus.emit("free_text_test_started", {"test": "table_rows"}, source="free_text")
 
                 result = await _test_table_rows(page, run_id, table_keyword)
                 test_results["tests_executed"].append(result)
@@ -304,23 +301,13 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
                     test_results["tests_failed"] += 1
 
                 # Emit test completed event
-                with open(events_file, "a") as f:
-                    event = {
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "type": "free_text_test_completed",
-                        "data": {"test": "table_rows", "status": result["status"], "details": result}
-                    }
-                    f.write(json.dumps(event) + "\n")
+                bus.emit("free_text_test_completed", {
+                    "test": "table_rows", "status": result["status"], "details": result
+                }, source="free_text")
 
             # Test pagination
             if "paginat" in instruction_lower:
-                with open(events_file, "a") as f:
-                    event = {
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "type": "free_text_test_started",
-                        "data": {"test": "pagination"}
-                    }
-                    f.write(json.dumps(event) + "\n")
+                bus.emit("free_text_test_started", {"test": "pagination"}, source="free_text")
 
                 result = await _test_pagination(page, run_id)
                 test_results["tests_executed"].append(result)
@@ -329,23 +316,13 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
                 else:
                     test_results["tests_failed"] += 1
 
-                with open(events_file, "a") as f:
-                    event = {
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "type": "free_text_test_completed",
-                        "data": {"test": "pagination", "status": result["status"], "details": result}
-                    }
-                    f.write(json.dumps(event) + "\n")
+                bus.emit("free_text_test_completed", {
+                    "test": "pagination", "status": result["status"], "details": result
+                }, source="free_text")
 
             # Verify counts
             if "count" in instruction_lower or "verify" in instruction_lower:
-                with open(events_file, "a") as f:
-                    event = {
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "type": "free_text_test_started",
-                        "data": {"test": "table_counts"}
-                    }
-                    f.write(json.dumps(event) + "\n")
+                bus.emit("free_text_test_started", {"test": "table_counts"}, source="free_text")
 
                 result = await _verify_table_counts(page, run_id)
                 test_results["tests_executed"].append(result)
@@ -354,23 +331,13 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
                 else:
                     test_results["tests_failed"] += 1
 
-                with open(events_file, "a") as f:
-                    event = {
-                        "timestamp": datetime.utcnow().isoformat() + "Z",
-                        "type": "free_text_test_completed",
-                        "data": {"test": "table_counts", "status": result["status"], "details": result}
-                    }
-                    f.write(json.dumps(event) + "\n")
+                bus.emit("free_text_test_completed", {
+                    "test": "table_counts", "status": result["status"], "details": result
+                }, source="free_text")
 
         # Search testing
         if "search" in instruction_lower:
-            with open(events_file, "a") as f:
-                event = {
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "type": "free_text_test_started",
-                    "data": {"test": "search"}
-                }
-                f.write(json.dumps(event) + "\n")
+            bus.emit("free_text_test_started", {"test": "search"}, source="free_text")
 
             result = await _test_search(page, run_id, instruction)
             test_results["tests_executed"].append(result)
@@ -379,23 +346,13 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
             else:
                 test_results["tests_failed"] += 1
 
-            with open(events_file, "a") as f:
-                event = {
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "type": "free_text_test_completed",
-                    "data": {"test": "search", "status": result["status"], "details": result}
-                }
-                f.write(json.dumps(event) + "\n")
+            bus.emit("free_text_test_completed", {
+                "test": "search", "status": result["status"], "details": result
+            }, source="free_text")
 
         # Filter testing
         if "filter" in instruction_lower:
-            with open(events_file, "a") as f:
-                event = {
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "type": "free_text_test_started",
-                    "data": {"test": "filters"}
-                }
-                f.write(json.dumps(event) + "\n")
+            bus.emit("free_text_test_started", {"test": "filters"}, source="free_text")
 
             result = await _test_filters(page, run_id)
             test_results["tests_executed"].append(result)
@@ -404,33 +361,22 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
             else:
                 test_results["tests_failed"] += 1
 
-            with open(events_file, "a") as f:
-                event = {
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "type": "free_text_test_completed",
-                    "data": {"test": "filters", "status": result["status"], "details": result}
-                }
-                f.write(json.dumps(event) + "\n")
+            bus.emit("free_text_test_completed", {
+                "test": "filters", "status": result["status"], "details": result
+            }, source="free_text")
 
         logger.info(f"[{run_id}] Test execution completed: {test_results['tests_passed']} passed, {test_results['tests_failed']} failed")
 
         # Log completion
-        with open(events_file, "a") as f:
-            event = {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "type": "free_text_execution_completed",
-                "data": {
-                    "passed": test_results["tests_passed"],
-                    "failed": test_results["tests_failed"],
-                    "total_tests": len(test_results["tests_executed"])
-                }
-            }
-            f.write(json.dumps(event) + "\n")
+        bus.emit("free_text_execution_completed", {
+            "passed": test_results["tests_passed"],
+            "failed": test_results["tests_failed"],
+            "total_tests": len(test_results["tests_executed"])
+        }, source="free_text")
 
         # Save test results
         results_file = Path(context.artifacts_path) / "free_text_results.json"
-        with open(results_file, "w") as f:
-            json.dump(test_results, f, indent=2)
+        write_artifact(results_file, test_results)
 
         # Transition back to WAIT_TEST_INTENT (ready for more commands)
         context = _run_store.transition_state(run_id, RunState.WAIT_TEST_INTENT)
@@ -442,16 +388,9 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
 
         # Log error
         try:
-            events_file = Path(context.artifacts_path) / "events.jsonl"
-            with open(events_file, "a") as f:
-                event = {
-                    "timestamp": datetime.utcnow().isoformat() + "Z",
-                    "type": "free_text_execution_error",
-                    "data": {
-                        "error": str(e)
-                    }
-                }
-                f.write(json.dumps(event) + "\n")
+            get_event_bus(run_id, context.artifacts_path).emit(
+                "free_text_execution_error", {"error": str(e)}, source="free_text"
+            )
         except:
             pass
 
@@ -461,6 +400,13 @@ async def _execute_free_text_instruction(run_id: str, instruction: str):
         except:
             pass
 
+    finally:
+        # Write out this instruction's events and release the bus it opened
+        try:
+            await close_event_bus(run_id, context.artifacts_path)
+        except:
+            pass
+
 
 async def _test_table_rows(page, run_id: str, table_keyword: Optional[str]) -> Dict[str, Any]:
     """Click all rows in a table and verify detail pages."""
@@ -758,9 +704,7 @@ async def list_runs(complete_only: bool = True):
     """
     try:
         # Use same base path as run store so we list the same run dirs discovery uses
-        data_dir = Path(getattr(_run_store, "base_path", None) or "data")
-        if not data_dir.exists():
-            data_dir = Path("agent-api/data")
+        data_dir = resolve_data_dir(getattr(_run_store, "base_path", None))
         if not data_dir.exists():
             return {"runs": []}
 
@@ -792,33 +736,31 @@ async def list_runs(complete_only: bool = True):
 
             if discovery_file.exists():
                 try:
-                    with open(discovery_file, "r") as f:
-                        discovery_data = json.load(f)
-                        run_info["started_at"] = discovery_data.get("started_at")
-                        run_info["base_url"] = discovery_data.get("base_url")
-                        pages_list = discovery_data.get("pages", [])
-                        run_info["pages_count"] = len(pages_list)
-
-                        # Count forms from pages
-                        forms_count = 0
-                        for page in pages_list:
-                            forms_count += len(page.get("forms", []))
-                        run_info["forms_count"] = forms_count
-
-                        # Fallback: if "pages" is empty but summary exists (e.g. discovery saved summary only)
-                        if run_info["pages_count"] == 0 and run_info["forms_count"] == 0:
-                            summary = discovery_data.get("summary") or {}
-                            if summary:
-                                run_info["pages_count"] = int(summary.get("total_pages") or summary.get("pages_visited") or 0)
-                                run_info["forms_count"] = int(summary.get("forms_count") or 0)
+                    discovery_data = read_artifact(discovery_file)
+                    run_info["started_at"] = discovery_data.get("started_at")
+                    run_info["base_url"] = discovery_data.get("base_url")
+                    pages_list = discovery_data.get("pages", [])
+                    run_info["pages_count"] = len(pages_list)
+
+                    # Count forms from pages
+                    forms_count = 0
+                    for page in pages_list:
+                        forms_count += len(page.get("forms", []))
+                    run_info["forms_count"] = forms_count
+
+                    # Fallback: if "pages" is empty but summary exists (e.g. discovery saved summary only)
+                    if run_info["pages_count"] == 0 and run_info["forms_count"] == 0:
+                        summary = discovery_data.get("summary") or {}
+                        if summary:
+                            run_info["pages_count"] = int(summary.get("total_pages") or summary.get("pages_visited") or 0)
+                            run_info["forms_count"] = int(summary.get("forms_count") or 0)
                 except Exception as e:
                     logger.warning(f"Failed to load discovery for {run_id}: {e}")
 
             if test_cases_file.exists():
                 try:
-                    with open(test_cases_file, "r") as f:
-                        test_cases_data = json.load(f)
-                        run_info["test_cases_count"] = test_cases_data.get("total_test_cases", 0)
+                    test_cases_data = read_artifact(test_cases_file)
+                    run_info["test_cases_count"] = test_cases_data.get("total_test_cases", 0)
                 except Exception as e:
                     logger.warning(f"Failed to load test cases for {run_id}: {e}")
 
@@ -892,9 +834,7 @@ async def delete_run(run_id: str, db: AsyncSession = Depends(get_db)):
             logger.warning(f"[{run_id}] Database deletion failed (continuing with file deletion): {db_error}")
         
         # Find the run directory
-        data_dir = Path("data")
-        if not data_dir.exists():
-            data_dir = Path("agent-api/data")
+        data_dir = resolve_data_dir(_run_store.base_path)
         if not data_dir.exists():
             raise HTTPException(status_code=404, detail="Data directory not found")
 
@@ -916,24 +856,17 @@ async def delete_run(run_id: str, db: AsyncSession = Depends(get_db)):
         discovery_file = run_dir / "discovery.json"
         if discovery_file.exists():
             try:
-                with open(discovery_file, "r") as f:
-                    discovery_data = json.load(f)
-                    run_info["base_url"] = discovery_data.get("base_url")
-                    run_info["started_at"] = discovery_data.get("started_at")
+                discovery_data = read_artifact(discovery_file)
+                run_info["base_url"] = discovery_data.get("base_url")
+                run_info["started_at"] = discovery_data.get("started_at")
             except Exception:
                 pass
 
-        # Count files being deleted
-        file_count = sum(1 for _ in run_dir.rglob("*") if _.is_file())
+        # Delete the entire run directory (off the event loop)
+        file_count, total_size = await get_retention_service().remove_run_dir(run_dir)
         run_info["files_deleted"] = file_count
-
-        # Calculate directory size
-        total_size = sum(f.stat().st_size for f in run_dir.rglob("*") if f.is_file())
         run_info["size_deleted_mb"] = round(total_size / (1024 * 1024), 2)
 
-        # Delete the entire run directory
-        shutil.rmtree(run_dir)
-
         logger.info(
             f"Deleted run {run_id}: {file_count} files, {run_info['size_deleted_mb']} MB"
         )
@@ -1275,8 +1208,7 @@ async def get_discovery_features(run_id: str):
 
     try:
         # Read discovery data
-        with open(discovery_file, "r", encoding="utf-8") as f:
-            discovery_data = json.load(f)
+        discovery_data = read_artifact(discovery_file)
 
         # Extract features from pages
         features = {}
@@ -1423,14 +1355,13 @@ async def get_discovery_features(run_id: str):
         free_text_results_file = Path(context.artifacts_path) / "free_text_results.json"
         if free_text_results_file.exists():
             try:
-                with open(free_text_results_file, "r", encoding="utf-8") as f:
-                    free_text_results = json.load(f)
-                    # Map test names to their status
-                    for test_result in free_text_results.get("tests_executed", []):
-                        test_name = test_result.get("test", "")
-                        status = test_result.get("status", "pending")
-                        if test_name:
-                            test_results_map[test_name.lower()] = status
+                free_text_results = read_artifact(free_text_results_file)
+                # Map test names to their status
+                for test_result in free_text_results.get("tests_executed", []):
+                    test_name = test_result.get("test", "")
+                    status = test_result.get("status", "pending")
+                    if test_name:
+                        test_results_map[test_name.lower()] = status
             except Exception as e:
                 logger.warning(f"[{run_id}] Failed to load test results: {e}")
 
@@ -1457,10 +1388,9 @@ async def get_discovery_features(run_id: str):
         
         if test_cases_file.exists():
             try:
-                with open(test_cases_file, "r", encoding="utf-8") as f:
-                    test_cases_data = json.load(f)
-                    actual_total_test_cases = test_cases_data.get("total_test_cases", total_test_cases_from_features)
-                    scenarios_count = len(test_cases_data.get("scenarios", []))
+                test_cases_data = read_artifact(test_cases_file)
+                actual_total_test_cases = test_cases_data.get("total_test_cases", total_test_cases_from_features)
+                scenarios_count = len(test_cases_data.get("scenarios", []))
             except Exception as e:
                 logger.warning(f"[{run_id}] Failed to load test_cases.json for accurate count: {e}")
 
@@ -1499,7 +1429,7 @@ async def get_events(run_id: str, after: int = 0):
     
     events_file = Path(context.artifacts_path) / "events.jsonl"
     
-    if not events_file.exists():
+    if not artifact_log_exists(events_file):
         return {
             "run_id": run_id,
             "events": [],
@@ -1508,9 +1438,8 @@ async def get_events(run_id: str, after: int = 0):
         }
     
     try:
-        # Read all events
-        with open(events_file, "r", encoding="utf-8") as f:
-            lines = f.readlines()
+        # Read all events (transparently decompressed once the run is finished)
+        lines = list(iter_artifact_lines(events_file))
         
         total_events = len(lines)
         
@@ -2065,8 +1994,7 @@ async def answer_question(
                 # Load discovery data
                 discovery_dir = Path(context.artifacts_path)
                 discovery_file = discovery_dir / "discovery.json"
-                with open(discovery_file) as f:
-                    discovery_data = json.load(f)
+                discovery_data = read_artifact(discovery_file)
                 base_url = discovery_data.get("base_url", context.base_url)
                 
                 # Generate tests for this specific module
@@ -2084,8 +2012,7 @@ async def answer_question(
                 
                 # Save test plan to JSON file
                 plan_file = discovery_dir / "test_plan.json"
-                with open(plan_file, "w") as f:
-                    json.dump(test_plan, f, indent=2, default=str)
+                write_artifact(plan_file, test_plan)
                 
                 # Store test plan in context
                 context = _run_store.update_run(
@@ -2308,7 +2235,7 @@ async def upload_image_pre_run(
             raise HTTPException(status_code=400, detail="File must be an image")
 
         # Create temporary uploads directory
-        temp_uploads_dir = Path("agent-api/data/temp_uploads/images")
+        temp_uploads_dir = TEMP_UPLOADS_DIR / "images"
         temp_uploads_dir.mkdir(parents=True, exist_ok=True)
 
         # Save file with unique ID
@@ -2448,7 +2375,7 @@ async def upload_document_pre_run(
             )
 
         # Save document
-        temp_uploads_dir = Path("agent-api/data/temp_uploads/documents")
+        temp_uploads_dir = TEMP_UPLOADS_DIR / "documents"
         temp_uploads_dir.mkdir(parents=True, exist_ok=True)
 
         file_id = uuid.uuid4().hex
@@ -2769,7 +2696,7 @@ async def compare_runs(
     - Overall summary of changes
     """
     from app.services.db_storage import DatabaseStorageService
-    from app.database.repositories import RunRepository, ComparisonRepository
+    from app.database.repositories import RunRepository
     
     try:
         # Check if runs exist in database
@@ -2781,23 +2708,8 @@ async def compare_runs(
         if not run_b:
             raise HTTPException(status_code=404, detail=f"Run {run_id_b} not found in database. Store it first using POST /{run_id_b}/store")
 
-        # Check if comparison already exists
-        existing_comparison = await ComparisonRepository.get_comparison(db, run_id_a, run_id_b)
-        if existing_comparison:
-            return {
-                "comparison": existing_comparison.comparison_data,
-                "compared_at": existing_comparison.compared_at.isoformat(),
-                "cached": True
-            }
-
-        # Perform comparison
-        comparison_data = await DatabaseStorageService.compare_runs(db, run_id_a, run_id_b)
-
-        return {
-            "comparison": comparison_data,
-            "compared_at": datetime.utcnow().isoformat(),
-            "cached": False
-        }
+        # Reuses the stored comparison while neither run has changed
+        return await DatabaseStorageService.compare_runs(db, run_id_a, run_id_b)
 
     except HTTPException:
         raise
@@ -2810,7 +2722,7 @@ async def compare_runs(
 async def get_run_history(
     base_url: str,
     limit: int = 10,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get historical runs for a specific base URL.
@@ -2846,8 +2758,7 @@ async def get_test_results(run_id: str):
         if not report_file.exists():
             raise HTTPException(status_code=404, detail="Test results not found. Execute tests first.")
         
-        with open(report_file, "r") as f:
-            report_data = json.load(f)
+        report_data = read_artifact(report_file)
         
         return report_data
         
@@ -2868,9 +2779,7 @@ async def get_test_cases(run_id: str):
             test_cases_file = Path(context.artifacts_path) / "test_cases.json"
         else:
             # If run not in memory, try loading from file system directly
-            data_dir = Path("data")
-            if not data_dir.exists():
-                data_dir = Path("agent-api/data")
+            data_dir = resolve_data_dir(_run_store.base_path)
 
             run_dir = data_dir / run_id
             if not run_dir.exists():
@@ -2886,8 +2795,7 @@ async def get_test_cases(run_id: str):
                 "scenarios": []
             }
 
-        with open(test_cases_file, "r") as f:
-            test_cases_data = json.load(f)
+        test_cases_data = read_artifact(test_cases_file)
 
         return test_cases_data
 
@@ -2907,7 +2815,7 @@ async def regenerate_test_cases(run_id: str):
     try:
         context = _run_store.get_run(run_id)
         if not context:
-            data_dir = Path("data") if Path("data").exists() else Path("agent-api/data")
+            data_dir = resolve_data_dir(_run_store.base_path)
             run_dir = data_dir / run_id
             if not run_dir.exists():
                 raise HTTPException(status_code=404, detail=f"Run {run_id} not found")
@@ -2919,8 +2827,7 @@ async def regenerate_test_cases(run_id: str):
         if not discovery_file.exists():
             raise HTTPException(status_code=404, detail="Discovery not found. Run discovery first.")
 
-        with open(discovery_file, "r") as f:
-            discovery_data = json.load(f)
+        discovery_data = read_artifact(discovery_file)
 
         pages = discovery_data.get("pages", [])
         if not pages:
@@ -3009,116 +2916,22 @@ async def execute_test_cases(run_id: str, request: ExecuteTestCasesRequest = Bod
         if not test_cases_file.exists():
             raise HTTPException(status_code=404, detail="Test cases not found. Please run discovery first.")
         
-        with open(test_cases_file, "r") as f:
-            test_cases_data = json.load(f)
+        # Resolve selected IDs through the cached per-run index (exact, case-insensitive, suffix)
+        test_case_index = get_test_case_index_cache().get(run_id, test_cases_file)
+        logger.info(f"[{execution_id}] Test case index has {len(test_case_index)} total test cases")
         
-        # Find selected test cases
-        all_test_cases = []
-        for scenario in test_cases_data.get("scenarios", []):
-            scenario_tests = scenario.get("test_cases", [])
-            for test in scenario_tests:
-                # Log test details for debugging
-                test_id = test.get("id", "N/A")
-                steps = test.get("steps", [])
-                steps_count = len(steps)
-                if steps_count > 0:
-                    # Show first few steps with their action types
-                    step_preview = []
-                    for s in steps[:3]:
-                        if isinstance(s, str):
-                            # String step - extract action
-                            step_lower = s.lower()
-                            if "navigate" in step_lower:
-                                step_preview.append(f"navigate: {s[:40]}")
-                            elif "count" in step_lower:
-                                step_preview.append(f"count: {s[:40]}")
-                            elif "enter" in step_lower or "fill" in step_lower:
-                                step_preview.append(f"fill: {s[:40]}")
-                            elif "wait" in step_lower:
-                                step_preview.append(f"wait: {s[:40]}")
-                            elif "verify" in step_lower:
-                                step_preview.append(f"verify: {s[:40]}")
-                            elif "clear" in step_lower:
-                                step_preview.append(f"clear: {s[:40]}")
-                            else:
-                                step_preview.append(f"other: {s[:40]}")
-                        elif isinstance(s, dict):
-                            # Dict step (TestStep format)
-                            action = s.get('action', 'unknown')
-                            selector = s.get('selector', '')[:20] if s.get('selector') else ''
-                            step_preview.append(f"{action}: {selector}")
-                        else:
-                            step_preview.append(str(s)[:50])
-                    logger.info(f"[{execution_id}] Test {test_id} has {steps_count} steps. First steps: {step_preview}")
-                else:
-                    logger.warning(f"[{execution_id}] Test {test_id} has NO steps in test_cases.json - will try to load from discovery")
-            all_test_cases.extend(scenario_tests)
+        selected_tests, unmatched_ids = test_case_index.select(request.test_case_ids)
         
-        logger.info(f"[{execution_id}] Loaded {len(all_test_cases)} total test cases from test_cases.json")
+        if unmatched_ids:
+            logger.warning(f"[{run_id}] Could not match {len(unmatched_ids)} test case IDs: {unmatched_ids[:10]}")
+            # Log available test case IDs for debugging
+            available_ids = [tc.get("id") or tc.get("test_id") or "N/A" for tc in test_case_index.test_cases[:5]]
+            logger.warning(f"[{run_id}] Sample available test case IDs: {available_ids}")
+        logger.info(f"[{run_id}] Matched {len(selected_tests)}/{len(request.test_case_ids)} requested test cases")
         
-        # Filter by selected IDs
-        selected_tests = []
-        for test_id in request.test_case_ids:
-            found = False
-            
-            # Try multiple matching strategies
-            # 1. Try exact match first (full ID)
-            for tc in all_test_cases:
-                tc_id = tc.get("id") or tc.get("test_id") or ""
-                if tc_id == test_id:
-                    selected_tests.append(tc)
-                    found = True
-                    logger.info(f"[{run_id}] Matched test case by exact ID: {test_id}")
-                    break
-            
-            if found:
-                continue
-            
-            # 2. Try matching with different ID field names
-            for tc in all_test_cases:
-                tc_id = tc.get("id") or tc.get("test_id") or ""
-                # Try case-insensitive match
-                if tc_id.lower() == test_id.lower():
-                    selected_tests.append(tc)
-                    found = True
-                    logger.info(f"[{run_id}] Matched test case by case-insensitive ID: {test_id}")
-                    break
-            
-            if found:
-                continue
-            
-            # 3. Try splitting (format: feature_name_test_id or scenario_X_Y)
-            # Try splitting from the end to get the actual test ID
-            parts = test_id.split("_")
-            if len(parts) > 1:
-                # Try last part as ID
-                test_id_part = parts[-1]
-                for tc in all_test_cases:
-                    tc_id = tc.get("id") or tc.get("test_id") or ""
-                    if tc_id == test_id_part or tc_id.endswith(test_id_part) or test_id_part in tc_id:
-                        selected_tests.append(tc)
-                        found = True
-                        logger.info(f"[{run_id}] Matched test case by partial ID: {test_id} -> {test_id_part}")
-                        break
-            
-            if found:
-                continue
-            
-            # 4. Try matching by name if ID doesn't match
-            test_name_lower = test_id.lower()
-            for tc in all_test_cases:
-                tc_name = (tc.get("name") or tc.get("test_name") or "").lower()
-                if test_name_lower in tc_name or tc_name in test_name_lower:
-                    selected_tests.append(tc)
-                    found = True
-                    logger.info(f"[{run_id}] Matched test case by name: {test_id}")
-                    break
-            
-            if not found:
-                logger.warning(f"[{run_id}] Could not match test case ID: {test_id}")
-                # Log available test case IDs for debugging
-                available_ids = [tc.get("id") or tc.get("test_id") or "N/A" for tc in all_test_cases[:5]]
-                logger.warning(f"[{run_id}] Sample available test case IDs: {available_ids}")
+        for test in selected_tests:
+            if not test.get("steps"):
+                logger.warning(f"[{execution_id}] Test {test.get('id', 'N/A')} has NO steps in test_cases.json - will try to load from discovery")
         
         if not selected_tests:
             raise HTTPException(status_code=400, detail="No matching test cases found for the provided IDs")
@@ -3132,8 +2945,7 @@ async def execute_test_cases(run_id: str, request: ExecuteTestCasesRequest = Bod
         discovery_data = {}
         if discovery_file.exists():
             try:
-                with open(discovery_file, "r") as f:
-                    discovery_data = json.load(f)
+                discovery_data = read_artifact(discovery_file)
                 logger.info(f"[{execution_id}] Loaded discovery data with {len(discovery_data.get('pages', []))} pages")
             except Exception as e:
                 logger.warning(f"[{execution_id}] Failed to load discovery.json: {e}")
@@ -3398,7 +3210,8 @@ async def execute_test_cases(run_id: str, request: ExecuteTestCasesRequest = Bod
         # Update execution in database (update existing record or create new one)
         try:
             from app.database import get_db
-            from app.models.database import TestExecutionRun, TestExecutionResult
+            from app.models.database import TestExecutionRun
+            from app.database.repositories import TestExecutionResultRepository
             from sqlalchemy import select
             
             async for db in get_db():
@@ -3464,22 +3277,14 @@ async def execute_test_cases(run_id: str, request: ExecuteTestCasesRequest = Bod
                         )
                         db.add(exec_run)
                     
-                    # Store individual test results
-                    for test_result in execution_result.get("report", {}).get("tests", []):
-                        exec_result = TestExecutionResult(
-                            execution_id=execution_id,
-                            test_id=test_result.get("test_id", ""),
-                            test_name=test_result.get("name", ""),
-                            test_type=test_result.get("test_type", test_result.get("type", "")),
-                            status=test_result.get("status", "failed"),
-                            duration_ms=test_result.get("duration_ms", 0),
-                            executed_at=start_time,
-                            steps=test_result.get("steps", []),
-                            error_message=test_result.get("error"),
-                            screenshot_path=test_result.get("evidence", [{}])[0].get("path") if test_result.get("evidence") and len(test_result.get("evidence", [])) > 0 else None,
-                            evidence=test_result.get("evidence")
-                        )
-                        db.add(exec_result)
+                    # Store individual test results in bulk (run row must exist first for the FK)
+                    await db.flush()
+                    await TestExecutionResultRepository.bulk_create_results(
+                        db,
+                        execution_id,
+                        execution_result.get("report", {}).get("tests", []),
+                        executed_at=test_execution_start_time
+                    )
                     
                     await db.commit()
                     logger.info(f"[{execution_id}] Test execution stored in database")
@@ -3520,37 +3325,87 @@ async def execute_test_cases(run_id: str, request: ExecuteTestCasesRequest = Bod
 
 
 @router.get("/executions/list", summary="List all test execution runs")
-async def list_test_executions(db: AsyncSession = Depends(get_db)):
-    """List all test execution runs from database."""
+async def list_test_executions(
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    List test execution runs from database, newest first.
+
+    Only summary columns are selected. Pass the returned ``next_cursor`` back as
+    ``cursor`` to fetch the next page (keyset pagination on started_at, execution_id).
+    """
     try:
         from app.models.database import TestExecutionRun
-        from sqlalchemy import select, desc
+        from sqlalchemy import select, desc, or_, and_
+        
+        limit = max(1, min(limit, 500))
+        query = select(
+            TestExecutionRun.execution_id,
+            TestExecutionRun.discovery_run_id,
+            TestExecutionRun.execution_name,
+            TestExecutionRun.description,
+            TestExecutionRun.environment,
+            TestExecutionRun.started_at,
+            TestExecutionRun.completed_at,
+            TestExecutionRun.total_tests,
+            TestExecutionRun.passed,
+            TestExecutionRun.failed,
+            TestExecutionRun.skipped,
+            TestExecutionRun.duration_seconds,
+            TestExecutionRun.status
+        ).order_by(desc(TestExecutionRun.started_at), desc(TestExecutionRun.execution_id))
+        
+        if cursor:
+            try:
+                cursor_started_at, cursor_execution_id = cursor.split("|", 1)
+                cursor_ts = datetime.fromisoformat(cursor_started_at)
+            except ValueError:
+                raise HTTPException(status_code=400, detail=f"Invalid cursor: {cursor}")
+            query = query.where(
+                or_(
+                    TestExecutionRun.started_at < cursor_ts,
+                    and_(
+                        TestExecutionRun.started_at == cursor_ts,
+                        TestExecutionRun.execution_id < cursor_execution_id
+                    )
+                )
+            )
         
-        result = await db.execute(
-            select(TestExecutionRun).order_by(desc(TestExecutionRun.started_at)).limit(100)
-        )
-        executions = result.scalars().all()
+        # Fetch one extra row to know whether another page exists
+        result = await db.execute(query.limit(limit + 1))
+        rows = result.all()
+        has_more = len(rows) > limit
+        rows = rows[:limit]
+        
+        executions_list = [
+            {
+                "execution_id": row.execution_id,
+                "discovery_run_id": row.discovery_run_id,
+                "execution_name": row.execution_name,
+                "description": row.description,
+                "environment": row.environment,
+                "started_at": row.started_at.isoformat() if row.started_at else None,
+                "completed_at": row.completed_at.isoformat() if row.completed_at else None,
+                "total_tests": row.total_tests,
+                "passed": row.passed,
+                "failed": row.failed,
+                "skipped": row.skipped,
+                "duration_seconds": row.duration_seconds,
+                "status": row.status
+            }
+            for row in rows
+        ]
         
-        executions_list = []
-        for exec_run in executions:
-            executions_list.append({
-                "execution_id": exec_run.execution_id,
-                "discovery_run_id": exec_run.discovery_run_id,
-                "execution_name": exec_run.execution_name,
-                "description": exec_run.description,
-                "environment": exec_run.environment,
-                "started_at": exec_run.started_at.isoformat() if exec_run.started_at else None,
-                "completed_at": exec_run.completed_at.isoformat() if exec_run.completed_at else None,
-                "total_tests": exec_run.total_tests,
-                "passed": exec_run.passed,
-                "failed": exec_run.failed,
-                "skipped": exec_run.skipped,
-                "duration_seconds": exec_run.duration_seconds,
-                "status": exec_run.status
-            })
+        next_cursor = None
+        if has_more and rows and rows[-1].started_at:
+            next_cursor = f"{rows[-1].started_at.isoformat()}|{rows[-1].execution_id}"
         
-        return {"executions": executions_list}
+        return {"executions": executions_list, "next_cursor": next_cursor}
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to list test executions: {e}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Failed to list test executions: {str(e)}")
@@ -3589,8 +3444,7 @@ async def delete_test_execution(execution_id: str, db: AsyncSession = Depends(ge
             if exec_run.artifacts_path:
                 artifacts_path = Path(exec_run.artifacts_path)
                 if artifacts_path.exists():
-                    import shutil
-                    shutil.rmtree(artifacts_path)
+                    await get_retention_service().remove_run_dir(artifacts_path)
                     logger.info(f"Deleted artifacts directory: {artifacts_path}")
         except Exception as e:
             logger.warning(f"Failed to delete artifacts directory: {e}")
@@ -3606,16 +3460,28 @@ async def delete_test_execution(execution_id: str, db: AsyncSession = Depends(ge
 
 
 @router.get("/executions/{execution_id}/status", summary="Get test execution status")
-async def get_execution_status(execution_id: str, db: AsyncSession = Depends(get_db)):
+async def get_execution_status(execution_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get current status of a test execution (for progress tracking)."""
     try:
         from app.models.database import TestExecutionRun
         from sqlalchemy import select
         
+        # Status polling only needs the summary columns, never the results blob
         result = await db.execute(
-            select(TestExecutionRun).where(TestExecutionRun.execution_id == execution_id)
+            select(
+                TestExecutionRun.discovery_run_id,
+                TestExecutionRun.artifacts_path,
+                TestExecutionRun.status,
+                TestExecutionRun.started_at,
+                TestExecutionRun.completed_at,
+                TestExecutionRun.total_tests,
+                TestExecutionRun.passed,
+                TestExecutionRun.failed,
+                TestExecutionRun.skipped,
+                TestExecutionRun.duration_seconds
+            ).where(TestExecutionRun.execution_id == execution_id)
         )
-        exec_run = result.scalar_one_or_none()
+        exec_run = result.one_or_none()
         
         if not exec_run:
             raise HTTPException(status_code=404, detail=f"Execution {execution_id} not found")
@@ -3635,23 +3501,22 @@ async def get_execution_status(execution_id: str, db: AsyncSession = Depends(get
         current_step = None
         current_test = None
         
-        if events_file.exists():
+        if artifact_log_exists(events_file):
             try:
-                with open(events_file, "r") as f:
-                    lines = f.readlines()
-                    # Get last 20 events
-                    for line in lines[-20:]:
-                        try:
-                            event = json.loads(line.strip())
-                            event_type = event.get("type", "")
-                            if event_type in ["step_started", "step_completed", "test_started", "test_completed"]:
-                                recent_events.append(event)
-                                if event_type == "step_started":
-                                    current_step = event.get("data", {})
-                                elif event_type == "test_started":
-                                    current_test = event.get("data", {})
-                        except:
-                            continue
+                lines = list(iter_artifact_lines(events_file))
+                # Get last 20 events
+                for line in lines[-20:]:
+                    try:
+                        event = json.loads(line.strip())
+                        event_type = event.get("type", "")
+                        if event_type in ["step_started", "step_completed", "test_started", "test_completed"]:
+                            recent_events.append(event)
+                            if event_type == "step_started":
+                                current_step = event.get("data", {})
+                            elif event_type == "test_started":
+                                current_test = event.get("data", {})
+                    except:
+                        continue
             except Exception as e:
                 logger.debug(f"Failed to read events: {e}")
         
@@ -3664,18 +3529,17 @@ async def get_execution_status(execution_id: str, db: AsyncSession = Depends(get
         report_file = Path(artifacts_path) / "executions" / execution_id / "report.json"
         if report_file.exists():
             try:
-                with open(report_file, "r") as f:
-                    report_data = json.load(f)
-                    tests = report_data.get("tests", [])
-                    for test in tests:
-                        steps = test.get("steps", [])
-                        total_steps += len(steps)
-                        for step in steps:
-                            if step.get("status") == "passed":
-                                completed_steps += 1
-                            elif step.get("status") == "failed":
-                                failed_steps += 1
-                                completed_steps += 1  # Count as completed even if failed
+                report_data = read_artifact(report_file)
+                tests = report_data.get("tests", [])
+                for test in tests:
+                    steps = test.get("steps", [])
+                    total_steps += len(steps)
+                    for step in steps:
+                        if step.get("status") == "passed":
+                            completed_steps += 1
+                        elif step.get("status") == "failed":
+                            failed_steps += 1
+                            completed_steps += 1  # Count as completed even if failed
             except:
                 pass
         
@@ -3708,36 +3572,48 @@ async def get_execution_status(execution_id: str, db: AsyncSession = Depends(get
 
 
 @router.get("/executions/{execution_id}", summary="Get test execution details")
-async def get_test_execution(execution_id: str, db: AsyncSession = Depends(get_db)):
-    """Get detailed test execution results."""
+async def get_test_execution(
+    execution_id: str,
+    include_details: bool = True,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Get detailed test execution results.
+
+    With ``include_details=false`` the large JSON columns (run results, per-test
+    steps and evidence) and report.json are skipped.
+    """
     try:
         from app.models.database import TestExecutionRun, TestExecutionResult
         from sqlalchemy import select
+        from sqlalchemy.orm import undefer_group
         
         # Get execution run
-        result = await db.execute(
-            select(TestExecutionRun).where(TestExecutionRun.execution_id == execution_id)
-        )
+        run_query = select(TestExecutionRun).where(TestExecutionRun.execution_id == execution_id)
+        if include_details:
+            run_query = run_query.options(undefer_group("blobs"))
+        result = await db.execute(run_query)
         exec_run = result.scalar_one_or_none()
         
         if not exec_run:
             raise HTTPException(status_code=404, detail=f"Execution {execution_id} not found")
         
         # Get test results
-        results_query = await db.execute(
-            select(TestExecutionResult).where(TestExecutionResult.execution_id == execution_id)
-        )
-        test_results = results_query.scalars().all()
+        results_query = select(TestExecutionResult).where(
+            TestExecutionResult.execution_id == execution_id
+        ).order_by(TestExecutionResult.id)
+        if include_details:
+            results_query = results_query.options(undefer_group("blobs"))
+        test_results = (await db.execute(results_query)).scalars().all()
         
         # Check for report.json and execution artifacts
         execution_details = {}
-        if exec_run.artifacts_path:
+        if include_details and exec_run.artifacts_path:
             artifacts_dir = Path(exec_run.artifacts_path)
             report_json = artifacts_dir / "report.json"
             if report_json.exists():
                 try:
-                    with open(report_json, "r") as f:
-                        execution_details["report_json"] = json.load(f)
+                    execution_details["report_json"] = read_artifact(report_json)
                 except Exception as e:
                     logger.warning(f"[{execution_id}] Failed to load report.json: {e}")
         
@@ -3772,7 +3648,7 @@ async def get_test_execution(execution_id: str, db: AsyncSession = Depends(get_d
                 "skipped": exec_run.skipped,
                 "duration_seconds": exec_run.duration_seconds,
                 "status": exec_run.status,
-                "execution_results": exec_run.execution_results,
+                "execution_results": exec_run.execution_results if include_details else None,
                 "allure_report_url": allure_report_url,
                 "execution_details": execution_details
             },
@@ -3784,10 +3660,10 @@ async def get_test_execution(execution_id: str, db: AsyncSession = Depends(get_d
                     "status": tr.status,
                     "duration_ms": tr.duration_ms,
                     "executed_at": tr.executed_at.isoformat() if tr.executed_at else None,
-                    "steps": tr.steps,
+                    "steps": tr.steps if include_details else None,
                     "error_message": tr.error_message,
                     "screenshot_path": tr.screenshot_path,
-                    "evidence": tr.evidence
+                    "evidence": tr.evidence if include_details else None
                 }
                 for tr in test_results
             ]
@@ -3801,7 +3677,7 @@ async def get_test_execution(execution_id: str, db: AsyncSession = Depends(get_d
 
 
 @router.get("/executions/{execution_id}/allure-report", summary="Get Allure-style HTML report")
-async def get_allure_report(execution_id: str, db: AsyncSession = Depends(get_db)):
+async def get_allure_report(execution_id: str, db: AsyncSession = Depends(get_read_db)):
     """Get Allure-style HTML report for test execution."""
     try:
         from app.models.database import TestExecutionRun
@@ -3843,8 +3719,7 @@ async def get_allure_report(execution_id: str, db: AsyncSession = Depends(get_db
                 try:
                     from app.services.report_generator import get_report_generator
                     report_generator = get_report_generator()
-                    with open(report_json, "r") as f:
-                        report_data = json.load(f)
+                    report_data = read_artifact(report_json)
                     
                     # Generate report on the fly
                     allure_report_path = report_generator.generate_allure_report(
@@ -3878,13 +3753,40 @@ async def get_allure_report(execution_id: str, db: AsyncSession = Depends(get_db
         raise HTTPException(status_code=500, detail=f"Failed to get Allure report: {str(e)}")
 
 
+def _accepts_encoding(request: Request, codec: str) -> bool:
+    """
+    Whether the client's Accept-Encoding allows ``codec``.
+
+    Honours q-values (``gzip;q=0`` refuses gzip) and the ``*`` wildcard.
+    """
+    qvalues: Dict[str, float] = {}
+    for item in request.headers.get("accept-encoding", "").lower().split(","):
+        name, _, params = item.partition(";")
+        name = name.strip()
+        if not name:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        qvalues[name] = q
+    if codec == "gzip" and "gzip" not in qvalues and "x-gzip" in qvalues:
+        return qvalues["x-gzip"] > 0
+    return qvalues.get(codec, qvalues.get("*", 0.0)) > 0
+
+
 @router.get("/executions/{execution_id}/artifacts/{file_path:path}", summary="Get execution artifact file (screenshots, network logs, etc.)")
-async def get_execution_artifact(execution_id: str, file_path: str, db: AsyncSession = Depends(get_db)):
+async def get_execution_artifact(execution_id: str, file_path: str, request: Request, db: AsyncSession = Depends(get_read_db)):
     """Serve static files (screenshots, network logs) from execution artifacts."""
     try:
         from app.models.database import TestExecutionRun
         from sqlalchemy import select
-        from fastapi.responses import FileResponse
+        from fastapi.responses import FileResponse, StreamingResponse
+        from starlette.concurrency import iterate_in_threadpool
         
         result = await db.execute(
             select(TestExecutionRun).where(TestExecutionRun.execution_id == execution_id)
@@ -3903,7 +3805,8 @@ async def get_execution_artifact(execution_id: str, file_path: str, db: AsyncSes
         except ValueError:
             raise HTTPException(status_code=403, detail="Access denied: File outside artifacts directory")
         
-        if not requested_file.exists():
+        compressed_log = compressed_log_path(requested_file) if file_path.endswith('.jsonl') else None
+        if not requested_file.exists() and compressed_log is None:
             raise HTTPException(status_code=404, detail=f"File not found: {file_path}")
         
         # Determine content type
@@ -3914,6 +3817,48 @@ async def get_execution_artifact(execution_id: str, file_path: str, db: AsyncSes
             content_type = "application/json"
         elif file_path.endswith('.html'):
             content_type = "text/html"
+
+        if compressed_log is not None:
+            # Log compressed when the run finished (events.jsonl -> events.jsonl.zst)
+            log_codec = "gzip" if compressed_log.suffix == ".gz" else "zstd"
+            if not requested_file.exists() and _accepts_encoding(request, log_codec):
+                return FileResponse(
+                    path=str(compressed_log),
+                    media_type=content_type,
+                    filename=requested_file.name,
+                    headers={"Content-Encoding": log_codec}
+                )
+            # Lines appended after compression live in the plain file: stream both
+            return StreamingResponse(
+                iterate_in_threadpool(iter_artifact_lines(requested_file)),
+                media_type=content_type,
+                headers={"Content-Disposition": f'attachment; filename="{requested_file.name}"'}
+            )
+
+        with open(requested_file, "rb") as f:
+            head = f.read(64)
+        codec = detect_compression(head)
+
+        if file_path.endswith('.json'):
+            body = decompress_bytes(requested_file.read_bytes()) if codec else head
+            if is_binary_artifact(body):
+                # Binary-encoded artifact: serve it as JSON
+                return JSONResponse(content=decode_artifact(body))
+
+        if codec:
+            # Compressed artifact: send as-is if the client accepts the encoding
+            if _accepts_encoding(request, codec):
+                return FileResponse(
+                    path=str(requested_file),
+                    media_type=content_type,
+                    filename=requested_file.name,
+                    headers={"Content-Encoding": codec}
+                )
+            return Response(
+                content=decompress_bytes(requested_file.read_bytes()),
+                media_type=content_type,
+                headers={"Content-Disposition": f'attachment; filename="{requested_file.name}"'}
+            )
         
         return FileResponse(
             path=str(requested_file),
@@ -3929,7 +3874,7 @@ async def get_execution_artifact(execution_id: str, file_path: str, db: AsyncSes
 
 
 @router.get("/stats", summary="Get database statistics")
-async def get_database_stats(db: AsyncSession = Depends(get_db)):
+async def get_database_stats(db: AsyncSession = Depends(get_read_db)):
     """Get overall statistics from the database."""
     from sqlalchemy import select, func
     from app.models.database import Run, Page, TestCase
@@ -4119,8 +4064,7 @@ async def update_metadata(
             "updated_at": datetime.utcnow().isoformat() + "Z"
         }
 
-        with open(metadata_file, "w") as f:
-            json.dump(metadata_data, f, indent=2)
+        write_artifact(metadata_file, metadata_data)
 
         logger.info(f"[{run_id}] Updated requirement metadata")
 
@@ -13,6 +13,7 @@ from app.services.test_plan_builder import TestPlanBuilder, get_test_plan_builde
 from app.services.test_executor import TestExecutor, get_test_executor
 from app.services.report_generator import ReportGenerator, get_report_generator
 from app.services.image_analyzer import ImageAnalyzer, get_image_analyzer
+from app.services.metrics import MetricsRegistry, get_metrics_registry
 
 __all__ = [
     "RunStore",
@@ -39,5 +40,7 @@ __all__ = [
     "ReportGenerator",
     "get_report_generator",
     "ImageAnalyzer",
-    "get_image_analyzer"
+    "get_image_analyzer",
+    "MetricsRegistry",
+    "get_metrics_registry"
 ]
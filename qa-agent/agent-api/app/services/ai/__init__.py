@@ -2,9 +2,16 @@
 
 from app.services.ai.llm_provider import LLMProvider
 from app.services.ai.provider_factory import get_llm_provider, create_llm_provider
+from app.services.ai.response_cache import LLMResponseCache, get_llm_response_cache
+from app.services.ai.rate_limiter import RateLimitController, get_rate_limiter, get_llm_usage_tracker
 
 __all__ = [
     "LLMProvider",
     "get_llm_provider",
-    "create_llm_provider"
+    "create_llm_provider",
+    "LLMResponseCache",
+    "get_llm_response_cache",
+    "RateLimitController",
+    "get_rate_limiter",
+    "get_llm_usage_tracker"
 ]
@@ -0,0 +1,147 @@
+"""JSON helpers for parsing (possibly streamed) LLM output."""
+
+import json
+import logging
+from typing import Any, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+def _strip_code_fences(text: str) -> str:
+    if "```json" in text:
+        return text.split("```json", 1)[1].split("```", 1)[0].strip()
+    if "```" in text:
+        return text.split("```", 1)[1].split("```", 1)[0].strip()
+    return text.strip()
+
+
+def _balanced_end(text: str, start: int) -> Optional[int]:
+    """Index just past the JSON value opening at ``start``, or None if unterminated."""
+    depth = 0
+    in_string = False
+    escaped = False
+    for pos in range(start, len(text)):
+        ch = text[pos]
+        if in_string:
+            if escaped:
+                escaped = False
+            elif ch == "\\":
+                escaped = True
+            elif ch == '"':
+                in_string = False
+        elif ch == '"':
+            in_string = True
+        elif ch in "{[":
+            depth += 1
+        elif ch in "}]":
+            depth -= 1
+            if depth == 0:
+                return pos + 1
+    return None
+
+
+def extract_json(text: str) -> Any:
+    """
+    Parse the JSON value in an LLM response.
+
+    Handles markdown code fences and prose around the JSON by falling back to
+    the first balanced object/array in the text.
+
+    Raises:
+        ValueError: If no JSON value can be parsed
+    """
+    candidate = _strip_code_fences(text)
+    try:
+        return json.loads(candidate)
+    except json.JSONDecodeError:
+        pass
+
+    for opener in ("{", "["):
+        start = text.find(opener)
+        if start == -1:
+            continue
+        end = _balanced_end(text, start)
+        if end is None:
+            continue
+        try:
+            return json.loads(text[start:end])
+        except json.JSONDecodeError:
+            continue
+    raise ValueError("No JSON value found in response")
+
+
+class IncrementalObjectParser:
+    """
+    Incrementally parse the members of a streamed top-level JSON object.
+
+    Feed response chunks as they arrive; every member (``"key": value``) is
+    returned as soon as its value is complete, so callers can use the first
+    entries of a large response before the rest has been generated. Text
+    before the opening brace (prose, code fences) is ignored, and a member that
+    fails to parse is skipped without affecting the others.
+    """
+
+    def __init__(self):
+        self._buffer = ""
+        self._pos = 0
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+        self._member_start: Optional[int] = None
+        self.finished = False
+        self.failed_members = 0
+
+    def feed(self, chunk: str) -> List[Tuple[str, Any]]:
+        """Consume a chunk and return the members it completed."""
+        completed: List[Tuple[str, Any]] = []
+        if self.finished or not chunk:
+            return completed
+
+        self._buffer += chunk
+        buffer = self._buffer
+        while self._pos < len(buffer):
+            ch = buffer[self._pos]
+            if self._depth == 0:
+                if ch == "{":
+                    self._depth = 1
+                    self._member_start = self._pos + 1
+            elif self._in_string:
+                if self._escaped:
+                    self._escaped = False
+                elif ch == "\\":
+                    self._escaped = True
+                elif ch == '"':
+                    self._in_string = False
+            elif ch == '"':
+                self._in_string = True
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                if self._depth == 1:
+                    self._emit(self._pos, completed)
+                    self._depth = 0
+                    self.finished = True
+                    self._pos += 1
+                    break
+                self._depth -= 1
+            elif ch == "," and self._depth == 1:
+                self._emit(self._pos, completed)
+                self._member_start = self._pos + 1
+            self._pos += 1
+
+        # Drop consumed text so long streams don't grow the buffer unbounded
+        if self._member_start is not None and self._member_start > 0 and not self.finished:
+            self._buffer = self._buffer[self._member_start:]
+            self._pos -= self._member_start
+            self._member_start = 0
+        return completed
+
+    def _emit(self, end: int, completed: List[Tuple[str, Any]]) -> None:
+        member = self._buffer[self._member_start:end].strip()
+        if not member:
+            return
+        try:
+            completed.extend(json.loads("{" + member + "}").items())
+        except json.JSONDecodeError as e:
+            self.failed_members += 1
+            logger.debug(f"Skipping unparseable streamed member: {e}")
@@ -1,14 +1,24 @@
 """Abstract base class for LLM providers."""
 
 from abc import ABC, abstractmethod
-from typing import Dict, List, Any, Optional
+from typing import Callable, Dict, List, Any, Optional
+import asyncio
 import logging
 
+from app.services.metrics import LLM_REQUEST_SECONDS, LLM_TOKENS
+from app.services.ai.rate_limiter import current_llm_run_id, get_llm_usage_tracker
+
 logger = logging.getLogger(__name__)
 
 
 class LLMProvider(ABC):
     """Abstract base class for LLM providers."""
+
+    # Short provider identifier used in metrics labels
+    provider_name: str = "unknown"
+
+    # True when generate_structured_batch answers several prompts in one request
+    supports_batching: bool = False
     
     def __init__(self, config: Dict[str, Any]):
         """
@@ -64,6 +74,46 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def generate_structured_batch(
+        self,
+        prompts: Dict[str, str],
+        schema: Dict[str, Any],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        on_item: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Generate structured output for several prompts.
+
+        The default implementation issues one ``generate_structured`` call per
+        prompt concurrently; providers with ``supports_batching`` combine them
+        into a single request.
+        
+        Args:
+            prompts: Prompt per key (e.g. one per page)
+            schema: JSON schema each result must match
+            system_prompt: Optional system prompt
+            temperature: Sampling temperature
+            on_item: Optional callback invoked with (key, result) as soon as
+                each result is available
+            
+        Returns:
+            Result per key
+        """
+        async def _one(key: str, prompt: str):
+            result = await self.generate_structured(
+                prompt=prompt,
+                schema=schema,
+                system_prompt=system_prompt,
+                temperature=temperature
+            )
+            if on_item:
+                on_item(key, result)
+            return key, result
+
+        pairs = await asyncio.gather(*(_one(k, p) for k, p in prompts.items()))
+        return dict(pairs)
+    
     @abstractmethod
     async def is_available(self) -> bool:
         """
@@ -74,6 +124,27 @@ class LLMProvider(ABC):
         """
         pass
     
+    async def close(self) -> None:
+        """Release network resources held by the provider."""
+        return None
+
+    def _record_request(
+        self,
+        duration_s: float,
+        outcome: str = "success",
+        prompt_tokens: Optional[int] = None,
+        completion_tokens: Optional[int] = None
+    ) -> None:
+        """Record latency and token usage for one provider request."""
+        model = getattr(self, "model_name", "unknown")
+        LLM_REQUEST_SECONDS.labels(self.provider_name, model, outcome).observe(duration_s)
+        if prompt_tokens:
+            LLM_TOKENS.labels(self.provider_name, model, "prompt").inc(prompt_tokens)
+        if completion_tokens:
+            LLM_TOKENS.labels(self.provider_name, model, "completion").inc(completion_tokens)
+        if outcome == "success":
+            get_llm_usage_tracker().record(current_llm_run_id.get(), model, prompt_tokens or 0, completion_tokens or 0)
+
     def _validate_config(self) -> bool:
         """Validate provider configuration."""
         return self.enabled
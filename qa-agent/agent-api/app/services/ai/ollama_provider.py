@@ -1,32 +1,50 @@
 """Ollama LLM provider for local model inference."""
 
 import json
+import time
+import asyncio
 import logging
-from typing import Dict, Any, Optional
+from typing import AsyncIterator, Callable, Dict, Any, Optional
 import aiohttp
 from urllib.parse import urljoin
 
 from app.services.ai.llm_provider import LLMProvider
+from app.services.ai.json_stream import IncrementalObjectParser, extract_json
 
 logger = logging.getLogger(__name__)
 
 
 class OllamaProvider(LLMProvider):
     """Ollama provider for local LLM models."""
+
+    provider_name = "ollama"
+    supports_batching = True
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
         self.base_url = config.get("base_url", "http://localhost:11434")
         self.model_name = config.get("model_name", "llama2")
         self.timeout = config.get("timeout", 60)
+        self.max_connections = config.get("max_connections", 8)
+        self.max_parse_retries = config.get("max_parse_retries", 1)
         self._session: Optional[aiohttp.ClientSession] = None
+        self._session_loop: Optional[asyncio.AbstractEventLoop] = None
     
     async def _get_session(self) -> aiohttp.ClientSession:
-        """Get or create aiohttp session."""
-        if self._session is None or self._session.closed:
+        """
+        Get or create the shared aiohttp session.
+
+        The session (and its keep-alive connection pool) is reused by every
+        request made from the same event loop; a new one is only created when
+        the previous one was closed or belongs to another loop.
+        """
+        loop = asyncio.get_running_loop()
+        if self._session is None or self._session.closed or self._session_loop is not loop:
             self._session = aiohttp.ClientSession(
-                timeout=aiohttp.ClientTimeout(total=self.timeout)
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                connector=aiohttp.TCPConnector(limit=self.max_connections)
             )
+            self._session_loop = loop
         return self._session
     
     async def generate_text(
@@ -37,6 +55,7 @@ class OllamaProvider(LLMProvider):
         max_tokens: int = 2000
     ) -> str:
         """Generate text using Ollama API."""
+        started = time.perf_counter()
         try:
             session = await self._get_session()
             url = urljoin(self.base_url, "/api/generate")
@@ -58,13 +77,20 @@ class OllamaProvider(LLMProvider):
                 if response.status != 200:
                     error_text = await response.text()
                     logger.error(f"Ollama API error {response.status}: {error_text}")
+                    self._record_request(time.perf_counter() - started, "error")
                     raise Exception(f"Ollama API error: {error_text}")
                 
                 result = await response.json()
+                self._record_request(
+                    time.perf_counter() - started,
+                    prompt_tokens=result.get("prompt_eval_count"),
+                    completion_tokens=result.get("eval_count")
+                )
                 return result.get("response", "")
         
         except aiohttp.ClientError as e:
             logger.error(f"Ollama connection error: {e}")
+            self._record_request(time.perf_counter() - started, "error")
             raise Exception(f"Failed to connect to Ollama: {e}")
         except Exception as e:
             logger.error(f"Ollama generation error: {e}")
@@ -95,21 +121,160 @@ Respond with ONLY valid JSON matching the schema above.
             max_tokens=4000
         )
         
-        # Try to extract JSON from response
+        # Try to extract JSON from response (code fences / surrounding prose are tolerated)
         try:
-            # Remove markdown code blocks if present
-            if "```json" in response_text:
-                response_text = response_text.split("```json")[1].split("```")[0].strip()
-            elif "```" in response_text:
-                response_text = response_text.split("```")[1].split("```")[0].strip()
-            
-            return json.loads(response_text)
-        except json.JSONDecodeError as e:
+            return extract_json(response_text)
+        except ValueError as e:
             logger.warning(f"Failed to parse JSON from Ollama response: {e}")
             logger.debug(f"Response text: {response_text[:500]}")
             # Return empty structure matching schema
             return self._create_empty_schema(schema)
     
+    async def stream_text(
+        self,
+        prompt: str,
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        max_tokens: int = 2000,
+        timeout: Optional[aiohttp.ClientTimeout] = None
+    ) -> AsyncIterator[str]:
+        """
+        Stream generated text chunks from the Ollama API as they are decoded.
+
+        Args:
+            timeout: Request timeout (defaults to the session's ``total=self.timeout``)
+        """
+        started = time.perf_counter()
+        session = await self._get_session()
+        url = urljoin(self.base_url, "/api/generate")
+        
+        payload = {
+            "model": self.model_name,
+            "prompt": prompt,
+            "stream": True,
+            "options": {
+                "temperature": temperature,
+                "num_predict": max_tokens
+            }
+        }
+        if system_prompt:
+            payload["system"] = system_prompt
+        
+        try:
+            async with session.post(url, json=payload, timeout=timeout or session.timeout) as response:
+                if response.status != 200:
+                    error_text = await response.text()
+                    logger.error(f"Ollama API error {response.status}: {error_text}")
+                    self._record_request(time.perf_counter() - started, "error")
+                    raise Exception(f"Ollama API error: {error_text}")
+                
+                # Ollama streams newline-delimited JSON objects
+                async for line in response.content:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    chunk = json.loads(line)
+                    if chunk.get("response"):
+                        yield chunk["response"]
+                    if chunk.get("done"):
+                        self._record_request(
+                            time.perf_counter() - started,
+                            prompt_tokens=chunk.get("prompt_eval_count"),
+                            completion_tokens=chunk.get("eval_count")
+                        )
+                        break
+        except aiohttp.ClientError as e:
+            logger.error(f"Ollama connection error: {e}")
+            self._record_request(time.perf_counter() - started, "error")
+            raise Exception(f"Failed to connect to Ollama: {e}")
+    
+    async def generate_structured_batch(
+        self,
+        prompts: Dict[str, str],
+        schema: Dict[str, Any],
+        system_prompt: Optional[str] = None,
+        temperature: float = 0.7,
+        on_item: Optional[Callable[[str, Dict[str, Any]], None]] = None
+    ) -> Dict[str, Dict[str, Any]]:
+        """
+        Answer several prompts with one streamed request.
+
+        The prompts are combined into a single request asking for a JSON object
+        keyed by prompt key. The response is parsed incrementally, so each
+        key's result is passed to ``on_item`` as soon as its JSON is complete.
+        Keys that are missing or fail to parse, including every key left when
+        the stream fails, are retried on their own (at least once, up to
+        ``max_parse_retries`` times); the rest of the batch is not regenerated.
+        """
+        if len(prompts) == 1:
+            key, prompt = next(iter(prompts.items()))
+            result = await self.generate_structured(prompt, schema, system_prompt, temperature)
+            if on_item:
+                on_item(key, result)
+            return {key: result}
+        
+        sections = "\n\n".join(f"### {key}\n{prompt}" for key, prompt in prompts.items())
+        batch_prompt = f"""
+You will receive {len(prompts)} separate requests, each under a heading with its key.
+Respond with ONLY a JSON object whose keys are exactly: {", ".join(prompts)}.
+The value for each key must be a JSON object matching this schema:
+{json.dumps(schema, indent=2)}
+
+{sections}
+"""
+        
+        results: Dict[str, Dict[str, Any]] = {}
+        parser = IncrementalObjectParser()
+        
+        def _accept(key: str, value: Any) -> None:
+            if key in prompts and key not in results and self._matches_schema(value, schema):
+                results[key] = value
+                if on_item:
+                    on_item(key, value)
+        
+        # A batch generates up to len(prompts) answers: scale the overall limit with
+        # it and bound stalls per read instead
+        batch_timeout = aiohttp.ClientTimeout(total=self.timeout * len(prompts), sock_read=self.timeout)
+        try:
+            async for chunk in self.stream_text(
+                prompt=batch_prompt,
+                system_prompt=system_prompt,
+                temperature=temperature,
+                max_tokens=4000 * len(prompts),
+                timeout=batch_timeout
+            ):
+                for key, value in parser.feed(chunk):
+                    _accept(key, value)
+        except Exception as e:
+            logger.warning(f"Ollama batch request failed after {len(results)}/{len(prompts)} results: {e}")
+        
+        failed = [key for key in prompts if key not in results]
+        for attempt in range(max(1, self.max_parse_retries)):
+            if not failed:
+                break
+            logger.info(f"Retrying {len(failed)} of {len(prompts)} batched prompts individually")
+            retried = await asyncio.gather(*(
+                self.generate_structured(prompts[key], schema, system_prompt, temperature)
+                for key in failed
+            ), return_exceptions=True)
+            for key, value in zip(failed, retried):
+                if not isinstance(value, Exception):
+                    _accept(key, value)
+            failed = [key for key in failed if key not in results]
+        
+        for key in failed:
+            results[key] = self._create_empty_schema(schema)
+        return results
+    
+    @staticmethod
+    def _matches_schema(value: Any, schema: Dict[str, Any]) -> bool:
+        """Shallow check that a parsed value has the schema's type and required keys."""
+        if schema.get("type") == "object":
+            return isinstance(value, dict) and all(k in value for k in schema.get("required", []))
+        if schema.get("type") == "array":
+            return isinstance(value, list)
+        return value is not None
+    
     async def is_available(self) -> bool:
         """Check if Ollama is available."""
         try:
@@ -131,9 +296,15 @@ Respond with ONLY valid JSON matching the schema above.
             return []
         return {}
     
+    async def close(self) -> None:
+        """Close the shared HTTP session."""
+        if self._session and not self._session.closed:
+            await self._session.close()
+        self._session = None
+        self._session_loop = None
+    
     async def __aenter__(self):
         return self
     
     async def __aexit__(self, exc_type, exc_val, exc_tb):
-        if self._session and not self._session.closed:
-            await self._session.close()
+        await self.close()
@@ -1,10 +1,14 @@
 """OpenAI LLM provider for cloud-based model inference."""
 
+import os
 import json
+import time
+import hashlib
 import logging
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Mapping, Optional, Tuple
 
 from app.services.ai.llm_provider import LLMProvider
+from app.services.ai.rate_limiter import get_rate_limiter
 
 logger = logging.getLogger(__name__)
 
@@ -19,6 +23,8 @@ except ImportError:
 
 class OpenAIProvider(LLMProvider):
     """OpenAI provider for GPT models."""
+
+    provider_name = "openai"
     
     def __init__(self, config: Dict[str, Any]):
         super().__init__(config)
@@ -32,12 +38,69 @@ class OpenAIProvider(LLMProvider):
         self.model_name = config.get("model_name", "gpt-3.5-turbo")
         self.timeout = config.get("timeout", 60)
         
-        # Initialize OpenAI client
+        # Optional alternative endpoint (e.g. a stand-in server in tests); the
+        # client also honours OPENAI_BASE_URL when this is unset
+        self.api_base_url = config.get("api_base_url")
+        
+        # Initialize OpenAI client (retries are handled by the shared rate limiter)
         self.client = openai.AsyncOpenAI(
             api_key=self.api_key,
-            timeout=self.timeout
+            timeout=self.timeout,
+            base_url=self.api_base_url,
+            max_retries=0
+        )
+        
+        # One limiter per endpoint + key, shared by every provider instance using it
+        key_digest = hashlib.sha256(self.api_key.encode("utf-8")).hexdigest()[:12]
+        self.rate_limiter = get_rate_limiter(
+            f"openai:{self.api_base_url or os.getenv('OPENAI_BASE_URL', 'default')}:{key_digest}",
+            requests_per_minute=int(config.get("requests_per_minute") or os.getenv("OPENAI_RPM", "500")),
+            tokens_per_minute=int(config.get("tokens_per_minute") or os.getenv("OPENAI_TPM", "90000")),
+            max_concurrency=int(config.get("max_concurrency") or os.getenv("OPENAI_MAX_CONCURRENCY", "8")),
+            max_retries=int(config.get("max_retries") or os.getenv("OPENAI_MAX_RETRIES", "5"))
         )
     
+    @staticmethod
+    def _classify_error(error: Exception) -> Tuple[bool, bool, Optional[float], Optional[Mapping[str, str]]]:
+        """Map an OpenAI error to (retryable, throttled, retry_after, headers)."""
+        response = getattr(error, "response", None)
+        headers = getattr(response, "headers", None)
+        retry_after = None
+        if headers is not None:
+            try:
+                retry_after = float(headers.get("retry-after")) if headers.get("retry-after") else None
+            except ValueError:
+                retry_after = None
+        
+        if isinstance(error, openai.RateLimitError):
+            return True, True, retry_after, headers
+        if isinstance(error, (openai.APIConnectionError, openai.APITimeoutError)):
+            return True, False, None, None
+        if isinstance(error, openai.APIStatusError) and error.status_code >= 500:
+            return True, False, retry_after, headers
+        return False, False, None, headers
+    
+    async def _create_completion(self, estimated_tokens: int, **kwargs) -> Any:
+        """Create a chat completion under the shared rate limiter, with retries."""
+        async def _call():
+            raw = await self.client.chat.completions.with_raw_response.create(**kwargs)
+            self.rate_limiter.update_from_headers(raw.headers)
+            return raw.parse()
+        
+        response = await self.rate_limiter.run(_call, self._classify_error, estimated_tokens)
+        
+        # Give back the part of the token reservation the request didn't use
+        usage = getattr(response, "usage", None)
+        total_tokens = getattr(usage, "total_tokens", None)
+        if total_tokens is not None and total_tokens < estimated_tokens:
+            self.rate_limiter.tokens.refund(estimated_tokens - total_tokens)
+        return response
+    
+    @staticmethod
+    def _estimate_tokens(messages: list, max_tokens: int) -> int:
+        """Rough token estimate (~4 characters per token) plus the completion budget."""
+        return sum(len(m.get("content") or "") for m in messages) // 4 + max_tokens
+    
     async def generate_text(
         self, 
         prompt: str, 
@@ -46,23 +109,27 @@ class OpenAIProvider(LLMProvider):
         max_tokens: int = 2000
     ) -> str:
         """Generate text using OpenAI API."""
+        started = time.perf_counter()
         try:
             messages = []
             if system_prompt:
                 messages.append({"role": "system", "content": system_prompt})
             messages.append({"role": "user", "content": prompt})
             
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
+                self._estimate_tokens(messages, max_tokens),
                 model=self.model_name,
                 messages=messages,
                 temperature=temperature,
                 max_tokens=max_tokens
             )
+            self._record_usage(response, started)
             
             return response.choices[0].message.content
             
         except Exception as e:
             logger.error(f"OpenAI generation error: {e}")
+            self._record_request(time.perf_counter() - started, "error")
             raise Exception(f"OpenAI API error: {e}")
     
     async def generate_structured(
@@ -73,6 +140,8 @@ class OpenAIProvider(LLMProvider):
         temperature: float = 0.7
     ) -> Dict[str, Any]:
         """Generate structured JSON output using function calling."""
+        started = time.perf_counter()
+        response = None
         try:
             messages = []
             if system_prompt:
@@ -86,13 +155,15 @@ class OpenAIProvider(LLMProvider):
                 "parameters": schema
             }]
             
-            response = await self.client.chat.completions.create(
+            response = await self._create_completion(
+                self._estimate_tokens(messages, self.config.get("max_tokens") or 2000),
                 model=self.model_name,
                 messages=messages,
                 functions=functions,
                 function_call={"name": "generate_response"},
                 temperature=temperature
             )
+            self._record_usage(response, started)
             
             # Extract function call arguments
             message = response.choices[0].message
@@ -108,6 +179,8 @@ class OpenAIProvider(LLMProvider):
         
         except Exception as e:
             logger.error(f"OpenAI structured generation error: {e}")
+            if response is None:
+                self._record_request(time.perf_counter() - started, "error")
             # Return empty structure on error
             return self._create_empty_schema(schema)
     
@@ -121,6 +194,15 @@ class OpenAIProvider(LLMProvider):
             logger.debug(f"OpenAI availability check failed: {e}")
             return False
     
+    def _record_usage(self, response: Any, started: float) -> None:
+        """Record latency and token usage from a completion response."""
+        usage = getattr(response, "usage", None)
+        self._record_request(
+            time.perf_counter() - started,
+            prompt_tokens=getattr(usage, "prompt_tokens", None),
+            completion_tokens=getattr(usage, "completion_tokens", None)
+        )
+    
     def _create_empty_schema(self, schema: Dict[str, Any]) -> Dict[str, Any]:
         """Create empty structure matching schema."""
         if schema.get("type") == "object":
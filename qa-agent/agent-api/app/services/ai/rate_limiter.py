@@ -0,0 +1,290 @@
+"""Rate-limit-aware concurrency control and usage accounting for LLM requests."""
+
+import os
+import re
+import time
+import random
+import asyncio
+import logging
+import contextvars
+from contextlib import asynccontextmanager
+from typing import Any, Awaitable, Callable, Dict, Mapping, Optional, Tuple, TypeVar
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Run the current LLM request is attributed to (set by the generation pipeline)
+current_llm_run_id: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar(
+    "current_llm_run_id", default=None
+)
+
+# USD per 1M tokens (prompt, completion); override unknown models via LLM_PRICE_<MODEL>="in,out"
+MODEL_PRICES: Dict[str, Tuple[float, float]] = {
+    "gpt-3.5-turbo": (0.50, 1.50),
+    "gpt-4": (30.00, 60.00),
+    "gpt-4-turbo": (10.00, 30.00),
+    "gpt-4o": (2.50, 10.00),
+    "gpt-4o-mini": (0.15, 0.60),
+}
+
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+
+
+def parse_reset_duration(value: Optional[str]) -> Optional[float]:
+    """Parse rate-limit reset values such as ``"1s"``, ``"6m0s"`` or ``"20ms"`` into seconds."""
+    if not value:
+        return None
+    try:
+        return float(value)
+    except ValueError:
+        pass
+    parts = _DURATION_PART.findall(value)
+    if not parts:
+        return None
+    scale = {"h": 3600.0, "m": 60.0, "s": 1.0, "ms": 0.001}
+    return sum(float(amount) * scale[unit] for amount, unit in parts)
+
+
+def model_price(model: str) -> Tuple[float, float]:
+    """Price per 1M (prompt, completion) tokens for a model, (0, 0) if unknown."""
+    override = os.getenv(f"LLM_PRICE_{re.sub(r'[^A-Za-z0-9]', '_', model).upper()}")
+    if override:
+        try:
+            prompt_price, completion_price = (float(p) for p in override.split(","))
+            return prompt_price, completion_price
+        except ValueError:
+            logger.warning(f"Ignoring malformed price override for {model}: {override}")
+    for name in sorted(MODEL_PRICES, key=len, reverse=True):
+        if model.startswith(name):
+            return MODEL_PRICES[name]
+    return 0.0, 0.0
+
+
+class TokenBucket:
+    """
+    Token bucket refilled continuously at ``capacity`` per ``period`` seconds.
+
+    Capacity and current level can be corrected from server-reported limits
+    via ``update``.
+    """
+
+    def __init__(self, capacity: float, period: float = 60.0):
+        self.capacity = float(capacity)
+        self.period = period
+        self.tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        if now <= self._updated:
+            return  # Window reset is still in the future
+        self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.capacity / self.period)
+        self._updated = now
+
+    async def acquire(self, amount: float = 1.0) -> None:
+        """Wait until ``amount`` tokens are available and take them."""
+        amount = min(amount, self.capacity)
+        async with self._lock:
+            while True:
+                self._refill()
+                if self.tokens >= amount:
+                    self.tokens -= amount
+                    return
+                await asyncio.sleep((amount - self.tokens) * self.period / self.capacity)
+
+    def refund(self, amount: float) -> None:
+        """Return over-reserved tokens (e.g. when a response used fewer than estimated)."""
+        self._refill()
+        self.tokens = min(self.capacity, self.tokens + amount)
+
+    def update(self, limit: Optional[float], remaining: Optional[float], reset_seconds: Optional[float]) -> None:
+        """Align the bucket with limits reported by the server."""
+        self._refill()
+        if limit:
+            self.capacity = float(limit)
+        if remaining is not None:
+            self.tokens = min(self.tokens, float(remaining))
+            if remaining <= 0 and reset_seconds:
+                # Nothing left until the window resets: push the refill clock forward
+                self._updated = time.monotonic() + reset_seconds
+
+
+class RateLimitController:
+    """
+    Shared limiter for one provider endpoint.
+
+    Combines request-per-minute and token-per-minute buckets (refreshed from
+    ``x-ratelimit-*`` response headers) with an AIMD concurrency limit: every
+    success raises the limit slowly, every 429 halves it.
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = 500,
+        tokens_per_minute: int = 90000,
+        max_concurrency: int = 8,
+        min_concurrency: int = 1,
+        max_retries: int = 5,
+        base_delay: float = 1.0,
+        max_delay: float = 60.0
+    ):
+        self.requests = TokenBucket(requests_per_minute)
+        self.tokens = TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.in_flight = 0
+        self.throttled = 0
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self, estimated_tokens: int = 0):
+        """Hold one request slot, waiting for concurrency and rate budget."""
+        async with self._condition:
+            await self._condition.wait_for(lambda: self.in_flight < int(self.concurrency_limit))
+            self.in_flight += 1
+        try:
+            await self.requests.acquire(1)
+            if estimated_tokens:
+                await self.tokens.acquire(estimated_tokens)
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self._condition.notify_all()
+
+    def on_success(self) -> None:
+        self.concurrency_limit = min(self.max_concurrency, self.concurrency_limit + 1.0 / max(self.concurrency_limit, 1.0))
+
+    def on_throttled(self) -> None:
+        self.throttled += 1
+        self.concurrency_limit = max(self.min_concurrency, self.concurrency_limit / 2)
+        logger.warning(f"LLM rate limited, concurrency limit now {int(self.concurrency_limit)}")
+
+    def update_from_headers(self, headers: Optional[Mapping[str, str]]) -> None:
+        """Refresh budgets from ``x-ratelimit-*`` response headers."""
+        if not headers:
+            return
+
+        def _num(name: str) -> Optional[float]:
+            value = headers.get(name)
+            try:
+                return float(value) if value is not None else None
+            except ValueError:
+                return None
+
+        self.requests.update(
+            _num("x-ratelimit-limit-requests"),
+            _num("x-ratelimit-remaining-requests"),
+            parse_reset_duration(headers.get("x-ratelimit-reset-requests"))
+        )
+        self.tokens.update(
+            _num("x-ratelimit-limit-tokens"),
+            _num("x-ratelimit-remaining-tokens"),
+            parse_reset_duration(headers.get("x-ratelimit-reset-tokens"))
+        )
+
+    def backoff_delay(self, attempt: int, retry_after: Optional[float] = None) -> float:
+        """Full-jitter exponential backoff, never shorter than the server's retry-after."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * (2 ** attempt)))
+        if retry_after:
+            delay = max(delay, retry_after)
+        return delay
+
+    async def run(
+        self,
+        call: Callable[[], Awaitable[T]],
+        classify_error: Callable[[Exception], Tuple[bool, bool, Optional[float], Optional[Mapping[str, str]]]],
+        estimated_tokens: int = 0
+    ) -> T:
+        """
+        Run ``call`` under the limiter, retrying transient failures.
+
+        Args:
+            call: Zero-argument coroutine factory performing one request
+            classify_error: Maps an exception to (retryable, throttled, retry_after, headers)
+            estimated_tokens: Token budget to reserve for the request
+
+        Returns:
+            The result of the first successful call
+        """
+        attempt = 0
+        while True:
+            retry_after = None
+            async with self.slot(estimated_tokens):
+                try:
+                    result = await call()
+                    self.on_success()
+                    return result
+                except Exception as e:
+                    retryable, throttled, retry_after, headers = classify_error(e)
+                    self.update_from_headers(headers)
+                    if throttled:
+                        self.on_throttled()
+                    if not retryable or attempt >= self.max_retries:
+                        raise
+            delay = self.backoff_delay(attempt, retry_after)
+            attempt += 1
+            logger.info(f"Retrying LLM request in {delay:.1f}s (attempt {attempt}/{self.max_retries})")
+            await asyncio.sleep(delay)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "in_flight": self.in_flight,
+            "concurrency_limit": int(self.concurrency_limit),
+            "throttled": self.throttled,
+            "requests_available": round(self.requests.tokens, 1),
+            "tokens_available": round(self.tokens.tokens, 1),
+        }
+
+
+class LLMUsageTracker:
+    """Per-run token and cost counters."""
+
+    def __init__(self):
+        self._runs: Dict[str, Dict[str, Any]] = {}
+
+    def record(self, run_id: Optional[str], model: str, prompt_tokens: int = 0, completion_tokens: int = 0) -> None:
+        if not run_id:
+            return
+        prompt_price, completion_price = model_price(model)
+        usage = self._runs.setdefault(run_id, {
+            "requests": 0,
+            "prompt_tokens": 0,
+            "completion_tokens": 0,
+            "cost_usd": 0.0,
+        })
+        usage["requests"] += 1
+        usage["prompt_tokens"] += prompt_tokens or 0
+        usage["completion_tokens"] += completion_tokens or 0
+        usage["cost_usd"] += ((prompt_tokens or 0) * prompt_price + (completion_tokens or 0) * completion_price) / 1_000_000
+
+    def get(self, run_id: str) -> Dict[str, Any]:
+        return dict(self._runs.get(run_id, {}))
+
+    def pop(self, run_id: str) -> Dict[str, Any]:
+        return self._runs.pop(run_id, {})
+
+
+# Shared limiters per endpoint/key and global usage tracker
+_rate_limiters: Dict[str, RateLimitController] = {}
+_usage_tracker = LLMUsageTracker()
+
+
+def get_rate_limiter(key: str, **kwargs) -> RateLimitController:
+    """Get (or create) the shared rate limiter for an endpoint/key."""
+    limiter = _rate_limiters.get(key)
+    if limiter is None:
+        limiter = RateLimitController(**kwargs)
+        _rate_limiters[key] = limiter
+    return limiter
+
+
+def get_llm_usage_tracker() -> LLMUsageTracker:
+    """Get global LLM usage tracker instance."""
+    return _usage_tracker
@@ -0,0 +1,184 @@
+"""Persistent, size-bounded cache for LLM responses."""
+
+import os
+import json
+import time
+import sqlite3
+import asyncio
+import hashlib
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Any, Optional
+
+from app.services.metrics import LLM_CACHE_REQUESTS
+
+logger = logging.getLogger(__name__)
+
+# Cache location and bounds (override via environment)
+LLM_CACHE_DIR = os.getenv("LLM_CACHE_DIR", "./.cache/llm")
+LLM_CACHE_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "5000"))
+LLM_CACHE_MAX_BYTES = int(os.getenv("LLM_CACHE_MAX_BYTES", str(256 * 1024 * 1024)))
+
+
+def make_cache_key(
+    provider: str,
+    model: str,
+    system_prompt: Optional[str],
+    prompt: str,
+    temperature: float,
+    schema: Optional[Dict[str, Any]] = None
+) -> str:
+    """Build a cache key from everything that determines a response."""
+    prompt_hash = hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+    parts = {
+        "provider": provider,
+        "model": model,
+        "system_prompt": system_prompt or "",
+        "prompt_hash": prompt_hash,
+        "temperature": round(float(temperature), 4),
+        "schema": schema,
+    }
+    return hashlib.sha256(json.dumps(parts, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+class LLMResponseCache:
+    """
+    Disk-backed LRU cache of LLM responses.
+
+    Entries live in a small SQLite file so they survive restarts and are
+    shared by every run. Eviction removes the least recently used entries once
+    either the entry count or the total payload size exceeds its bound.
+    Blocking SQLite calls run in a worker thread.
+    """
+
+    def __init__(
+        self,
+        cache_dir: str = LLM_CACHE_DIR,
+        max_entries: int = LLM_CACHE_MAX_ENTRIES,
+        max_bytes: int = LLM_CACHE_MAX_BYTES
+    ):
+        self.path = Path(cache_dir) / "responses.sqlite3"
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    def _connection(self) -> sqlite3.Connection:
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(
+                """CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    value TEXT NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    accessed_at REAL NOT NULL
+                )"""
+            )
+            conn.execute("CREATE INDEX IF NOT EXISTS ix_responses_accessed_at ON responses (accessed_at)")
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+    def get_sync(self, key: str) -> Optional[Any]:
+        """Look up a cached response, refreshing its LRU position."""
+        with self._lock:
+            conn = self._connection()
+            row = conn.execute("SELECT value FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None:
+                self.misses += 1
+                LLM_CACHE_REQUESTS.labels("miss").inc()
+                return None
+            conn.execute("UPDATE responses SET accessed_at = ? WHERE key = ?", (time.time(), key))
+            conn.commit()
+        self.hits += 1
+        LLM_CACHE_REQUESTS.labels("hit").inc()
+        return json.loads(row[0])
+
+    def set_sync(self, key: str, value: Any) -> None:
+        """Store a response and evict least recently used entries beyond the bounds."""
+        payload = json.dumps(value, default=str)
+        now = time.time()
+        with self._lock:
+            conn = self._connection()
+            conn.execute(
+                "INSERT OR REPLACE INTO responses (key, value, size, created_at, accessed_at) VALUES (?, ?, ?, ?, ?)",
+                (key, payload, len(payload), now, now)
+            )
+            self._evict(conn)
+            conn.commit()
+
+    def _evict(self, conn: sqlite3.Connection) -> None:
+        count, total_size = conn.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        evicted = 0
+        if count > self.max_entries:
+            evicted += conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY accessed_at ASC LIMIT ?)",
+                (count - self.max_entries,)
+            ).rowcount
+            total_size = conn.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total_size > self.max_bytes:
+            # Oldest entries whose cumulative size covers the excess
+            evicted += conn.execute(
+                "DELETE FROM responses WHERE key IN ("
+                "SELECT key FROM (SELECT key, size, SUM(size) OVER (ORDER BY accessed_at ASC, key "
+                "ROWS UNBOUNDED PRECEDING) AS running FROM responses) WHERE running - size < ?)",
+                (total_size - self.max_bytes,)
+            ).rowcount
+        if evicted:
+            logger.info(f"LLM cache evicted {evicted} entries")
+
+    async def get(self, key: str) -> Optional[Any]:
+        try:
+            return await asyncio.to_thread(self.get_sync, key)
+        except Exception as e:
+            logger.warning(f"LLM cache read failed: {e}")
+            return None
+
+    async def set(self, key: str, value: Any) -> None:
+        try:
+            await asyncio.to_thread(self.set_sync, key, value)
+        except Exception as e:
+            logger.warning(f"LLM cache write failed: {e}")
+
+    def clear(self) -> None:
+        with self._lock:
+            conn = self._connection()
+            conn.execute("DELETE FROM responses")
+            conn.commit()
+
+    def stats(self) -> Dict[str, Any]:
+        """Hit/miss counters and current size."""
+        with self._lock:
+            count, total_size = self._connection().execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses"
+            ).fetchone()
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": (self.hits / lookups) if lookups else 0.0,
+            "entries": count,
+            "bytes": total_size,
+            "max_entries": self.max_entries,
+            "max_bytes": self.max_bytes,
+        }
+
+
+# Global cache instance
+_llm_response_cache: Optional[LLMResponseCache] = None
+
+
+def get_llm_response_cache() -> LLMResponseCache:
+    """Get global LLM response cache instance."""
+    global _llm_response_cache
+    if _llm_response_cache is None:
+        _llm_response_cache = LLMResponseCache()
+    return _llm_response_cache
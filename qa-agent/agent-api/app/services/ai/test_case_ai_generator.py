@@ -1,13 +1,21 @@
 """AI-powered test case generation service."""
 
+import os
 import json
+import asyncio
 import logging
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Tuple
 
 from app.services.ai.llm_provider import LLMProvider
+from app.services.ai.response_cache import get_llm_response_cache, make_cache_key
+from app.services.ai.rate_limiter import current_llm_run_id
 
 logger = logging.getLogger(__name__)
 
+# Pages of the same shape are combined into one request when the provider supports it
+AI_BATCH_SIZE = int(os.getenv("AI_BATCH_SIZE", "4"))
+AI_BATCH_WINDOW = float(os.getenv("AI_BATCH_WINDOW", "0.25"))  # seconds to wait for similar pages
+
 # JSON schema for test case generation
 TEST_CASE_SCHEMA = {
     "type": "object",
@@ -47,19 +55,35 @@ TEST_CASE_SCHEMA = {
 class TestCaseAIGenerator:
     """AI-powered test case generation from discovery data."""
     
-    def __init__(self, llm_provider: LLMProvider):
+    def __init__(
+        self,
+        llm_provider: LLMProvider,
+        use_cache: bool = True,
+        batch_size: int = AI_BATCH_SIZE,
+        batch_window: float = AI_BATCH_WINDOW
+    ):
         """
         Initialize AI test case generator.
         
         Args:
             llm_provider: LLM provider instance
+            use_cache: Reuse persisted responses for identical prompts
+            batch_size: Maximum pages per batched request (1 disables batching)
+            batch_window: Seconds to wait for similar pages before sending a batch
         """
         self.provider = llm_provider
+        self.use_cache = use_cache
+        self.temperature = llm_provider.config.get("temperature", 0.7)
+        self.batch_size = batch_size if llm_provider.supports_batching else 1
+        self.batch_window = batch_window
+        self._pending_batches: Dict[Tuple[Any, ...], List[Tuple[str, asyncio.Future]]] = {}
+        self._batch_timers: Dict[Tuple[Any, ...], asyncio.TimerHandle] = {}
     
     async def generate_from_discovery(
         self, 
         discovery_data: Dict[str, Any],
-        page_info: Dict[str, Any]
+        page_info: Dict[str, Any],
+        bypass_cache: bool = False
     ) -> List[Dict[str, Any]]:
         """
         Generate test cases using AI from discovery data.
@@ -67,18 +91,45 @@ class TestCaseAIGenerator:
         Args:
             discovery_data: Full discovery data
             page_info: Specific page information
+            bypass_cache: Skip the cache lookup and force a fresh generation
+                (the new response still replaces the cached one)
             
         Returns:
             List of generated test cases
         """
         try:
             prompt = self._build_test_generation_prompt(discovery_data, page_info)
+            system_prompt = self._get_system_prompt()
             
-            response = await self.provider.generate_structured(
-                prompt=prompt,
-                schema=TEST_CASE_SCHEMA,
-                system_prompt=self._get_system_prompt()
-            )
+            cache = get_llm_response_cache() if self.use_cache else None
+            cache_key = None
+            response = None
+            if cache is not None:
+                cache_key = make_cache_key(
+                    self.provider.provider_name,
+                    getattr(self.provider, "model_name", "unknown"),
+                    system_prompt,
+                    prompt,
+                    self.temperature,
+                    TEST_CASE_SCHEMA
+                )
+                if not bypass_cache:
+                    response = await cache.get(cache_key)
+                    if response is not None:
+                        logger.info(f"AI test cases served from cache for {page_info.get('url', '')}")
+            
+            if response is None:
+                if self.batch_size > 1:
+                    response = await self._generate_batched(page_info, prompt, system_prompt)
+                else:
+                    response = await self.provider.generate_structured(
+                        prompt=prompt,
+                        schema=TEST_CASE_SCHEMA,
+                        system_prompt=system_prompt,
+                        temperature=self.temperature
+                    )
+                if cache is not None and response.get("test_cases"):
+                    await cache.set(cache_key, response)
             
             test_cases = response.get("test_cases", [])
             logger.info(f"AI generated {len(test_cases)} test cases")
@@ -89,6 +140,106 @@ class TestCaseAIGenerator:
             # Return empty list on error - fallback to rule-based
             return []
     
+    def _page_group(self, page_info: Dict[str, Any]) -> Tuple[bool, ...]:
+        """Feature profile used to batch only similar pages together."""
+        return (
+            len(page_info.get("tables", [])) > 0,
+            len(page_info.get("forms", [])) > 0,
+            self._detect_search(page_info),
+            self._detect_filters(page_info),
+            self._detect_pagination(page_info),
+        )
+    
+    async def _generate_batched(
+        self,
+        page_info: Dict[str, Any],
+        prompt: str,
+        system_prompt: str
+    ) -> Dict[str, Any]:
+        """
+        Queue a page prompt into a batch of similar pages and await its result.
+
+        A batch is sent when it reaches ``batch_size`` pages or ``batch_window``
+        seconds after its first page arrived. Only pages of the same run and
+        feature profile share a batch. Each page's future resolves as
+        soon as its part of the streamed response has been parsed.
+        """
+        loop = asyncio.get_running_loop()
+        # Batches never mix runs: the request's token usage is charged to the run
+        # whose context sends it
+        group = (current_llm_run_id.get(),) + self._page_group(page_info)
+        future = loop.create_future()
+        
+        pending = self._pending_batches.setdefault(group, [])
+        pending.append((prompt, future))
+        if len(pending) >= self.batch_size:
+            loop.create_task(self._flush_batch(group))
+        elif len(pending) == 1:
+            self._batch_timers[group] = loop.call_later(
+                self.batch_window, lambda: loop.create_task(self._flush_batch(group))
+            )
+        
+        return await future
+    
+    async def _flush_batch(self, group: Tuple[Any, ...]) -> None:
+        """Send the pending batch for a page group."""
+        timer = self._batch_timers.pop(group, None)
+        if timer is not None:
+            # Flushed early because the batch filled: the window belongs to the next batch
+            timer.cancel()
+        batch = self._pending_batches.pop(group, None)
+        if not batch:
+            return
+        
+        futures = {f"page_{i + 1}": future for i, (_, future) in enumerate(batch)}
+        prompts = {f"page_{i + 1}": prompt for i, (prompt, _) in enumerate(batch)}
+        
+        def _resolve(key: str, result: Dict[str, Any]) -> None:
+            future = futures.get(key)
+            if future is not None and not future.done():
+                future.set_result(result)
+        
+        try:
+            if len(batch) > 1:
+                logger.info(f"Sending batched AI request for {len(batch)} similar pages")
+            results = await self.provider.generate_structured_batch(
+                prompts=prompts,
+                schema=TEST_CASE_SCHEMA,
+                system_prompt=self._get_system_prompt(),
+                temperature=self.temperature,
+                on_item=_resolve
+            )
+            for key, result in results.items():
+                _resolve(key, result)
+        except Exception as e:
+            logger.warning(f"Batched AI generation failed: {e}")
+            await self._generate_unresolved(prompts, futures)
+        finally:
+            for future in futures.values():
+                if not future.done():
+                    future.set_result({"test_cases": []})
+    
+    async def _generate_unresolved(self, prompts: Dict[str, str], futures: Dict[str, asyncio.Future]) -> None:
+        """Generate the pages of a failed batch one by one so they are not lost."""
+        unresolved = [key for key, future in futures.items() if not future.done()]
+        if not unresolved:
+            return
+        logger.info(f"Retrying {len(unresolved)} pages of the failed batch individually")
+        results = await asyncio.gather(*(
+            self.provider.generate_structured(
+                prompt=prompts[key],
+                schema=TEST_CASE_SCHEMA,
+                system_prompt=self._get_system_prompt(),
+                temperature=self.temperature
+            )
+            for key in unresolved
+        ), return_exceptions=True)
+        for key, result in zip(unresolved, results):
+            if isinstance(result, Exception):
+                logger.warning(f"AI generation failed for {key} of the failed batch: {result}")
+            elif not futures[key].done():
+                futures[key].set_result(result)
+    
     def _build_test_generation_prompt(
         self, 
         discovery_data: Dict[str, Any],
@@ -102,7 +102,7 @@ def create_enhanced_test_case_generator(ai_config: Optional[AIConfig] = None) ->
                     available = asyncio.run(llm_provider.is_available())
                 
                 if available:
-                    ai_generator = TestCaseAIGenerator(llm_provider)
+                    ai_generator = TestCaseAIGenerator(llm_provider, use_cache=ai_config.cache_enabled)
                     logger.info(f"AI test case generator created with {ai_config.provider} provider")
                 else:
                     logger.warning(f"AI provider {ai_config.provider} is not available, using rule-based only")
@@ -0,0 +1,402 @@
+"""
+Artifact I/O - Encoding and decoding of run artifacts.
+
+All JSON artifacts of a run (discovery.json, test_cases.json, report.json,
+run_context.json, ...) are written and read through this module so the
+encoding can be tuned in one place:
+
+- ``json``: JSON text, encoded with orjson when it is installed (falling back
+  to the stdlib encoder), pretty-printed unless ``ARTIFACT_JSON_PRETTY=false``
+- ``msgpack``: compact MessagePack binary (requires the ``msgpack`` package)
+
+File names never change. Readers detect the encoding from the file content,
+so artifacts written with any format - including runs written before this
+module existed - remain readable.
+
+Finished runs can additionally be compressed (``ARTIFACT_COMPRESSION=gzip``
+or ``zstd``) with ``compress_run_artifacts``: JSON artifacts are compressed
+in place and detected by their magic bytes on read, while append-only logs
+(``*.jsonl``) are stream-compressed into a ``.gz``/``.zst`` sibling that
+``iter_artifact_lines`` reads back ahead of any lines appended later.
+"""
+
+import io
+import os
+import gzip
+import json
+import shutil
+import logging
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+logger = logging.getLogger(__name__)
+
+# Optional fast JSON encoder/decoder
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on environment
+    orjson = None
+
+# Optional compact binary encoding
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - depends on environment
+    msgpack = None
+
+# Optional zstd compression (gzip is always available)
+try:
+    import zstandard
+except ImportError:  # pragma: no cover - depends on environment
+    zstandard = None
+
+ARTIFACT_FORMATS = ("json", "msgpack")
+# Encoding used for new artifacts
+ARTIFACT_FORMAT = os.getenv("ARTIFACT_FORMAT", "json").lower()
+# Indent JSON artifacts (human readable) or write them compactly
+ARTIFACT_JSON_PRETTY = os.getenv("ARTIFACT_JSON_PRETTY", "true").lower() in ("1", "true", "yes")
+
+# Compression of finished run artifacts: none, gzip or zstd
+ARTIFACT_COMPRESSION = os.getenv("ARTIFACT_COMPRESSION", "none").lower()
+ARTIFACT_COMPRESSION_LEVEL = os.getenv("ARTIFACT_COMPRESSION_LEVEL")  # codec default if unset
+# JSON artifacts smaller than this are left uncompressed
+ARTIFACT_COMPRESSION_MIN_BYTES = int(os.getenv("ARTIFACT_COMPRESSION_MIN_BYTES", "65536"))
+
+# Mutable run state rewritten throughout a run's life: never compressed
+COMPRESSION_EXCLUDED = {"run_context.json"}
+
+GZIP_MAGIC = b"\x1f\x8b"
+ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+# Suffix of the compressed sibling of an append-only log, by codec
+LOG_SUFFIXES = {"zstd": ".zst", "gzip": ".gz"}
+
+PathLike = Union[str, Path]
+
+
+def _resolve_format(fmt: Optional[str]) -> str:
+    fmt = (fmt or ARTIFACT_FORMAT).lower()
+    if fmt not in ARTIFACT_FORMATS:
+        logger.warning(f"Unknown artifact format {fmt}, using json")
+        return "json"
+    if fmt == "msgpack" and msgpack is None:
+        logger.warning("msgpack not installed, writing JSON artifacts. Install with: pip install msgpack")
+        return "json"
+    return fmt
+
+
+def _encode_json(data: Any, pretty: bool) -> bytes:
+    if orjson is not None:
+        # Pass datetimes/dataclasses to default=str so output matches the stdlib encoder
+        option = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME | orjson.OPT_PASSTHROUGH_DATACLASS
+        if pretty:
+            option |= orjson.OPT_INDENT_2
+        try:
+            return orjson.dumps(data, default=str, option=option)
+        except (TypeError, orjson.JSONEncodeError) as e:
+            # e.g. integers beyond 64 bits: the stdlib encoder handles them
+            logger.debug(f"orjson could not encode artifact, using json: {e}")
+    return json.dumps(data, indent=2 if pretty else None, default=str).encode("utf-8")
+
+
+def detect_compression(raw: bytes) -> Optional[str]:
+    """Compression codec of artifact bytes (``gzip``/``zstd``), None if uncompressed."""
+    if raw.startswith(GZIP_MAGIC):
+        return "gzip"
+    if raw.startswith(ZSTD_MAGIC):
+        return "zstd"
+    return None
+
+
+def _resolve_compression(codec: Optional[str]) -> Optional[str]:
+    codec = (codec or ARTIFACT_COMPRESSION).lower()
+    if codec in ("", "none", "off", "false"):
+        return None
+    if codec not in LOG_SUFFIXES:
+        logger.warning(f"Unknown artifact compression {codec}, artifacts are left uncompressed")
+        return None
+    if codec == "zstd" and zstandard is None:
+        logger.warning("zstandard not installed, compressing artifacts with gzip. Install with: pip install zstandard")
+        return "gzip"
+    return codec
+
+
+def _level(codec: str) -> int:
+    if ARTIFACT_COMPRESSION_LEVEL:
+        return int(ARTIFACT_COMPRESSION_LEVEL)
+    return 3 if codec == "zstd" else 6
+
+
+def compress_bytes(raw: bytes, codec: Optional[str] = None) -> bytes:
+    """Compress bytes with ``codec`` (default: ``ARTIFACT_COMPRESSION``); unchanged if disabled."""
+    codec = _resolve_compression(codec)
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=_level(codec)).compress(raw)
+    if codec == "gzip":
+        return gzip.compress(raw, compresslevel=_level(codec))
+    return raw
+
+
+def decompress_bytes(raw: bytes) -> bytes:
+    """Decompress gzip/zstd bytes; uncompressed bytes are returned unchanged."""
+    codec = detect_compression(raw)
+    if codec == "gzip":
+        return gzip.decompress(raw)
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Artifact is zstd compressed but zstandard is not installed")
+        return zstandard.ZstdDecompressor().decompressobj().decompress(raw)
+    return raw
+
+
+def encode_artifact(data: Any, fmt: Optional[str] = None, pretty: Optional[bool] = None) -> bytes:
+    """
+    Encode an artifact.
+
+    Args:
+        data: JSON-compatible data (unknown types are stored as ``str``)
+        fmt: ``json`` or ``msgpack`` (default: ``ARTIFACT_FORMAT``)
+        pretty: Indent JSON output (default: ``ARTIFACT_JSON_PRETTY``)
+
+    Returns:
+        Encoded bytes
+    """
+    if _resolve_format(fmt) == "msgpack":
+        return msgpack.packb(data, default=str, use_bin_type=True)
+    return _encode_json(data, ARTIFACT_JSON_PRETTY if pretty is None else pretty)
+
+
+def is_binary_artifact(raw: bytes) -> bool:
+    """Whether encoded artifact bytes are MessagePack rather than JSON text."""
+    for byte in raw[:64]:
+        if byte in b" \t\r\n":
+            continue
+        # JSON documents start with an ASCII character; MessagePack maps/arrays with >= 0x80
+        return byte >= 0x80
+    return False
+
+
+def decode_artifact(raw: bytes) -> Any:
+    """Decode artifact bytes, detecting compression and JSON or MessagePack from the content."""
+    raw = decompress_bytes(raw)
+    if is_binary_artifact(raw):
+        if msgpack is None:
+            raise RuntimeError("Artifact is MessagePack encoded but msgpack is not installed")
+        return msgpack.unpackb(raw, raw=False, strict_map_key=False)
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/Infinity written by the stdlib encoder
+    return json.loads(raw)
+
+
+def write_artifact(path: PathLike, data: Any, fmt: Optional[str] = None, pretty: Optional[bool] = None) -> Path:
+    """
+    Write an artifact file.
+
+    Args:
+        path: Artifact path (its name is kept whatever the encoding)
+        data: Artifact content
+        fmt: ``json`` or ``msgpack`` (default: ``ARTIFACT_FORMAT``)
+        pretty: Indent JSON output (default: ``ARTIFACT_JSON_PRETTY``)
+
+    Returns:
+        Path written
+    """
+    path = Path(path)
+    path.write_bytes(encode_artifact(data, fmt=fmt, pretty=pretty))
+    return path
+
+
+def read_artifact(path: PathLike) -> Any:
+    """Read an artifact file written in any supported encoding."""
+    return decode_artifact(Path(path).read_bytes())
+
+
+def _compressed_log_siblings(path: Path) -> List[Path]:
+    return [path.with_name(path.name + suffix) for suffix in LOG_SUFFIXES.values()]
+
+
+def compressed_log_path(path: PathLike) -> Optional[Path]:
+    """Compressed sibling (``.gz``/``.zst``) of an append-only log, None if it has none."""
+    for sibling in _compressed_log_siblings(Path(path)):
+        if sibling.exists():
+            return sibling
+    return None
+
+
+def artifact_log_exists(path: PathLike) -> bool:
+    """Whether an append-only log exists, plain or compressed."""
+    path = Path(path)
+    return path.exists() or any(sibling.exists() for sibling in _compressed_log_siblings(path))
+
+
+def remove_artifact_log(path: PathLike) -> None:
+    """Delete an append-only log together with its compressed sibling."""
+    path = Path(path)
+    for candidate in [path, *_compressed_log_siblings(path)]:
+        if candidate.exists():
+            candidate.unlink()
+
+
+def iter_artifact_lines(path: PathLike) -> Iterator[str]:
+    """
+    Iterate the lines of an append-only log (e.g. ``events.jsonl``).
+
+    Lines from the compressed sibling come first, followed by lines appended
+    to the plain file after the log was compressed, so line numbers (event
+    cursors) are stable across compression.
+    """
+    path = Path(path)
+    for sibling in _compressed_log_siblings(path):
+        if not sibling.exists():
+            continue
+        if sibling.suffix == ".gz":
+            with gzip.open(sibling, "rt", encoding="utf-8") as f:
+                yield from f
+        else:
+            if zstandard is None:
+                raise RuntimeError(f"{sibling.name} is zstd compressed but zstandard is not installed")
+            with open(sibling, "rb") as raw:
+                reader = zstandard.ZstdDecompressor().stream_reader(raw, read_across_frames=True)
+                yield from io.TextIOWrapper(reader, encoding="utf-8")
+    if path.exists():
+        with open(path, "r", encoding="utf-8") as f:
+            yield from f
+
+
+def compress_log(path: PathLike, codec: Optional[str] = None) -> Optional[Path]:
+    """
+    Stream-compress an append-only log into its ``.gz``/``.zst`` sibling and remove it.
+
+    If the sibling already exists (lines were appended after an earlier
+    compression), the new lines are added as another gzip member / zstd
+    frame, which readers decode as one stream.
+
+    Returns:
+        Path of the compressed log, or None if nothing was compressed
+    """
+    path = Path(path)
+    codec = _resolve_compression(codec)
+    if codec is None or not path.exists():
+        return None
+
+    existing = [sibling for sibling in _compressed_log_siblings(path) if sibling.exists()]
+    target = existing[0] if existing else path.with_name(path.name + LOG_SUFFIXES[codec])
+    codec = "gzip" if target.suffix == ".gz" else "zstd"
+    if codec == "zstd" and zstandard is None:
+        logger.warning(f"Cannot append to {target.name}: zstandard is not installed")
+        return None
+
+    size = path.stat().st_size
+    tmp = target.with_name(target.name + ".tmp")
+    with open(path, "rb") as src, open(tmp, "wb") as dst:
+        if codec == "zstd":
+            with zstandard.ZstdCompressor(level=_level(codec)).stream_writer(dst, closefd=False) as writer:
+                shutil.copyfileobj(src, writer)
+        else:
+            with gzip.GzipFile(fileobj=dst, mode="wb", compresslevel=_level(codec)) as writer:
+                shutil.copyfileobj(src, writer)
+
+    if path.stat().st_size != size:
+        # Appended to while compressing: leave it for the next compression
+        tmp.unlink()
+        return None
+
+    if target.exists():
+        with open(tmp, "rb") as src, open(target, "ab") as dst:
+            shutil.copyfileobj(src, dst)
+        tmp.unlink()
+    else:
+        os.replace(tmp, target)
+    path.unlink()
+    return target
+
+
+def compress_artifact(path: PathLike, codec: Optional[str] = None) -> bool:
+    """
+    Compress a finished JSON artifact in place (same file name).
+
+    Returns:
+        True if the file was compressed
+    """
+    path = Path(path)
+    codec = _resolve_compression(codec)
+    if codec is None:
+        return False
+    if path.name in COMPRESSION_EXCLUDED:
+        return False
+    mtime = path.stat().st_mtime_ns
+    raw = path.read_bytes()
+    if len(raw) < ARTIFACT_COMPRESSION_MIN_BYTES or detect_compression(raw):
+        return False
+    tmp = path.with_name(path.name + ".tmp")
+    tmp.write_bytes(compress_bytes(raw, codec))
+    if path.stat().st_mtime_ns != mtime:
+        # Rewritten while compressing: keep the newer content
+        tmp.unlink()
+        return False
+    os.replace(tmp, path)
+    return True
+
+
+def compress_run_artifacts(run_dir: PathLike, codec: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Compress the artifacts of a finished run (no-op unless compression is enabled).
+
+    JSON artifacts above ``ARTIFACT_COMPRESSION_MIN_BYTES`` are compressed in
+    place; ``*.jsonl`` logs are stream-compressed into a sibling file.
+
+    Args:
+        run_dir: Run (or execution) artifacts directory
+        codec: ``gzip`` or ``zstd`` (default: ``ARTIFACT_COMPRESSION``)
+
+    Returns:
+        Stats with files compressed and bytes before/after
+    """
+    stats = {"codec": _resolve_compression(codec), "files": 0, "bytes_before": 0, "bytes_after": 0}
+    run_dir = Path(run_dir)
+    if stats["codec"] is None or not run_dir.is_dir():
+        return stats
+
+    for path in sorted(run_dir.rglob("*")):
+        if not path.is_file():
+            continue
+        try:
+            size = path.stat().st_size
+            if path.suffix == ".jsonl":
+                compressed = compress_log(path, stats["codec"])
+                if compressed is None:
+                    continue
+                after = compressed.stat().st_size
+            elif path.suffix == ".json":
+                if not compress_artifact(path, stats["codec"]):
+                    continue
+                after = path.stat().st_size
+            else:
+                continue
+            stats["files"] += 1
+            stats["bytes_before"] += size
+            stats["bytes_after"] += after
+        except Exception as e:
+            logger.warning(f"Failed to compress artifact {path}: {e}")
+
+    return stats
+
+
+__all__ = [
+    "ARTIFACT_FORMATS",
+    "encode_artifact",
+    "decode_artifact",
+    "is_binary_artifact",
+    "write_artifact",
+    "read_artifact",
+    "detect_compression",
+    "compress_bytes",
+    "decompress_bytes",
+    "compress_artifact",
+    "compress_log",
+    "compress_run_artifacts",
+    "iter_artifact_lines",
+    "artifact_log_exists",
+    "remove_artifact_log",
+]
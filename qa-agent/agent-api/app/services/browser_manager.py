@@ -7,6 +7,8 @@ import sys
 from typing import Optional, Dict
 from pathlib import Path
 
+from app.services.metrics import BROWSER_RESOURCES
+
 try:
     from playwright.async_api import async_playwright, Browser, BrowserContext, Page
 except ImportError:
@@ -227,6 +229,10 @@ class BrowserManager:
 # Global browser manager instance
 _browser_manager = BrowserManager()
 
+BROWSER_RESOURCES.labels("browsers").set_function(lambda: len(_browser_manager._browsers))
+BROWSER_RESOURCES.labels("contexts").set_function(lambda: len(_browser_manager._contexts))
+BROWSER_RESOURCES.labels("pages").set_function(lambda: len(_browser_manager._pages))
+
 
 def get_browser_manager() -> BrowserManager:
     """Get global browser manager instance."""
@@ -1,247 +1,247 @@
 """Test Coverage Engine - Calculate and track test coverage metrics."""
 
-from typing import Dict, List, Optional, Any
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 import logging
 from collections import defaultdict
+from pathlib import Path
 
 from app.models.test_case_models import TestCase
 from app.services.validation_schema import (
     ValidationSchemaRegistry,
     FeatureValidationSchema,
-    ValidationRule
+    get_validation_schema_registry
 )
+from app.services.artifact_io import write_artifact
 
 logger = logging.getLogger(__name__)
 
 
-class TestCoverageEngine:
-    """Calculate comprehensive test coverage metrics and identify gaps."""
+CATEGORIES = ("positive", "negative", "edge", "boundary")
+SEVERITIES = ("critical", "high", "medium", "low")
 
-    def __init__(self, schema_registry: Optional[ValidationSchemaRegistry] = None):
-        self.schema_registry = schema_registry or ValidationSchemaRegistry()
-        logger.info("TestCoverageEngine initialized")
 
-    def calculate_coverage(
-        self,
-        detected_features: Dict[str, Any],
-        generated_tests: List[TestCase]
-    ) -> Dict[str, Any]:
-        """Calculate comprehensive coverage metrics.
+class CoverageTracker:
+    """
+    Coverage counters maintained incrementally as test cases are generated.
 
-        Args:
-            detected_features: Features detected on pages (from enhanced generator)
-            generated_tests: List of generated test cases
+    Tests are indexed by (feature, category, severity) and (feature, rule_id)
+    and expected counts are taken once per detected feature, so adding a
+    page's tests costs O(tests) and ``snapshot()`` is O(1). ``report()``
+    produces the same structure as ``TestCoverageEngine.calculate_coverage``
+    without rescanning the tests.
+    """
 
-        Returns:
-            Comprehensive coverage report with percentages, gaps, and recommendations
-        """
-        logger.info(
-            f"Calculating coverage for {len(detected_features)} features and {len(generated_tests)} tests"
-        )
+    def __init__(self, schema_registry: Optional[ValidationSchemaRegistry] = None):
+        self.schema_registry = schema_registry or get_validation_schema_registry()
+        self.detected: Dict[str, FeatureValidationSchema] = {}  # feature -> schema (features with a schema)
+        self.undetected_features = 0  # detected features without a schema
+        self.actual: Dict[Tuple[str, str, str], int] = defaultdict(int)  # (feature, category, severity) -> tests
+        self.actual_by_feature: Dict[str, int] = defaultdict(int)
+        self.rule_hits: Dict[Tuple[str, str], int] = defaultdict(int)  # (feature, rule_id) -> tests
+        self.total_tests = 0
+        # Running totals over detected features only
+        self.total_expected = 0
+        self.total_actual = 0
+        self.features_with_tests = 0
+
+    def add_features(self, feature_types: Iterable[str]) -> None:
+        """Register features detected on a page (already known features are ignored)."""
+        for feature_type in feature_types:
+            if feature_type in self.detected:
+                continue
+            schema = self.schema_registry.get_schema(feature_type)
+            if not schema:
+                logger.warning(f"No schema found for feature: {feature_type}")
+                self.undetected_features += 1
+                continue
+            self.detected[feature_type] = schema
+            self.total_expected += len(schema.validation_rules)
+            existing = self.actual_by_feature.get(feature_type, 0)
+            self.total_actual += existing
+            if existing:
+                self.features_with_tests += 1
+
+    def add_tests(self, tests: Iterable[TestCase]) -> None:
+        """Count generated test cases."""
+        for test in tests:
+            feature_type = test.feature_type
+            self.total_tests += 1
+            self.actual[(feature_type, test.test_category, test.severity)] += 1
+            self.rule_hits[(feature_type, test.validation_rule_id)] += 1
+            self.actual_by_feature[feature_type] += 1
+            if feature_type in self.detected:
+                self.total_actual += 1
+                if self.actual_by_feature[feature_type] == 1:
+                    self.features_with_tests += 1
+
+    def remove_tests(self, tests: Iterable[TestCase]) -> None:
+        """Uncount test cases that were counted but did not make it into the final set."""
+        for test in tests:
+            feature_type = test.feature_type
+            self.total_tests -= 1
+            self.actual[(feature_type, test.test_category, test.severity)] -= 1
+            self.rule_hits[(feature_type, test.validation_rule_id)] -= 1
+            self.actual_by_feature[feature_type] -= 1
+            if feature_type in self.detected:
+                self.total_actual -= 1
+                if self.actual_by_feature[feature_type] == 0:
+                    self.features_with_tests -= 1
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Headline coverage numbers (cheap enough to attach to every event)."""
+        return {
+            "overall_coverage_percentage": round(
+                (self.total_actual / self.total_expected * 100) if self.total_expected else 0, 1
+            ),
+            "total_expected_tests": self.total_expected,
+            "total_actual_tests": self.total_actual,
+            "features_detected": len(self.detected) + self.undetected_features,
+            "features_with_tests": self.features_with_tests,
+        }
 
+    def _feature_counts(self, feature_type: str, dimension: int, keys: Tuple[str, ...]) -> Dict[str, int]:
+        counts = {key: 0 for key in keys}
+        for category in CATEGORIES:
+            for severity in SEVERITIES:
+                count = self.actual.get((feature_type, category, severity), 0)
+                if count:
+                    key = category if dimension == 0 else severity
+                    counts[key] = counts.get(key, 0) + count
+        return counts
+
+    def report(self) -> Dict[str, Any]:
+        """Full coverage report built from the counters."""
         coverage_report = {
             "overall_coverage_percentage": 0.0,
             "feature_coverage": {},
-            "category_coverage": {
-                "positive": {"expected": 0, "actual": 0, "percentage": 0.0},
-                "negative": {"expected": 0, "actual": 0, "percentage": 0.0},
-                "edge": {"expected": 0, "actual": 0, "percentage": 0.0},
-                "boundary": {"expected": 0, "actual": 0, "percentage": 0.0}
-            },
-            "severity_coverage": {
-                "critical": {"expected": 0, "actual": 0, "percentage": 0.0},
-                "high": {"expected": 0, "actual": 0, "percentage": 0.0},
-                "medium": {"expected": 0, "actual": 0, "percentage": 0.0},
-                "low": {"expected": 0, "actual": 0, "percentage": 0.0}
-            },
+            "category_coverage": {c: {"expected": 0, "actual": 0, "percentage": 0.0} for c in CATEGORIES},
+            "severity_coverage": {s: {"expected": 0, "actual": 0, "percentage": 0.0} for s in SEVERITIES},
             "requirements_met": True,
             "coverage_gaps": [],
             "recommendations": [],
             "summary": {
                 "total_expected_tests": 0,
-                "total_actual_tests": len(generated_tests),
-                "features_detected": len(detected_features),
+                "total_actual_tests": self.total_tests,
+                "features_detected": len(self.detected) + self.undetected_features,
                 "features_with_tests": 0
             }
         }
 
-        total_expected = 0
-        total_actual = 0
-
-        # Calculate per-feature coverage
-        for feature_type, feature_info in detected_features.items():
-            schema = self.schema_registry.get_schema(feature_type)
-            if not schema:
-                logger.warning(f"No schema found for feature: {feature_type}")
-                continue
-
+        for feature_type, schema in self.detected.items():
             expected_rules = schema.validation_rules
-            actual_tests = [t for t in generated_tests if t.feature_type == feature_type]
-
-            # Check if coverage requirements are met
-            requirements_met = self._check_requirements_met(actual_tests, schema.coverage_requirements)
-
+            actual_total = self.actual_by_feature.get(feature_type, 0)
+            actual_by_category = self._feature_counts(feature_type, 0, CATEGORIES)
+            actual_by_severity = self._feature_counts(feature_type, 1, SEVERITIES)
+
+            requirements_met = True
+            for requirement_key, min_required in schema.coverage_requirements.items():
+                # Parse requirement key (e.g., "min_positive_tests" -> "positive")
+                category_name = requirement_key.replace("min_", "").replace("_tests", "")
+                actual_count = actual_by_category.get(category_name, 0)
+                if actual_count < min_required:
+                    logger.warning(
+                        f"Requirement not met: {requirement_key} requires {min_required}, "
+                        f"but only {actual_count} tests generated"
+                    )
+                    requirements_met = False
+                    break
             if not requirements_met:
                 coverage_report["requirements_met"] = False
 
-            # Calculate category breakdown for this feature
-            category_breakdown = self._get_category_breakdown(actual_tests, expected_rules)
-
-            # Find missing rules
-            missing_rules = self._find_missing_rules(expected_rules, actual_tests)
-
-            feature_coverage = {
+            by_category = {c: {"expected": 0, "actual": actual_by_category[c]} for c in CATEGORIES}
+            by_severity = {s: {"expected": 0, "actual": actual_by_severity[s]} for s in SEVERITIES}
+            for category, rules in self.schema_registry.rules_by_category(feature_type).items():
+                by_category.setdefault(category, {"expected": 0, "actual": 0})["expected"] = len(rules)
+            for severity, rules in self.schema_registry.rules_by_severity(feature_type).items():
+                by_severity.setdefault(severity, {"expected": 0, "actual": 0})["expected"] = len(rules)
+            missing_rules = [
+                rule.id for rule in expected_rules
+                if not self.rule_hits.get((feature_type, rule.id))
+            ]
+
+            coverage_report["feature_coverage"][feature_type] = {
                 "expected_total": len(expected_rules),
-                "actual_total": len(actual_tests),
-                "coverage_percentage": (len(actual_tests) / len(expected_rules) * 100) if expected_rules else 0,
+                "actual_total": actual_total,
+                "coverage_percentage": (actual_total / len(expected_rules) * 100) if expected_rules else 0,
                 "requirements_met": requirements_met,
                 "missing_rules": missing_rules,
-                "by_category": category_breakdown["by_category"],
-                "by_severity": category_breakdown["by_severity"]
+                "by_category": by_category,
+                "by_severity": by_severity
             }
-
-            coverage_report["feature_coverage"][feature_type] = feature_coverage
-            total_expected += len(expected_rules)
-            total_actual += len(actual_tests)
-
-            if len(actual_tests) > 0:
+            if actual_total > 0:
                 coverage_report["summary"]["features_with_tests"] += 1
 
-            # Update global category coverage
-            for category in ["positive", "negative", "edge", "boundary"]:
-                expected_count = len([r for r in expected_rules if r.category == category])
-                actual_count = len([t for t in actual_tests if t.test_category == category])
-                coverage_report["category_coverage"][category]["expected"] += expected_count
-                coverage_report["category_coverage"][category]["actual"] += actual_count
-
-            # Update global severity coverage
-            for severity in ["critical", "high", "medium", "low"]:
-                expected_count = len([r for r in expected_rules if r.severity == severity])
-                actual_count = len([t for t in actual_tests if t.severity == severity])
-                coverage_report["severity_coverage"][severity]["expected"] += expected_count
-                coverage_report["severity_coverage"][severity]["actual"] += actual_count
-
-        # Calculate overall coverage percentage
+            # Update global category / severity coverage
+            for category in CATEGORIES:
+                coverage_report["category_coverage"][category]["expected"] += by_category[category]["expected"]
+                coverage_report["category_coverage"][category]["actual"] += by_category[category]["actual"]
+            for severity in SEVERITIES:
+                coverage_report["severity_coverage"][severity]["expected"] += by_severity[severity]["expected"]
+                coverage_report["severity_coverage"][severity]["actual"] += by_severity[severity]["actual"]
+
         coverage_report["overall_coverage_percentage"] = (
-            (total_actual / total_expected * 100) if total_expected > 0 else 0
+            (self.total_actual / self.total_expected * 100) if self.total_expected > 0 else 0
         )
+        coverage_report["summary"]["total_expected_tests"] = self.total_expected
+        coverage_report["summary"]["total_actual_tests"] = self.total_actual
 
-        coverage_report["summary"]["total_expected_tests"] = total_expected
-        coverage_report["summary"]["total_actual_tests"] = total_actual
-
-        # Calculate category percentages
-        for category in coverage_report["category_coverage"]:
-            expected = coverage_report["category_coverage"][category]["expected"]
-            actual = coverage_report["category_coverage"][category]["actual"]
-            coverage_report["category_coverage"][category]["percentage"] = (
-                (actual / expected * 100) if expected > 0 else 0
-            )
-
-        # Calculate severity percentages
-        for severity in coverage_report["severity_coverage"]:
-            expected = coverage_report["severity_coverage"][severity]["expected"]
-            actual = coverage_report["severity_coverage"][severity]["actual"]
-            coverage_report["severity_coverage"][severity]["percentage"] = (
-                (actual / expected * 100) if expected > 0 else 0
-            )
-
-        # Identify coverage gaps
-        coverage_report["coverage_gaps"] = self._identify_coverage_gaps(coverage_report)
-
-        # Generate recommendations
-        coverage_report["recommendations"] = self._generate_recommendations(coverage_report)
-
-        logger.info(
-            f"Coverage calculation complete: {coverage_report['overall_coverage_percentage']:.1f}% overall, "
-            f"Requirements met: {coverage_report['requirements_met']}"
-        )
+        for bucket in ("category_coverage", "severity_coverage"):
+            for cov in coverage_report[bucket].values():
+                cov["percentage"] = (cov["actual"] / cov["expected"] * 100) if cov["expected"] > 0 else 0
 
         return coverage_report
 
-    def _check_requirements_met(
-        self,
-        tests: List[TestCase],
-        requirements: Dict[str, int]
-    ) -> bool:
-        """Check if minimum coverage requirements are met."""
-
-        category_counts = {
-            "positive": len([t for t in tests if t.test_category == "positive"]),
-            "negative": len([t for t in tests if t.test_category == "negative"]),
-            "edge": len([t for t in tests if t.test_category == "edge"]),
-            "boundary": len([t for t in tests if t.test_category == "boundary"])
-        }
 
-        for requirement_key, min_required in requirements.items():
-            # Parse requirement key (e.g., "min_positive_tests" -> "positive")
-            category_name = requirement_key.replace("min_", "").replace("_tests", "")
-
-            actual_count = category_counts.get(category_name, 0)
+class TestCoverageEngine:
+    """Calculate comprehensive test coverage metrics and identify gaps."""
 
-            if actual_count < min_required:
-                logger.warning(
-                    f"Requirement not met: {requirement_key} requires {min_required}, "
-                    f"but only {actual_count} tests generated"
-                )
-                return False
+    def __init__(self, schema_registry: Optional[ValidationSchemaRegistry] = None):
+        self.schema_registry = schema_registry or get_validation_schema_registry()
+        logger.info("TestCoverageEngine initialized")
 
-        return True
+    def create_tracker(self) -> CoverageTracker:
+        """Create an incremental coverage tracker sharing this engine's schemas."""
+        return CoverageTracker(self.schema_registry)
 
-    def _get_category_breakdown(
+    def calculate_coverage(
         self,
-        actual_tests: List[TestCase],
-        expected_rules: List[ValidationRule]
-    ) -> Dict[str, Dict[str, int]]:
-        """Get breakdown by category and severity."""
-
-        breakdown = {
-            "by_category": {
-                "positive": {"expected": 0, "actual": 0},
-                "negative": {"expected": 0, "actual": 0},
-                "edge": {"expected": 0, "actual": 0},
-                "boundary": {"expected": 0, "actual": 0}
-            },
-            "by_severity": {
-                "critical": {"expected": 0, "actual": 0},
-                "high": {"expected": 0, "actual": 0},
-                "medium": {"expected": 0, "actual": 0},
-                "low": {"expected": 0, "actual": 0}
-            }
-        }
+        detected_features: Dict[str, Any],
+        generated_tests: List[TestCase]
+    ) -> Dict[str, Any]:
+        """Calculate comprehensive coverage metrics.
 
-        # Count expected
-        for rule in expected_rules:
-            breakdown["by_category"][rule.category]["expected"] += 1
-            breakdown["by_severity"][rule.severity]["expected"] += 1
+        Args:
+            detected_features: Features detected on pages (from enhanced generator)
+            generated_tests: List of generated test cases
 
-        # Count actual
-        for test in actual_tests:
-            breakdown["by_category"][test.test_category]["actual"] += 1
-            breakdown["by_severity"][test.severity]["actual"] += 1
+        Returns:
+            Comprehensive coverage report with percentages, gaps, and recommendations
+        """
+        logger.info(
+            f"Calculating coverage for {len(detected_features)} features and {len(generated_tests)} tests"
+        )
 
-        return breakdown
+        tracker = self.create_tracker()
+        tracker.add_features(detected_features.keys())
+        tracker.add_tests(generated_tests)
+        return self.build_report(tracker)
 
-    def _find_missing_rules(
-        self,
-        expected_rules: List[ValidationRule],
-        actual_tests: List[TestCase]
-    ) -> List[str]:
-        """Find validation rules that don't have corresponding test cases."""
+    def build_report(self, tracker: CoverageTracker) -> Dict[str, Any]:
+        """Turn a tracker's counters into the full report with gaps and recommendations."""
+        coverage_report = tracker.report()
 
-        # Get all validation rule IDs that were covered
-        covered_rule_ids = {t.validation_rule_id for t in actual_tests}
+        # Identify coverage gaps
+        coverage_report["coverage_gaps"] = self._identify_coverage_gaps(coverage_report)
 
-        # Find uncovered rules
-        missing_rules = []
-        for rule in expected_rules:
-            if rule.id not in covered_rule_ids:
-                missing_rules.append(rule.id)
+        # Generate recommendations
+        coverage_report["recommendations"] = self._generate_recommendations(coverage_report)
 
-        return missing_rules
+        logger.info(
+            f"Coverage calculation complete: {coverage_report['overall_coverage_percentage']:.1f}% overall, "
+            f"Requirements met: {coverage_report['requirements_met']}"
+        )
 
-    def _has_test_for_rule(self, rule: ValidationRule, tests: List[TestCase]) -> bool:
-        """Check if any test covers this validation rule."""
-        return any(t.validation_rule_id == rule.id for t in tests)
+        return coverage_report
 
     def _identify_coverage_gaps(self, coverage_report: Dict) -> List[Dict[str, Any]]:
         """Identify specific coverage gaps with actionable details."""
@@ -461,12 +461,9 @@ class TestCoverageEngine:
         output_path: Path
     ) -> Path:
         """Export coverage report to JSON file."""
-        import json
-
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, "w") as f:
-            json.dump(coverage_report, f, indent=2)
+        write_artifact(output_path, coverage_report)
 
         logger.info(f"Coverage report exported to: {output_path}")
         return output_path
@@ -554,6 +551,7 @@ class CoverageAnalyzer:
 
 
 __all__ = [
+    "CoverageTracker",
     "TestCoverageEngine",
     "CoverageAnalyzer"
 ]
@@ -1,22 +1,118 @@
 """Database connection manager for introspection via port-forward."""
 
+import os
+import time
 import asyncio
 import logging
-from typing import Dict, List, Optional, Any
+from datetime import datetime
+from typing import Dict, List, Optional, Any, Tuple
 
 logger = logging.getLogger(__name__)
 
+# asyncpg pool sizing per database service
+DB_POOL_MIN_SIZE = int(os.getenv("DB_POOL_MIN_SIZE", "1"))
+DB_POOL_MAX_SIZE = int(os.getenv("DB_POOL_MAX_SIZE", "4"))
+# Seconds a catalog introspection result is reused before it is refreshed
+DB_INTROSPECTION_CACHE_TTL = float(os.getenv("DB_INTROSPECTION_CACHE_TTL", "300"))
+
+# Bulk catalog queries: one round trip each for all tables, columns, indexes and FKs.
+# Sizes come from pg_class statistics instead of pg_total_relation_size() per table.
+PG_TABLES_QUERY = """
+    SELECT
+        n.nspname AS schema,
+        c.relname AS table_name,
+        c.oid AS table_oid,
+        c.reltuples::bigint AS estimated_rows,
+        pg_size_pretty(c.relpages::bigint * current_setting('block_size')::bigint) AS size
+    FROM pg_class c
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE c.relkind IN ('r', 'p')
+      AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+      AND n.nspname NOT LIKE 'pg_toast%'
+    ORDER BY n.nspname, c.relname;
+"""
+
+PG_COLUMNS_QUERY = """
+    SELECT
+        a.attrelid AS table_oid,
+        a.attname AS column_name,
+        format_type(a.atttypid, a.atttypmod) AS data_type,
+        NOT a.attnotnull AS nullable,
+        pg_get_expr(d.adbin, d.adrelid) AS column_default
+    FROM pg_attribute a
+    JOIN pg_class c ON c.oid = a.attrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    LEFT JOIN pg_attrdef d ON d.adrelid = a.attrelid AND d.adnum = a.attnum
+    WHERE c.relkind IN ('r', 'p')
+      AND a.attnum > 0 AND NOT a.attisdropped
+      AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+      AND n.nspname NOT LIKE 'pg_toast%'
+    ORDER BY a.attrelid, a.attnum;
+"""
+
+PG_INDEXES_QUERY = """
+    SELECT
+        i.indrelid AS table_oid,
+        ic.relname AS index_name,
+        i.indisunique AS is_unique,
+        i.indisprimary AS is_primary,
+        pg_get_indexdef(i.indexrelid) AS definition
+    FROM pg_index i
+    JOIN pg_class ic ON ic.oid = i.indexrelid
+    JOIN pg_class c ON c.oid = i.indrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    WHERE n.nspname NOT IN ('pg_catalog', 'information_schema')
+      AND n.nspname NOT LIKE 'pg_toast%'
+    ORDER BY i.indrelid, ic.relname;
+"""
+
+PG_FOREIGN_KEYS_QUERY = """
+    SELECT
+        con.conrelid AS table_oid,
+        con.conname AS constraint_name,
+        rn.nspname AS referenced_schema,
+        rc.relname AS referenced_table,
+        ARRAY(
+            SELECT a.attname FROM unnest(con.conkey) WITH ORDINALITY k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = con.conrelid AND a.attnum = k.attnum
+            ORDER BY k.ord
+        ) AS columns,
+        ARRAY(
+            SELECT a.attname FROM unnest(con.confkey) WITH ORDINALITY k(attnum, ord)
+            JOIN pg_attribute a ON a.attrelid = con.confrelid AND a.attnum = k.attnum
+            ORDER BY k.ord
+        ) AS referenced_columns
+    FROM pg_constraint con
+    JOIN pg_class c ON c.oid = con.conrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_class rc ON rc.oid = con.confrelid
+    JOIN pg_namespace rn ON rn.oid = rc.relnamespace
+    WHERE con.contype = 'f'
+      AND n.nspname NOT IN ('pg_catalog', 'information_schema')
+    ORDER BY con.conrelid, con.conname;
+"""
+
 
 class DatabaseConnectionManager:
     """Manage connections to databases through port-forward for introspection."""
 
-    def __init__(self):
-        self.connections: Dict[int, Any] = {}  # db_service_id -> connection
+    def __init__(self, pool_min_size: int = DB_POOL_MIN_SIZE, pool_max_size: int = DB_POOL_MAX_SIZE,
+                 introspection_ttl: float = DB_INTROSPECTION_CACHE_TTL):
+        self.connections: Dict[int, Any] = {}  # db_service_id -> connection (asyncpg pool / motor client)
         self.connection_types: Dict[int, str] = {}  # db_service_id -> db_type
+        self.pool_min_size = max(1, pool_min_size)
+        self.pool_max_size = max(self.pool_min_size, pool_max_size)
+        self.introspection_ttl = introspection_ttl
+        self._schema_cache: Dict[int, Tuple[float, Dict[str, Any]]] = {}  # db_service_id -> (fetched_at, schema)
+        self._schema_locks: Dict[int, asyncio.Lock] = {}
 
     async def connect_postgresql(self, host: str, port: int, database: str = "postgres", user: str = "postgres", password: str = "") -> Optional[Any]:
         """
-        Connect to PostgreSQL via asyncpg.
+        Create an asyncpg connection pool for PostgreSQL.
+
+        The pool exposes ``fetch``/``fetchrow``/``close`` like a single
+        connection, so callers can use it interchangeably, while bulk
+        introspection runs its catalog queries on separate pooled connections.
 
         Args:
             host: Database host (usually localhost for port-forward)
@@ -26,22 +122,24 @@ class DatabaseConnectionManager:
             password: Password
 
         Returns:
-            asyncpg Connection object or None
+            asyncpg Pool object or None
         """
         try:
             import asyncpg
 
-            conn = await asyncpg.connect(
+            pool = await asyncpg.create_pool(
                 host=host,
                 port=port,
                 database=database,
                 user=user,
                 password=password,
+                min_size=self.pool_min_size,
+                max_size=self.pool_max_size,
                 timeout=10
             )
 
-            logger.info(f"Connected to PostgreSQL at {host}:{port}")
-            return conn
+            logger.info(f"Connected to PostgreSQL at {host}:{port} (pool size {self.pool_min_size}-{self.pool_max_size})")
+            return pool
 
         except ImportError:
             logger.error("asyncpg not installed. Install with: pip install asyncpg")
@@ -95,24 +193,17 @@ class DatabaseConnectionManager:
         """
         Query pg_catalog to list tables.
 
+        Sizes are estimated from planner statistics (``relpages``) so the
+        query stays a single catalog scan regardless of table count.
+
         Args:
-            conn: asyncpg Connection object
+            conn: asyncpg Connection or Pool object
 
         Returns:
             List of table info dictionaries
         """
         try:
-            query = """
-                SELECT
-                    schemaname as schema,
-                    tablename as table_name,
-                    pg_size_pretty(pg_total_relation_size(schemaname||'.'||tablename)) as size
-                FROM pg_tables
-                WHERE schemaname NOT IN ('pg_catalog', 'information_schema')
-                ORDER BY schemaname, tablename;
-            """
-
-            rows = await conn.fetch(query)
+            rows = await conn.fetch(PG_TABLES_QUERY)
 
             tables = []
             for row in rows:
@@ -120,6 +211,7 @@ class DatabaseConnectionManager:
                     "schema": row["schema"],
                     "name": row["table_name"],
                     "size": row["size"],
+                    "estimated_rows": max(row["estimated_rows"], 0),
                 })
 
             logger.info(f"Found {len(tables)} PostgreSQL tables")
@@ -131,10 +223,13 @@ class DatabaseConnectionManager:
 
     async def list_postgresql_columns(self, conn: Any, schema: str, table_name: str) -> List[Dict]:
         """
-        Get column information for a PostgreSQL table.
+        Get column information for a single PostgreSQL table.
+
+        Prefer ``introspect_postgresql``/``get_schema`` when exploring more
+        than a handful of tables.
 
         Args:
-            conn: asyncpg Connection object
+            conn: asyncpg Connection or Pool object
             schema: Schema name
             table_name: Table name
 
@@ -170,6 +265,133 @@ class DatabaseConnectionManager:
             logger.error(f"Error listing columns: {e}")
             return []
 
+    async def introspect_postgresql(self, conn: Any) -> Dict[str, Any]:
+        """
+        Fetch all tables with their columns, indexes and foreign keys in four catalog queries.
+
+        With a pool the queries run concurrently on separate connections.
+
+        Args:
+            conn: asyncpg Connection or Pool object
+
+        Returns:
+            Schema dict with ``tables`` (each carrying columns, indexes and
+            foreign_keys) and ``introspected_at``
+        """
+        queries = (PG_TABLES_QUERY, PG_COLUMNS_QUERY, PG_INDEXES_QUERY, PG_FOREIGN_KEYS_QUERY)
+        if hasattr(conn, "acquire"):
+            table_rows, column_rows, index_rows, fk_rows = await asyncio.gather(
+                *(conn.fetch(query) for query in queries)
+            )
+        else:
+            # A single connection cannot run queries concurrently
+            table_rows, column_rows, index_rows, fk_rows = [await conn.fetch(query) for query in queries]
+
+        tables: Dict[int, Dict[str, Any]] = {}
+        for row in table_rows:
+            tables[row["table_oid"]] = {
+                "schema": row["schema"],
+                "name": row["table_name"],
+                "size": row["size"],
+                "estimated_rows": max(row["estimated_rows"], 0),
+                "columns": [],
+                "indexes": [],
+                "foreign_keys": [],
+            }
+
+        for row in column_rows:
+            table = tables.get(row["table_oid"])
+            if table is not None:
+                table["columns"].append({
+                    "name": row["column_name"],
+                    "type": row["data_type"],
+                    "nullable": row["nullable"],
+                    "default": row["column_default"],
+                })
+
+        for row in index_rows:
+            table = tables.get(row["table_oid"])
+            if table is not None:
+                table["indexes"].append({
+                    "name": row["index_name"],
+                    "unique": row["is_unique"],
+                    "primary": row["is_primary"],
+                    "definition": row["definition"],
+                })
+
+        for row in fk_rows:
+            table = tables.get(row["table_oid"])
+            if table is not None:
+                table["foreign_keys"].append({
+                    "name": row["constraint_name"],
+                    "columns": list(row["columns"]),
+                    "referenced_schema": row["referenced_schema"],
+                    "referenced_table": row["referenced_table"],
+                    "referenced_columns": list(row["referenced_columns"]),
+                })
+
+        logger.info(
+            f"Introspected {len(tables)} PostgreSQL tables "
+            f"({len(column_rows)} columns, {len(index_rows)} indexes, {len(fk_rows)} foreign keys)"
+        )
+        return {
+            "tables": list(tables.values()),
+            "introspected_at": datetime.utcnow().isoformat(),
+        }
+
+    async def get_schema(self, db_service_id: int, refresh: bool = False) -> Dict[str, Any]:
+        """
+        Get the cached catalog introspection for a connected PostgreSQL service.
+
+        Results are reused for ``introspection_ttl`` seconds and dropped on
+        disconnect or ``invalidate_schema``. Concurrent callers share a
+        single introspection.
+
+        Args:
+            db_service_id: Database service ID
+            refresh: Ignore the cache and introspect again
+
+        Returns:
+            Schema dict from ``introspect_postgresql`` (empty if unavailable)
+        """
+        conn = self.connections.get(db_service_id)
+        if not conn or self.connection_types.get(db_service_id) != "postgresql":
+            logger.error(f"No PostgreSQL connection for service ID {db_service_id}")
+            return {}
+
+        lock = self._schema_locks.setdefault(db_service_id, asyncio.Lock())
+        async with lock:
+            cached = self._schema_cache.get(db_service_id)
+            if cached and not refresh and time.monotonic() - cached[0] < self.introspection_ttl:
+                return cached[1]
+            try:
+                schema = await self.introspect_postgresql(conn)
+            except Exception as e:
+                logger.error(f"Error introspecting PostgreSQL schema: {e}")
+                return cached[1] if cached else {}
+            self._schema_cache[db_service_id] = (time.monotonic(), schema)
+            return schema
+
+    async def get_columns(self, db_service_id: int, schema: str, table_name: str) -> List[Dict]:
+        """Get a table's columns from the cached introspection."""
+        introspection = await self.get_schema(db_service_id)
+        for table in introspection.get("tables", []):
+            if table["schema"] == schema and table["name"] == table_name:
+                return table["columns"]
+        return []
+
+    def invalidate_schema(self, db_service_id: Optional[int] = None):
+        """
+        Drop cached introspection results (e.g. after migrations).
+
+        Args:
+            db_service_id: Service to invalidate (default: all services)
+        """
+        if db_service_id is None:
+            self._schema_cache.clear()
+        else:
+            self._schema_cache.pop(db_service_id, None)
+
     async def list_mongodb_databases(self, client: Any) -> List[str]:
         """
         List all databases in MongoDB.
@@ -262,6 +484,9 @@ class DatabaseConnectionManager:
         Returns:
             True if connected successfully
         """
+        # Reconnecting may point at a different database
+        self.invalidate_schema(db_service_id)
+
         try:
             if db_type == "postgresql":
                 conn = await self.connect_postgresql(
@@ -326,6 +551,8 @@ class DatabaseConnectionManager:
         finally:
             del self.connections[db_service_id]
             del self.connection_types[db_service_id]
+            self.invalidate_schema(db_service_id)
+            self._schema_locks.pop(db_service_id, None)
 
     async def list_tables(self, db_service_id: int, **kwargs) -> List[Dict]:
         """
@@ -347,6 +574,12 @@ class DatabaseConnectionManager:
 
         try:
             if db_type == "postgresql":
+                cached = self._schema_cache.get(db_service_id)
+                if cached and time.monotonic() - cached[0] < self.introspection_ttl:
+                    return [
+                        {key: table[key] for key in ("schema", "name", "size", "estimated_rows")}
+                        for table in cached[1].get("tables", [])
+                    ]
                 return await self.list_postgresql_tables(conn)
 
             elif db_type == "mongodb":
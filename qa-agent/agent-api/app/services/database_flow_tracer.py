@@ -1,16 +1,28 @@
 """Database flow tracer - monitors network traffic and traces database operations."""
 
+import os
 import asyncio
 import json
 import logging
 import re
-from typing import Dict, List, Optional, Any
+from collections import deque
+from itertools import islice
+from pathlib import Path
+from typing import Deque, Dict, Iterator, List, Optional, Any, TextIO, Tuple
 from datetime import datetime
 from urllib.parse import urlparse
 import sqlparse
 
+from app.services.artifact_io import iter_artifact_lines, read_artifact, write_artifact
+
 logger = logging.getLogger(__name__)
 
+# Operations kept in memory per run; older ones are spilled to data/<run_id>/db_operations.jsonl
+DB_TRACE_BUFFER_SIZE = int(os.getenv("DB_TRACE_BUFFER_SIZE", "1000"))
+DB_TRACE_DIR = os.getenv("DB_TRACE_DIR", "data")
+
+FlowKey = Tuple[str, str, str]  # (api_endpoint, target_table, operation_type)
+
 
 class DatabaseFlowTracer:
     """Monitor network traffic and trace database operations."""
@@ -39,10 +51,59 @@ class DatabaseFlowTracer:
         "SELECT": ["find", "findOne", "aggregate"],
     }
 
-    def __init__(self):
-        self.db_operations: Dict[str, List[Dict]] = {}  # run_id -> operations
-        self.flow_data: Dict[str, List[Dict]] = {}  # run_id -> flow mappings
+    def __init__(self, buffer_size: int = DB_TRACE_BUFFER_SIZE, data_dir: str = DB_TRACE_DIR):
+        """
+        Initialize tracer.
+
+        Args:
+            buffer_size: Operations kept in memory per run before spilling to disk
+            data_dir: Root directory for per-run spill files (data/<run_id>/)
+        """
+        self.buffer_size = max(1, buffer_size)
+        self.data_dir = Path(data_dir)
+        self.db_operations: Dict[str, Deque[Dict]] = {}  # run_id -> most recent operations (ring buffer)
+        self.flow_data: Dict[str, Dict[FlowKey, Dict]] = {}  # run_id -> flows keyed by (endpoint, table, op)
         self.current_page_url: Dict[str, str] = {}  # run_id -> current page URL
+        self.operation_counts: Dict[str, int] = {}  # run_id -> operations captured (memory + spilled)
+        self.monitored_pages: Dict[str, int] = {}  # run_id -> open pages being monitored
+        self._spill_files: Dict[str, TextIO] = {}  # run_id -> open spill file
+
+    def _run_dir(self, run_id: str) -> Path:
+        return self.data_dir / run_id
+
+    def _spill_path(self, run_id: str) -> Path:
+        return self._run_dir(run_id) / "db_operations.jsonl"
+
+    def _flows_path(self, run_id: str) -> Path:
+        return self._run_dir(run_id) / "db_flows.json"
+
+    def _ensure_run(self, run_id: str) -> None:
+        if run_id not in self.db_operations:
+            self.db_operations[run_id] = deque()
+            self.flow_data[run_id] = {}
+            self.current_page_url[run_id] = ""
+            self.operation_counts[run_id] = 0
+
+    def _record_operation(self, run_id: str, operation: Dict) -> None:
+        """Append to the run's ring buffer, spilling the oldest operation once it is full."""
+        self._ensure_run(run_id)
+        buffer = self.db_operations[run_id]
+        if len(buffer) >= self.buffer_size:
+            self._spill(run_id, [buffer.popleft()])
+        buffer.append(operation)
+        self.operation_counts[run_id] += 1
+
+    def _spill(self, run_id: str, operations: List[Dict]) -> None:
+        try:
+            spill_file = self._spill_files.get(run_id)
+            if spill_file is None:
+                self._run_dir(run_id).mkdir(parents=True, exist_ok=True)
+                spill_file = open(self._spill_path(run_id), "a", encoding="utf-8")
+                self._spill_files[run_id] = spill_file
+            for operation in operations:
+                spill_file.write(json.dumps(operation, default=str) + "\n")
+        except Exception as e:
+            logger.warning(f"[{run_id}] Failed to spill DB operations: {e}")
 
     async def start_monitoring(self, page, run_id: str):
         """
@@ -52,10 +113,8 @@ class DatabaseFlowTracer:
             page: Playwright page object
             run_id: Current discovery/test run ID
         """
-        if run_id not in self.db_operations:
-            self.db_operations[run_id] = []
-            self.flow_data[run_id] = []
-            self.current_page_url[run_id] = ""
+        self._ensure_run(run_id)
+        self.monitored_pages[run_id] = self.monitored_pages.get(run_id, 0) + 1
 
         async def handle_request(request):
             """Handle outgoing requests."""
@@ -87,9 +146,18 @@ class DatabaseFlowTracer:
             except Exception as e:
                 logger.debug(f"Error handling response in DB flow tracer: {e}")
 
+        def handle_close(_page=None):
+            """Evict the run from memory once its last monitored page closes."""
+            remaining = self.monitored_pages.get(run_id, 1) - 1
+            if remaining > 0:
+                self.monitored_pages[run_id] = remaining
+            else:
+                self.end_run(run_id)
+
         # Attach listeners
         page.on("request", handle_request)
         page.on("response", handle_response)
+        page.on("close", handle_close)
 
         logger.info(f"[{run_id}] Database flow tracer monitoring started")
 
@@ -243,7 +311,7 @@ class DatabaseFlowTracer:
         }
 
         # Store operation
-        self.db_operations[run_id].append(operation)
+        self._record_operation(run_id, operation)
 
         # Track flow (UI → API → DB → Table)
         self._track_flow(run_id, operation)
@@ -277,7 +345,7 @@ class DatabaseFlowTracer:
                         "query_text": None,
                     }
 
-                    self.db_operations[run_id].append(operation)
+                    self._record_operation(run_id, operation)
                     self._track_flow(run_id, operation)
 
         except Exception as e:
@@ -304,14 +372,11 @@ class DatabaseFlowTracer:
             "timestamp": operation.get("timestamp", ""),
         }
 
-        # Check if similar flow already exists (merge)
-        existing_flow = None
-        for f in self.flow_data[run_id]:
-            if (f.get("api_endpoint") == flow["api_endpoint"] and
-                f.get("target_table") == flow["target_table"] and
-                f.get("operation_type") == flow["operation_type"]):
-                existing_flow = f
-                break
+        # Merge with an existing flow for the same (endpoint, table, op) - O(1)
+        self._ensure_run(run_id)
+        flows = self.flow_data[run_id]
+        key = (flow["api_endpoint"], flow["target_table"], flow["operation_type"])
+        existing_flow = flows.get(key)
 
         if existing_flow:
             # Increment count
@@ -322,7 +387,7 @@ class DatabaseFlowTracer:
             flow["operation_count"] = 1
             flow["first_seen"] = flow["timestamp"]
             flow["last_seen"] = flow["timestamp"]
-            self.flow_data[run_id].append(flow)
+            flows[key] = flow
 
     async def generate_flow_diagram(self, run_id: str) -> Dict:
         """
@@ -334,26 +399,28 @@ class DatabaseFlowTracer:
         Returns:
             Flow diagram data in format similar to discovery_appmap.json
         """
-        flows = self.flow_data.get(run_id, [])
-        operations = self.db_operations.get(run_id, [])
+        flows = self.get_flows(run_id)
+        total_operations = self.operation_counts.get(run_id)
+        if total_operations is None:
+            total_operations = sum(flow.get("operation_count", 1) for flow in flows)
 
-        # Extract unique nodes
-        pages = set()
-        apis = set()
-        tables = set()
+        # Extract unique nodes (dicts give each node its index in O(1))
+        pages: Dict[str, int] = {}
+        apis: Dict[str, int] = {}
+        tables: Dict[str, int] = {}
 
         for flow in flows:
             if flow.get("source_page_url"):
-                pages.add(flow["source_page_url"])
+                pages.setdefault(flow["source_page_url"], len(pages))
             if flow.get("api_endpoint"):
-                apis.add(flow["api_endpoint"])
+                apis.setdefault(flow["api_endpoint"], len(apis))
             if flow.get("target_table"):
-                tables.add(flow["target_table"])
+                tables.setdefault(flow["target_table"], len(tables))
 
         # Build node structures
-        page_nodes = [{"id": f"page_{i}", "type": "page", "url": url} for i, url in enumerate(pages)]
-        api_nodes = [{"id": f"api_{i}", "type": "api", "endpoint": endpoint} for i, endpoint in enumerate(apis)]
-        table_nodes = [{"id": f"table_{i}", "type": "table", "name": table} for i, table in enumerate(tables)]
+        page_nodes = [{"id": f"page_{i}", "type": "page", "url": url} for url, i in pages.items()]
+        api_nodes = [{"id": f"api_{i}", "type": "api", "endpoint": endpoint} for endpoint, i in apis.items()]
+        table_nodes = [{"id": f"table_{i}", "type": "table", "name": table} for table, i in tables.items()]
 
         # Build edges (connections)
         edges = []
@@ -364,13 +431,13 @@ class DatabaseFlowTracer:
             table_id = None
 
             if flow.get("source_page_url"):
-                page_id = f"page_{list(pages).index(flow['source_page_url'])}"
+                page_id = f"page_{pages[flow['source_page_url']]}"
 
             if flow.get("api_endpoint"):
-                api_id = f"api_{list(apis).index(flow['api_endpoint'])}"
+                api_id = f"api_{apis[flow['api_endpoint']]}"
 
             if flow.get("target_table"):
-                table_id = f"table_{list(tables).index(flow['target_table'])}"
+                table_id = f"table_{tables[flow['target_table']]}"
 
             # Create edges: Page → API → Table
             if page_id and api_id:
@@ -396,7 +463,7 @@ class DatabaseFlowTracer:
             "generated_at": datetime.utcnow().isoformat() + "Z",
             "run_id": run_id,
             "summary": {
-                "total_operations": len(operations),
+                "total_operations": total_operations,
                 "total_flows": len(flows),
                 "unique_pages": len(pages),
                 "unique_apis": len(apis),
@@ -413,16 +480,144 @@ class DatabaseFlowTracer:
 
         return diagram
 
-    def get_operations(self, run_id: str) -> List[Dict]:
-        """Get all captured operations for a run."""
-        return self.db_operations.get(run_id, [])
+    def iter_operations(
+        self,
+        run_id: str,
+        operation_type: Optional[str] = None,
+        table_name: Optional[str] = None
+    ) -> Iterator[Dict]:
+        """
+        Stream a run's captured operations in capture order, filtering while reading.
+
+        Spilled operations are read back from disk line by line, so memory stays
+        bounded by the ring buffer however many operations the run captured.
+
+        Args:
+            run_id: Run ID
+            operation_type: Only yield operations of this type (INSERT, UPDATE, ...)
+            table_name: Only yield operations on this table
+        """
+        spill_file = self._spill_files.get(run_id)
+        if spill_file is not None:
+            spill_file.flush()
+
+        def matches(operation: Dict) -> bool:
+            return (
+                (operation_type is None or operation.get("operation_type") == operation_type)
+                and (table_name is None or operation.get("table_name") == table_name)
+            )
+
+        # Spilled operations (possibly compressed after the run finished)
+        for line in iter_artifact_lines(self._spill_path(run_id)):
+            if not line.strip():
+                continue
+            operation = json.loads(line)
+            if matches(operation):
+                yield operation
+        for operation in list(self.db_operations.get(run_id, ())):
+            if matches(operation):
+                yield operation
+
+    def get_operations(
+        self,
+        run_id: str,
+        operation_type: Optional[str] = None,
+        table_name: Optional[str] = None,
+        limit: Optional[int] = None
+    ) -> List[Dict]:
+        """
+        Get captured operations for a run (see ``iter_operations``).
+
+        Args:
+            run_id: Run ID
+            operation_type: Only return operations of this type
+            table_name: Only return operations on this table
+            limit: Stop after this many matching operations
+
+        Returns:
+            Matching operations in capture order
+        """
+        return list(islice(self.iter_operations(run_id, operation_type, table_name), limit))
+
+    def _load_flows(self, run_id: str) -> Dict[FlowKey, Dict]:
+        """Flows persisted by earlier monitoring sessions of the run, keyed like ``flow_data``."""
+        flows_path = self._flows_path(run_id)
+        if not flows_path.exists():
+            return {}
+        try:
+            persisted = read_artifact(flows_path)
+        except Exception as e:
+            logger.warning(f"[{run_id}] Failed to read DB flows: {e}")
+            return {}
+        return {
+            (flow.get("api_endpoint", ""), flow.get("target_table", ""), flow.get("operation_type", "")): flow
+            for flow in persisted
+        }
+
+    @staticmethod
+    def _merge_flows(persisted: Dict[FlowKey, Dict], live: Dict[FlowKey, Dict]) -> Dict[FlowKey, Dict]:
+        """Combine flows of several sessions: counts add up, first/last seen widen."""
+        merged = {key: dict(flow) for key, flow in persisted.items()}
+        for key, flow in live.items():
+            existing = merged.get(key)
+            if existing is None:
+                merged[key] = dict(flow)
+                continue
+            existing["operation_count"] = existing.get("operation_count", 1) + flow.get("operation_count", 1)
+            existing["first_seen"] = min(existing.get("first_seen") or flow["first_seen"], flow["first_seen"])
+            existing["last_seen"] = max(existing.get("last_seen") or flow["last_seen"], flow["last_seen"])
+        return merged
 
     def get_flows(self, run_id: str) -> List[Dict]:
-        """Get all flow mappings for a run."""
-        return self.flow_data.get(run_id, [])
+        """Get all flow mappings for a run (earlier sessions from disk plus the live one)."""
+        persisted = self._load_flows(run_id)
+        live = self.flow_data.get(run_id)
+        if live:
+            return list(self._merge_flows(persisted, live).values())
+        return list(persisted.values())
+
+    def end_run(self, run_id: str):
+        """
+        Persist a run's remaining operations and flows and evict it from memory.
+
+        Called automatically when the last monitored page of the run closes.
+        Operations and flows stay available through ``get_operations`` and
+        ``get_flows`` from the run's data directory.
+        """
+        if run_id not in self.db_operations:
+            return
+        buffer = self.db_operations.pop(run_id)
+        if buffer:
+            self._spill(run_id, list(buffer))
+        live = self.flow_data.pop(run_id, {})
+        flows = []
+        if live:
+            # Earlier monitoring sessions of the same run already wrote db_flows.json: merge, don't overwrite
+            flows = list(self._merge_flows(self._load_flows(run_id), live).values())
+            try:
+                self._run_dir(run_id).mkdir(parents=True, exist_ok=True)
+                write_artifact(self._flows_path(run_id), flows)
+            except Exception as e:
+                logger.warning(f"[{run_id}] Failed to persist DB flows: {e}")
+        self._close_spill(run_id)
+        self.current_page_url.pop(run_id, None)
+        self.monitored_pages.pop(run_id, None)
+        total = self.operation_counts.pop(run_id, 0)
+        logger.info(f"[{run_id}] Database flow tracer finished: {total} operations, {len(flows)} flows")
+
+    def _close_spill(self, run_id: str) -> None:
+        spill_file = self._spill_files.pop(run_id, None)
+        if spill_file is not None:
+            try:
+                spill_file.close()
+            except Exception as e:
+                logger.debug(f"[{run_id}] Failed to close DB operation spill file: {e}")
 
     def clear_run_data(self, run_id: str):
-        """Clear all data for a specific run."""
+        """Clear all in-memory data for a specific run (without persisting it)."""
         self.db_operations.pop(run_id, None)
         self.flow_data.pop(run_id, None)
         self.current_page_url.pop(run_id, None)
+        self.operation_counts.pop(run_id, None)
+        self.monitored_pages.pop(run_id, None)
+        self._close_spill(run_id)
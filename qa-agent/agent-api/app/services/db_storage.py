@@ -1,6 +1,5 @@
 """Database storage service for persisting analysis results."""
 
-import json
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional, List
@@ -15,6 +14,8 @@ from app.database.repositories import (
     ComparisonRepository,
     ImageRepository
 )
+from app.services.run_diff import get_run_diff_engine
+from app.services.artifact_io import read_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -62,8 +63,7 @@ class DatabaseStorageService:
             return
 
         try:
-            with open(discovery_file, "r", encoding="utf-8") as f:
-                discovery_data = json.load(f)
+            discovery_data = read_artifact(discovery_file)
 
             # Update run with discovery summary
             await RunRepository.update_run(
@@ -80,6 +80,7 @@ class DatabaseStorageService:
             pages = discovery_data.get("pages", [])
             if pages:
                 await PageRepository.bulk_create_pages(db, run_id, pages)
+            await RunRepository.refresh_content_hash(db, run_id)
 
             logger.info(f"[{run_id}] Stored {len(pages)} pages in database")
 
@@ -98,6 +99,7 @@ class DatabaseStorageService:
 
         try:
             await TestCaseRepository.bulk_create_test_cases(db, run_id, test_cases)
+            await RunRepository.refresh_content_hash(db, run_id)
             logger.info(f"[{run_id}] Stored {len(test_cases)} test cases in database")
         except Exception as e:
             logger.error(f"[{run_id}] Failed to store test cases: {e}", exc_info=True)
@@ -126,56 +128,51 @@ class DatabaseStorageService:
         """
         Compare two runs and return differences.
 
+        Pages are matched by normalized route template plus structural
+        fingerprint, so pages whose IDs or query strings changed still pair up.
+        The stored comparison is returned as-is while both runs' content hashes
+        are unchanged; otherwise a new comparison is computed and stored.
+
         Compares:
-        - Pages added/removed/changed
+        - Pages added/removed/changed (forms, fields, actions, tables)
         - Forms added/removed
         - Test cases added/removed
-        - API calls changed
+
+        Returns:
+            Dict with ``comparison``, ``compared_at`` and ``cached``
         """
-        # Get runs with pages
-        run_a = await RunRepository.get_run_with_pages(db, run_id_a)
-        run_b = await RunRepository.get_run_with_pages(db, run_id_b)
+        run_a = await RunRepository.get_run(db, run_id_a)
+        run_b = await RunRepository.get_run(db, run_id_b)
 
         if not run_a or not run_b:
             raise ValueError("One or both runs not found")
 
-        # Extract page URLs and signatures
-        pages_a = {p.url: p for p in run_a.pages}
-        pages_b = {p.url: p for p in run_b.pages}
-
-        urls_a = set(pages_a.keys())
-        urls_b = set(pages_b.keys())
-
-        # Calculate differences
-        added_urls = urls_b - urls_a
-        removed_urls = urls_a - urls_b
-        common_urls = urls_a & urls_b
-
-        # Check for changes in common pages
-        changed_pages = []
-        for url in common_urls:
-            page_a = pages_a[url]
-            page_b = pages_b[url]
-
-            # Compare signatures or content
-            if (page_a.forms_count != page_b.forms_count or
-                page_a.tables_count != page_b.tables_count or
-                page_a.buttons_count != page_b.buttons_count):
-                changed_pages.append({
-                    "url": url,
-                    "changes": {
-                        "forms": {"before": page_a.forms_count, "after": page_b.forms_count},
-                        "tables": {"before": page_a.tables_count, "after": page_b.tables_count},
-                        "buttons": {"before": page_a.buttons_count, "after": page_b.buttons_count}
-                    }
-                })
-
-        # Get test cases
-        test_cases_a = await TestCaseRepository.get_test_cases_by_run(db, run_id_a)
-        test_cases_b = await TestCaseRepository.get_test_cases_by_run(db, run_id_b)
-
-        test_ids_a = {tc.test_id for tc in test_cases_a}
-        test_ids_b = {tc.test_id for tc in test_cases_b}
+        hash_a = await RunRepository.get_content_hash(db, run_id_a)
+        hash_b = await RunRepository.get_content_hash(db, run_id_b)
+
+        existing = await ComparisonRepository.get_current_comparison(db, run_id_a, run_id_b, hash_a, hash_b)
+        if existing:
+            return {
+                "comparison": existing.comparison_data,
+                "compared_at": existing.compared_at.isoformat(),
+                "cached": True
+            }
+
+        pages_a = await PageRepository.get_page_summaries(db, run_id_a)
+        pages_b = await PageRepository.get_page_summaries(db, run_id_b)
+
+        async def load_page_data(page_ids: List[int]) -> Dict[int, Dict[str, Any]]:
+            return await PageRepository.get_page_data(db, page_ids)
+
+        pages_diff = await get_run_diff_engine().diff(pages_a, pages_b, page_data_loader=load_page_data)
+
+        test_ids_a = set(await TestCaseRepository.get_test_ids_by_run(db, run_id_a))
+        test_ids_b = set(await TestCaseRepository.get_test_ids_by_run(db, run_id_b))
+
+        forms_a = {p["url"]: p["forms_count"] or 0 for p in pages_a}
+        forms_b = {p["url"]: p["forms_count"] or 0 for p in pages_b}
+        forms_added = sum(forms_b.get(p["url"], 0) for p in pages_diff["added"])
+        forms_removed = sum(forms_a.get(p["url"], 0) for p in pages_diff["removed"])
 
         # Build comparison result
         comparison_data = {
@@ -183,54 +180,59 @@ class DatabaseStorageService:
                 "run_id": run_id_a,
                 "base_url": run_a.base_url,
                 "started_at": run_a.started_at.isoformat(),
-                "pages_count": len(run_a.pages),
-                "test_cases_count": len(test_cases_a)
+                "pages_count": len(pages_a),
+                "test_cases_count": len(test_ids_a),
+                "content_hash": hash_a
             },
             "run_b": {
                 "run_id": run_id_b,
                 "base_url": run_b.base_url,
                 "started_at": run_b.started_at.isoformat(),
-                "pages_count": len(run_b.pages),
-                "test_cases_count": len(test_cases_b)
-            },
-            "pages": {
-                "added": [{"url": url, "title": pages_b[url].title} for url in added_urls],
-                "removed": [{"url": url, "title": pages_a[url].title} for url in removed_urls],
-                "changed": changed_pages,
-                "unchanged": len(common_urls) - len(changed_pages)
+                "pages_count": len(pages_b),
+                "test_cases_count": len(test_ids_b),
+                "content_hash": hash_b
             },
+            "pages": pages_diff,
             "test_cases": {
-                "added": list(test_ids_b - test_ids_a),
-                "removed": list(test_ids_a - test_ids_b),
-                "total_a": len(test_cases_a),
-                "total_b": len(test_cases_b)
+                "added": sorted(test_ids_b - test_ids_a),
+                "removed": sorted(test_ids_a - test_ids_b),
+                "total_a": len(test_ids_a),
+                "total_b": len(test_ids_b)
             },
             "summary": {
-                "pages_added": len(added_urls),
-                "pages_removed": len(removed_urls),
-                "pages_changed": len(changed_pages),
+                "pages_added": len(pages_diff["added"]),
+                "pages_removed": len(pages_diff["removed"]),
+                "pages_changed": len(pages_diff["changed"]),
+                "forms_added": forms_added,
+                "forms_removed": forms_removed,
                 "test_cases_added": len(test_ids_b - test_ids_a),
                 "test_cases_removed": len(test_ids_a - test_ids_b)
             }
         }
 
         # Store comparison in database
-        await ComparisonRepository.create_comparison(
+        comparison = await ComparisonRepository.create_comparison(
             db=db,
             run_id_a=run_id_a,
             run_id_b=run_id_b,
             comparison_data=comparison_data,
-            pages_added=len(added_urls),
-            pages_removed=len(removed_urls),
-            pages_changed=len(changed_pages),
-            forms_added=sum(pages_b[url].forms_count for url in added_urls),
-            forms_removed=sum(pages_a[url].forms_count for url in removed_urls),
+            pages_added=len(pages_diff["added"]),
+            pages_removed=len(pages_diff["removed"]),
+            pages_changed=len(pages_diff["changed"]),
+            forms_added=forms_added,
+            forms_removed=forms_removed,
             test_cases_added=len(test_ids_b - test_ids_a),
-            test_cases_removed=len(test_ids_a - test_ids_b)
+            test_cases_removed=len(test_ids_a - test_ids_b),
+            run_a_hash=hash_a,
+            run_b_hash=hash_b
         )
 
         logger.info(f"Compared runs: {run_id_a} vs {run_id_b}")
-        return comparison_data
+        return {
+            "comparison": comparison_data,
+            "compared_at": comparison.compared_at.isoformat(),
+            "cached": False
+        }
 
     @staticmethod
     async def store_uploaded_image(
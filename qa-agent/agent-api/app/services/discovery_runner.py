@@ -12,8 +12,20 @@ from urllib.parse import urlparse, urljoin
 from app.models.run_state import RunState
 from app.services.live_validator import LiveValidator
 from app.services.production_validator import ProductionValidator
-from app.services.enhanced_test_case_generator import EnhancedTestCaseGenerator
-from app.services.coverage_engine import TestCoverageEngine, CoverageAnalyzer
+from app.services.validation_pipeline import (
+    ValidationPipeline,
+    LiveValidationStage,
+    ProductionValidationStage,
+    get_observations,
+    record_observation,
+    was_exercised
+)
+from app.services.enhanced_test_case_generator import EnhancedTestCaseGenerator, AI_GENERATION_TIMEOUT
+from app.services.coverage_engine import CoverageTracker, TestCoverageEngine, CoverageAnalyzer
+from app.services.ai.rate_limiter import get_llm_usage_tracker
+from app.services.metrics import ACTIVE_DISCOVERIES, QUEUE_DEPTH
+from app.services.event_bus import get_event_bus, close_event_bus
+from app.services.artifact_io import write_artifact, remove_artifact_log, compress_run_artifacts
 
 logger = logging.getLogger(__name__)
 
@@ -110,33 +122,102 @@ class DiscoveryRunner:
         self.config = config or DiscoveryConfig()
         self.live_validator = LiveValidator()  # Initialize live validator for real-time feature testing
         self.production_validator = ProductionValidator()  # Initialize production-grade validator
+        # Validators run as stages sharing one visit, DOM snapshot and observation store per page
+        self.validation_pipeline = ValidationPipeline([
+            LiveValidationStage(self.live_validator),
+            ProductionValidationStage(self.production_validator),
+        ])
         # Enhanced test case generator - initialized without AI by default for backward compatibility
         self.enhanced_test_generator = EnhancedTestCaseGenerator()  # Default: rule-based only
         self.coverage_engine = TestCoverageEngine()  # Test coverage engine
         self.coverage_analyzer = CoverageAnalyzer()  # Coverage quality analyzer
-        self.event_writers: Dict[str, Any] = {}  # run_id -> file handle
         self.trace_writers: Dict[str, Any] = {}  # run_id -> file handle
         self.trace_step_no: Dict[str, int] = {}  # run_id -> step counter
         self.modal_forms: Dict[str, List[Dict]] = {}  # run_id -> list of forms from modals
+        self.coverage_trackers: Dict[str, CoverageTracker] = {}  # run_id -> live coverage counters
+        self.page_results: Dict[str, Dict[str, Dict[str, Any]]] = {}  # run_id -> url -> features/test cases
     
-    def _get_event_writer(self, run_id: str, artifacts_path: str):
-        """Get or create event writer for a run."""
-        if run_id not in self.event_writers:
-            events_file = Path(artifacts_path) / "events.jsonl"
-            self.event_writers[run_id] = open(events_file, "a", encoding="utf-8")
-        return self.event_writers[run_id]
-    
+    def _generate_page_test_cases(
+        self,
+        page_info: Dict[str, Any],
+        run_id: str,
+        artifacts_path: str,
+        ai_mode: str,
+        page_name: str = ""
+    ) -> None:
+        """
+        Generate and publish test cases for a discovered page without blocking the crawl.
+
+        Rule-based test cases are emitted immediately. In ai/hybrid mode the page
+        is queued for AI generation and the resulting test cases are emitted and
+        appended to test_cases.json as they arrive.
+        """
+        use_ai = ai_mode in ["ai", "hybrid"] and self.enhanced_test_generator.ai_generator is not None
+
+        features = self.enhanced_test_generator._detect_all_features(page_info)
+        tracker = self.coverage_trackers.get(run_id)
+        if tracker is not None:
+            tracker.add_features(features.keys())
+
+        rule_based = []
+        if ai_mode != "ai" or not use_ai:
+            rule_based = self.enhanced_test_generator.generate_rule_based_test_cases(
+                page_info=page_info,
+                run_id=run_id,
+                coverage_mode="comprehensive"
+            )
+            self._publish_test_cases(run_id, artifacts_path, rule_based)
+            logger.debug(f"[{run_id}] Generated {len(rule_based)} test cases for {page_name}")
+
+        # Kept for end-of-run assembly so pages are not generated twice
+        run_pages = self.page_results.setdefault(run_id, {})
+        previous = run_pages.get(page_info.get("url", ""))
+        if tracker is not None and previous and previous["test_cases"]:
+            # Page revisited: assembly keeps only the latest tests, so the tracker must too
+            tracker.remove_tests(previous["test_cases"])
+        run_pages[page_info.get("url", "")] = {
+            "features": features,
+            "test_cases": rule_based if (ai_mode != "ai" or not use_ai) else None,
+        }
+
+        if use_ai:
+            self.enhanced_test_generator.schedule_ai_test_cases(
+                page_info=page_info,
+                run_id=run_id,
+                existing_test_cases=rule_based,
+                on_ready=lambda test_cases: self._publish_test_cases(run_id, artifacts_path, test_cases)
+            )
+
+    def _publish_test_cases(self, run_id: str, artifacts_path: str, test_cases: List[Any]) -> None:
+        """Emit events for test cases, append them to test_cases.json and count their coverage."""
+        from app.services.test_case_generator import get_test_case_generator
+
+        if not test_cases:
+            return
+
+        tracker = self.coverage_trackers.get(run_id)
+        if tracker is not None:
+            tracker.add_tests(test_cases)
+
+        # Convert to legacy format for incremental saving and event emission
+        test_gen = get_test_case_generator()
+        legacy_test_cases = [tc.to_legacy_format() for tc in test_cases]
+
+        # Emit events for each test case
+        for tc in legacy_test_cases:
+            test_gen.emit_test_case_event(run_id, artifacts_path, tc)
+
+        # Save test cases incrementally so UI can display them in real-time
+        test_gen.append_test_cases(run_id, artifacts_path, legacy_test_cases)
+
     def _emit_event(self, run_id: str, artifacts_path: str, event_type: str, data: Dict[str, Any]):
-        """Emit a discovery event to the events.jsonl file."""
+        """Publish a discovery event on the run's event bus (written to events.jsonl)."""
         try:
-            event = {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "type": event_type,
-                "data": data
-            }
-            writer = self._get_event_writer(run_id, artifacts_path)
-            writer.write(json.dumps(event, default=str) + "\n")
-            writer.flush()
+            tracker = self.coverage_trackers.get(run_id)
+            if tracker is not None and event_type == "page_discovered":
+                # Live coverage so far (O(1) snapshot of the run's counters)
+                data = {**data, "coverage": tracker.snapshot()}
+            get_event_bus(run_id, artifacts_path).emit(event_type, data, source="discovery")
         except Exception as e:
             logger.warning(f"[{run_id}] Failed to emit event: {e}")
 
@@ -166,8 +247,7 @@ class DiscoveryRunner:
             ]
         }
 
-        with open(report_file, "w") as f:
-            json.dump(report, f, indent=2)
+        write_artifact(report_file, report)
 
         logger.info(f"[{run_id}] 💾 Saved validation report: {report_file}")
 
@@ -899,6 +979,10 @@ class DiscoveryRunner:
         Returns:
             Dict with discovery results
         """
+        ACTIVE_DISCOVERIES.inc()
+        self.coverage_trackers[run_id] = self.coverage_engine.create_tracker()
+        # This run's share of the shared queue gauge (runs overlap, so only inc/dec it)
+        queued_nav = 0
         try:
             logger.info(f"[{run_id}] Starting enhanced discovery from: {base_url}")
 
@@ -917,14 +1001,12 @@ class DiscoveryRunner:
 
             # Initialize events.jsonl
             events_file = discovery_dir / "events.jsonl"
-            if events_file.exists():
-                events_file.unlink()  # Start fresh
+            remove_artifact_log(events_file)  # Start fresh
 
             # Initialize discovery_trace.jsonl (debug)
             if debug:
                 trace_file = discovery_dir / "discovery_trace.jsonl"
-                if trace_file.exists():
-                    trace_file.unlink()
+                remove_artifact_log(trace_file)
                 self.trace_step_no[run_id] = 0
 
             self._emit_event(run_id, artifacts_path, "discovery_started", {
@@ -1160,23 +1242,16 @@ class DiscoveryRunner:
                     page, base_url, "Home", run_id, discovery_dir, len(visited_pages), artifacts_path
                 )
 
-                # 🎯 PRODUCTION VALIDATION - Test features with real interactions
-                try:
-                    validation_results = await self.production_validator.validate_page_production(
-                        page=page,
-                        page_info=page_info,
-                        run_id=run_id,
-                        artifacts_path=discovery_dir  # Pass Path object, not string
-                    )
-                    page_info["production_validation"] = validation_results
-
+                # 🎯 PRODUCTION VALIDATION - Test features with real interactions (shared single-visit pipeline)
+                await self.validation_pipeline.run(
+                    page, page_info, run_id, discovery_dir, stages=["production"]  # Path object, not string
+                )
+                validation_results = page_info.get("production_validation", {})
+                if "error" not in validation_results:
                     logger.info(
                         f"[{run_id}] ✅ Production validation complete | "
                         f"Health Score: {validation_results.get('overall_health', 0):.1f}/10"
                     )
-                except Exception as e:
-                    logger.error(f"[{run_id}] ❌ Production validation error: {e}", exc_info=True)
-                    page_info["production_validation"] = {"error": str(e)}
 
                 visited_pages.append(page_info)
                 visited_urls.add(base_url)
@@ -1209,29 +1284,8 @@ class DiscoveryRunner:
 
                 # Generate test cases for this page using enhanced generator
                 try:
-                    from app.services.test_case_generator import get_test_case_generator
-
-                    # Generate comprehensive test cases
                     ai_mode = ai_config.mode if ai_config and ai_config.enabled else "normal"
-                    page_test_cases = self.enhanced_test_generator.generate_test_cases_for_page(
-                        page_info=page_info,
-                        run_id=run_id,
-                        coverage_mode="comprehensive",
-                        ai_mode=ai_mode
-                    )
-
-                    # Convert to legacy format for incremental saving and event emission
-                    test_gen = get_test_case_generator()
-                    legacy_test_cases = [tc.to_legacy_format() for tc in page_test_cases]
-
-                    # Emit events for each test case
-                    for tc in legacy_test_cases:
-                        test_gen.emit_test_case_event(run_id, artifacts_path, tc)
-
-                    # Save test cases incrementally so UI can display them in real-time
-                    test_gen.append_test_cases(run_id, artifacts_path, legacy_test_cases)
-
-                    logger.debug(f"[{run_id}] Generated {len(page_test_cases)} test cases for {page_name}")
+                    self._generate_page_test_cases(page_info, run_id, artifacts_path, ai_mode, page_name)
                 except Exception as tc_error:
                     logger.warning(f"[{run_id}] Failed to generate test cases: {tc_error}")
 
@@ -1244,6 +1298,9 @@ class DiscoveryRunner:
             
             # Visit navigation items
             for idx, nav in enumerate(nav_items):
+                QUEUE_DEPTH.labels("discovery_nav").inc(len(nav_items) - idx - queued_nav)
+                queued_nav = len(nav_items) - idx
+
                 # Intelligent stopping conditions
                 elapsed_time = asyncio.get_event_loop().time() - discovery_start_time
                 
@@ -1335,24 +1392,15 @@ class DiscoveryRunner:
                         page, final_url, nav.get("text", "Unknown"), run_id, discovery_dir, len(visited_pages), artifacts_path
                     )
 
-                    # 🧪 LIVE VALIDATION - Test features immediately
-                    try:
-                        validation_results = await self.live_validator.validate_page_live(
-                            page=page,
-                            page_info=page_info,
-                            run_id=run_id,
-                            artifacts_path=artifacts_path
-                        )
-                        page_info["validation_results"] = validation_results
-
+                    # 🧪 LIVE VALIDATION - Test features immediately (shared single-visit pipeline)
+                    await self.validation_pipeline.run(page, page_info, run_id, artifacts_path, stages=["live"])
+                    validation_results = page_info.get("validation_results", {})
+                    if "error" not in validation_results:
                         logger.info(
                             f"[{run_id}] ✅ Validation | "
-                            f"Passed: {validation_results['passed_count']}, "
-                            f"Failed: {validation_results['failed_count']}"
+                            f"Passed: {validation_results.get('passed_count', 0)}, "
+                            f"Failed: {validation_results.get('failed_count', 0)}"
                         )
-                    except Exception as e:
-                        logger.error(f"[{run_id}] ❌ Validation error: {e}")
-                        page_info["validation_results"] = {"error": str(e)}
 
                     visited_pages.append(page_info)
 
@@ -1477,29 +1525,8 @@ class DiscoveryRunner:
 
                     # Generate test cases for this page using enhanced generator
                     try:
-                        from app.services.test_case_generator import get_test_case_generator
-
-                        # Generate comprehensive test cases
                         ai_mode = ai_config.mode if ai_config and ai_config.enabled else "normal"
-                        page_test_cases = self.enhanced_test_generator.generate_test_cases_for_page(
-                        page_info=page_info,
-                        run_id=run_id,
-                        coverage_mode="comprehensive",
-                        ai_mode=ai_mode
-                    )
-
-                        # Convert to legacy format for incremental saving and event emission
-                        test_gen = get_test_case_generator()
-                        legacy_test_cases = [tc.to_legacy_format() for tc in page_test_cases]
-
-                        # Emit events for each test case
-                        for tc in legacy_test_cases:
-                            test_gen.emit_test_case_event(run_id, artifacts_path, tc)
-
-                        # Save test cases incrementally so UI can display them in real-time
-                        test_gen.append_test_cases(run_id, artifacts_path, legacy_test_cases)
-
-                        logger.debug(f"[{run_id}] Generated {len(page_test_cases)} test cases for {page_name}")
+                        self._generate_page_test_cases(page_info, run_id, artifacts_path, ai_mode, page_name)
                     except Exception as tc_error:
                         logger.warning(f"[{run_id}] Failed to generate test cases: {tc_error}")
 
@@ -1558,46 +1585,102 @@ class DiscoveryRunner:
             
             # Save discovery.json
             discovery_file = discovery_dir / "discovery.json"
-            with open(discovery_file, "w") as f:
-                json.dump(result, f, indent=2, default=str)
+            write_artifact(discovery_file, result)
             
             # Create discovery_appmap.json
             appmap = self._create_appmap(visited_pages, dropdowns_found, forms_found)
             appmap_file = discovery_dir / "discovery_appmap.json"
-            with open(appmap_file, "w") as f:
-                json.dump(appmap, f, indent=2, default=str)
+            write_artifact(appmap_file, appmap)
             
             # Collect and save all generated test cases using ENHANCED generator
             try:
                 logger.info(f"[{run_id}] Generating comprehensive test cases using enhanced generator...")
 
-                # Generate comprehensive test cases for all pages
+                # Assemble test cases from the per-page results generated during the crawl;
+                # only pages that never went through crawl-time generation are expanded here
+                page_results = self.page_results.get(run_id, {})
+                tracker = self.coverage_trackers.get(run_id)
                 all_test_cases = []
+                late_test_cases = []  # Generated here, not yet counted by the live tracker
                 detected_features = {}
+                assembled_urls = set()
 
                 for page in visited_pages:
-                    # Use enhanced generator for comprehensive, executable test cases
-                    page_test_cases = self.enhanced_test_generator.generate_test_cases_for_page(
-                        page_info=page,
-                        run_id=run_id,
-                        coverage_mode="comprehensive"  # Generate all validation tests
-                    )
-                    all_test_cases.extend(page_test_cases)
+                    url = page.get("url", "")
+                    if url in assembled_urls:
+                        continue
+                    assembled_urls.add(url)
+
+                    page_result = page_results.get(url)
+                    if page_result is None:
+                        page_result = {
+                            "features": self.enhanced_test_generator._detect_all_features(page),
+                            "test_cases": None,
+                        }
+                        page_results[url] = page_result
+                        if tracker is not None:
+                            tracker.add_features(page_result["features"].keys())
+                    if page_result["test_cases"] is None:
+                        # AI-only pages have no rule-based tests yet (used if AI produced nothing)
+                        page_result["test_cases"] = self.enhanced_test_generator.generate_rule_based_test_cases(
+                            page_info=page,
+                            run_id=run_id,
+                            coverage_mode="comprehensive"  # Generate all validation tests
+                        )
+                        late_test_cases.extend(page_result["test_cases"])
+                    all_test_cases.extend(page_result["test_cases"])
 
                     # Track detected features for coverage calculation
-                    page_features = self.enhanced_test_generator._detect_all_features(page)
-                    for feature_type, feature_info in page_features.items():
-                        if feature_type not in detected_features:
-                            detected_features[feature_type] = []
-                        detected_features[feature_type].append(page)
-
-                # Calculate comprehensive coverage
-                logger.info(f"[{run_id}] Calculating test coverage...")
-                coverage_report = self.coverage_engine.calculate_coverage(
-                    detected_features=detected_features,
-                    generated_tests=all_test_cases
+                    for feature_type in page_result["features"]:
+                        detected_features.setdefault(feature_type, []).append(page)
+
+                generator = self.enhanced_test_generator
+                logger.info(
+                    f"[{run_id}] Assembled {len(all_test_cases)} rule-based test cases from "
+                    f"{len(assembled_urls)} pages (generation cache: {generator.generation_cache_hits} hits, "
+                    f"{generator.generation_cache_misses} misses)"
                 )
 
+                # Merge AI test cases generated in the background during the crawl
+                ai_test_cases = await self.enhanced_test_generator.drain_ai_generation(
+                    run_id, timeout=AI_GENERATION_TIMEOUT
+                )
+                replaced_by_ai = False
+                dropped_ai_test_cases = []
+                if ai_test_cases:
+                    if ai_config and ai_config.enabled and ai_config.mode == "ai":
+                        all_test_cases = ai_test_cases
+                        replaced_by_ai = True
+                    else:
+                        all_test_cases = self.enhanced_test_generator._merge_test_cases(
+                            all_test_cases, ai_test_cases, run_id
+                        )
+                        # Published per page, but duplicates of another page's rule-based tests
+                        kept = {id(tc) for tc in all_test_cases}
+                        dropped_ai_test_cases = [tc for tc in ai_test_cases if id(tc) not in kept]
+                    logger.info(f"[{run_id}] Included {len(ai_test_cases)} AI-generated test cases")
+                llm_usage = get_llm_usage_tracker().pop(run_id)
+                if llm_usage:
+                    logger.info(
+                        f"[{run_id}] LLM usage: {llm_usage['requests']} requests, "
+                        f"{llm_usage['prompt_tokens'] + llm_usage['completion_tokens']} tokens, "
+                        f"${llm_usage['cost_usd']:.4f}"
+                    )
+
+                if tracker is None or replaced_by_ai:
+                    # AI-only mode swaps the whole test set for the AI results, dropping tests the
+                    # tracker already counted, so this branch alone recomputes coverage from scratch
+                    logger.info(f"[{run_id}] Calculating test coverage...")
+                    coverage_report = self.coverage_engine.calculate_coverage(
+                        detected_features=detected_features,
+                        generated_tests=all_test_cases
+                    )
+                else:
+                    # Live tracker already counts every published test; apply the end-of-run delta
+                    tracker.add_tests(late_test_cases)
+                    tracker.remove_tests(dropped_ai_test_cases)
+                    coverage_report = self.coverage_engine.build_report(tracker)
+
                 # Analyze test quality
                 quality_report = self.coverage_analyzer.analyze_test_quality(all_test_cases)
 
@@ -1610,8 +1693,7 @@ class DiscoveryRunner:
 
                 # Save coverage report
                 coverage_file = discovery_dir / "test_coverage_report.json"
-                with open(coverage_file, "w") as f:
-                    json.dump(coverage_report, f, indent=2)
+                write_artifact(coverage_file, coverage_report)
                 logger.info(f"[{run_id}] Coverage report saved to: {coverage_file.name}")
 
                 # Save coverage summary (human-readable)
@@ -1621,8 +1703,7 @@ class DiscoveryRunner:
 
                 # Save quality report
                 quality_file = discovery_dir / "test_quality_report.json"
-                with open(quality_file, "w") as f:
-                    json.dump(quality_report, f, indent=2)
+                write_artifact(quality_file, quality_report)
 
                 # Save test cases in BOTH formats (enhanced + legacy)
                 # Enhanced format (executable)
@@ -1634,8 +1715,7 @@ class DiscoveryRunner:
                     "generated_at": datetime.utcnow().isoformat() + "Z"
                 }
                 enhanced_file = discovery_dir / "test_cases_enhanced.json"
-                with open(enhanced_file, "w") as f:
-                    json.dump(test_cases_enhanced, f, indent=2, default=str)
+                write_artifact(enhanced_file, test_cases_enhanced)
 
                 # Legacy format (backwards compatible with existing test_executor)
                 from app.services.test_case_generator import get_test_case_generator
@@ -1654,7 +1734,8 @@ class DiscoveryRunner:
                     "scenarios": scenarios,
                     "coverage_percentage": coverage_report['overall_coverage_percentage'],
                     "requirements_met": coverage_report['requirements_met'],
-                    "quality_score": quality_report['quality_score']
+                    "quality_score": quality_report['quality_score'],
+                    "llm_usage": llm_usage
                 })
 
                 # Emit coverage gaps if any
@@ -1683,18 +1764,18 @@ class DiscoveryRunner:
             try:
                 from app.services.health_check_executor import HealthCheckExecutor
 
-                health_checker = HealthCheckExecutor(max_concurrent=3)
+                health_checker = HealthCheckExecutor()  # Adaptive concurrency (HEALTH_CHECK_* env)
                 health_report = await health_checker.execute_health_checks(
                     run_id=run_id,
                     pages=visited_pages,
                     browser_context=page.context,
-                    debug=debug
+                    debug=debug,
+                    artifacts_path=artifacts_path
                 )
 
                 # Save health check report
                 health_report_path = discovery_dir / "health_check_report.json"
-                with open(health_report_path, "w") as f:
-                    f.write(json.dumps(health_report.model_dump(), indent=2, default=str))
+                write_artifact(health_report_path, health_report.model_dump())
 
                 logger.info(f"[{run_id}] Health checks completed: {health_report.checks_passed} passed, "
                            f"{health_report.checks_failed} failed, {health_report.checks_skipped} skipped")
@@ -1703,10 +1784,8 @@ class DiscoveryRunner:
                 logger.error(f"[{run_id}] Health check execution failed: {health_error}", exc_info=True)
                 # Continue even if health checks fail
 
-            # Close event writer
-            if run_id in self.event_writers:
-                self.event_writers[run_id].close()
-                del self.event_writers[run_id]
+            # Write out and close the run's event bus
+            await close_event_bus(run_id, artifacts_path)
 
             # Close trace writer
             if run_id in self.trace_writers:
@@ -1750,6 +1829,17 @@ class DiscoveryRunner:
 
             logger.info(f"[{run_id}] Discovery completed: {len(visited_pages)} pages, {len(forms_found)} forms, {len(api_requests)} APIs")
 
+            # 🗜️ Compress finished artifacts (ARTIFACT_COMPRESSION)
+            try:
+                compression = await asyncio.to_thread(compress_run_artifacts, discovery_dir)
+                if compression["files"]:
+                    logger.info(
+                        f"[{run_id}] Compressed {compression['files']} artifacts with {compression['codec']}: "
+                        f"{compression['bytes_before'] / 1e6:.1f} MB -> {compression['bytes_after'] / 1e6:.1f} MB"
+                    )
+            except Exception as e:
+                logger.warning(f"[{run_id}] Failed to compress artifacts: {e}")
+
             return result
         
         except Exception as e:
@@ -1758,10 +1848,8 @@ class DiscoveryRunner:
                 "error": str(e)[:500]
             })
             
-            # Close event writer on error
-            if run_id in self.event_writers:
-                self.event_writers[run_id].close()
-                del self.event_writers[run_id]
+            # Close event bus on error
+            await close_event_bus(run_id, artifacts_path)
 
             # Close trace writer on error
             if run_id in self.trace_writers:
@@ -1790,12 +1878,18 @@ class DiscoveryRunner:
             discovery_dir = Path(artifacts_path)
             discovery_dir.mkdir(parents=True, exist_ok=True)
             discovery_file = discovery_dir / "discovery.json"
-            with open(discovery_file, "w") as f:
-                json.dump(result, f, indent=2, default=str)
+            write_artifact(discovery_file, result)
 
             return result
 
         finally:
+            ACTIVE_DISCOVERIES.dec()
+            QUEUE_DEPTH.labels("discovery_nav").dec(queued_nav)
+            self.enhanced_test_generator.cancel_ai_generation(run_id)
+            get_llm_usage_tracker().pop(run_id)
+            self.coverage_trackers.pop(run_id, None)
+            self.page_results.pop(run_id, None)
+
             # Restore original config if overrides were applied
             if config_overrides and original_config:
                 for key, value in original_config.items():
@@ -3505,18 +3599,8 @@ class DiscoveryRunner:
                                             fingerprint = self._create_fingerprint(nav_path, new_url, heading)
 
                                             if fingerprint not in visited_fingerprints:
-                                                # 🧪 LIVE VALIDATION - Test features immediately
-                                                try:
-                                                    validation_results = await self.live_validator.validate_page_live(
-                                                        page=page,
-                                                        page_info=page_info,
-                                                        run_id=run_id,
-                                                        artifacts_path=artifacts_path
-                                                    )
-                                                    page_info["validation_results"] = validation_results
-                                                except Exception as e:
-                                                    logger.error(f"[{run_id}] ❌ Validation error: {e}")
-                                                    page_info["validation_results"] = {"error": str(e)}
+                                                # 🧪 LIVE VALIDATION - Test features immediately (shared single-visit pipeline)
+                                                await self.validation_pipeline.run(page, page_info, run_id, artifacts_path, stages=["live"])
 
                                                 visited_pages.append(page_info)
                                                 visited_fingerprints.add(fingerprint)
@@ -3571,18 +3655,8 @@ class DiscoveryRunner:
                                 fingerprint = self._create_fingerprint(nav_path, new_url, heading)
 
                                 if fingerprint not in visited_fingerprints:
-                                    # 🧪 LIVE VALIDATION
-                                    try:
-                                        validation_results = await self.live_validator.validate_page_live(
-                                            page=page,
-                                            page_info=page_info,
-                                            run_id=run_id,
-                                            artifacts_path=artifacts_path
-                                        )
-                                        page_info["validation_results"] = validation_results
-                                    except Exception as e:
-                                        logger.error(f"[{run_id}] ❌ Validation error: {e}")
-                                        page_info["validation_results"] = {"error": str(e)}
+                                    # 🧪 LIVE VALIDATION (shared single-visit pipeline)
+                                    await self.validation_pipeline.run(page, page_info, run_id, artifacts_path, stages=["live"])
 
                                     visited_pages.append(page_info)
                                     visited_fingerprints.add(fingerprint)
@@ -3772,18 +3846,8 @@ class DiscoveryRunner:
                                             fingerprint = self._create_fingerprint(nav_path, after_url, heading)
 
                                             if fingerprint not in visited_fingerprints:
-                                                # 🧪 LIVE VALIDATION
-                                                try:
-                                                    validation_results = await self.live_validator.validate_page_live(
-                                                        page=page,
-                                                        page_info=page_info,
-                                                        run_id=run_id,
-                                                        artifacts_path=artifacts_path
-                                                    )
-                                                    page_info["validation_results"] = validation_results
-                                                except Exception as e:
-                                                    logger.error(f"[{run_id}] ❌ Validation error: {e}")
-                                                    page_info["validation_results"] = {"error": str(e)}
+                                                # 🧪 LIVE VALIDATION (shared single-visit pipeline)
+                                                await self.validation_pipeline.run(page, page_info, run_id, artifacts_path, stages=["live"])
 
                                                 visited_pages.append(page_info)
                                                 visited_fingerprints.add(fingerprint)
@@ -5012,206 +5076,214 @@ class DiscoveryRunner:
                 "actions_to_test": ["search", "filters", "sort", "pagination", "table_rows"]
             })
             
-            # 1. Test Search (if present)
-            try:
-                search_selectors = [
-                    "input[type='search']",
-                    "input[placeholder*='search' i]",
-                    "input[placeholder*='find' i]",
-                    "input[aria-label*='search' i]",
-                    ".search-input",
-                    "[role='searchbox']"
-                ]
+            # 1. Test Search (if present) - skipped if already exercised during the page visit
+            if not was_exercised(page_info, "search"):
+                try:
+                    search_selectors = [
+                        "input[type='search']",
+                        "input[placeholder*='search' i]",
+                        "input[placeholder*='find' i]",
+                        "input[aria-label*='search' i]",
+                        ".search-input",
+                        "[role='searchbox']"
+                    ]
                 
-                for selector in search_selectors:
-                    try:
-                        search_input = page.locator(selector).first
-                        if await search_input.is_visible(timeout=1000):
-                            self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                                "url": page_url,
-                                "action": "search",
-                                "status": "testing"
-                            })
-                            
-                            # Type test query
-                            await search_input.fill("test", timeout=2000)
-                            await asyncio.sleep(1)
-                            await page.wait_for_load_state("networkidle", timeout=5000)
+                    for selector in search_selectors:
+                        try:
+                            search_input = page.locator(selector).first
+                            if await search_input.is_visible(timeout=1000):
+                                self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                                    "url": page_url,
+                                    "action": "search",
+                                    "status": "testing"
+                                })
                             
-                            # Clear search
-                            await search_input.fill("", timeout=2000)
-                            await asyncio.sleep(1)
-                            await page.wait_for_load_state("networkidle", timeout=5000)
+                                # Type test query
+                                await search_input.fill("test", timeout=2000)
+                                await asyncio.sleep(1)
+                                await page.wait_for_load_state("networkidle", timeout=5000)
                             
-                            # Ensure we're still on the same page
-                            current_url = self._normalize_url(page.url)
-                            if current_url != normalized_original:
-                                await page.goto(page_url, timeout=30000, wait_until="networkidle")
+                                # Clear search
+                                await search_input.fill("", timeout=2000)
                                 await asyncio.sleep(1)
+                                await page.wait_for_load_state("networkidle", timeout=5000)
                             
-                            self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                                "url": page_url,
-                                "action": "search",
-                                "status": "completed"
-                            })
-                            break
-                    except:
-                        continue
-            except Exception as e:
-                logger.debug(f"[{run_id}] Search testing error: {e}")
+                                # Ensure we're still on the same page
+                                current_url = self._normalize_url(page.url)
+                                if current_url != normalized_original:
+                                    await page.goto(page_url, timeout=30000, wait_until="networkidle")
+                                    await asyncio.sleep(1)
+                            
+                                record_observation(get_observations(page_info), "search", "passed", "interactions")
+                                self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                                    "url": page_url,
+                                    "action": "search",
+                                    "status": "completed"
+                                })
+                                break
+                        except:
+                            continue
+                except Exception as e:
+                    logger.debug(f"[{run_id}] Search testing error: {e}")
             
-            # 2. Test Filters (if present)
-            try:
-                filter_selectors = [
-                    "select[aria-label*='filter' i]",
-                    "button[aria-label*='filter' i]",
-                    ".filter-select",
-                    "[role='combobox'][aria-label*='filter' i]"
-                ]
+            # 2. Test Filters (if present) - skipped if already exercised during the page visit
+            if not was_exercised(page_info, "filters"):
+                try:
+                    filter_selectors = [
+                        "select[aria-label*='filter' i]",
+                        "button[aria-label*='filter' i]",
+                        ".filter-select",
+                        "[role='combobox'][aria-label*='filter' i]"
+                    ]
                 
-                for selector in filter_selectors:
-                    try:
-                        filter_elem = page.locator(selector).first
-                        if await filter_elem.is_visible(timeout=1000):
-                            self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                                "url": page_url,
-                                "action": "filters",
-                                "status": "testing"
-                            })
+                    for selector in filter_selectors:
+                        try:
+                            filter_elem = page.locator(selector).first
+                            if await filter_elem.is_visible(timeout=1000):
+                                self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                                    "url": page_url,
+                                    "action": "filters",
+                                    "status": "testing"
+                                })
                             
-                            # Try to interact with filter
-                            if await filter_elem.evaluate("el => el.tagName.toLowerCase()") == "select":
-                                options = await filter_elem.locator("option").count()
-                                if options > 1:
-                                    await filter_elem.select_option(index=1, timeout=2000)
-                                    await asyncio.sleep(1)
-                                    await page.wait_for_load_state("networkidle", timeout=5000)
+                                # Try to interact with filter
+                                if await filter_elem.evaluate("el => el.tagName.toLowerCase()") == "select":
+                                    options = await filter_elem.locator("option").count()
+                                    if options > 1:
+                                        await filter_elem.select_option(index=1, timeout=2000)
+                                        await asyncio.sleep(1)
+                                        await page.wait_for_load_state("networkidle", timeout=5000)
                                     
-                                    # Reset filter
-                                    await filter_elem.select_option(index=0, timeout=2000)
-                                    await asyncio.sleep(1)
-                                    await page.wait_for_load_state("networkidle", timeout=5000)
-                            else:
-                                await filter_elem.click(timeout=2000)
-                                await asyncio.sleep(1)
-                                # Try to select first option if dropdown opens
-                                first_option = page.locator("[role='option']").first
-                                if await first_option.is_visible(timeout=1000):
-                                    await first_option.click(timeout=2000)
+                                        # Reset filter
+                                        await filter_elem.select_option(index=0, timeout=2000)
+                                        await asyncio.sleep(1)
+                                        await page.wait_for_load_state("networkidle", timeout=5000)
+                                else:
+                                    await filter_elem.click(timeout=2000)
                                     await asyncio.sleep(1)
+                                    # Try to select first option if dropdown opens
+                                    first_option = page.locator("[role='option']").first
+                                    if await first_option.is_visible(timeout=1000):
+                                        await first_option.click(timeout=2000)
+                                        await asyncio.sleep(1)
                             
-                            # Ensure we're still on the same page
-                            current_url = self._normalize_url(page.url)
-                            if current_url != normalized_original:
-                                await page.goto(page_url, timeout=30000, wait_until="networkidle")
-                                await asyncio.sleep(1)
+                                # Ensure we're still on the same page
+                                current_url = self._normalize_url(page.url)
+                                if current_url != normalized_original:
+                                    await page.goto(page_url, timeout=30000, wait_until="networkidle")
+                                    await asyncio.sleep(1)
                             
-                            self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                                "url": page_url,
-                                "action": "filters",
-                                "status": "completed"
-                            })
-                            break
-                    except:
-                        continue
-            except Exception as e:
-                logger.debug(f"[{run_id}] Filter testing error: {e}")
+                                record_observation(get_observations(page_info), "filters", "passed", "interactions")
+                                self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                                    "url": page_url,
+                                    "action": "filters",
+                                    "status": "completed"
+                                })
+                                break
+                        except:
+                            continue
+                except Exception as e:
+                    logger.debug(f"[{run_id}] Filter testing error: {e}")
             
-            # 3. Test Sort (if present)
-            try:
-                sort_selectors = [
-                    "button[aria-label*='sort' i]",
-                    "th[aria-sort]",
-                    ".sort-button",
-                    "[role='columnheader'][aria-sort]"
-                ]
+            # 3. Test Sort (if present) - skipped if already exercised during the page visit
+            if not was_exercised(page_info, "sort"):
+                try:
+                    sort_selectors = [
+                        "button[aria-label*='sort' i]",
+                        "th[aria-sort]",
+                        ".sort-button",
+                        "[role='columnheader'][aria-sort]"
+                    ]
                 
-                for selector in sort_selectors:
-                    try:
-                        sort_elem = page.locator(selector).first
-                        if await sort_elem.is_visible(timeout=1000):
-                            self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                                "url": page_url,
-                                "action": "sort",
-                                "status": "testing"
-                            })
-                            
-                            await sort_elem.click(timeout=2000)
-                            await asyncio.sleep(1)
-                            await page.wait_for_load_state("networkidle", timeout=5000)
+                    for selector in sort_selectors:
+                        try:
+                            sort_elem = page.locator(selector).first
+                            if await sort_elem.is_visible(timeout=1000):
+                                self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                                    "url": page_url,
+                                    "action": "sort",
+                                    "status": "testing"
+                                })
                             
-                            # Click again to reverse sort
-                            await sort_elem.click(timeout=2000)
-                            await asyncio.sleep(1)
-                            await page.wait_for_load_state("networkidle", timeout=5000)
+                                await sort_elem.click(timeout=2000)
+                                await asyncio.sleep(1)
+                                await page.wait_for_load_state("networkidle", timeout=5000)
                             
-                            # Ensure we're still on the same page
-                            current_url = self._normalize_url(page.url)
-                            if current_url != normalized_original:
-                                await page.goto(page_url, timeout=30000, wait_until="networkidle")
+                                # Click again to reverse sort
+                                await sort_elem.click(timeout=2000)
                                 await asyncio.sleep(1)
+                                await page.wait_for_load_state("networkidle", timeout=5000)
                             
-                            self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                                "url": page_url,
-                                "action": "sort",
-                                "status": "completed"
-                            })
-                            break
-                    except:
-                        continue
-            except Exception as e:
-                logger.debug(f"[{run_id}] Sort testing error: {e}")
-            
-            # 4. Test Pagination (if present) - but limit to 2-3 pages to avoid long waits
-            try:
-                pagination_next = page.locator("button:has-text('Next'), a:has-text('Next'), button[aria-label*='Next' i]").first
-                if await pagination_next.is_visible(timeout=1000):
-                    self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                        "url": page_url,
-                        "action": "pagination",
-                        "status": "testing"
-                    })
-                    
-                    # Click next (max 2 times to avoid long waits)
-                    for i in range(2):
-                        try:
-                            is_disabled = await pagination_next.is_disabled(timeout=500)
-                            if is_disabled:
-                                break
+                                # Ensure we're still on the same page
+                                current_url = self._normalize_url(page.url)
+                                if current_url != normalized_original:
+                                    await page.goto(page_url, timeout=30000, wait_until="networkidle")
+                                    await asyncio.sleep(1)
                             
-                            await pagination_next.click(timeout=2000)
-                            await asyncio.sleep(1)
-                            await page.wait_for_load_state("networkidle", timeout=5000)
+                                record_observation(get_observations(page_info), "sort", "passed", "interactions")
+                                self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                                    "url": page_url,
+                                    "action": "sort",
+                                    "status": "completed"
+                                })
+                                break
                         except:
-                            break
+                            continue
+                except Exception as e:
+                    logger.debug(f"[{run_id}] Sort testing error: {e}")
+            
+            # 4. Test Pagination (if present) - limited to 2-3 pages, skipped if already exercised during the page visit
+            if not was_exercised(page_info, "pagination"):
+                try:
+                    pagination_next = page.locator("button:has-text('Next'), a:has-text('Next'), button[aria-label*='Next' i]").first
+                    if await pagination_next.is_visible(timeout=1000):
+                        self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                            "url": page_url,
+                            "action": "pagination",
+                            "status": "testing"
+                        })
                     
-                    # Go back to first page
-                    pagination_prev = page.locator("button:has-text('Previous'), a:has-text('Previous'), button[aria-label*='Previous' i]").first
-                    if await pagination_prev.is_visible(timeout=1000):
+                        # Click next (max 2 times to avoid long waits)
                         for i in range(2):
                             try:
-                                is_disabled = await pagination_prev.is_disabled(timeout=500)
+                                is_disabled = await pagination_next.is_disabled(timeout=500)
                                 if is_disabled:
                                     break
-                                await pagination_prev.click(timeout=2000)
+                            
+                                await pagination_next.click(timeout=2000)
                                 await asyncio.sleep(1)
                                 await page.wait_for_load_state("networkidle", timeout=5000)
                             except:
                                 break
                     
-                    # Ensure we're back on original page
-                    current_url = self._normalize_url(page.url)
-                    if current_url != normalized_original:
-                        await page.goto(page_url, timeout=30000, wait_until="networkidle")
-                        await asyncio.sleep(1)
+                        # Go back to first page
+                        pagination_prev = page.locator("button:has-text('Previous'), a:has-text('Previous'), button[aria-label*='Previous' i]").first
+                        if await pagination_prev.is_visible(timeout=1000):
+                            for i in range(2):
+                                try:
+                                    is_disabled = await pagination_prev.is_disabled(timeout=500)
+                                    if is_disabled:
+                                        break
+                                    await pagination_prev.click(timeout=2000)
+                                    await asyncio.sleep(1)
+                                    await page.wait_for_load_state("networkidle", timeout=5000)
+                                except:
+                                    break
+                    
+                        # Ensure we're back on original page
+                        current_url = self._normalize_url(page.url)
+                        if current_url != normalized_original:
+                            await page.goto(page_url, timeout=30000, wait_until="networkidle")
+                            await asyncio.sleep(1)
                     
-                    self._emit_event(run_id, artifacts_path, "page_action_testing", {
-                        "url": page_url,
-                        "action": "pagination",
-                        "status": "completed"
-                    })
-            except Exception as e:
-                logger.debug(f"[{run_id}] Pagination testing error: {e}")
+                        record_observation(get_observations(page_info), "pagination", "passed", "interactions")
+                        self._emit_event(run_id, artifacts_path, "page_action_testing", {
+                            "url": page_url,
+                            "action": "pagination",
+                            "status": "completed"
+                        })
+                except Exception as e:
+                    logger.debug(f"[{run_id}] Pagination testing error: {e}")
             
             # 5. Test Table Row Clicks (if present) - but limit to first 3 rows
             try:
@@ -1,12 +1,12 @@
 """Discovery summarizer service for generating discovery summaries."""
 
-import json
 import logging
 from pathlib import Path
 from typing import Dict, Any, Optional
 
 from app.models.run_state import RunState
 from app.models.run_context import Question, QuestionOption
+from app.services.artifact_io import read_artifact, write_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -43,8 +43,7 @@ class DiscoverySummarizer:
                 logger.warning(f"[{run_id}] discovery.json not found, using empty summary")
                 discovery_data = {}
             else:
-                with open(discovery_file) as f:
-                    discovery_data = json.load(f)
+                discovery_data = read_artifact(discovery_file)
             
             # Generate summary counts
             pages = discovery_data.get("pages", [])
@@ -88,8 +87,7 @@ class DiscoverySummarizer:
             
             # Save summary to JSON file
             summary_file = discovery_dir / "discovery_summary.json"
-            with open(summary_file, "w") as f:
-                json.dump(summary, f, indent=2)
+            write_artifact(summary_file, summary)
             
             logger.info(f"[{run_id}] Discovery summary generated: {summary}")
             
@@ -143,8 +141,7 @@ class DiscoverySummarizer:
             discovery_dir = Path(artifacts_path)
             discovery_dir.mkdir(parents=True, exist_ok=True)
             summary_file = discovery_dir / "discovery_summary.json"
-            with open(summary_file, "w") as f:
-                json.dump(summary, f, indent=2)
+            write_artifact(summary_file, summary)
             
             # Create question
             question = Question(
@@ -1,14 +1,21 @@
 """Enhanced Test Case Generator - Schema-driven comprehensive test generation."""
 
-from typing import Dict, List, Optional, Any
+from typing import Callable, Dict, List, Optional, Any, Set, Tuple
+from collections import OrderedDict
+import os
+import copy
+import json
+import asyncio
 import logging
 import re
 from pathlib import Path
 
+from app.services.ai.rate_limiter import current_llm_run_id
 from app.services.validation_schema import (
     ValidationRule,
     FeatureValidationSchema,
-    ValidationSchemaRegistry
+    ValidationSchemaRegistry,
+    get_validation_schema_registry
 )
 from app.models.test_case_models import (
     TestCase,
@@ -22,6 +29,13 @@ from app.models.test_case_models import (
 
 logger = logging.getLogger(__name__)
 
+# Concurrent LLM requests per generator and per-request timeout (seconds)
+AI_GENERATION_CONCURRENCY = int(os.getenv("AI_GENERATION_CONCURRENCY", "4"))
+AI_GENERATION_TIMEOUT = float(os.getenv("AI_GENERATION_TIMEOUT", "120"))
+
+# Distinct page feature signatures whose rule expansions are memoized
+GENERATION_CACHE_SIZE = int(os.getenv("TEST_GENERATION_CACHE_SIZE", "256"))
+
 
 class SmartSelectorDetector:
     """Detects actual selectors on page for validation rules."""
@@ -149,7 +163,339 @@ class TestDataGenerator:
         }
 
         return data_map.get(rule.assertion_type, {})
-    
+
+
+class EnhancedTestCaseGenerator:
+    """Generate comprehensive, executable test cases using validation schemas."""
+
+    def __init__(
+        self,
+        ai_generator=None,
+        ai_concurrency: int = AI_GENERATION_CONCURRENCY,
+        schema_registry: Optional[ValidationSchemaRegistry] = None
+    ):
+        """
+        Initialize test case generator.
+        
+        Args:
+            ai_generator: Optional AI test case generator for hybrid mode
+            ai_concurrency: Maximum number of concurrent LLM requests
+            schema_registry: Schema registry to use (defaults to the shared frozen registry)
+        """
+        self.schema_registry = schema_registry or get_validation_schema_registry()
+        self.selector_detector = SmartSelectorDetector()
+        self.data_generator = TestDataGenerator()
+        self.ai_generator = ai_generator
+        self.ai_concurrency = max(1, ai_concurrency)
+        self._ai_semaphore: Optional[asyncio.Semaphore] = None
+        self._ai_tasks: Dict[str, Set[asyncio.Task]] = {}  # run_id -> pending AI generations
+        self._ai_results: Dict[str, List[TestCase]] = {}  # run_id -> AI test cases collected so far
+        # feature signature -> detected features / (signature, coverage_mode) -> (rule, template) pairs
+        self._feature_cache: "OrderedDict[str, Dict[str, Dict[str, Any]]]" = OrderedDict()
+        self._expansion_cache: "OrderedDict[Tuple[str, str], List[Tuple[ValidationRule, TestCase]]]" = OrderedDict()
+        self.generation_cache_hits = 0
+        self.generation_cache_misses = 0
+        logger.info("EnhancedTestCaseGenerator initialized with validation schemas")
+
+    def generate_test_cases_for_page(
+        self,
+        page_info: Dict[str, Any],
+        run_id: str,
+        coverage_mode: str = "comprehensive",  # "comprehensive", "essential", "minimal"
+        ai_mode: str = "normal"  # "normal", "ai", "hybrid"
+    ) -> List[TestCase]:
+        """Generate comprehensive test cases with full coverage for a page.
+
+        Synchronous entry point kept for backward compatibility. Inside a running
+        event loop AI generation cannot be awaited here, so only rule-based test
+        cases are returned; async callers should use ``agenerate_test_cases_for_page``
+        or ``schedule_ai_test_cases``.
+
+        Args:
+            page_info: Page information from discovery
+            run_id: Discovery run ID
+            coverage_mode: Coverage level - comprehensive (all), essential (critical+high), minimal (critical only)
+            ai_mode: normal (rule-based), ai (AI only) or hybrid (both)
+
+        Returns:
+            List of executable test cases
+        """
+        if ai_mode in ["ai", "hybrid"] and self.ai_generator:
+            try:
+                asyncio.get_running_loop()
+            except RuntimeError:
+                return asyncio.run(
+                    self.agenerate_test_cases_for_page(page_info, run_id, coverage_mode, ai_mode)
+                )
+            logger.warning(
+                f"[{run_id}] Sync generation called from a running event loop, "
+                f"skipping AI generation (use the async API)"
+            )
+
+        return self.generate_rule_based_test_cases(page_info, run_id, coverage_mode)
+
+    async def agenerate_test_cases_for_page(
+        self,
+        page_info: Dict[str, Any],
+        run_id: str,
+        coverage_mode: str = "comprehensive",
+        ai_mode: str = "normal"
+    ) -> List[TestCase]:
+        """Generate test cases for a page, awaiting AI generation when enabled."""
+        test_cases = self.generate_rule_based_test_cases(page_info, run_id, coverage_mode)
+        if ai_mode not in ["ai", "hybrid"] or not self.ai_generator:
+            return test_cases
+
+        ai_test_cases = await self.generate_ai_test_cases(page_info, run_id)
+        if ai_mode == "ai":
+            logger.info(f"[{run_id}] AI mode: Using {len(ai_test_cases)} AI-generated test cases")
+            return ai_test_cases
+
+        merged = self._merge_test_cases(test_cases, ai_test_cases, run_id)
+        logger.info(
+            f"[{run_id}] Hybrid mode: Merged {len(test_cases)} rule-based + "
+            f"{len(ai_test_cases)} AI = {len(merged)} total"
+        )
+        return merged
+
+    def generate_rule_based_test_cases(
+        self,
+        page_info: Dict[str, Any],
+        run_id: str,
+        coverage_mode: str = "comprehensive"
+    ) -> List[TestCase]:
+        """Generate schema-driven test cases for a page (no AI).
+
+        Rule expansion only depends on the page's feature signature, so pages
+        built from the same template reuse the first expansion and only get
+        their URL and name substituted.
+        """
+        signature = self.feature_signature(page_info)
+        cache_key = (signature, coverage_mode)
+        page_url = page_info.get("url", "")
+        page_name = page_info.get("page_signature", {}).get("page_name", "Unknown")
+
+        expansion = self._expansion_cache.get(cache_key)
+        if expansion is not None:
+            self._expansion_cache.move_to_end(cache_key)
+            self.generation_cache_hits += 1
+            test_cases = [
+                self._bind_to_page(rule, template, page_url, page_name)
+                for rule, template in expansion
+            ]
+            logger.debug(
+                f"[{run_id}] Reused {len(test_cases)} cached test cases for page {page_url}"
+            )
+            return test_cases
+
+        self.generation_cache_misses += 1
+        expansion = self._expand_rules(page_info, run_id, coverage_mode)
+        self._expansion_cache[cache_key] = expansion
+        if len(self._expansion_cache) > GENERATION_CACHE_SIZE:
+            self._expansion_cache.popitem(last=False)
+        # Callers own the returned objects; the cached templates stay untouched
+        return [copy.deepcopy(test_case) for _, test_case in expansion]
+
+    def _expand_rules(
+        self,
+        page_info: Dict[str, Any],
+        run_id: str,
+        coverage_mode: str
+    ) -> List[Tuple[ValidationRule, TestCase]]:
+        """Generate one test case per applicable validation rule, paired with its rule."""
+        logger.info(f"[{run_id}] Generating test cases for page: {page_info.get('url', 'unknown')}")
+
+        expansion = []
+        detected_features = self._detect_all_features(page_info)
+
+        logger.info(f"[{run_id}] Detected features: {list(detected_features.keys())}")
+
+        for feature_type, feature_info in detected_features.items():
+            # Get validation schema for this feature
+            schema = self.schema_registry.get_schema(feature_type)
+            if not schema:
+                logger.warning(f"No schema found for feature: {feature_type}")
+                continue
+
+            logger.info(f"[{run_id}] Generating tests for {feature_type} using {len(schema.validation_rules)} rules")
+
+            # Generate test case for each validation rule
+            for rule in schema.validation_rules:
+                # Skip based on coverage mode
+                if not self._should_generate_for_coverage_mode(rule, coverage_mode):
+                    logger.debug(f"Skipping rule {rule.id} due to coverage mode: {coverage_mode}")
+                    continue
+
+                test_case = self._generate_test_case_from_rule(
+                    rule=rule,
+                    feature_info=feature_info,
+                    page_info=page_info,
+                    schema=schema,
+                    run_id=run_id
+                )
+
+                if test_case:
+                    expansion.append((rule, test_case))
+                    logger.debug(f"Generated test case: {test_case.id}")
+
+        logger.info(
+            f"[{run_id}] Generated {len(expansion)} test cases for page {page_info.get('url', '')}"
+        )
+        return expansion
+
+    def _bind_to_page(
+        self,
+        rule: ValidationRule,
+        template: TestCase,
+        page_url: str,
+        page_name: str
+    ) -> TestCase:
+        """Copy a cached test case, substituting the page-specific fields."""
+        test_case = copy.deepcopy(template)
+        test_case.id = f"TC_{template.feature_type.upper()}_{rule.id}_{self._sanitize_id(page_name)}"
+        test_case.name = f"{rule.name} on {page_name}"
+        test_case.page_url = page_url
+        test_case.page_name = page_name
+        for step in test_case.steps:
+            if step.action == "navigate":
+                navigation = create_navigation_step(step.step_number, page_url)
+                step.data = navigation.data
+                step.description = navigation.description
+        return test_case
+
+    def feature_signature(self, page_info: Dict[str, Any]) -> str:
+        """
+        Canonical signature of everything rule expansion reads from a page.
+
+        Pages with equal signatures detect the same features and resolve the
+        same selectors; only their URL and name differ.
+        """
+        page_sig = page_info.get("page_signature", {}) or {}
+        tables = page_info.get("tables", []) or []
+        signature = {
+            "actions": [str(action.get("text", "")) for action in page_sig.get("primary_actions", [])],
+            "forms": [
+                [str(field.get("name", "")) for field in form.get("fields", [])]
+                for form in page_sig.get("forms", [])
+            ],
+            "has_tables": page_sig.get("has_tables"),
+            "tables": len(tables) > 0,
+            "large_table": any(table.get("row_count", 0) >= 10 for table in tables),
+        }
+        return json.dumps(signature, sort_keys=True, default=str)
+
+    async def generate_ai_test_cases(self, page_info: Dict[str, Any], run_id: str) -> List[TestCase]:
+        """
+        Generate AI test cases for one page.
+
+        At most ``ai_concurrency`` LLM requests run at once across all pages;
+        each request is bounded by ``AI_GENERATION_TIMEOUT``.
+
+        Returns:
+            Converted AI test cases (empty list on failure or timeout)
+        """
+        if not self.ai_generator:
+            return []
+        if self._ai_semaphore is None:
+            self._ai_semaphore = asyncio.Semaphore(self.ai_concurrency)
+
+        # Attribute provider token usage to this run
+        current_llm_run_id.set(run_id)
+        try:
+            async with self._ai_semaphore:
+                ai_test_cases = await asyncio.wait_for(
+                    self.ai_generator.generate_from_discovery(
+                        discovery_data={},  # Can be enhanced to pass full discovery
+                        page_info=page_info
+                    ),
+                    timeout=AI_GENERATION_TIMEOUT
+                )
+        except asyncio.TimeoutError:
+            logger.warning(f"[{run_id}] AI generation timed out for {page_info.get('url', '')}")
+            return []
+        except Exception as e:
+            logger.warning(f"[{run_id}] AI generation failed for {page_info.get('url', '')}: {e}")
+            return []
+
+        return self._convert_ai_to_test_cases(ai_test_cases, page_info, run_id)
+
+    def schedule_ai_test_cases(
+        self,
+        page_info: Dict[str, Any],
+        run_id: str,
+        existing_test_cases: List[TestCase],
+        on_ready: Optional[Callable[[List[TestCase]], None]] = None
+    ) -> Optional[asyncio.Task]:
+        """
+        Queue AI generation for a page without waiting for it.
+
+        Must be called from a running event loop. When the LLM responds, test
+        cases that duplicate ``existing_test_cases`` or earlier AI results for
+        the run are dropped, the rest are collected for ``drain_ai_generation``
+        and passed to ``on_ready``.
+
+        Args:
+            page_info: Page information from discovery
+            run_id: Discovery run ID
+            existing_test_cases: Test cases already emitted for the page
+            on_ready: Optional callback receiving the new AI test cases
+
+        Returns:
+            The scheduled task, or None when no AI generator is configured
+        """
+        if not self.ai_generator:
+            return None
+
+        async def _generate():
+            ai_test_cases = await self.generate_ai_test_cases(page_info, run_id)
+            if not ai_test_cases:
+                return
+            collected = self._ai_results.setdefault(run_id, [])
+            known = list(existing_test_cases) + collected
+            new_test_cases = self._merge_test_cases(known, ai_test_cases, run_id)[len(known):]
+            if not new_test_cases:
+                return
+            collected.extend(new_test_cases)
+            logger.info(f"[{run_id}] AI added {len(new_test_cases)} test cases for {page_info.get('url', '')}")
+            if on_ready:
+                try:
+                    on_ready(new_test_cases)
+                except Exception as e:
+                    logger.warning(f"[{run_id}] Failed to publish AI test cases: {e}")
+
+        task = asyncio.get_running_loop().create_task(_generate())
+        pending = self._ai_tasks.setdefault(run_id, set())
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+        return task
+
+    def pending_ai_generations(self, run_id: str) -> int:
+        """Number of AI generations still running for a run."""
+        return len(self._ai_tasks.get(run_id, ()))
+
+    async def drain_ai_generation(self, run_id: str, timeout: Optional[float] = None) -> List[TestCase]:
+        """
+        Wait for a run's queued AI generations and return everything they produced.
+
+        Generations still running after ``timeout`` seconds are cancelled.
+        """
+        pending = self._ai_tasks.get(run_id)
+        if pending:
+            logger.info(f"[{run_id}] Waiting for {len(pending)} pending AI generations")
+            done, not_done = await asyncio.wait(set(pending), timeout=timeout)
+            for task in not_done:
+                task.cancel()
+            if not_done:
+                logger.warning(f"[{run_id}] Cancelled {len(not_done)} AI generations after timeout")
+        self._ai_tasks.pop(run_id, None)
+        return self._ai_results.pop(run_id, [])
+
+    def cancel_ai_generation(self, run_id: str) -> None:
+        """Cancel a run's pending AI generations and drop collected results."""
+        for task in self._ai_tasks.pop(run_id, set()):
+            task.cancel()
+        self._ai_results.pop(run_id, None)
+
     def _convert_ai_to_test_cases(
         self,
         ai_test_cases: List[Dict[str, Any]],
@@ -217,30 +563,6 @@ class TestDataGenerator:
         
         return converted
     
-    async def _generate_ai_test_cases(
-        self,
-        page_info: Dict[str, Any],
-        run_id: str,
-        ai_mode: str,
-        rule_based_test_cases: List[TestCase]
-    ) -> List[TestCase]:
-        """Async helper to generate AI test cases."""
-        ai_test_cases = await self.ai_generator.generate_from_discovery(
-            discovery_data={},  # Can be enhanced to pass full discovery
-            page_info=page_info
-        )
-        
-        if ai_mode == "ai":
-            # AI-only mode: return only AI-generated test cases
-            logger.info(f"[{run_id}] AI mode: Using {len(ai_test_cases)} AI-generated test cases")
-            return self._convert_ai_to_test_cases(ai_test_cases, page_info, run_id)
-        else:
-            # Hybrid mode: merge rule-based and AI-generated
-            ai_test_cases_converted = self._convert_ai_to_test_cases(ai_test_cases, page_info, run_id)
-            merged = self._merge_test_cases(rule_based_test_cases, ai_test_cases_converted, run_id)
-            logger.info(f"[{run_id}] Hybrid mode: Merged {len(rule_based_test_cases)} rule-based + {len(ai_test_cases_converted)} AI = {len(merged)} total")
-            return merged
-    
     def _merge_test_cases(
         self,
         rule_based: List[TestCase],
@@ -269,133 +591,22 @@ class TestDataGenerator:
         
         return merged
 
-
-class EnhancedTestCaseGenerator:
-    """Generate comprehensive, executable test cases using validation schemas."""
-
-    def __init__(self, ai_generator=None):
-        """
-        Initialize test case generator.
-        
-        Args:
-            ai_generator: Optional AI test case generator for hybrid mode
-        """
-        self.schema_registry = ValidationSchemaRegistry()
-        self.selector_detector = SmartSelectorDetector()
-        self.data_generator = TestDataGenerator()
-        self.ai_generator = ai_generator
-        logger.info("EnhancedTestCaseGenerator initialized with validation schemas")
-
-    def generate_test_cases_for_page(
-        self,
-        page_info: Dict[str, Any],
-        run_id: str,
-        coverage_mode: str = "comprehensive",  # "comprehensive", "essential", "minimal"
-        ai_mode: str = "normal"  # "normal", "ai", "hybrid"
-    ) -> List[TestCase]:
-        """Generate comprehensive test cases with full coverage for a page.
-
-        Args:
-            page_info: Page information from discovery
-            run_id: Discovery run ID
-            coverage_mode: Coverage level - comprehensive (all), essential (critical+high), minimal (critical only)
-
-        Returns:
-            List of executable test cases
-        """
-        logger.info(f"[{run_id}] Generating test cases for page: {page_info.get('url', 'unknown')}")
-
-        test_cases = []
-        detected_features = self._detect_all_features(page_info)
-
-        logger.info(f"[{run_id}] Detected features: {list(detected_features.keys())}")
-
-        for feature_type, feature_info in detected_features.items():
-            # Get validation schema for this feature
-            schema = self.schema_registry.get_schema(feature_type)
-            if not schema:
-                logger.warning(f"No schema found for feature: {feature_type}")
-                continue
-
-            logger.info(f"[{run_id}] Generating tests for {feature_type} using {len(schema.validation_rules)} rules")
-
-            # Generate test case for each validation rule
-            for rule in schema.validation_rules:
-                # Skip based on coverage mode
-                if not self._should_generate_for_coverage_mode(rule, coverage_mode):
-                    logger.debug(f"Skipping rule {rule.id} due to coverage mode: {coverage_mode}")
-                    continue
-
-                test_case = self._generate_test_case_from_rule(
-                    rule=rule,
-                    feature_info=feature_info,
-                    page_info=page_info,
-                    schema=schema,
-                    run_id=run_id
-                )
-
-                if test_case:
-                    test_cases.append(test_case)
-                    logger.debug(f"Generated test case: {test_case.id}")
-
-        logger.info(
-            f"[{run_id}] Generated {len(test_cases)} test cases for page {page_info.get('url', '')}"
-        )
-
-        # AI enhancement in hybrid or AI-only mode
-        # Note: AI generation is async, but this method is sync for backward compatibility
-        # We handle async AI generation by running it in a new event loop if needed
-        if ai_mode in ["ai", "hybrid"] and self.ai_generator:
-            try:
-                import asyncio
-                import nest_asyncio
-                
-                # Try to use nest_asyncio to allow nested event loops
-                try:
-                    nest_asyncio.apply()
-                except (ImportError, AttributeError):
-                    # nest_asyncio not available, will handle differently
-                    pass
-                
-                # Try to get or create event loop
-                try:
-                    loop = asyncio.get_event_loop()
-                    if loop.is_running():
-                        # Running in async context - create task
-                        import concurrent.futures
-                        with concurrent.futures.ThreadPoolExecutor() as executor:
-                            future = executor.submit(
-                                lambda: asyncio.run(
-                                    self._generate_ai_test_cases(page_info, run_id, ai_mode, test_cases)
-                                )
-                            )
-                            ai_result = future.result(timeout=120)  # 2 minute timeout
-                            return ai_result
-                    else:
-                        # Loop exists but not running
-                        ai_result = loop.run_until_complete(
-                            self._generate_ai_test_cases(page_info, run_id, ai_mode, test_cases)
-                        )
-                        return ai_result
-                except RuntimeError:
-                    # No event loop, create new one
-                    ai_result = asyncio.run(
-                        self._generate_ai_test_cases(page_info, run_id, ai_mode, test_cases)
-                    )
-                    return ai_result
-            
-            except Exception as e:
-                logger.warning(f"[{run_id}] AI generation failed, falling back to rule-based: {e}")
-                # Fallback to rule-based on AI failure
-                if ai_mode == "ai":
-                    logger.error(f"[{run_id}] AI-only mode failed, returning empty list")
-                    return []
-                # In hybrid mode, continue with rule-based only
-
-        return test_cases
-
     def _detect_all_features(self, page_info: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
-        """Detect all features present on the page."""
+        """Detect all features present on the page (memoized by feature signature)."""
+        signature = self.feature_signature(page_info)
+        cached = self._feature_cache.get(signature)
+        if cached is not None:
+            self._feature_cache.move_to_end(signature)
+            return {feature: dict(info) for feature, info in cached.items()}
+
+        detected = self._scan_features(page_info)
+        self._feature_cache[signature] = detected
+        if len(self._feature_cache) > GENERATION_CACHE_SIZE:
+            self._feature_cache.popitem(last=False)
+        return {feature: dict(info) for feature, info in detected.items()}
+
+    def _scan_features(self, page_info: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+        """Run the feature detectors over a page."""
         detected = {}
 
         page_sig = page_info.get("page_signature", {})
@@ -0,0 +1,246 @@
+"""
+Event Bus - Ordered, buffered writer for a run's events.jsonl.
+
+Every producer of run events (discovery, health checks, validators, test
+generation and execution) publishes through the run's bus instead of opening
+the file itself. Publishing only appends to an in-memory buffer; a background
+task writes batches to disk when the batch size is reached or the flush
+interval passes. A single lock covers draining and writing, so events land in
+the file in exactly the order they were published. In-process consumers can
+subscribe to the same stream.
+"""
+
+import os
+import json
+import time
+import asyncio
+import logging
+import threading
+from collections import deque
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, Optional, TextIO
+
+from app.services.metrics import EVENTS_EMITTED, EVENT_WRITE_SECONDS, QUEUE_DEPTH
+
+logger = logging.getLogger(__name__)
+
+# Events buffered before the writer is woken up early
+EVENT_BUS_BATCH_SIZE = int(os.getenv("EVENT_BUS_BATCH_SIZE", "64"))
+# Upper bound on buffered events; beyond it the publisher writes the backlog itself
+EVENT_BUS_MAX_PENDING = int(os.getenv("EVENT_BUS_MAX_PENDING", "2048"))
+# Seconds an event may wait in the buffer before it is written
+EVENT_BUS_FLUSH_INTERVAL = float(os.getenv("EVENT_BUS_FLUSH_INTERVAL", "0.25"))
+
+EventSubscriber = Callable[[Dict[str, Any]], None]
+
+
+class EventBus:
+    """Buffered, ordered event stream of one run, persisted to ``events.jsonl``."""
+
+    def __init__(
+        self,
+        run_id: str,
+        events_path: Path,
+        batch_size: int = EVENT_BUS_BATCH_SIZE,
+        max_pending: int = EVENT_BUS_MAX_PENDING,
+        flush_interval: float = EVENT_BUS_FLUSH_INTERVAL
+    ):
+        """
+        Initialize event bus.
+
+        Args:
+            run_id: Run the events belong to
+            events_path: JSONL file the events are appended to
+            batch_size: Buffered events that trigger an early write
+            max_pending: Buffered events before publishers write synchronously
+            flush_interval: Maximum seconds an event stays buffered
+        """
+        self.run_id = run_id
+        self.events_path = Path(events_path)
+        self.batch_size = max(1, batch_size)
+        self.max_pending = max(self.batch_size, max_pending)
+        self.flush_interval = flush_interval
+        self.published = 0
+        self.written = 0
+        self._pending: Deque[str] = deque()
+        self._lock = threading.Lock()  # Serializes drain + write, which keeps file order
+        self._file: Optional[TextIO] = None
+        self._subscribers: Dict[int, EventSubscriber] = {}
+        self._next_subscriber_id = 0
+        self._wakeup: Optional[asyncio.Event] = None
+        self._writer_task: Optional[asyncio.Task] = None
+        self._stopping = False  # Writer shutting down: publishers write inline
+        self._closed = False
+
+    def emit(self, event_type: str, data: Dict[str, Any], source: str = "discovery") -> Dict[str, Any]:
+        """Build a timestamped event and publish it."""
+        event = {
+            "timestamp": datetime.utcnow().isoformat() + "Z",
+            "type": event_type,
+            "data": data
+        }
+        self.publish(event, source=source)
+        return event
+
+    def publish(self, event: Dict[str, Any], source: str = "discovery") -> None:
+        """
+        Queue an event for writing and deliver it to subscribers.
+
+        Never blocks on disk unless ``max_pending`` events are already
+        waiting, in which case the caller writes the backlog (backpressure).
+
+        Args:
+            event: Event dict (``timestamp``, ``type``, ``data``)
+            source: Metrics label of the producer
+        """
+        started = time.perf_counter()
+        if self._closed:
+            logger.warning(f"[{self.run_id}] Event {event.get('type')} published after the event bus was closed")
+            return
+
+        self._pending.append(json.dumps(event, default=str) + "\n")
+        self.published += 1
+        QUEUE_DEPTH.labels("events").inc()
+
+        for subscriber in list(self._subscribers.values()):
+            try:
+                subscriber(event)
+            except Exception as e:
+                logger.warning(f"[{self.run_id}] Event subscriber failed: {e}")
+
+        pending = len(self._pending)
+        if pending >= self.max_pending or not self._ensure_writer():
+            self._drain()
+        elif pending >= self.batch_size:
+            self._wakeup.set()
+
+        EVENTS_EMITTED.labels(source).inc()
+        EVENT_WRITE_SECONDS.labels(source).observe(time.perf_counter() - started)
+
+    def subscribe(self, callback: EventSubscriber) -> Callable[[], None]:
+        """
+        Receive every event published from now on, in publish order.
+
+        Callbacks run synchronously inside ``publish`` and must not block.
+
+        Returns:
+            Function that removes the subscription
+        """
+        subscriber_id = self._next_subscriber_id
+        self._next_subscriber_id += 1
+        self._subscribers[subscriber_id] = callback
+        return lambda: self._subscribers.pop(subscriber_id, None)
+
+    def _ensure_writer(self) -> bool:
+        """Start the background writer on the running loop; False outside of a loop."""
+        if self._stopping:
+            return False
+        if self._writer_task is not None and not self._writer_task.done():
+            return True
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            return False
+        self._wakeup = asyncio.Event()
+        self._writer_task = loop.create_task(self._run_writer())
+        return True
+
+    async def _run_writer(self):
+        """Write buffered events every ``flush_interval`` or as soon as a batch is full."""
+        while not self._stopping:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=self.flush_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            if self._pending:
+                await asyncio.to_thread(self._drain)
+
+    def _drain(self) -> None:
+        """Write all buffered events in order and flush the file."""
+        with self._lock:
+            if not self._pending:
+                return
+            lines = []
+            while self._pending:
+                lines.append(self._pending.popleft())
+            QUEUE_DEPTH.labels("events").dec(len(lines))
+            try:
+                if self._file is None:
+                    self.events_path.parent.mkdir(parents=True, exist_ok=True)
+                    self._file = open(self.events_path, "a", encoding="utf-8")
+                self._file.write("".join(lines))
+                self._file.flush()
+                self.written += len(lines)
+            except Exception as e:
+                logger.warning(f"[{self.run_id}] Failed to write {len(lines)} events: {e}")
+
+    async def flush(self) -> None:
+        """Write everything published so far."""
+        await asyncio.to_thread(self._drain)
+
+    async def close(self) -> None:
+        """Stop the writer, write the remaining events and close the file."""
+        self._stopping = True
+        if self._writer_task is not None:
+            self._wakeup.set()
+            try:
+                await self._writer_task
+            except Exception as e:
+                logger.warning(f"[{self.run_id}] Event writer failed: {e}")
+            self._writer_task = None
+        self._closed = True
+        self._drain()
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+        self._subscribers.clear()
+
+
+# Buses by events file: producers writing the same file share one bus
+_event_buses: Dict[str, EventBus] = {}
+
+
+def _bus_key(artifacts_path: Any) -> str:
+    return str((Path(artifacts_path) / "events.jsonl").resolve())
+
+
+def get_event_bus(run_id: str, artifacts_path: Any) -> EventBus:
+    """
+    Get (or create) the event bus writing ``<artifacts_path>/events.jsonl``.
+
+    Args:
+        run_id: Run the events belong to
+        artifacts_path: Run artifacts directory
+
+    Returns:
+        Shared EventBus for the run's events file
+    """
+    key = _bus_key(artifacts_path)
+    bus = _event_buses.get(key)
+    if bus is None:
+        bus = EventBus(run_id, Path(artifacts_path) / "events.jsonl")
+        _event_buses[key] = bus
+    return bus
+
+
+async def close_event_bus(run_id: str, artifacts_path: Any) -> None:
+    """Write out and close the event bus of a run's events file (no-op if none is open)."""
+    key = _bus_key(artifacts_path)
+    bus = _event_buses.get(key)
+    if bus is None:
+        return
+    await bus.close()
+    # Unregister only once drained, so later publishers cannot overtake queued events
+    if _event_buses.get(key) is bus:
+        del _event_buses[key]
+    logger.debug(f"[{run_id}] Event bus closed after {bus.written} events")
+
+
+__all__ = [
+    "EventBus",
+    "get_event_bus",
+    "close_event_bus",
+]
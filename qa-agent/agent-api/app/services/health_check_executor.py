@@ -9,19 +9,27 @@ Executes comprehensive health checks on discovered pages including:
 - Sort functionality testing
 
 Features:
-- Parallel execution with configurable concurrency
+- Parallel execution with adaptive (AIMD) concurrency and per-host caps
+- Browser page reuse across checks
+- Pages already validated during discovery are reported from their visit
+  (DOM snapshot + observations) without loading them again
 - Real-time event streaming to UI
 - Individual check timeout handling
 - Automatic screenshot capture on failures
 """
 
+import os
+import time
 import asyncio
-import json
 import logging
-from typing import List, Dict
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, Deque, List, Dict, Optional
 from datetime import datetime
 from pathlib import Path
+from urllib.parse import urlparse
 
+from app.services.event_bus import get_event_bus
 from app.models.health_check import (
     HealthCheckType, HealthCheckStatus, HealthCheckResult,
     PageHealthCheck, HealthCheckReport
@@ -29,52 +37,232 @@ from app.models.health_check import (
 
 logger = logging.getLogger(__name__)
 
+# Concurrency bounds (the executor adapts between min and max, starting at initial)
+HEALTH_CHECK_MIN_CONCURRENCY = int(os.getenv("HEALTH_CHECK_MIN_CONCURRENCY", "1"))
+HEALTH_CHECK_MAX_CONCURRENCY = int(os.getenv("HEALTH_CHECK_MAX_CONCURRENCY", "12"))
+HEALTH_CHECK_INITIAL_CONCURRENCY = int(os.getenv("HEALTH_CHECK_INITIAL_CONCURRENCY", "3"))
+HEALTH_CHECK_PER_HOST_LIMIT = int(os.getenv("HEALTH_CHECK_PER_HOST_LIMIT", "6"))
+# Page loads count as congestion when slower than LATENCY_TOLERANCE x the fastest load seen
+# (never below LATENCY_FLOOR_MS) or slower than TARGET_LATENCY_MS
+HEALTH_CHECK_TARGET_LATENCY_MS = float(os.getenv("HEALTH_CHECK_TARGET_LATENCY_MS", "5000"))
+HEALTH_CHECK_LATENCY_TOLERANCE = float(os.getenv("HEALTH_CHECK_LATENCY_TOLERANCE", "3.0"))
+HEALTH_CHECK_LATENCY_FLOOR_MS = float(os.getenv("HEALTH_CHECK_LATENCY_FLOOR_MS", "1000"))
+HEALTH_CHECK_MAX_ERROR_RATE = float(os.getenv("HEALTH_CHECK_MAX_ERROR_RATE", "0.2"))
+# Navigation waits for DOM content, then at most this long for the network to go idle
+HEALTH_CHECK_IDLE_TIMEOUT_MS = int(os.getenv("HEALTH_CHECK_IDLE_TIMEOUT_MS", "5000"))
+
+
+# Health check -> feature key in the discovery observation store
+OBSERVED_FEATURES = {
+    HealthCheckType.PAGINATION: "pagination",
+    HealthCheckType.SEARCH: "search",
+    HealthCheckType.FILTERS: "filters",
+    HealthCheckType.SORT: "sort",
+}
+OBSERVED_STATUS = {
+    "passed": HealthCheckStatus.PASSED,
+    "failed": HealthCheckStatus.FAILED,
+    "error": HealthCheckStatus.FAILED,
+    "skipped": HealthCheckStatus.SKIPPED,
+}
+# Health check -> (DOM snapshot count, skip reason when the count is zero)
+SNAPSHOT_CONTROLS = {
+    HealthCheckType.PAGINATION: ("pagination_controls", "No pagination controls found"),
+    HealthCheckType.SEARCH: ("search_inputs", "No search input found"),
+    HealthCheckType.FILTERS: ("filter_controls", "No filter controls found"),
+    HealthCheckType.SORT: ("sortable_headers", "No sortable columns found"),
+}
+
+
+class AdaptiveConcurrencyController:
+    """
+    AIMD concurrency limit driven by page-load latency and error rate.
+
+    Every healthy page load raises the limit by ``1/limit`` (about +1 per
+    round of concurrent loads). A load that fails, returns a 429/5xx, or is
+    slower than ``latency_tolerance`` x the fastest load seen (at least
+    ``latency_floor_ms``, at most ``target_latency_ms``) halves it, at most once per round, and so does an error rate above
+    ``max_error_rate`` over the recent window. Each host additionally has a
+    fixed in-flight cap.
+    """
+
+    def __init__(
+        self,
+        initial: int = HEALTH_CHECK_INITIAL_CONCURRENCY,
+        min_limit: int = HEALTH_CHECK_MIN_CONCURRENCY,
+        max_limit: int = HEALTH_CHECK_MAX_CONCURRENCY,
+        per_host_limit: int = HEALTH_CHECK_PER_HOST_LIMIT,
+        target_latency_ms: float = HEALTH_CHECK_TARGET_LATENCY_MS,
+        latency_tolerance: float = HEALTH_CHECK_LATENCY_TOLERANCE,
+        latency_floor_ms: float = HEALTH_CHECK_LATENCY_FLOOR_MS,
+        max_error_rate: float = HEALTH_CHECK_MAX_ERROR_RATE,
+        window: int = 20
+    ):
+        self.min_limit = max(1, min_limit)
+        self.max_limit = max(self.min_limit, max_limit)
+        self.limit = float(min(max(initial, self.min_limit), self.max_limit))
+        self.per_host_limit = max(1, per_host_limit)
+        self.target_latency_ms = target_latency_ms
+        self.latency_tolerance = latency_tolerance
+        self.latency_floor_ms = latency_floor_ms
+        self.max_error_rate = max_error_rate
+        self.in_flight = 0
+        self.host_in_flight: Dict[str, int] = {}
+        self.min_latency_ms: Optional[float] = None
+        self.outcomes: Deque[bool] = deque(maxlen=window)  # True = error
+        self.completed = 0
+        self.decreases = 0
+        self.peak_limit = int(self.limit)
+        # Completion count at the last decrease; starts a full round back so the first congestion signal backs off
+        self._last_decrease_at = -self.max_limit
+        self._condition = asyncio.Condition()
+
+    @asynccontextmanager
+    async def slot(self, host: str = ""):
+        """Hold one concurrency slot for ``host``, waiting while at the global or per-host limit."""
+        async with self._condition:
+            await self._condition.wait_for(
+                lambda: self.in_flight < int(self.limit)
+                and self.host_in_flight.get(host, 0) < self.per_host_limit
+            )
+            self.in_flight += 1
+            self.host_in_flight[host] = self.host_in_flight.get(host, 0) + 1
+        try:
+            yield
+        finally:
+            async with self._condition:
+                self.in_flight -= 1
+                self.host_in_flight[host] -= 1
+                if not self.host_in_flight[host]:
+                    del self.host_in_flight[host]
+                self._condition.notify_all()
+
+    def record(self, latency_ms: float, error: bool = False) -> None:
+        """Feed one page-load observation into the limit."""
+        self.completed += 1
+        self.outcomes.append(error)
+        if not error:
+            self.min_latency_ms = latency_ms if self.min_latency_ms is None else min(self.min_latency_ms, latency_ms)
+
+        slow_threshold = self.target_latency_ms
+        if self.min_latency_ms is not None:
+            slow_threshold = min(
+                slow_threshold,
+                max(self.latency_floor_ms, self.min_latency_ms * self.latency_tolerance)
+            )
+        error_rate = sum(self.outcomes) / len(self.outcomes)
+
+        if error or latency_ms > slow_threshold or error_rate > self.max_error_rate:
+            # One decrease per round of in-flight loads, so a burst of slow responses halves once
+            if self.completed - self._last_decrease_at >= max(1, int(self.limit)):
+                self.limit = max(float(self.min_limit), self.limit / 2)
+                self._last_decrease_at = self.completed
+                self.decreases += 1
+                logger.info(
+                    f"Health check concurrency decreased to {int(self.limit)} "
+                    f"(latency {latency_ms:.0f}ms, error rate {error_rate:.0%})"
+                )
+        else:
+            self.limit = min(float(self.max_limit), self.limit + 1.0 / self.limit)
+            self.peak_limit = max(self.peak_limit, int(self.limit))
+        self._wake()
+
+    def _wake(self) -> None:
+        async def _notify():
+            async with self._condition:
+                self._condition.notify_all()
+        try:
+            asyncio.get_running_loop().create_task(_notify())
+        except RuntimeError:
+            pass  # No loop (e.g. called from sync code); nobody can be waiting
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "concurrency_limit": int(self.limit),
+            "peak_concurrency": self.peak_limit,
+            "decreases": self.decreases,
+            "min_latency_ms": round(self.min_latency_ms, 1) if self.min_latency_ms is not None else None,
+            "error_rate": round(sum(self.outcomes) / len(self.outcomes), 3) if self.outcomes else 0.0,
+        }
+
 
 class HealthCheckExecutor:
     """Execute health checks in parallel with real-time event streaming."""
 
-    def __init__(self, max_concurrent: int = 3):
+    def __init__(
+        self,
+        max_concurrent: int = HEALTH_CHECK_MAX_CONCURRENCY,
+        min_concurrent: int = HEALTH_CHECK_MIN_CONCURRENCY,
+        initial_concurrent: int = HEALTH_CHECK_INITIAL_CONCURRENCY,
+        per_host_limit: int = HEALTH_CHECK_PER_HOST_LIMIT
+    ):
         """
         Initialize health check executor.
 
         Args:
-            max_concurrent: Maximum number of pages to validate concurrently (default: 3)
+            max_concurrent: Upper bound for the adaptive number of pages validated concurrently
+            min_concurrent: Lower bound for the adaptive concurrency
+            initial_concurrent: Concurrency to start with before any page load was observed
+            per_host_limit: Maximum concurrent page loads against a single host
         """
         self.max_concurrent = max_concurrent
+        self.min_concurrent = min_concurrent
+        self.initial_concurrent = initial_concurrent
+        self.per_host_limit = per_host_limit
+        self.controller: Optional[AdaptiveConcurrencyController] = None
+        self._idle_pages: List[Any] = []
+        self._artifacts_paths: Dict[str, Path] = {}  # run_id -> run artifacts directory
 
     async def execute_health_checks(
         self,
         run_id: str,
         pages: List[Dict],
         browser_context,
-        debug: bool = False
+        debug: bool = False,
+        artifacts_path: Optional[str] = None
     ) -> HealthCheckReport:
         """
         Execute health checks on all pages with parallel execution.
 
+        Events go to the run's event bus, which stays open: the caller that
+        owns the run (discovery) closes it.
+
         Args:
             run_id: Run identifier
             pages: List of discovered pages with metadata
             browser_context: Playwright browser context
             debug: Enable debug logging
+            artifacts_path: Run artifacts directory (defaults to data/<run_id>)
 
         Returns:
             Complete health check report
         """
+        self._artifacts_paths[run_id] = Path(artifacts_path) if artifacts_path else Path("data") / run_id
+
         report = HealthCheckReport(
             run_id=run_id,
             started_at=datetime.utcnow().isoformat(),
             total_pages=len(pages)
         )
 
+        # Fresh controller per run: limits adapt to the environment being checked
+        self.controller = AdaptiveConcurrencyController(
+            initial=self.initial_concurrent,
+            min_limit=self.min_concurrent,
+            max_limit=self.max_concurrent,
+            per_host_limit=self.per_host_limit
+        )
+
         # Emit start event
         await self._emit_event(run_id, "health_check_started", {
             "total_pages": len(pages),
-            "concurrent_limit": self.max_concurrent
+            "concurrent_limit": int(self.controller.limit),
+            "max_concurrent": self.max_concurrent
         })
 
-        # Create health check tasks for all pages
+        # Create health check tasks for pages not already validated during discovery
         tasks = []
+        task_pages = []
         for page_info in pages:
             page_checks = self._determine_checks_for_page(page_info)
 
@@ -88,23 +276,35 @@ class HealthCheckExecutor:
             report.pages.append(page_health)
             report.total_checks += len(page_checks)
 
+            # Reuse what the single-visit validation pipeline observed instead of re-navigating
+            if await self._report_from_visit(run_id, page_health, page_info):
+                report.pages_from_discovery += 1
+                continue
+
             # Create task for this page
             task = self._validate_page_health(
                 run_id, page_health, browser_context, debug
             )
             tasks.append(task)
+            task_pages.append(page_health)
 
-        # Execute with concurrency limit
-        semaphore = asyncio.Semaphore(self.max_concurrent)
-
-        async def bounded_task(task):
-            async with semaphore:
+        async def bounded_task(task, url):
+            async with self.controller.slot(urlparse(url).netloc):
                 return await task
 
-        # Run all tasks in parallel (bounded by semaphore)
-        await asyncio.gather(
-            *[bounded_task(task) for task in tasks],
-            return_exceptions=True
+        # Run all tasks in parallel (bounded by the adaptive limit)
+        try:
+            await asyncio.gather(
+                *[bounded_task(task, page_health.page_url) for task, page_health in zip(tasks, task_pages)],
+                return_exceptions=True
+            )
+        finally:
+            await self._close_idle_pages()
+
+        report.concurrency = self.controller.stats()
+        logger.info(
+            f"[{run_id}] Health checks: {report.pages_from_discovery} pages from discovery observations, "
+            f"{len(tasks)} navigated | concurrency: {report.concurrency}"
         )
 
         # Update report with results
@@ -125,11 +325,104 @@ class HealthCheckExecutor:
             "total_checks": report.total_checks,
             "passed": report.checks_passed,
             "failed": report.checks_failed,
-            "skipped": report.checks_skipped
+            "skipped": report.checks_skipped,
+            "concurrency": report.concurrency
         })
+        self._artifacts_paths.pop(run_id, None)
 
         return report
 
+    async def _report_from_visit(self, run_id: str, page_health: PageHealthCheck, page_info: Dict) -> bool:
+        """
+        Resolve a page's checks from its discovery visit (DOM snapshot + observations).
+
+        Returns False, leaving the checks untouched, unless every check can be
+        answered without loading the page again.
+        """
+        snapshot = page_info.get("dom_snapshot")
+        if not snapshot:
+            return False
+        observations = page_info.get("observations", {})
+
+        resolved = []
+        for check in page_health.checks:
+            outcome = self._resolve_check(check.check_type, snapshot, observations)
+            if outcome is None:
+                return False
+            resolved.append(outcome)
+
+        await self._emit_event(run_id, "page_validation_started", {
+            "url": page_health.page_url,
+            "title": page_health.page_title,
+            "checks_count": len(page_health.checks),
+            "source": "discovery"
+        })
+        now = datetime.utcnow().isoformat()
+        for check, (status, details, error) in zip(page_health.checks, resolved):
+            check.status = status
+            check.details.update(details)
+            check.error = error
+            check.started_at = check.completed_at = now
+            check.duration_ms = 0
+
+        if all(c.status == HealthCheckStatus.PASSED for c in page_health.checks):
+            page_health.overall_status = HealthCheckStatus.PASSED
+        elif any(c.status == HealthCheckStatus.FAILED for c in page_health.checks):
+            page_health.overall_status = HealthCheckStatus.FAILED
+        else:
+            page_health.overall_status = HealthCheckStatus.SKIPPED
+
+        await self._emit_event(run_id, "page_validation_completed", {
+            "url": page_health.page_url,
+            "status": page_health.overall_status.value,
+            "source": "discovery",
+            "checks": [
+                {
+                    "type": c.check_type.value,
+                    "status": c.status.value
+                } for c in page_health.checks
+            ]
+        })
+        return True
+
+    def _resolve_check(
+        self,
+        check_type: HealthCheckType,
+        snapshot: Dict[str, Any],
+        observations: Dict[str, Dict[str, Any]]
+    ) -> Optional[tuple]:
+        """(status, details, error) for a check from visit data, or None if it needs the page."""
+        if check_type == HealthCheckType.TABLE_LISTING:
+            tables = snapshot.get("tables", 0)
+            if not tables:
+                return HealthCheckStatus.SKIPPED, {"reason": "No tables found on page"}, None
+            rows = snapshot.get("rows", 0)
+            details = {
+                "tables_found": tables,
+                "rows_visible": rows,
+                "columns": snapshot.get("headers", 0),
+                "has_data": rows > 0,
+            }
+            if not rows:
+                details["warning"] = "Table exists but no rows visible"
+            return HealthCheckStatus.PASSED, details, None
+
+        feature = OBSERVED_FEATURES.get(check_type)
+        observation = observations.get(feature) if feature else None
+        if observation and observation.get("status") in OBSERVED_STATUS:
+            status = OBSERVED_STATUS[observation["status"]]
+            details = {"source": observation.get("source")}
+            if observation.get("reason"):
+                details["reason"] = observation["reason"]
+            error = observation.get("reason") if status == HealthCheckStatus.FAILED else None
+            return status, details, error
+
+        # Nothing exercised it: only answerable if the control is absent from the page
+        control = SNAPSHOT_CONTROLS.get(check_type)
+        if control and snapshot.get(control[0], 0) == 0:
+            return HealthCheckStatus.SKIPPED, {"reason": control[1]}, None
+        return None
+
     def _determine_checks_for_page(self, page_info: Dict) -> List[HealthCheckResult]:
         """Determine which health checks to run based on page characteristics."""
         checks = []
@@ -194,12 +487,28 @@ class HealthCheckExecutor:
             "checks_count": len(page_health.checks)
         })
 
-        # Create new page for this validation
-        page = await browser_context.new_page()
+        # Reuse an idle page from earlier checks when possible
+        page = await self._acquire_page(browser_context)
+        reusable = False
 
         try:
-            # Navigate to page
-            await page.goto(page_health.page_url, timeout=30000, wait_until="networkidle")
+            # Navigate to page; the time to DOM content is what drives the adaptive concurrency
+            load_started = time.perf_counter()
+            try:
+                response = await page.goto(page_health.page_url, timeout=30000, wait_until="domcontentloaded")
+            except Exception:
+                self.controller.record((time.perf_counter() - load_started) * 1000, error=True)
+                raise
+            status = response.status if response is not None else 200
+            self.controller.record(
+                (time.perf_counter() - load_started) * 1000,
+                error=status == 429 or status >= 500
+            )
+            # Not part of the latency sample: long-polling/websocket pages never go idle
+            try:
+                await page.wait_for_load_state("networkidle", timeout=HEALTH_CHECK_IDLE_TIMEOUT_MS)
+            except Exception:
+                pass  # DOM content is enough to check
 
             # Execute each health check
             for check in page_health.checks:
@@ -212,18 +521,20 @@ class HealthCheckExecutor:
                 page_health.overall_status = HealthCheckStatus.FAILED
             else:
                 page_health.overall_status = HealthCheckStatus.SKIPPED
+            reusable = True
 
         except Exception as e:
             logger.error(f"[{run_id}] Page validation failed: {e}")
             page_health.overall_status = HealthCheckStatus.FAILED
 
         finally:
-            await page.close()
+            await self._release_page(page, reusable)
 
             # Emit page validation complete
             await self._emit_event(run_id, "page_validation_completed", {
                 "url": page_health.page_url,
                 "status": page_health.overall_status.value,
+                "concurrency_limit": int(self.controller.limit),
                 "checks": [
                     {
                         "type": c.check_type.value,
@@ -232,6 +543,33 @@ class HealthCheckExecutor:
                 ]
             })
 
+    async def _acquire_page(self, browser_context):
+        """Take an idle page from the pool or open a new one."""
+        while self._idle_pages:
+            page = self._idle_pages.pop()
+            if not page.is_closed():
+                return page
+        return await browser_context.new_page()
+
+    async def _release_page(self, page, reusable: bool) -> None:
+        """Return a page to the pool, or close it if it may be in a broken state."""
+        if reusable and not page.is_closed() and len(self._idle_pages) < self.max_concurrent:
+            self._idle_pages.append(page)
+            return
+        try:
+            await page.close()
+        except Exception as e:
+            logger.debug(f"Failed to close health check page: {e}")
+
+    async def _close_idle_pages(self) -> None:
+        """Close every pooled page."""
+        pages, self._idle_pages = self._idle_pages, []
+        for page in pages:
+            try:
+                await page.close()
+            except Exception as e:
+                logger.debug(f"Failed to close health check page: {e}")
+
     async def _execute_single_check(
         self,
         run_id: str,
@@ -271,7 +609,7 @@ class HealthCheckExecutor:
 
             # Capture screenshot on failure
             try:
-                screenshot_dir = Path(f"data/{run_id}/health_checks")
+                screenshot_dir = self._artifacts_path(run_id) / "health_checks"
                 screenshot_dir.mkdir(parents=True, exist_ok=True)
                 screenshot_path = screenshot_dir / f"fail_{check.check_type.value}_{int(datetime.utcnow().timestamp())}.png"
                 await page.screenshot(path=str(screenshot_path))
@@ -433,17 +771,9 @@ class HealthCheckExecutor:
             check.status = HealthCheckStatus.SKIPPED
             check.details["reason"] = "No sortable columns found"
 
-    async def _emit_event(self, run_id: str, event_type: str, data: Dict):
-        """Emit event to events.jsonl for real-time UI updates."""
-        event = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "type": event_type,
-            "data": data
-        }
-
-        # Write to events.jsonl
-        events_path = Path(f"data/{run_id}/events.jsonl")
-        events_path.parent.mkdir(parents=True, exist_ok=True)
+    def _artifacts_path(self, run_id: str) -> Path:
+        return self._artifacts_paths.get(run_id) or Path("data") / run_id
 
-        with open(events_path, "a") as f:
-            f.write(json.dumps(event) + "\n")
+    async def _emit_event(self, run_id: str, event_type: str, data: Dict):
+        """Emit event to the run's events.jsonl for real-time UI updates."""
+        get_event_bus(run_id, self._artifacts_path(run_id)).emit(event_type, data, source="health_check")
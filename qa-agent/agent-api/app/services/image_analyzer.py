@@ -1,20 +1,268 @@
 """Image analysis service for extracting UI elements and patterns from uploaded images."""
 
+import os
+import math
+import asyncio
+import multiprocessing
+import hashlib
 import logging
-import json
+import threading
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
 from pathlib import Path
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 
+from app.services.artifact_io import write_artifact
+
 logger = logging.getLogger(__name__)
 
+# NumPy is optional; without it color/layout analysis falls back to PIL heuristics
+try:
+    import numpy as np
+    NUMPY_AVAILABLE = True
+except ImportError:
+    np = None
+    NUMPY_AVAILABLE = False
+
+# Longest side of the downsampled buffer used for color/layout analysis
+ANALYSIS_MAX_SIDE = 512
+
+# Worker processes for OCR and pixel work, and how many scans to keep cached
+IMAGE_ANALYSIS_WORKERS = int(os.getenv("IMAGE_ANALYSIS_WORKERS", str(min(4, os.cpu_count() or 1))))
+IMAGE_SCAN_CACHE_SIZE = int(os.getenv("IMAGE_SCAN_CACHE_SIZE", "64"))
+
+
+def _file_sha256(image_path: str) -> str:
+    digest = hashlib.sha256()
+    with open(image_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+def _downsample(rgb) -> "np.ndarray":
+    """Downsample a decoded RGB image to at most ANALYSIS_MAX_SIDE pixels per side."""
+    factor = math.ceil(max(rgb.width, rgb.height) / ANALYSIS_MAX_SIDE)
+    small = rgb.reduce(factor) if factor > 1 else rgb
+    return np.asarray(small, dtype=np.uint8)
+
+
+def palette_from_pixels(pixels: "np.ndarray", count: int = 5) -> List[str]:
+    """
+    Dominant colors by histogram quantization.
+
+    Pixels are binned into a 4-bit-per-channel histogram (4096 bins); the
+    most populated bins are returned as the mean color of their pixels,
+    most frequent first.
+    """
+    flat = pixels.reshape(-1, 3).astype(np.int32)
+    codes = ((flat[:, 0] >> 4) << 8) | ((flat[:, 1] >> 4) << 4) | (flat[:, 2] >> 4)
+    counts = np.bincount(codes, minlength=4096)
+    top = np.argsort(counts)[::-1][:count]
+    top = top[counts[top] > 0]
+    sums = np.stack([np.bincount(codes, weights=flat[:, c], minlength=4096)[top] for c in range(3)], axis=1)
+    means = np.rint(sums / counts[top, None]).astype(int)
+    return [f"#{r:02x}{g:02x}{b:02x}" for r, g, b in means]
+
+
+def segment_layout(pixels: "np.ndarray", width: int, height: int) -> Dict[str, Any]:
+    """
+    Detect header, footer and sidebar with projection profiles.
+
+    Row and column luminance means are computed over the downsampled buffer;
+    the strongest jump in the top/bottom quarter marks the header/footer edge
+    and the strongest jump in the left third marks a sidebar edge. Coordinates
+    are scaled back to the original image size.
+    """
+    rows, cols = pixels.shape[:2]
+    gray = pixels.astype(np.float32) @ np.array([0.299, 0.587, 0.114], dtype=np.float32)
+    row_jumps = np.abs(np.diff(gray.mean(axis=1)))
+    col_jumps = np.abs(np.diff(gray.mean(axis=0)))
+    threshold = max(6.0, float(gray.std()) * 0.2)
+    y_scale = height / rows
+    x_scale = width / cols
+
+    def _edge(jumps: "np.ndarray", start: int, end: int) -> Optional[int]:
+        window = jumps[start:end]
+        if window.size == 0:
+            return None
+        idx = int(np.argmax(window))
+        return start + idx + 1 if window[idx] >= threshold else None
+
+    header_end = _edge(row_jumps, 1, int(rows * 0.25))
+    footer_start = _edge(row_jumps, int(rows * 0.75), rows - 2)
+    sidebar_end = _edge(col_jumps, int(cols * 0.05), int(cols * 0.35))
+
+    content_top = int((header_end or 0) * y_scale)
+    content_bottom = int(footer_start * y_scale) if footer_start else height
+    regions = []
+    if header_end:
+        regions.append({"name": "header", "y_start": 0, "y_end": content_top})
+    if sidebar_end:
+        regions.append({
+            "name": "sidebar",
+            "x_start": 0,
+            "x_end": int(sidebar_end * x_scale),
+            "y_start": content_top,
+            "y_end": content_bottom
+        })
+    regions.append({
+        "name": "content",
+        "x_start": int(sidebar_end * x_scale) if sidebar_end else 0,
+        "x_end": width,
+        "y_start": content_top,
+        "y_end": content_bottom
+    })
+    if footer_start:
+        regions.append({"name": "footer", "y_start": content_bottom, "y_end": height})
+
+    return {
+        "type": "sidebar_layout" if sidebar_end else "single_column",
+        "regions": regions,
+        "has_sidebar": sidebar_end is not None,
+        "has_header": header_end is not None,
+        "has_footer": footer_start is not None,
+        "method": "projection_profile"
+    }
+
+
+def scan_image(image_path: str) -> Dict[str, Any]:
+    """
+    Read an image once and collect everything the analyzers need.
+
+    Runs in a worker process: opens the image a single time, performs one OCR
+    pass (``image_to_data``) and derives both word boxes and text lines from
+    it, then computes the palette and layout regions from the same buffer.
+
+    Returns:
+        Dict with ``metadata``, ``words``, ``lines``, ``colors``, ``layout``
+        (when NumPy is available) and ``ocr_available``
+    """
+    scan: Dict[str, Any] = {"metadata": {}, "words": [], "lines": [], "colors": [], "ocr_available": False}
+
+    try:
+        from PIL import Image
+    except ImportError:
+        scan["error"] = "pil_missing"
+        return scan
+
+    try:
+        with Image.open(image_path) as img:
+            scan["metadata"] = {
+                "width": img.width,
+                "height": img.height,
+                "format": img.format,
+                "mode": img.mode,
+            }
+            rgb = img.convert("RGB")
+    except Exception as e:
+        scan["error"] = str(e)
+        return scan
+
+    try:
+        import pytesseract
+        data = pytesseract.image_to_data(rgb, output_type=pytesseract.Output.DICT)
+        scan["ocr_available"] = True
+    except ImportError:
+        data = None
+    except Exception as e:
+        logger.debug(f"OCR failed for {image_path}: {e}")
+        data = None
+
+    if data:
+        confidences = data.get("conf") if isinstance(data.get("conf"), list) else None
+        lines: "OrderedDict[tuple, List[str]]" = OrderedDict()
+        for i, text in enumerate(data["text"]):
+            if not text or not text.strip():
+                continue
+            scan["words"].append({
+                "text": text.strip(),
+                "x": data["left"][i],
+                "y": data["top"][i],
+                "width": data["width"][i],
+                "height": data["height"][i],
+                "confidence": confidences[i] if confidences else 0,
+            })
+            line_key = (data.get("block_num", [0])[i], data.get("par_num", [0])[i], data.get("line_num", [0])[i])
+            lines.setdefault(line_key, []).append(text.strip())
+        scan["lines"] = [" ".join(words) for words in lines.values()]
+
+    # Colors and layout from the same decoded buffer
+    if NUMPY_AVAILABLE:
+        pixels = _downsample(rgb)
+        scan["colors"] = palette_from_pixels(pixels)
+        scan["layout"] = segment_layout(pixels, rgb.width, rgb.height)
+    else:
+        thumbnail = rgb.copy()
+        thumbnail.thumbnail((200, 200))
+        colors = thumbnail.getcolors(maxcolors=256 * 256 * 256) or []
+        colors.sort(key=lambda x: x[0], reverse=True)
+        scan["colors"] = [f"#{r:02x}{g:02x}{b:02x}" for _, (r, g, b) in colors[:5]]
+    return scan
+
 
 class ImageAnalyzer:
     """Service for analyzing uploaded images to extract UI information."""
     
-    def __init__(self):
-        """Initialize image analyzer."""
-        pass
+    def __init__(self, max_workers: int = IMAGE_ANALYSIS_WORKERS, cache_size: int = IMAGE_SCAN_CACHE_SIZE):
+        """
+        Initialize image analyzer.
+
+        Args:
+            max_workers: Worker processes used for OCR and pixel analysis
+            cache_size: Number of image scans cached by content hash
+        """
+        self.max_workers = max(1, max_workers)
+        self.cache_size = cache_size
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._scan_cache: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                # Spawned, not forked: forking the threaded server process can copy a held lock into the child
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn")
+                )
+            return self._executor
+
+    async def _scan(self, image_path: Path, run_id: str) -> Dict[str, Any]:
+        """Scan an image off the event loop, reusing cached scans of identical content."""
+        content_hash = await asyncio.to_thread(_file_sha256, str(image_path))
+        with self._lock:
+            cached = self._scan_cache.get(content_hash)
+            if cached is not None:
+                self._scan_cache.move_to_end(content_hash)
+                logger.info(f"[{run_id}] Reusing cached scan for {image_path.name}")
+                return cached
+
+        loop = asyncio.get_running_loop()
+        try:
+            scan = await loop.run_in_executor(self._get_executor(), scan_image, str(image_path))
+        except (BrokenProcessPool, OSError, RuntimeError) as e:
+            # Process pool unavailable (e.g. restricted sandbox): fall back to a thread
+            logger.warning(f"[{run_id}] Image worker pool unavailable ({e}), scanning in a thread")
+            with self._lock:
+                self._executor = None
+            scan = await asyncio.to_thread(scan_image, str(image_path))
+
+        scan["content_hash"] = content_hash
+        with self._lock:
+            self._scan_cache[content_hash] = scan
+            while len(self._scan_cache) > self.cache_size:
+                self._scan_cache.popitem(last=False)
+        return scan
+
+    def shutdown(self) -> None:
+        """Stop the worker processes."""
+        with self._lock:
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+                self._executor = None
     
     async def analyze_image(
         self,
@@ -45,33 +293,26 @@ class ImageAnalyzer:
                 "run_id": run_id
             }
             
-            # Try to extract image dimensions using PIL if available
-            try:
-                from PIL import Image
-                with Image.open(image_path) as img:
-                    image_info["width"] = img.width
-                    image_info["height"] = img.height
-                    image_info["format"] = img.format
-                    image_info["mode"] = img.mode
-            except ImportError:
+            # One scan (single OCR pass) shared by every extractor below
+            scan = await self._scan(image_path, run_id)
+            image_info.update(scan.get("metadata", {}))
+            if scan.get("error") == "pil_missing":
                 logger.warning(f"[{run_id}] PIL/Pillow not installed, skipping image dimensions")
-            except Exception as e:
-                logger.debug(f"[{run_id}] Could not read image dimensions: {e}")
             
             # Extract UI elements and patterns
-            ui_elements = await self._extract_ui_elements(image_path, run_id)
-            text_content = await self._extract_text_content(image_path, run_id)
-            color_scheme = await self._extract_color_scheme(image_path, run_id)
-            layout_structure = await self._extract_layout_structure(image_path, run_id)
-            components_detected = await self._detect_components(image_path, run_id)
-            workflow_hints = await self._identify_workflow_hints(image_path, run_id)
-            accessibility_notes = await self._check_accessibility(image_path, run_id)
+            ui_elements = self._extract_ui_elements(scan, run_id)
+            text_content = self._extract_text_content(scan, run_id)
+            color_scheme = self._extract_color_scheme(scan, run_id)
+            layout_structure = self._extract_layout_structure(scan, run_id)
+            components_detected = self._detect_components(text_content, run_id)
+            workflow_hints = self._identify_workflow_hints(text_content, run_id)
+            accessibility_notes = self._check_accessibility(color_scheme, text_content, run_id)
 
             # NEW: Specialized component detection for intelligent testing
-            search_components = await self._detect_search_components(image_path, run_id)
-            filter_components = await self._detect_filter_components(image_path, run_id)
-            pagination_components = await self._detect_pagination_components(image_path, run_id)
-            data_tables = await self._detect_data_tables(image_path, run_id)
+            search_components = self._detect_search_components(text_content, run_id)
+            filter_components = self._detect_filter_components(text_content, run_id)
+            pagination_components = self._detect_pagination_components(text_content, run_id)
+            data_tables = self._detect_data_tables(text_content, run_id)
 
             # NEW: Generate GET operation test hints
             get_operation_hints = self._generate_get_operation_hints(
@@ -101,8 +342,7 @@ class ImageAnalyzer:
             # Save analysis results
             analysis_file = Path(artifacts_path) / "uploads" / "images" / f"{image_path.stem}_analysis.json"
             analysis_file.parent.mkdir(parents=True, exist_ok=True)
-            with open(analysis_file, "w") as f:
-                json.dump(analysis_result, f, indent=2, default=str)
+            write_artifact(analysis_file, analysis_result)
             
             logger.info(f"[{run_id}] Image analysis completed: {image_path.name}")
             return analysis_result
@@ -120,42 +360,31 @@ class ImageAnalyzer:
                 "accessibility_notes": []
             }
     
-    async def _extract_ui_elements(
+    def _extract_ui_elements(
         self,
-        image_path: Path,
+        scan: Dict[str, Any],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Extract UI elements from image (buttons, inputs, cards, etc.)."""
         elements = []
         
         try:
-            # Try using OCR to detect text-based elements
-            try:
-                import pytesseract
-                from PIL import Image
+            # Text-based elements from the OCR word boxes
+            for word in scan.get("words", []):
+                x, y, w, h = word["x"], word["y"], word["width"], word["height"]
                 
-                with Image.open(image_path) as img:
-                    # Get text with bounding boxes
-                    data = pytesseract.image_to_data(img, output_type=pytesseract.Output.DICT)
-                    
-                    current_element = None
-                    for i, text in enumerate(data['text']):
-                        if text.strip():
-                            x, y, w, h = data['left'][i], data['top'][i], data['width'][i], data['height'][i]
-                            
-                            # Detect element type based on text patterns
-                            element_type = self._classify_element_type(text, w, h)
-                            
-                            elements.append({
-                                "type": element_type,
-                                "text": text.strip(),
-                                "position": {"x": x, "y": y, "width": w, "height": h},
-                                "confidence": data.get('conf', [0])[i] if isinstance(data.get('conf'), list) else 0
-                            })
-            except ImportError:
+                # Detect element type based on text patterns
+                element_type = self._classify_element_type(word["text"], w, h)
+                
+                elements.append({
+                    "type": element_type,
+                    "text": word["text"],
+                    "position": {"x": x, "y": y, "width": w, "height": h},
+                    "confidence": word.get("confidence", 0)
+                })
+            
+            if not scan.get("ocr_available"):
                 logger.debug(f"[{run_id}] pytesseract not available, using basic analysis")
-            except Exception as e:
-                logger.debug(f"[{run_id}] OCR extraction failed: {e}")
             
             # If no elements found, add placeholder
             if not elements:
@@ -197,39 +426,28 @@ class ImageAnalyzer:
         
         return "text"
     
-    async def _extract_text_content(
+    def _extract_text_content(
         self,
-        image_path: Path,
+        scan: Dict[str, Any],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Extract all text content from image."""
         text_items = []
         
-        try:
-            import pytesseract
-            from PIL import Image
-            
-            with Image.open(image_path) as img:
-                # Simple text extraction
-                text = pytesseract.image_to_string(img)
-                
-                if text.strip():
-                    lines = [line.strip() for line in text.split('\n') if line.strip()]
-                    for line in lines:
-                        text_items.append({
-                            "text": line,
-                            "type": "paragraph" if len(line) > 50 else "label"
-                        })
-        except ImportError:
+        for line in scan.get("lines", []):
+            text_items.append({
+                "text": line,
+                "type": "paragraph" if len(line) > 50 else "label"
+            })
+        
+        if not scan.get("ocr_available"):
             logger.debug(f"[{run_id}] pytesseract not available for text extraction")
-        except Exception as e:
-            logger.debug(f"[{run_id}] Text extraction error: {e}")
         
         return text_items
     
-    async def _extract_color_scheme(
+    def _extract_color_scheme(
         self,
-        image_path: Path,
+        scan: Dict[str, Any],
         run_id: str
     ) -> Dict[str, Any]:
         """Extract dominant colors from image."""
@@ -240,40 +458,20 @@ class ImageAnalyzer:
             "text": None
         }
         
-        try:
-            from PIL import Image
-            import colorsys
-            
-            with Image.open(image_path) as img:
-                # Resize for faster processing
-                img.thumbnail((200, 200))
-                
-                # Get dominant colors
-                colors = img.getcolors(maxcolors=256*256*256)
-                if colors:
-                    # Sort by frequency and get top colors
-                    colors.sort(key=lambda x: x[0], reverse=True)
-                    top_colors = colors[:5]
-                    
-                    # Convert to hex
-                    hex_colors = []
-                    for count, (r, g, b) in top_colors[:5]:
-                        hex_colors.append(f"#{r:02x}{g:02x}{b:02x}")
-                    
-                    if hex_colors:
-                        color_scheme["primary"] = hex_colors[0]
-                        color_scheme["secondary"] = hex_colors[1] if len(hex_colors) > 1 else None
-                        color_scheme["background"] = hex_colors[-1]  # Usually background is most common
-        except ImportError:
-            logger.debug(f"[{run_id}] PIL not available for color extraction")
-        except Exception as e:
-            logger.debug(f"[{run_id}] Color extraction error: {e}")
+        # Top colors by frequency, computed during the scan
+        hex_colors = scan.get("colors", [])
+        if hex_colors:
+            color_scheme["primary"] = hex_colors[0]
+            color_scheme["secondary"] = hex_colors[1] if len(hex_colors) > 1 else None
+            color_scheme["background"] = hex_colors[-1]  # Usually background is most common
+        else:
+            logger.debug(f"[{run_id}] No colors extracted")
         
         return color_scheme
     
-    async def _extract_layout_structure(
+    def _extract_layout_structure(
         self,
-        image_path: Path,
+        scan: Dict[str, Any],
         run_id: str
     ) -> Dict[str, Any]:
         """Analyze layout structure (grid, list, sidebar, etc.)."""
@@ -285,11 +483,13 @@ class ImageAnalyzer:
             "has_footer": False
         }
         
+        if scan.get("layout"):
+            return dict(scan["layout"])
+        
         try:
-            from PIL import Image
-            
-            with Image.open(image_path) as img:
-                width, height = img.size
+            metadata = scan.get("metadata", {})
+            if "width" in metadata and "height" in metadata:
+                width, height = metadata["width"], metadata["height"]
                 
                 # Basic layout detection based on image dimensions and regions
                 # Left region (potential sidebar)
@@ -313,18 +513,16 @@ class ImageAnalyzer:
         
         return structure
     
-    async def _detect_components(
+    def _detect_components(
         self,
-        image_path: Path,
+        text_content: List[Dict[str, Any]],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Detect UI components (forms, tables, modals, etc.)."""
         components = []
         
         try:
-            # Try to detect components based on text patterns
-            text_content = await self._extract_text_content(image_path, run_id)
-            
+            # Detect components based on text patterns
             # Look for form indicators
             form_keywords = ['submit', 'save', 'cancel', 'email', 'password', 'username', 'name', 'address']
             if any(keyword in str(text_content).lower() for keyword in form_keywords):
@@ -357,16 +555,15 @@ class ImageAnalyzer:
         
         return components
     
-    async def _identify_workflow_hints(
+    def _identify_workflow_hints(
         self,
-        image_path: Path,
+        text_content: List[Dict[str, Any]],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Identify potential workflows and user journeys from image."""
         hints = []
         
         try:
-            text_content = await self._extract_text_content(image_path, run_id)
             all_text = " ".join([item.get("text", "") for item in text_content]).lower()
             
             # Detect workflow patterns
@@ -396,17 +593,16 @@ class ImageAnalyzer:
         
         return hints
     
-    async def _check_accessibility(
+    def _check_accessibility(
         self,
-        image_path: Path,
+        color_scheme: Dict[str, Any],
+        text_content: List[Dict[str, Any]],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Check for accessibility issues."""
         notes = []
         
         try:
-            color_scheme = await self._extract_color_scheme(image_path, run_id)
-            
             # Check contrast (basic heuristic)
             if color_scheme.get("primary") and color_scheme.get("background"):
                 notes.append({
@@ -416,7 +612,6 @@ class ImageAnalyzer:
                 })
             
             # Check text readability
-            text_content = await self._extract_text_content(image_path, run_id)
             if not text_content:
                 notes.append({
                     "type": "text_readability",
@@ -429,16 +624,15 @@ class ImageAnalyzer:
         
         return notes
 
-    async def _detect_search_components(
+    def _detect_search_components(
         self,
-        image_path: Path,
+        text_content: List[Dict[str, Any]],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Detect search boxes, search buttons, and search-related UI."""
         search_components = []
 
         try:
-            text_content = await self._extract_text_content(image_path, run_id)
             all_text_items = []
 
             for item in text_content:
@@ -474,16 +668,15 @@ class ImageAnalyzer:
 
         return search_components
 
-    async def _detect_filter_components(
+    def _detect_filter_components(
         self,
-        image_path: Path,
+        text_content: List[Dict[str, Any]],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Detect filter dropdowns, checkboxes, and filter controls."""
         filter_components = []
 
         try:
-            text_content = await self._extract_text_content(image_path, run_id)
             all_text_items = []
 
             for item in text_content:
@@ -522,16 +715,15 @@ class ImageAnalyzer:
 
         return filter_components
 
-    async def _detect_pagination_components(
+    def _detect_pagination_components(
         self,
-        image_path: Path,
+        text_content: List[Dict[str, Any]],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Detect pagination controls: next, prev, page numbers."""
         pagination_components = []
 
         try:
-            text_content = await self._extract_text_content(image_path, run_id)
             all_text_items = []
 
             for item in text_content:
@@ -574,16 +766,15 @@ class ImageAnalyzer:
 
         return pagination_components
 
-    async def _detect_data_tables(
+    def _detect_data_tables(
         self,
-        image_path: Path,
+        text_content: List[Dict[str, Any]],
         run_id: str
     ) -> List[Dict[str, Any]]:
         """Detect data tables/grids with columns and rows."""
         tables = []
 
         try:
-            text_content = await self._extract_text_content(image_path, run_id)
             all_text_items = []
 
             for item in text_content:
@@ -1,16 +1,56 @@
 """Kubernetes service discovery for database services."""
 
+import os
+import time
 import asyncio
 import logging
-from typing import List, Dict, Optional
-from kubernetes import client, config
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, List, Dict, Optional, Union
+from kubernetes import client, config, watch
 from kubernetes.client.rest import ApiException
 
 logger = logging.getLogger(__name__)
 
+# Keep per-namespace service caches current with a watch (otherwise re-list after the TTL)
+K8S_SERVICE_WATCH = os.getenv("K8S_SERVICE_WATCH", "true").lower() in ("1", "true", "yes")
+K8S_SERVICE_CACHE_TTL = float(os.getenv("K8S_SERVICE_CACHE_TTL", "30"))
+# Server-side watch timeout; the watch reconnects after it, so it also bounds how long stopping a watch takes
+K8S_WATCH_TIMEOUT_SECONDS = int(os.getenv("K8S_WATCH_TIMEOUT_SECONDS", "30"))
+# Dedicated threads for blocking watch streams (kept off the shared default executor)
+K8S_WATCH_MAX_THREADS = int(os.getenv("K8S_WATCH_MAX_THREADS", "8"))
+K8S_WATCH_RETRY_DELAY = float(os.getenv("K8S_WATCH_RETRY_DELAY", "5"))
+
+
+@dataclass
+class NamespaceServiceCache:
+    """Services of one namespace, kept current by a background watch."""
+    namespace: str
+    services: Dict[str, Any] = field(default_factory=dict)  # service name -> V1Service
+    resource_version: Optional[str] = None
+    listed_at: float = 0.0
+    watching: bool = False
+    lock: threading.Lock = field(default_factory=threading.Lock)
+    watcher: Optional[Any] = None  # kubernetes.watch.Watch while streaming
+    task: Optional[asyncio.Task] = None
+    stop: threading.Event = field(default_factory=threading.Event)  # Stops the current watch generation
+
+    def fresh(self, ttl: float) -> bool:
+        return self.watching or (self.listed_at > 0 and time.monotonic() - self.listed_at < ttl)
+
 
 class K8sDiscoveryService:
-    """Discover database services in Kubernetes namespace."""
+    """
+    Discover database services in Kubernetes namespaces.
+
+    The synchronous kubernetes client runs in worker threads so discovery
+    never blocks the event loop. Each namespace is listed once and then kept
+    current by a watch, so repeated discovery and ``get_service_info`` are
+    served from memory. Watch streams block for up to
+    ``K8S_WATCH_TIMEOUT_SECONDS`` at a time, so they run on a dedicated
+    executor instead of the default one shared with the rest of the app.
+    """
 
     DATABASE_INDICATORS = {
         "mongodb": ["mongo", "mongodb"],
@@ -19,15 +59,35 @@ class K8sDiscoveryService:
         "redis": ["redis"],
     }
 
-    def __init__(self):
+    def __init__(self, use_watch: bool = K8S_SERVICE_WATCH, cache_ttl: float = K8S_SERVICE_CACHE_TTL):
         self.k8s_loaded = False
         self.v1 = None
+        self.use_watch = use_watch
+        self.cache_ttl = cache_ttl
+        self._caches: Dict[str, NamespaceServiceCache] = {}
+        self._list_locks: Dict[str, asyncio.Lock] = {}
+        self._config_lock = asyncio.Lock()
+        self._watch_executor: Optional[ThreadPoolExecutor] = None
+        self._closed = False
+
+    def _get_watch_executor(self) -> ThreadPoolExecutor:
+        if self._watch_executor is None:
+            self._watch_executor = ThreadPoolExecutor(
+                max_workers=max(1, K8S_WATCH_MAX_THREADS), thread_name_prefix="k8s-watch"
+            )
+        return self._watch_executor
 
     async def _load_k8s_config(self) -> bool:
-        """Load K8s config from kubeconfig or in-cluster."""
+        """Load K8s config from kubeconfig or in-cluster (in a worker thread)."""
         if self.k8s_loaded:
             return True
 
+        async with self._config_lock:
+            if self.k8s_loaded:
+                return True
+            return await asyncio.to_thread(self._load_k8s_config_sync)
+
+    def _load_k8s_config_sync(self) -> bool:
         try:
             # Try to load in-cluster config first (if running in K8s pod)
             config.load_incluster_config()
@@ -44,7 +104,8 @@ class K8sDiscoveryService:
                 return False
 
         # Initialize API client
-        self.v1 = client.CoreV1Api()
+        if self.v1 is None:
+            self.v1 = client.CoreV1Api()
         return True
 
     def _detect_database_type(self, service_name: str, labels: Dict) -> Optional[str]:
@@ -72,12 +133,147 @@ class K8sDiscoveryService:
 
         return None
 
-    async def discover_database_services(self, namespace: str = "default") -> List[Dict]:
+    def _service_to_dict(self, service: Any, namespace: str, db_type: Optional[str],
+                         include_timestamp: bool = False) -> Dict:
+        """Connection details of a service."""
+        service_name = service.metadata.name
+        labels = service.metadata.labels or {}
+
+        # Use first port (usually main DB port)
+        ports = service.spec.ports or []
+        port = ports[0].port if ports else None
+
+        metadata = {
+            "labels": labels,
+            "cluster_ip": service.spec.cluster_ip,
+            "type": service.spec.type,
+            "selector": service.spec.selector or {},
+        }
+        if include_timestamp:
+            metadata["creation_timestamp"] = service.metadata.creation_timestamp
+
+        return {
+            "service_name": service_name,
+            "namespace": namespace,
+            "db_type": db_type,
+            # Internal cluster DNS name
+            "host": f"{service_name}.{namespace}.svc.cluster.local",
+            "port": port,
+            "metadata": metadata,
+        }
+
+    async def _namespace_services(self, namespace: str) -> NamespaceServiceCache:
+        """
+        Get the service cache of a namespace, listing it (and starting its watch) if needed.
+
+        Concurrent callers for the same namespace share one list call.
         """
-        Auto-discover database services in K8s namespace.
+        cache = self._caches.get(namespace)
+        if cache is not None and cache.fresh(self.cache_ttl):
+            return cache
+
+        lock = self._list_locks.setdefault(namespace, asyncio.Lock())
+        async with lock:
+            cache = self._caches.get(namespace)
+            if cache is not None and cache.fresh(self.cache_ttl):
+                return cache
+
+            logger.info(f"Listing services in namespace: {namespace}")
+            service_list = await asyncio.to_thread(self.v1.list_namespaced_service, namespace=namespace)
+
+            if cache is None:
+                cache = NamespaceServiceCache(namespace=namespace)
+                self._caches[namespace] = cache
+            with cache.lock:
+                cache.services = {service.metadata.name: service for service in service_list.items}
+                cache.resource_version = service_list.metadata.resource_version
+                cache.listed_at = time.monotonic()
+
+            if self.use_watch and not self._closed and (
+                cache.task is None or cache.task.done() or cache.stop.is_set()
+            ):
+                # A stopped watch may still be inside its stream: the new one joins it first
+                previous = cache.task if cache.task is not None and not cache.task.done() else None
+                cache.stop = threading.Event()
+                cache.task = asyncio.create_task(self._watch_namespace(cache, cache.stop, previous))
+            return cache
+
+    async def _watch_namespace(
+        self,
+        cache: NamespaceServiceCache,
+        stop: threading.Event,
+        previous: Optional[asyncio.Task] = None
+    ):
+        """Apply service watch events to a namespace cache until the watch is stopped or the service closed."""
+        if previous is not None:
+            # Never two watch threads on one namespace
+            await asyncio.gather(previous, return_exceptions=True)
+        loop = asyncio.get_running_loop()
+        try:
+            while not self._closed and not stop.is_set():
+                try:
+                    await loop.run_in_executor(self._get_watch_executor(), self._stream_service_events, cache, stop)
+                except ApiException as e:
+                    cache.watching = False
+                    if e.status == 410:
+                        # Resource version too old: re-list and watch from there
+                        logger.info(f"Service watch for {cache.namespace} expired, re-listing")
+                        cache.listed_at = 0.0
+                    else:
+                        logger.warning(f"K8s service watch error in {cache.namespace}: {e}")
+                        await asyncio.sleep(K8S_WATCH_RETRY_DELAY)
+                    return
+                except Exception as e:
+                    cache.watching = False
+                    logger.warning(f"K8s service watch for {cache.namespace} failed: {e}")
+                    await asyncio.sleep(K8S_WATCH_RETRY_DELAY)
+                    return
+        finally:
+            # Without a watch the cache falls back to TTL-based re-listing
+            if cache.stop is stop:
+                cache.watching = False
+
+    def _stream_service_events(self, cache: NamespaceServiceCache, stop: threading.Event):
+        """Blocking watch loop run on the watch executor; returns when the watch times out or is stopped."""
+        if stop.is_set():
+            return
+        w = watch.Watch()
+        cache.watcher = w
+        cache.watching = True
+        try:
+            for event in w.stream(
+                self.v1.list_namespaced_service,
+                namespace=cache.namespace,
+                resource_version=cache.resource_version,
+                timeout_seconds=K8S_WATCH_TIMEOUT_SECONDS,
+                # Client-side bound too, so a silent connection cannot outlive the server timeout
+                _request_timeout=K8S_WATCH_TIMEOUT_SECONDS + 5
+            ):
+                if stop.is_set():
+                    break
+                service = event["object"]
+                if event["type"] == "ERROR":
+                    raise ApiException(status=getattr(service, "code", None) or 500, reason=str(service))
+                with cache.lock:
+                    if event["type"] == "DELETED":
+                        cache.services.pop(service.metadata.name, None)
+                    else:
+                        cache.services[service.metadata.name] = service
+                    cache.resource_version = service.metadata.resource_version
+                    cache.listed_at = time.monotonic()
+        finally:
+            if cache.watcher is w:
+                cache.watcher = None
+
+    async def discover_database_services(self, namespace: Union[str, List[str]] = "default") -> List[Dict]:
+        """
+        Auto-discover database services in one or more K8s namespaces.
+
+        Namespaces are discovered concurrently and served from the service
+        cache after their first listing.
 
         Args:
-            namespace: K8s namespace to search (default: "default")
+            namespace: K8s namespace (or list of namespaces) to search (default: "default")
 
         Returns:
             List of discovered database services with connection details
@@ -86,14 +282,22 @@ class K8sDiscoveryService:
             logger.warning("K8s config not loaded, skipping database discovery")
             return []
 
+        namespaces = [namespace] if isinstance(namespace, str) else list(dict.fromkeys(namespace))
+        results = await asyncio.gather(*(self._discover_namespace(ns) for ns in namespaces))
+        discovered_services = [service for services in results for service in services]
+
+        logger.info(f"Total database services discovered: {len(discovered_services)}")
+        return discovered_services
+
+    async def _discover_namespace(self, namespace: str) -> List[Dict]:
         discovered_services = []
 
         try:
-            # List all services in namespace
-            logger.info(f"Discovering database services in namespace: {namespace}")
-            services = self.v1.list_namespaced_service(namespace=namespace)
+            cache = await self._namespace_services(namespace)
+            with cache.lock:
+                services = list(cache.services.values())
 
-            for service in services.items:
+            for service in services:
                 service_name = service.metadata.name
                 labels = service.metadata.labels or {}
 
@@ -102,45 +306,23 @@ class K8sDiscoveryService:
                 if not db_type:
                     continue
 
-                # Extract connection details
-                ports = service.spec.ports or []
-                port = None
-                if ports:
-                    # Use first port (usually main DB port)
-                    port = ports[0].port
-
-                # Internal cluster DNS name
-                cluster_dns = f"{service_name}.{namespace}.svc.cluster.local"
-
-                discovered_service = {
-                    "service_name": service_name,
-                    "namespace": namespace,
-                    "db_type": db_type,
-                    "host": cluster_dns,
-                    "port": port,
-                    "metadata": {
-                        "labels": labels,
-                        "cluster_ip": service.spec.cluster_ip,
-                        "type": service.spec.type,
-                        "selector": service.spec.selector or {},
-                    }
-                }
-
-                discovered_services.append(discovered_service)
-                logger.info(f"Discovered {db_type} service: {service_name} on port {port}")
+                discovered_services.append(self._service_to_dict(service, namespace, db_type))
+                logger.debug(f"Discovered {db_type} service: {service_name} in {namespace}")
 
         except ApiException as e:
-            logger.error(f"K8s API error during service discovery: {e}")
+            logger.error(f"K8s API error during service discovery in {namespace}: {e}")
         except Exception as e:
-            logger.error(f"Unexpected error during K8s service discovery: {e}")
+            logger.error(f"Unexpected error during K8s service discovery in {namespace}: {e}")
 
-        logger.info(f"Total database services discovered: {len(discovered_services)}")
         return discovered_services
 
     async def get_service_info(self, service_name: str, namespace: str) -> Optional[Dict]:
         """
         Get detailed information about a specific service.
 
+        Served from the namespace cache when it is current; otherwise read
+        from the API server.
+
         Args:
             service_name: K8s service name
             namespace: K8s namespace
@@ -152,28 +334,21 @@ class K8sDiscoveryService:
             return None
 
         try:
-            service = self.v1.read_namespaced_service(name=service_name, namespace=namespace)
+            cache = self._caches.get(namespace)
+            if cache is not None and cache.fresh(self.cache_ttl):
+                with cache.lock:
+                    service = cache.services.get(service_name)
+                if service is None:
+                    logger.warning(f"Service {service_name} not found in namespace {namespace}")
+                    return None
+            else:
+                service = await asyncio.to_thread(
+                    self.v1.read_namespaced_service, name=service_name, namespace=namespace
+                )
 
             labels = service.metadata.labels or {}
             db_type = self._detect_database_type(service_name, labels)
-
-            ports = service.spec.ports or []
-            port = ports[0].port if ports else None
-
-            return {
-                "service_name": service_name,
-                "namespace": namespace,
-                "db_type": db_type,
-                "host": f"{service_name}.{namespace}.svc.cluster.local",
-                "port": port,
-                "metadata": {
-                    "labels": labels,
-                    "cluster_ip": service.spec.cluster_ip,
-                    "type": service.spec.type,
-                    "selector": service.spec.selector or {},
-                    "creation_timestamp": service.metadata.creation_timestamp,
-                }
-            }
+            return self._service_to_dict(service, namespace, db_type, include_timestamp=True)
 
         except ApiException as e:
             if e.status == 404:
@@ -184,3 +359,40 @@ class K8sDiscoveryService:
         except Exception as e:
             logger.error(f"Unexpected error getting service info: {e}")
             return None
+
+    def invalidate(self, namespace: Optional[str] = None):
+        """Force the next lookup of a namespace (default: all) to re-list its services."""
+        for ns, cache in list(self._caches.items()):
+            if namespace is None or ns == namespace:
+                cache.listed_at = 0.0
+                cache.watching = False
+                # Cancelling the task would not stop its thread; the next watch joins it instead
+                cache.stop.set()
+                if cache.watcher is not None:
+                    cache.watcher.stop()
+
+    async def close(self):
+        """Stop all service watches and wait for their threads (at most one watch timeout)."""
+        self._closed = True
+        for cache in self._caches.values():
+            cache.stop.set()
+            if cache.watcher is not None:
+                cache.watcher.stop()
+        tasks = [cache.task for cache in self._caches.values() if cache.task is not None]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._caches.clear()
+        if self._watch_executor is not None:
+            self._watch_executor.shutdown(wait=False)
+            self._watch_executor = None
+
+
+# Global instance
+_k8s_discovery_service = None
+
+
+def get_k8s_discovery_service() -> K8sDiscoveryService:
+    """Get global K8sDiscoveryService instance."""
+    global _k8s_discovery_service
+    if _k8s_discovery_service is None:
+        _k8s_discovery_service = K8sDiscoveryService()
+    return _k8s_discovery_service
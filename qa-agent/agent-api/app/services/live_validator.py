@@ -8,12 +8,13 @@ Goal: Comprehensive testing for sanity and regression.
 """
 
 import logging
-import json
 import asyncio
 from typing import Dict, List, Any, Optional
 from datetime import datetime
 from pathlib import Path
 
+from app.services.event_bus import get_event_bus
+
 logger = logging.getLogger(__name__)
 
 
@@ -1006,8 +1007,6 @@ class LiveValidator:
         results: Dict[str, Any]
     ):
         """Emit real-time validation event to UI."""
-        events_file = artifacts_path / "events.jsonl"
-
         event = {
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "type": "live_validation_completed",
@@ -1030,8 +1029,7 @@ class LiveValidator:
             }
         }
 
-        with open(events_file, "a") as f:
-            f.write(json.dumps(event) + "\n")
+        get_event_bus(run_id, artifacts_path).publish(event, source="validation")
 
     def get_validation_stats(self) -> Dict[str, Any]:
         """Get overall validation statistics."""
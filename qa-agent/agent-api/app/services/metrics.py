@@ -0,0 +1,335 @@
+"""Process-wide metrics registry exposed in Prometheus text format.
+
+Services report into module-level metrics defined at the bottom of this file;
+``/metrics`` renders the registry on each scrape. The API intentionally mirrors
+a small subset of ``prometheus_client`` (``labels()``, ``inc()``, ``set()``,
+``observe()``, ``time()``) so call sites stay familiar without adding a
+dependency.
+"""
+
+import math
+import time
+import threading
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0
+)
+
+CONTENT_TYPE_LATEST = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _format_value(value: float) -> str:
+    """Format a sample value the way Prometheus expects."""
+    if value == math.inf:
+        return "+Inf"
+    if value == -math.inf:
+        return "-Inf"
+    if isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return repr(value)
+
+
+def _escape_label(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = [f'{n}="{_escape_label(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(f'{extra[0]}="{_escape_label(extra[1])}"')
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class _Metric:
+    """Base class for labelled metrics."""
+
+    metric_type = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._children: Dict[Tuple[str, ...], "_Metric"] = {}
+
+    def labels(self, *values: str, **kwargs: str):
+        """Return the child metric for a label combination."""
+        if kwargs:
+            values = tuple(str(kwargs[name]) for name in self.labelnames)
+        else:
+            values = tuple(str(v) for v in values)
+        if len(values) != len(self.labelnames):
+            raise ValueError(f"{self.name}: expected labels {self.labelnames}, got {values}")
+
+        child = self._children.get(values)
+        if child is None:
+            with self._lock:
+                child = self._children.get(values)
+                if child is None:
+                    child = self._new_child()
+                    self._children[values] = child
+        return child
+
+    def _new_child(self) -> "_Metric":
+        raise NotImplementedError
+
+    def _samples(self) -> List[Tuple[str, str, float]]:
+        """Return (suffix, label_string, value) samples for this metric."""
+        raise NotImplementedError
+
+    def _iter_children(self):
+        if not self.labelnames:
+            yield (), self
+        else:
+            for values, child in list(self._children.items()):
+                yield values, child
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} {self.metric_type}",
+        ]
+        for values, child in self._iter_children():
+            for suffix, extra, value in child._child_samples():
+                labels = _format_labels(self.labelnames, values, extra)
+                lines.append(f"{self.name}{suffix}{labels} {_format_value(value)}")
+        return lines
+
+
+class Counter(_Metric):
+    """Monotonically increasing counter."""
+
+    metric_type = "counter"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+
+    def _new_child(self) -> "Counter":
+        return Counter(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        if amount < 0:
+            raise ValueError("Counters can only be incremented by non-negative amounts")
+        with self._lock:
+            self._value += amount
+
+    def get(self) -> float:
+        return self._value
+
+    def _child_samples(self):
+        return [("_total", None, self._value)]
+
+
+class Gauge(_Metric):
+    """Value that can go up and down, or be computed at scrape time."""
+
+    metric_type = "gauge"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        super().__init__(name, documentation, labelnames)
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+
+    def _new_child(self) -> "Gauge":
+        return Gauge(self.name, self.documentation)
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value -= amount
+
+    def set(self, value: float) -> None:
+        with self._lock:
+            self._value = float(value)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """Compute the gauge value lazily on every scrape."""
+        self._function = function
+
+    @contextmanager
+    def track_inprogress(self):
+        """Increment while the block runs, decrement on exit."""
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+    def get(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception as e:
+                logger.debug(f"Gauge {self.name} callback failed: {e}")
+                return 0.0
+        return self._value
+
+    def _child_samples(self):
+        return [("", None, self.get())]
+
+
+class Histogram(_Metric):
+    """Cumulative histogram with fixed buckets."""
+
+    metric_type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ):
+        super().__init__(name, documentation, labelnames)
+        self._upper_bounds = tuple(sorted(buckets))
+        self._bucket_counts = [0] * (len(self._upper_bounds) + 1)  # last slot is +Inf
+        self._sum = 0.0
+        self._count = 0
+
+    def _new_child(self) -> "Histogram":
+        return Histogram(self.name, self.documentation, buckets=self._upper_bounds)
+
+    def observe(self, value: float) -> None:
+        index = bisect_left(self._upper_bounds, value)
+        with self._lock:
+            self._bucket_counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self):
+        """Observe the wall-clock duration of the block in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    @property
+    def count(self) -> int:
+        return self._count
+
+    @property
+    def sum(self) -> float:
+        return self._sum
+
+    def _child_samples(self):
+        samples = []
+        cumulative = 0
+        for bound, bucket_count in zip(self._upper_bounds + (math.inf,), self._bucket_counts):
+            cumulative += bucket_count
+            samples.append(("_bucket", ("le", _format_value(float(bound))), cumulative))
+        samples.append(("_sum", None, self._sum))
+        samples.append(("_count", None, self._count))
+        return samples
+
+
+class MetricsRegistry:
+    """Collection of metrics rendered together on scrape."""
+
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _register(self, metric: _Metric) -> _Metric:
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                if type(existing) is not type(metric) or existing.labelnames != metric.labelnames:
+                    raise ValueError(f"Metric {metric.name} already registered with a different shape")
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Sequence[str] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def get(self, name: str) -> Optional[_Metric]:
+        return self._metrics.get(name)
+
+    def render(self) -> str:
+        """Render all metrics in Prometheus text exposition format."""
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+# Global registry instance
+_registry = MetricsRegistry()
+
+
+def get_metrics_registry() -> MetricsRegistry:
+    """Get global metrics registry instance."""
+    return _registry
+
+
+# Runs
+ACTIVE_DISCOVERIES = _registry.gauge(
+    "qa_active_discoveries", "Discovery runs currently in progress"
+)
+ACTIVE_EXECUTIONS = _registry.gauge(
+    "qa_active_executions", "Test executions currently in progress"
+)
+
+# Browser resources (values are supplied by BrowserManager at scrape time)
+BROWSER_RESOURCES = _registry.gauge(
+    "qa_browser_open_resources", "Open Playwright resources by kind", ["kind"]
+)
+
+# Events
+EVENTS_EMITTED = _registry.counter(
+    "qa_events_emitted", "Events written to events.jsonl", ["source"]
+)
+EVENT_WRITE_SECONDS = _registry.histogram(
+    "qa_event_write_seconds", "Time spent writing a single event", ["source"],
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.5)
+)
+
+# Queues
+QUEUE_DEPTH = _registry.gauge(
+    "qa_queue_depth", "Items waiting in internal work queues", ["queue"]
+)
+
+# Database
+DB_SESSION_SECONDS = _registry.histogram(
+    "qa_db_session_seconds", "Lifetime of request-scoped database sessions", ["outcome"]
+)
+
+# LLM providers
+LLM_REQUEST_SECONDS = _registry.histogram(
+    "qa_llm_request_seconds", "LLM request latency", ["provider", "model", "outcome"]
+)
+LLM_TOKENS = _registry.counter(
+    "qa_llm_tokens", "Tokens consumed by LLM requests", ["provider", "model", "kind"]
+)
+LLM_CACHE_REQUESTS = _registry.counter(
+    "qa_llm_cache_requests", "LLM response cache lookups", ["result"]
+)
+
+# Retention
+RETENTION_RECLAIMED_BYTES = _registry.counter(
+    "qa_retention_reclaimed_bytes", "Bytes reclaimed by artifact retention", ["policy"]
+)
@@ -1,38 +1,87 @@
 """Port-forward manager for kubectl port-forward sessions."""
 
+import os
 import asyncio
 import logging
-import subprocess
 import socket
-from typing import Dict, Optional, List
-from pathlib import Path
+from dataclasses import dataclass, field
+from typing import Dict, Optional, List, Tuple
 
 logger = logging.getLogger(__name__)
 
+# Seconds to wait for "Forwarding from" output (or an accepting socket) before giving up
+PORT_FORWARD_READY_TIMEOUT = float(os.getenv("PORT_FORWARD_READY_TIMEOUT", "10"))
+# Automatic restarts of a forward that died while still in use
+PORT_FORWARD_MAX_RESTARTS = int(os.getenv("PORT_FORWARD_MAX_RESTARTS", "3"))
+PORT_FORWARD_RESTART_BACKOFF = float(os.getenv("PORT_FORWARD_RESTART_BACKOFF", "1.0"))
+KUBECTL_BINARY = os.getenv("KUBECTL_BINARY", "kubectl")
+
+ForwardKey = Tuple[str, str, int, Optional[str]]  # (namespace, service, remote_port, kubeconfig)
+
+
+@dataclass
+class PortForward:
+    """One kubectl port-forward process, shared by every user of the same service port."""
+    namespace: str
+    service_name: str
+    remote_port: int
+    local_port: int
+    kubeconfig_path: Optional[str] = None
+    process: Optional[asyncio.subprocess.Process] = None
+    refcount: int = 0
+    restarts: int = 0
+    stopping: bool = False
+    ready: asyncio.Event = field(default_factory=asyncio.Event)
+    last_error: str = ""
+    tasks: List[asyncio.Task] = field(default_factory=list)
+
+    @property
+    def key(self) -> ForwardKey:
+        return (self.namespace, self.service_name, self.remote_port, self.kubeconfig_path)
+
+    @property
+    def alive(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+
 
 class PortForwardManager:
     """Manage kubectl port-forward sessions for database connections."""
 
-    def __init__(self, port_range_start: int = 30000, port_range_end: int = 40000):
+    def __init__(self, port_range_start: int = 30000, port_range_end: int = 40000,
+                 ready_timeout: float = PORT_FORWARD_READY_TIMEOUT,
+                 max_restarts: int = PORT_FORWARD_MAX_RESTARTS):
         """
         Initialize PortForwardManager.
 
         Args:
             port_range_start: Start of local port range
             port_range_end: End of local port range
+            ready_timeout: Seconds to wait for a forward to become ready
+            max_restarts: Automatic restarts of a forward that dies while in use
         """
-        self.active_forwards: Dict[int, subprocess.Popen] = {}  # local_port -> process
+        self.active_forwards: Dict[int, PortForward] = {}  # local_port -> forward
+        self.forwards_by_key: Dict[ForwardKey, PortForward] = {}
         self.port_range = range(port_range_start, port_range_end)
         self.used_ports = set()
+        self.ready_timeout = ready_timeout
+        self.max_restarts = max_restarts
+        self._next_port_index = 0
+        self._key_locks: Dict[ForwardKey, asyncio.Lock] = {}
 
     def _find_available_port(self) -> Optional[int]:
         """
         Find an available local port.
 
+        Candidates are taken round-robin from the port range, so recently
+        released ports are not immediately handed out again and a lookup
+        usually probes a single port.
+
         Returns:
             Available port number or None if none available
         """
-        for port in self.port_range:
+        for _ in range(len(self.port_range)):
+            port = self.port_range[self._next_port_index]
+            self._next_port_index = (self._next_port_index + 1) % len(self.port_range)
             if port in self.used_ports:
                 continue
 
@@ -46,6 +95,159 @@ class PortForwardManager:
 
         return None
 
+    def _build_command(self, forward: PortForward) -> List[str]:
+        cmd = [
+            KUBECTL_BINARY,
+            "port-forward",
+            "-n", forward.namespace,
+            f"svc/{forward.service_name}",
+            f"{forward.local_port}:{forward.remote_port}"
+        ]
+
+        # Add kubeconfig if specified
+        if forward.kubeconfig_path:
+            cmd.insert(1, "--kubeconfig")
+            cmd.insert(2, forward.kubeconfig_path)
+        return cmd
+
+    async def _read_stdout(self, forward: PortForward, process: asyncio.subprocess.Process):
+        """Drain stdout, marking the forward ready on kubectl's "Forwarding from" line."""
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                return
+            if b"Forwarding from" in line:
+                forward.ready.set()
+
+    async def _read_stderr(self, forward: PortForward, process: asyncio.subprocess.Process):
+        """Drain stderr, keeping the latest error line for diagnostics."""
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                return
+            text = line.decode(errors="replace").strip()
+            if text:
+                forward.last_error = text
+
+    async def _probe_socket(self, forward: PortForward):
+        """Mark the forward ready once its local port accepts connections."""
+        while not forward.ready.is_set():
+            try:
+                _, writer = await asyncio.open_connection("127.0.0.1", forward.local_port)
+                writer.close()
+                forward.ready.set()
+                return
+            except OSError:
+                await asyncio.sleep(0.2)
+
+    async def _spawn(self, forward: PortForward) -> bool:
+        """
+        Start the kubectl process for a forward and wait until it is ready.
+
+        Returns:
+            True once "Forwarding from" is printed or the local port accepts
+            connections, False if the process exits or the timeout expires
+        """
+        forward.ready = asyncio.Event()
+        forward.last_error = ""
+        process = await asyncio.create_subprocess_exec(
+            *self._build_command(forward),
+            stdout=asyncio.subprocess.PIPE,
+            stderr=asyncio.subprocess.PIPE
+        )
+        forward.process = process
+        forward.tasks = [
+            asyncio.create_task(self._read_stdout(forward, process)),
+            asyncio.create_task(self._read_stderr(forward, process)),
+        ]
+
+        ready_task = asyncio.create_task(forward.ready.wait())
+        probe_task = asyncio.create_task(self._probe_socket(forward))
+        exit_task = asyncio.create_task(process.wait())
+        try:
+            await asyncio.wait(
+                {ready_task, exit_task},
+                timeout=self.ready_timeout,
+                return_when=asyncio.FIRST_COMPLETED
+            )
+        finally:
+            for task in (ready_task, probe_task, exit_task):
+                task.cancel()
+
+        if forward.ready.is_set() and process.returncode is None:
+            forward.tasks.append(asyncio.create_task(self._watch(forward, process)))
+            return True
+
+        if process.returncode is None:
+            logger.error(f"Port-forward to {forward.service_name}:{forward.remote_port} not ready after {self.ready_timeout}s")
+            await self._terminate(forward)
+        else:
+            # Let the stderr reader pick up the final message
+            await asyncio.gather(*forward.tasks, return_exceptions=True)
+            logger.error(f"Port-forward failed to start: {forward.last_error}")
+        return False
+
+    async def _watch(self, forward: PortForward, process: asyncio.subprocess.Process):
+        """Restart a forward whose process dies while it still has users."""
+        await process.wait()
+        if forward.stopping or forward.process is not process:
+            return
+
+        logger.warning(
+            f"Port-forward on {forward.local_port} died unexpectedly "
+            f"(exit {process.returncode}): {forward.last_error}"
+        )
+        lock = self._key_locks.setdefault(forward.key, asyncio.Lock())
+        while forward.refcount > 0 and not forward.stopping and forward.restarts < self.max_restarts:
+            forward.restarts += 1
+            await asyncio.sleep(PORT_FORWARD_RESTART_BACKOFF * forward.restarts)
+            # Same lock as start_port_forward, so only one of them replaces the process
+            async with lock:
+                if forward.stopping:
+                    return
+                if forward.process is not process and forward.alive:
+                    return  # Already replaced by start_port_forward or health_check
+                logger.info(
+                    f"Restarting port-forward {forward.service_name}:{forward.remote_port} -> "
+                    f"localhost:{forward.local_port} (attempt {forward.restarts}/{self.max_restarts})"
+                )
+                try:
+                    if await self._spawn(forward):
+                        return
+                except Exception as e:
+                    logger.error(f"Error restarting port-forward: {e}")
+                process = forward.process
+
+        if not forward.stopping:
+            logger.error(f"Giving up on port-forward on {forward.local_port} after {forward.restarts} restarts")
+            self._forget(forward)
+
+    async def _terminate(self, forward: PortForward):
+        """Terminate the forward's process and stop its reader tasks."""
+        process = forward.process
+        if process is not None and process.returncode is None:
+            process.terminate()
+            try:
+                await asyncio.wait_for(process.wait(), timeout=5)
+            except asyncio.TimeoutError:
+                # Force kill if it doesn't terminate
+                logger.warning(f"Port-forward on {forward.local_port} did not terminate, killing...")
+                process.kill()
+                await process.wait()
+
+        current = asyncio.current_task()
+        for task in forward.tasks:
+            if task is not current:
+                task.cancel()
+        forward.tasks = []
+
+    def _forget(self, forward: PortForward):
+        if self.active_forwards.get(forward.local_port) is forward:
+            del self.active_forwards[forward.local_port]
+        if self.forwards_by_key.get(forward.key) is forward:
+            del self.forwards_by_key[forward.key]
+        self.used_ports.discard(forward.local_port)
+
     async def start_port_forward(
         self,
         service_name: str,
@@ -54,7 +256,10 @@ class PortForwardManager:
         kubeconfig_path: Optional[str] = None
     ) -> Optional[int]:
         """
-        Start kubectl port-forward and return local port.
+        Start kubectl port-forward (or reuse a running one) and return local port.
+
+        Forwards are shared per (namespace, service, remote port); every call
+        takes a reference that must be released with ``stop_port_forward``.
 
         Args:
             service_name: K8s service name
@@ -65,94 +270,86 @@ class PortForwardManager:
         Returns:
             Local port number if successful, None otherwise
         """
-        # Find available local port
-        local_port = self._find_available_port()
-        if not local_port:
-            logger.error("No available ports for port-forward")
-            return None
-
-        # Build kubectl command
-        cmd = [
-            "kubectl",
-            "port-forward",
-            "-n", namespace,
-            f"svc/{service_name}",
-            f"{local_port}:{remote_port}"
-        ]
+        key = (namespace, service_name, remote_port, kubeconfig_path)
+        lock = self._key_locks.setdefault(key, asyncio.Lock())
+
+        async with lock:
+            forward = self.forwards_by_key.get(key)
+            if forward is not None and forward.alive and forward.ready.is_set():
+                forward.refcount += 1
+                logger.info(
+                    f"Reusing port-forward localhost:{forward.local_port} -> {service_name}:{remote_port} "
+                    f"({forward.refcount} users)"
+                )
+                return forward.local_port
+
+            if forward is None:
+                # Find available local port
+                local_port = self._find_available_port()
+                if not local_port:
+                    logger.error("No available ports for port-forward")
+                    return None
+                forward = PortForward(
+                    namespace=namespace,
+                    service_name=service_name,
+                    remote_port=remote_port,
+                    local_port=local_port,
+                    kubeconfig_path=kubeconfig_path
+                )
+            else:
+                # Dead or restarting: replace its process on the same local port
+                await self._terminate(forward)
 
-        # Add kubeconfig if specified
-        if kubeconfig_path:
-            cmd.insert(1, "--kubeconfig")
-            cmd.insert(2, kubeconfig_path)
-
-        try:
-            logger.info(f"Starting port-forward: {service_name}:{remote_port} -> localhost:{local_port}")
-
-            # Start port-forward process
-            process = subprocess.Popen(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True
-            )
-
-            # Give it a moment to establish
-            await asyncio.sleep(2)
-
-            # Check if process is still running
-            if process.poll() is not None:
-                # Process terminated
-                stdout, stderr = process.communicate()
-                logger.error(f"Port-forward failed to start: {stderr}")
+            try:
+                logger.info(f"Starting port-forward: {service_name}:{remote_port} -> localhost:{forward.local_port}")
+                self.used_ports.add(forward.local_port)
+                if not await self._spawn(forward):
+                    self._forget(forward)
+                    return None
+
+            except FileNotFoundError:
+                logger.error("kubectl command not found. Is kubectl installed?")
+                self._forget(forward)
+                return None
+            except Exception as e:
+                logger.error(f"Error starting port-forward: {e}")
+                self._forget(forward)
                 return None
 
             # Success
-            self.active_forwards[local_port] = process
-            self.used_ports.add(local_port)
-
-            logger.info(f"Port-forward established: localhost:{local_port} -> {service_name}:{remote_port}")
-            return local_port
+            forward.refcount += 1
+            forward.restarts = 0
+            self.active_forwards[forward.local_port] = forward
+            self.forwards_by_key[key] = forward
 
-        except FileNotFoundError:
-            logger.error("kubectl command not found. Is kubectl installed?")
-            return None
-        except Exception as e:
-            logger.error(f"Error starting port-forward: {e}")
-            return None
+            logger.info(f"Port-forward established: localhost:{forward.local_port} -> {service_name}:{remote_port}")
+            return forward.local_port
 
-    async def stop_port_forward(self, local_port: int) -> bool:
+    async def stop_port_forward(self, local_port: int, force: bool = False) -> bool:
         """
-        Stop port-forward process.
+        Release a port-forward reference, stopping the process when unused.
 
         Args:
             local_port: Local port of the port-forward to stop
+            force: Stop the process even if other users still hold references
 
         Returns:
             True if stopped successfully, False otherwise
         """
-        process = self.active_forwards.get(local_port)
-        if not process:
+        forward = self.active_forwards.get(local_port)
+        if not forward:
             logger.warning(f"No active port-forward on port {local_port}")
             return False
 
+        forward.refcount = 0 if force else max(forward.refcount - 1, 0)
+        if forward.refcount > 0:
+            logger.info(f"Port-forward on localhost:{local_port} still used by {forward.refcount} users")
+            return True
+
         try:
             logger.info(f"Stopping port-forward on localhost:{local_port}")
-
-            # Terminate the process
-            process.terminate()
-
-            # Wait for it to exit (with timeout)
-            try:
-                process.wait(timeout=5)
-            except subprocess.TimeoutExpired:
-                # Force kill if it doesn't terminate
-                logger.warning(f"Port-forward on {local_port} did not terminate, killing...")
-                process.kill()
-                process.wait()
-
-            # Clean up
-            del self.active_forwards[local_port]
-            self.used_ports.discard(local_port)
+            forward.stopping = True
+            await self._terminate(forward)
 
             logger.info(f"Port-forward on localhost:{local_port} stopped")
             return True
@@ -161,6 +358,10 @@ class PortForwardManager:
             logger.error(f"Error stopping port-forward: {e}")
             return False
 
+        finally:
+            # Clean up
+            self._forget(forward)
+
     def get_active_forwards(self) -> List[Dict]:
         """
         Get list of active port-forwards.
@@ -169,19 +370,16 @@ class PortForwardManager:
             List of active port-forward info
         """
         active = []
-        for local_port, process in list(self.active_forwards.items()):
-            # Check if process is still alive
-            if process.poll() is not None:
-                # Process died, clean up
-                logger.warning(f"Port-forward on {local_port} died unexpectedly")
-                del self.active_forwards[local_port]
-                self.used_ports.discard(local_port)
-                continue
-
+        for local_port, forward in list(self.active_forwards.items()):
             active.append({
                 "local_port": local_port,
-                "pid": process.pid,
-                "status": "active"
+                "pid": forward.process.pid if forward.process else None,
+                "service_name": forward.service_name,
+                "namespace": forward.namespace,
+                "remote_port": forward.remote_port,
+                "users": forward.refcount,
+                "restarts": forward.restarts,
+                "status": "active" if forward.alive else "restarting"
             })
 
         return active
@@ -196,44 +394,39 @@ class PortForwardManager:
         Returns:
             True if active, False otherwise
         """
-        process = self.active_forwards.get(local_port)
-        if not process:
-            return False
-
-        # Check if process is still running
-        if process.poll() is not None:
-            # Process died
-            del self.active_forwards[local_port]
-            self.used_ports.discard(local_port)
-            return False
-
-        return True
+        forward = self.active_forwards.get(local_port)
+        return bool(forward and forward.alive and forward.ready.is_set())
 
     async def cleanup_all(self):
         """Stop all active port-forwards."""
         logger.info(f"Cleaning up {len(self.active_forwards)} active port-forwards")
 
         for local_port in list(self.active_forwards.keys()):
-            await self.stop_port_forward(local_port)
+            await self.stop_port_forward(local_port, force=True)
 
         logger.info("All port-forwards cleaned up")
 
     async def health_check(self):
-        """Check health of all active port-forwards and clean up dead ones."""
-        dead_ports = []
-
-        for local_port, process in self.active_forwards.items():
-            if process.poll() is not None:
-                logger.warning(f"Port-forward on {local_port} is dead")
-                dead_ports.append(local_port)
-
-        # Clean up dead forwards
-        for local_port in dead_ports:
-            del self.active_forwards[local_port]
-            self.used_ports.discard(local_port)
-
-        if dead_ports:
-            logger.info(f"Cleaned up {len(dead_ports)} dead port-forwards")
+        """Restart dead port-forwards that are still in use and clean up the rest."""
+        dead = [forward for forward in self.active_forwards.values() if not forward.alive]
+
+        for forward in dead:
+            if forward.refcount > 0 and all(task.done() for task in forward.tasks):
+                # Watcher already gave up or never ran: retry once from scratch
+                logger.warning(f"Port-forward on {forward.local_port} is dead, restarting")
+                async with self._key_locks.setdefault(forward.key, asyncio.Lock()):
+                    try:
+                        if await self._spawn(forward):
+                            continue
+                    except Exception as e:
+                        logger.error(f"Error restarting port-forward: {e}")
+                self._forget(forward)
+            elif forward.refcount == 0:
+                logger.warning(f"Port-forward on {forward.local_port} is dead")
+                self._forget(forward)
+
+        if dead:
+            logger.info(f"Checked {len(dead)} dead port-forwards")
 
 
 # Global instance
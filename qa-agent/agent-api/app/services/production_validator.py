@@ -10,13 +10,15 @@ This validator performs thorough validation suitable for production environments
 """
 
 import asyncio
-import json
 import logging
 from typing import Dict, Any, List, Optional
 from datetime import datetime
 from pathlib import Path
 from dataclasses import dataclass, asdict
 
+from app.services.event_bus import get_event_bus
+from app.services.artifact_io import write_artifact
+
 logger = logging.getLogger(__name__)
 
 
@@ -1037,8 +1039,6 @@ class ProductionValidator:
         results: Dict[str, Any]
     ):
         """Emit production validation event."""
-        events_file = artifacts_path / "events.jsonl"
-
         event = {
             "timestamp": datetime.utcnow().isoformat() + "Z",
             "type": "production_validation_completed",
@@ -1053,8 +1053,7 @@ class ProductionValidator:
             }
         }
 
-        with open(events_file, "a") as f:
-            f.write(json.dumps(event) + "\n")
+        get_event_bus(run_id, artifacts_path).publish(event, source="validation")
 
     def generate_observation_report(self, run_id: str, artifacts_path: Path):
         """Generate comprehensive observation report."""
@@ -1075,8 +1074,7 @@ class ProductionValidator:
         }
 
         report_file = artifacts_path / "production_validation_report.json"
-        with open(report_file, "w") as f:
-            json.dump(report, f, indent=2)
+        write_artifact(report_file, report)
 
         logger.info(f"[{run_id}] 📊 Production validation report saved: {report_file}")
 
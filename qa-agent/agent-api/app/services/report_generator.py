@@ -6,6 +6,8 @@ from pathlib import Path
 from typing import Dict, Any, Optional
 from datetime import datetime
 
+from app.services.artifact_io import read_artifact
+
 logger = logging.getLogger(__name__)
 
 
@@ -49,15 +51,13 @@ class ReportGenerator:
             if not report_file.exists():
                 raise FileNotFoundError("report.json not found")
             
-            with open(report_file) as f:
-                report_data = json.load(f)
+            report_data = read_artifact(report_file)
             
             # Load discovery_summary.json (optional)
             discovery_summary_file = artifacts_dir / "discovery_summary.json"
             discovery_summary = {}
             if discovery_summary_file.exists():
-                with open(discovery_summary_file) as f:
-                    discovery_summary = json.load(f)
+                discovery_summary = read_artifact(discovery_summary_file)
             
             # Generate HTML
             html_content = self._generate_html(
@@ -0,0 +1,545 @@
+"""
+Retention Service - Background garbage collection of run artifacts.
+
+Every run writes its artifacts to ``data/<run_id>/`` and nothing ever removed
+them. The retention service sweeps the data directory periodically and applies
+the configured policies, in this order:
+
+1. Temp uploads older than ``RETENTION_TEMP_UPLOADS_MAX_AGE_HOURS`` are removed.
+2. Runs idle for more than ``RETENTION_MAX_AGE_DAYS`` are deleted.
+3. Only the newest ``RETENTION_KEEP_RUNS_PER_BASE_URL`` runs of each base URL are kept.
+4. Oldest runs are deleted until the data directory fits ``RETENTION_DISK_QUOTA_MB``.
+5. Runs idle for more than ``RETENTION_STRIP_MEDIA_AFTER_DAYS`` lose their screenshots,
+   videos and traces; JSON artifacts are kept.
+
+A policy set to 0 is disabled. Runs with activity in the last
+``RETENTION_ACTIVE_GRACE_HOURS`` are never touched, and neither are runs whose
+persisted state is not terminal (DONE/FAILED), so in-progress discoveries and
+executions are safe even when they sit idle. Files are deleted in small batches on a worker thread,
+with the pause between batches awaited on the event loop, at no more than
+``RETENTION_DELETE_RATE`` files per second to keep disk I/O smooth.
+"""
+
+import os
+import time
+import asyncio
+import logging
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from app.models.run_state import RunState
+from app.services.artifact_io import read_artifact
+from app.services.metrics import RETENTION_RECLAIMED_BYTES
+from app.services.run_store import TEMP_UPLOADS_DIR, resolve_data_dir
+
+logger = logging.getLogger(__name__)
+
+# Seconds between background sweeps (0 disables the background task)
+RETENTION_INTERVAL_SECONDS = float(os.getenv("RETENTION_INTERVAL_SECONDS", "3600"))
+# Newest runs kept per base URL (0 = unlimited)
+RETENTION_KEEP_RUNS_PER_BASE_URL = int(os.getenv("RETENTION_KEEP_RUNS_PER_BASE_URL", "0"))
+# Days since last activity after which a run is deleted (0 = never)
+RETENTION_MAX_AGE_DAYS = float(os.getenv("RETENTION_MAX_AGE_DAYS", "0"))
+# Maximum size of all runs in MB; oldest runs are deleted beyond it (0 = unlimited)
+RETENTION_DISK_QUOTA_MB = float(os.getenv("RETENTION_DISK_QUOTA_MB", "0"))
+# Days since last activity after which screenshots/videos/traces are removed (0 = never)
+RETENTION_STRIP_MEDIA_AFTER_DAYS = float(os.getenv("RETENTION_STRIP_MEDIA_AFTER_DAYS", "0"))
+# Hours after which uploaded images/documents in temp_uploads are removed (0 = never)
+RETENTION_TEMP_UPLOADS_MAX_AGE_HOURS = float(os.getenv("RETENTION_TEMP_UPLOADS_MAX_AGE_HOURS", "0"))
+# Runs modified within this many hours are considered active and never collected
+RETENTION_ACTIVE_GRACE_HOURS = float(os.getenv("RETENTION_ACTIVE_GRACE_HOURS", "6"))
+# Files deleted per second by background sweeps (0 = unthrottled)
+RETENTION_DELETE_RATE = float(os.getenv("RETENTION_DELETE_RATE", "200"))
+# Seconds of deletions handed to the worker thread at a time when throttled
+DELETE_BATCH_SECONDS = 0.1
+
+# Artifacts removed by the strip-media policy
+MEDIA_SUFFIXES = {".png", ".jpg", ".jpeg", ".webp", ".gif", ".mp4", ".webm", ".zip"}
+# Directories under data/ that are not runs
+NON_RUN_DIRS = {"temp_uploads"}
+# Run states after which a run is no longer in progress
+TERMINAL_RUN_STATES = {RunState.DONE.value, RunState.FAILED.value}
+
+
+@dataclass
+class RunUsage:
+    """Disk usage and identity of one run directory."""
+    run_id: str
+    path: Path
+    base_url: Optional[str]
+    size_bytes: int
+    file_count: int
+    last_activity: float  # Newest file mtime (epoch seconds)
+    state: Optional[str] = None  # Persisted run_store state (None without run_context.json)
+
+    def collectable(self, now: float, grace_seconds: float) -> bool:
+        """Whether the run is finished and idle beyond the grace period."""
+        if self.state is not None and self.state not in TERMINAL_RUN_STATES:
+            return False
+        return now - self.last_activity > grace_seconds
+
+
+@dataclass
+class SweepReport:
+    """Outcome of one retention sweep."""
+    started_at: str
+    dry_run: bool = False
+    finished_at: Optional[str] = None
+    duration_seconds: float = 0.0
+    runs_scanned: int = 0
+    runs_deleted: List[str] = field(default_factory=list)
+    runs_stripped: List[str] = field(default_factory=list)
+    files_deleted: int = 0
+    bytes_reclaimed: int = 0
+    bytes_by_policy: Dict[str, int] = field(default_factory=dict)
+    error: Optional[str] = None
+
+    def add(self, policy: str, files: int, size: int):
+        self.files_deleted += files
+        self.bytes_reclaimed += size
+        self.bytes_by_policy[policy] = self.bytes_by_policy.get(policy, 0) + size
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "dry_run": self.dry_run,
+            "runs_scanned": self.runs_scanned,
+            "runs_deleted": self.runs_deleted,
+            "runs_stripped": self.runs_stripped,
+            "files_deleted": self.files_deleted,
+            "bytes_reclaimed": self.bytes_reclaimed,
+            "mb_reclaimed": round(self.bytes_reclaimed / (1024 * 1024), 2),
+            "bytes_by_policy": self.bytes_by_policy,
+            "error": self.error
+        }
+
+
+def _remove_paths(paths: List[Path]) -> Tuple[int, int]:
+    """
+    Delete files (and then the directories that contain them).
+
+    Args:
+        paths: Files and directories to remove; directories are removed when empty
+
+    Returns:
+        Tuple of (files deleted, bytes reclaimed)
+    """
+    files = 0
+    reclaimed = 0
+    for path in paths:
+        try:
+            if path.is_dir() and not path.is_symlink():
+                path.rmdir()
+                continue
+            size = path.lstat().st_size
+            path.unlink()
+        except FileNotFoundError:
+            continue
+        except OSError as e:
+            logger.warning(f"Retention: failed to remove {path}: {e}")
+            continue
+        files += 1
+        reclaimed += size
+    return files, reclaimed
+
+
+async def _remove_paths_paced(paths: List[Path], rate: float = 0) -> Tuple[int, int]:
+    """
+    Delete paths off the event loop, at most ``rate`` files per second.
+
+    Each batch is removed in a worker thread; the pause between batches is
+    awaited on the event loop so no executor thread sits idle while throttled.
+
+    Args:
+        paths: Files and directories to remove (see ``_remove_paths``)
+        rate: Maximum files deleted per second (0 = as fast as possible)
+
+    Returns:
+        Tuple of (files deleted, bytes reclaimed)
+    """
+    if rate <= 0:
+        return await asyncio.to_thread(_remove_paths, paths)
+    batch_size = max(1, int(rate * DELETE_BATCH_SECONDS))
+    files = 0
+    reclaimed = 0
+    started = time.monotonic()
+    for start in range(0, len(paths), batch_size):
+        batch_files, batch_bytes = await asyncio.to_thread(_remove_paths, paths[start:start + batch_size])
+        files += batch_files
+        reclaimed += batch_bytes
+        ahead = files / rate - (time.monotonic() - started)
+        if ahead > 0 and start + batch_size < len(paths):
+            await asyncio.sleep(ahead)
+    return files, reclaimed
+
+
+def _tree_paths(root: Path) -> List[Path]:
+    """All files of a tree followed by its directories, deepest first."""
+    files: List[Path] = []
+    dirs: List[Path] = []
+    for dirpath, dirnames, filenames in os.walk(root, topdown=False):
+        base = Path(dirpath)
+        files.extend(base / name for name in filenames)
+        dirs.extend(base / name for name in dirnames if (base / name).is_symlink())
+        dirs.append(base)
+    return files + dirs
+
+
+def _scan_run(run_dir: Path) -> RunUsage:
+    """Measure a run directory and read its base URL and run state."""
+    size = 0
+    count = 0
+    last_activity = run_dir.stat().st_mtime
+    for dirpath, _dirnames, filenames in os.walk(run_dir):
+        for name in filenames:
+            try:
+                stat = os.lstat(os.path.join(dirpath, name))
+            except OSError:
+                continue
+            size += stat.st_size
+            count += 1
+            last_activity = max(last_activity, stat.st_mtime)
+
+    base_url = None
+    state = None
+    for name in ("run_context.json", "discovery.json"):
+        artifact = run_dir / name
+        if artifact.exists():
+            try:
+                data = read_artifact(artifact)
+                base_url = data.get("base_url")
+                if name == "run_context.json":
+                    state = data.get("state")
+            except Exception as e:
+                logger.debug(f"[{run_dir.name}] Retention: unreadable {name}: {e}")
+            if base_url:
+                break
+
+    return RunUsage(
+        run_id=run_dir.name,
+        path=run_dir,
+        base_url=base_url,
+        size_bytes=size,
+        file_count=count,
+        last_activity=last_activity,
+        state=state
+    )
+
+
+class RetentionService:
+    """Applies artifact retention policies to the data directory."""
+
+    def __init__(
+        self,
+        data_dir: Optional[Path] = None,
+        temp_upload_dirs: Optional[List[Path]] = None,
+        interval_seconds: float = RETENTION_INTERVAL_SECONDS,
+        delete_rate: float = RETENTION_DELETE_RATE
+    ):
+        """
+        Initialize retention service.
+
+        Args:
+            data_dir: Directory holding one sub-directory per run (defaults to the
+                      router's data directory, see ``resolve_data_dir``)
+            temp_upload_dirs: Upload staging directories to clean (defaults to
+                              ``TEMP_UPLOADS_DIR``, where the upload endpoints write)
+            interval_seconds: Seconds between background sweeps
+            delete_rate: Files deleted per second by background sweeps
+        """
+        self.data_dir = Path(data_dir) if data_dir else resolve_data_dir()
+        self.temp_upload_dirs = temp_upload_dirs or [TEMP_UPLOADS_DIR, self.data_dir / "temp_uploads"]
+        self.interval_seconds = interval_seconds
+        self.delete_rate = delete_rate
+        self.keep_runs_per_base_url = RETENTION_KEEP_RUNS_PER_BASE_URL
+        self.max_age_days = RETENTION_MAX_AGE_DAYS
+        self.disk_quota_mb = RETENTION_DISK_QUOTA_MB
+        self.strip_media_after_days = RETENTION_STRIP_MEDIA_AFTER_DAYS
+        self.temp_uploads_max_age_hours = RETENTION_TEMP_UPLOADS_MAX_AGE_HOURS
+        self.active_grace_hours = RETENTION_ACTIVE_GRACE_HOURS
+
+        self._lock = asyncio.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self.sweeps = 0
+        self.total_bytes_reclaimed = 0
+        self.total_files_deleted = 0
+        self.total_runs_deleted = 0
+        self.last_report: Optional[SweepReport] = None
+
+    @property
+    def sweep_running(self) -> bool:
+        return self._lock.locked()
+
+    def policy(self) -> Dict[str, Any]:
+        """Effective retention policy."""
+        return {
+            "data_dir": str(self.data_dir),
+            "interval_seconds": self.interval_seconds,
+            "keep_runs_per_base_url": self.keep_runs_per_base_url,
+            "max_age_days": self.max_age_days,
+            "disk_quota_mb": self.disk_quota_mb,
+            "strip_media_after_days": self.strip_media_after_days,
+            "temp_uploads_max_age_hours": self.temp_uploads_max_age_hours,
+            "active_grace_hours": self.active_grace_hours,
+            "delete_rate": self.delete_rate
+        }
+
+    def stats(self) -> Dict[str, Any]:
+        """Cumulative reclaim statistics and the last sweep report."""
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "sweep_in_progress": self.sweep_running,
+            "sweeps": self.sweeps,
+            "total_runs_deleted": self.total_runs_deleted,
+            "total_files_deleted": self.total_files_deleted,
+            "total_bytes_reclaimed": self.total_bytes_reclaimed,
+            "total_mb_reclaimed": round(self.total_bytes_reclaimed / (1024 * 1024), 2),
+            "last_sweep": self.last_report.to_dict() if self.last_report else None,
+            "policy": self.policy()
+        }
+
+    def start(self):
+        """Start the background sweep loop on the running event loop."""
+        if self.interval_seconds <= 0:
+            logger.info("Retention sweeps disabled (RETENTION_INTERVAL_SECONDS=0)")
+            return
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run_loop())
+            logger.info(f"Retention service started (every {self.interval_seconds:.0f}s): {self.policy()}")
+
+    async def stop(self):
+        """Cancel the background sweep loop."""
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run_loop(self):
+        while True:
+            try:
+                await self.sweep()
+            except Exception as e:
+                logger.error(f"Retention sweep failed: {e}", exc_info=True)
+            await asyncio.sleep(self.interval_seconds)
+
+    async def remove_run_dir(self, run_dir: Path, rate: float = 0) -> Tuple[int, int]:
+        """
+        Delete a run directory off the event loop.
+
+        Args:
+            run_dir: Run directory to delete
+            rate: Maximum files deleted per second (0 = unthrottled)
+
+        Returns:
+            Tuple of (files deleted, bytes reclaimed)
+        """
+        paths = await asyncio.to_thread(_tree_paths, Path(run_dir))
+        return await _remove_paths_paced(paths, rate)
+
+    async def sweep(self, dry_run: bool = False) -> SweepReport:
+        """
+        Apply all retention policies once.
+
+        Args:
+            dry_run: Only report what would be removed
+
+        Returns:
+            SweepReport of the sweep
+        """
+        async with self._lock:
+            report = SweepReport(started_at=datetime.utcnow().isoformat() + "Z", dry_run=dry_run)
+            started = time.monotonic()
+            try:
+                await self._sweep(report)
+            except Exception as e:
+                report.error = str(e)
+                logger.error(f"Retention sweep failed: {e}", exc_info=True)
+            report.duration_seconds = time.monotonic() - started
+            report.finished_at = datetime.utcnow().isoformat() + "Z"
+
+            if not dry_run:
+                self.sweeps += 1
+                self.total_bytes_reclaimed += report.bytes_reclaimed
+                self.total_files_deleted += report.files_deleted
+                self.total_runs_deleted += len(report.runs_deleted)
+            self.last_report = report
+
+            if report.files_deleted or report.runs_deleted:
+                logger.info(
+                    f"Retention sweep{' (dry run)' if dry_run else ''}: "
+                    f"{len(report.runs_deleted)} runs deleted, {len(report.runs_stripped)} stripped, "
+                    f"{report.files_deleted} files, {report.bytes_reclaimed / (1024 * 1024):.1f} MB reclaimed"
+                )
+            return report
+
+    async def _sweep(self, report: SweepReport):
+        now = time.time()
+        await self._clean_temp_uploads(report, now)
+
+        if not self.data_dir.exists():
+            return
+        runs = await asyncio.to_thread(self._scan_runs)
+        report.runs_scanned = len(runs)
+
+        grace = self.active_grace_hours * 3600
+        candidates = [run for run in runs if run.collectable(now, grace)]
+        to_delete: Dict[str, str] = {}  # run_id -> policy
+
+        if self.max_age_days > 0:
+            max_age = self.max_age_days * 86400
+            for run in candidates:
+                if now - run.last_activity > max_age:
+                    to_delete.setdefault(run.run_id, "max_age")
+
+        if self.keep_runs_per_base_url > 0:
+            by_base_url: Dict[str, List[RunUsage]] = {}
+            for run in runs:
+                if run.base_url:
+                    by_base_url.setdefault(run.base_url, []).append(run)
+            for group in by_base_url.values():
+                group.sort(key=lambda r: r.last_activity, reverse=True)
+                for run in group[self.keep_runs_per_base_url:]:
+                    if run.collectable(now, grace):
+                        to_delete.setdefault(run.run_id, "keep_last")
+
+        if self.disk_quota_mb > 0:
+            quota = self.disk_quota_mb * 1024 * 1024
+            used = sum(run.size_bytes for run in runs if run.run_id not in to_delete)
+            for run in sorted(candidates, key=lambda r: r.last_activity):
+                if used <= quota:
+                    break
+                if run.run_id not in to_delete:
+                    to_delete[run.run_id] = "disk_quota"
+                    used -= run.size_bytes
+            if used > quota:
+                logger.warning(
+                    f"Retention: data directory still uses {used / (1024 * 1024):.1f} MB "
+                    f"(quota {self.disk_quota_mb:g} MB) after collecting all inactive runs"
+                )
+
+        for run in sorted(runs, key=lambda r: r.last_activity):
+            policy = to_delete.get(run.run_id)
+            if policy is None:
+                continue
+            await self._delete_run(run, policy, report)
+
+        if self.strip_media_after_days > 0:
+            strip_age = max(self.strip_media_after_days * 86400, grace)
+            for run in candidates:
+                if run.run_id not in to_delete and now - run.last_activity > strip_age:
+                    await self._strip_media(run, report)
+
+    def _scan_runs(self) -> List[RunUsage]:
+        runs = []
+        for run_dir in self.data_dir.iterdir():
+            if not run_dir.is_dir() or run_dir.name in NON_RUN_DIRS or run_dir.name.startswith("."):
+                continue
+            try:
+                runs.append(_scan_run(run_dir))
+            except OSError as e:
+                logger.warning(f"[{run_dir.name}] Retention: failed to scan run: {e}")
+        return runs
+
+    async def _delete_run(self, run: RunUsage, policy: str, report: SweepReport):
+        report.runs_deleted.append(run.run_id)
+        if report.dry_run:
+            report.add(policy, run.file_count, run.size_bytes)
+            return
+        await _delete_run_records(run.run_id)
+        files, reclaimed = await self.remove_run_dir(run.path, rate=self.delete_rate)
+        report.add(policy, files, reclaimed)
+        RETENTION_RECLAIMED_BYTES.labels(policy).inc(reclaimed)
+        logger.info(
+            f"[{run.run_id}] Retention ({policy}): deleted run of {run.base_url or 'unknown base URL'}, "
+            f"{files} files, {reclaimed / (1024 * 1024):.1f} MB"
+        )
+
+    async def _strip_media(self, run: RunUsage, report: SweepReport):
+        media = await asyncio.to_thread(
+            lambda: [p for p in run.path.rglob("*") if p.suffix.lower() in MEDIA_SUFFIXES and p.is_file()]
+        )
+        if not media:
+            return
+        report.runs_stripped.append(run.run_id)
+        if report.dry_run:
+            report.add("strip_media", len(media), sum(p.stat().st_size for p in media))
+            return
+        files, reclaimed = await _remove_paths_paced(media, self.delete_rate)
+        report.add("strip_media", files, reclaimed)
+        RETENTION_RECLAIMED_BYTES.labels("strip_media").inc(reclaimed)
+        logger.info(f"[{run.run_id}] Retention (strip_media): removed {files} media files, {reclaimed / (1024 * 1024):.1f} MB")
+
+    async def _clean_temp_uploads(self, report: SweepReport, now: float):
+        if self.temp_uploads_max_age_hours <= 0:
+            return
+        max_age = self.temp_uploads_max_age_hours * 3600
+
+        def collect() -> List[Path]:
+            expired: List[Path] = []
+            seen = set()
+            for upload_dir in self.temp_upload_dirs:
+                if not upload_dir.exists() or upload_dir.resolve() in seen:
+                    continue
+                seen.add(upload_dir.resolve())
+                for path in upload_dir.rglob("*"):
+                    try:
+                        if path.is_file() and now - path.stat().st_mtime > max_age:
+                            expired.append(path)
+                    except OSError:
+                        continue
+            return expired
+
+        expired = await asyncio.to_thread(collect)
+        if not expired:
+            return
+        if report.dry_run:
+            report.add("temp_uploads", len(expired), sum(p.stat().st_size for p in expired if p.exists()))
+            return
+        files, reclaimed = await _remove_paths_paced(expired, self.delete_rate)
+        report.add("temp_uploads", files, reclaimed)
+        RETENTION_RECLAIMED_BYTES.labels("temp_uploads").inc(reclaimed)
+
+
+async def _delete_run_records(run_id: str):
+    """Delete the database records of a collected run (same tables as ``DELETE /runs/{run_id}``)."""
+    try:
+        from sqlalchemy import delete
+        from app.database import get_db
+        from app.models.database import Run, Page, TestCase, RunComparison
+
+        async for db in get_db():
+            try:
+                await db.execute(
+                    delete(RunComparison).where(
+                        (RunComparison.run_id_a == run_id) | (RunComparison.run_id_b == run_id)
+                    )
+                )
+                await db.execute(delete(TestCase).where(TestCase.run_id == run_id))
+                await db.execute(delete(Page).where(Page.run_id == run_id))
+                await db.execute(delete(Run).where(Run.run_id == run_id))
+                await db.commit()
+            except Exception as e:
+                await db.rollback()
+                logger.warning(f"[{run_id}] Retention: failed to delete database records: {e}")
+            break
+    except Exception as e:
+        logger.warning(f"[{run_id}] Retention: database cleanup skipped: {e}")
+
+
+# Global retention service instance
+_retention_service: Optional[RetentionService] = None
+
+
+def get_retention_service() -> RetentionService:
+    """Get global retention service instance."""
+    global _retention_service
+    if _retention_service is None:
+        _retention_service = RetentionService()
+    return _retention_service
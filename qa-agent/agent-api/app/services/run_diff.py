@@ -0,0 +1,246 @@
+"""Run diff engine that matches pages by route template and structural fingerprint."""
+
+import re
+import json
+import hashlib
+import logging
+from typing import Dict, Any, List, Tuple, Iterable
+from urllib.parse import urlparse
+
+logger = logging.getLogger(__name__)
+
+# Path segments that identify a record rather than a route
+_ID_SEGMENT_PATTERNS = [
+    re.compile(r"^\d+$"),  # numeric IDs
+    re.compile(r"^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$", re.I),  # UUIDs
+    re.compile(r"^[0-9a-f]{16,}$", re.I),  # hex hashes / object IDs
+    re.compile(r"^(?=.*\d)[A-Za-z0-9_-]{20,}$"),  # long opaque tokens containing digits
+]
+
+
+def _hash(value: Any) -> str:
+    """Stable short hash of a JSON-serializable value."""
+    payload = json.dumps(value, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()[:16]
+
+
+def _template_segments(path: str) -> List[str]:
+    segments = []
+    for segment in path.split("/"):
+        if not segment:
+            continue
+        if any(p.match(segment) for p in _ID_SEGMENT_PATTERNS):
+            segments.append("{id}")
+        else:
+            segments.append(segment.lower())
+    return segments
+
+
+def normalize_route(url: str) -> str:
+    """
+    Reduce a URL to its route template.
+
+    Query strings are dropped and ID-like path segments become ``{id}``.
+    Hash routes (``/#/projects/42``) are kept since SPAs route on them.
+    """
+    if not url:
+        return "/"
+    parsed = urlparse(url)
+    route = "/" + "/".join(_template_segments(parsed.path))
+    fragment = parsed.fragment.split("?", 1)[0]
+    if fragment.startswith("/"):
+        route = route.rstrip("/") + "/#/" + "/".join(_template_segments(fragment))
+    return route
+
+
+def _form_key(form: Dict[str, Any]) -> str:
+    return f"{(form.get('method') or 'GET').upper()} {normalize_route(form.get('action') or '')}"
+
+
+def _field_key(field: Dict[str, Any]) -> str:
+    return f"{field.get('name') or field.get('label') or ''}:{field.get('type') or ''}"
+
+
+def extract_structure(page_data: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Extract the comparable structure of a discovered page.
+
+    Returns:
+        Dict with ``forms`` (form key -> sorted field keys), ``actions`` and
+        ``tables`` (sorted column lists).
+    """
+    forms: Dict[str, List[str]] = {}
+    for form in page_data.get("forms") or []:
+        key = _form_key(form)
+        fields = sorted(_field_key(f) for f in form.get("fields") or [])
+        # Two forms with the same action/method: keep them distinct
+        while key in forms:
+            key += "'"
+        forms[key] = fields
+
+    actions = sorted({
+        (a.get("text") or "").strip().lower()
+        for a in page_data.get("primary_actions") or []
+        if (a.get("text") or "").strip()
+    })
+    tables = sorted(
+        [str(c) for c in (t.get("columns") or t.get("headers") or [])]
+        for t in page_data.get("tables") or []
+    )
+    return {"forms": forms, "actions": actions, "tables": tables}
+
+
+def structural_fingerprint(page_data: Dict[str, Any]) -> str:
+    """Hash of a page's forms, fields, actions and table columns."""
+    return _hash(extract_structure(page_data))
+
+
+def run_content_hash(page_keys: Iterable[Tuple[str, str]], test_ids: Iterable[str]) -> str:
+    """Hash identifying a stored run's pages (route, fingerprint) and test case IDs."""
+    return hashlib.sha256(
+        json.dumps([sorted(page_keys), sorted(test_ids)], separators=(",", ":")).encode("utf-8")
+    ).hexdigest()
+
+
+def _diff_sets(before: Iterable[str], after: Iterable[str]) -> Dict[str, List[str]]:
+    before, after = set(before), set(after)
+    return {"added": sorted(after - before), "removed": sorted(before - after)}
+
+
+class RunDiffEngine:
+    """Diff two runs' pages by route template plus structural fingerprint."""
+
+    def match_pages(
+        self,
+        pages_a: List[Dict[str, Any]],
+        pages_b: List[Dict[str, Any]]
+    ) -> Tuple[List[Tuple[Dict[str, Any], Dict[str, Any]]], List[Dict[str, Any]], List[Dict[str, Any]]]:
+        """
+        Pair pages across runs.
+
+        Each page dict needs ``route_template`` and ``fingerprint``. Pages that
+        share a template are paired by identical fingerprint first, then by URL,
+        then in discovery order.
+
+        Returns:
+            (matched pairs, added pages, removed pages)
+        """
+        by_route_a: Dict[str, List[Dict[str, Any]]] = {}
+        by_route_b: Dict[str, List[Dict[str, Any]]] = {}
+        for p in pages_a:
+            by_route_a.setdefault(p["route_template"], []).append(p)
+        for p in pages_b:
+            by_route_b.setdefault(p["route_template"], []).append(p)
+
+        matched: List[Tuple[Dict[str, Any], Dict[str, Any]]] = []
+        added: List[Dict[str, Any]] = []
+        removed: List[Dict[str, Any]] = []
+
+        for route in sorted(by_route_a.keys() | by_route_b.keys()):
+            left = list(by_route_a.get(route, []))
+            right = list(by_route_b.get(route, []))
+
+            for key in ("fingerprint", "url"):
+                if not left or not right:
+                    break
+                index: Dict[str, List[Dict[str, Any]]] = {}
+                for p in right:
+                    index.setdefault(p[key], []).append(p)
+                remaining_left = []
+                for p in left:
+                    candidates = index.get(p[key])
+                    if candidates:
+                        matched.append((p, candidates.pop(0)))
+                    else:
+                        remaining_left.append(p)
+                left = remaining_left
+                right = [p for bucket in index.values() for p in bucket]
+
+            pairs = min(len(left), len(right))
+            matched.extend(zip(left[:pairs], right[:pairs]))
+            removed.extend(left[pairs:])
+            added.extend(right[pairs:])
+
+        return matched, added, removed
+
+    def diff_structures(self, structure_a: Dict[str, Any], structure_b: Dict[str, Any]) -> Dict[str, Any]:
+        """Describe form/field/action/table differences between two page structures."""
+        forms_a = structure_a.get("forms", {})
+        forms_b = structure_b.get("forms", {})
+        form_changes = _diff_sets(forms_a.keys(), forms_b.keys())
+        changed_forms = []
+        for key in sorted(forms_a.keys() & forms_b.keys()):
+            if _hash(forms_a[key]) != _hash(forms_b[key]):
+                changed_forms.append({"form": key, "fields": _diff_sets(forms_a[key], forms_b[key])})
+        form_changes["changed"] = changed_forms
+
+        tables_a = [",".join(t) for t in structure_a.get("tables", [])]
+        tables_b = [",".join(t) for t in structure_b.get("tables", [])]
+
+        return {
+            "forms": form_changes,
+            "actions": _diff_sets(structure_a.get("actions", []), structure_b.get("actions", [])),
+            "tables": _diff_sets(tables_a, tables_b),
+        }
+
+    async def diff(
+        self,
+        pages_a: List[Dict[str, Any]],
+        pages_b: List[Dict[str, Any]],
+        page_data_loader=None
+    ) -> Dict[str, Any]:
+        """
+        Compute the page section of a run comparison.
+
+        Args:
+            pages_a: Lightweight page rows of the baseline run
+            pages_b: Lightweight page rows of the new run
+            page_data_loader: Optional async callable ``ids -> {id: page_data}`` used to
+                fetch full page data only for pages whose fingerprint changed
+
+        Returns:
+            Dict with added/removed/changed pages and the unchanged count
+        """
+        matched, added, removed = self.match_pages(pages_a, pages_b)
+        changed_pairs = [(a, b) for a, b in matched if a["fingerprint"] != b["fingerprint"]]
+
+        page_data: Dict[Any, Dict[str, Any]] = {}
+        if changed_pairs and page_data_loader is not None:
+            ids = [p["id"] for pair in changed_pairs for p in pair]
+            page_data = await page_data_loader(ids) or {}
+
+        changed = []
+        for a, b in changed_pairs:
+            entry = {
+                "url": b["url"],
+                "previous_url": a["url"] if a["url"] != b["url"] else None,
+                "route_template": b["route_template"],
+                "changes": {
+                    "forms": {"before": a.get("forms_count", 0), "after": b.get("forms_count", 0)},
+                    "tables": {"before": a.get("tables_count", 0), "after": b.get("tables_count", 0)},
+                    "buttons": {"before": a.get("buttons_count", 0), "after": b.get("buttons_count", 0)},
+                },
+            }
+            if a["id"] in page_data and b["id"] in page_data:
+                entry["structure"] = self.diff_structures(
+                    extract_structure(page_data[a["id"]]),
+                    extract_structure(page_data[b["id"]])
+                )
+            changed.append(entry)
+
+        return {
+            "added": [{"url": p["url"], "title": p.get("title"), "route_template": p["route_template"]} for p in added],
+            "removed": [{"url": p["url"], "title": p.get("title"), "route_template": p["route_template"]} for p in removed],
+            "changed": changed,
+            "unchanged": len(matched) - len(changed),
+            "moved": sum(1 for a, b in matched if a["url"] != b["url"]),
+        }
+
+
+# Global diff engine instance
+_run_diff_engine = RunDiffEngine()
+
+
+def get_run_diff_engine() -> RunDiffEngine:
+    """Get global run diff engine instance."""
+    return _run_diff_engine
@@ -1,6 +1,5 @@
 """Run store for managing run contexts with persistence."""
 
-import json
 import logging
 from pathlib import Path
 from typing import Optional, Dict, List
@@ -9,9 +8,30 @@ from datetime import datetime
 from app.models.run_context import RunContext, AuthConfig
 from app.models.ai_config import AIConfig
 from app.models.run_state import RunState
+from app.services.artifact_io import read_artifact, write_artifact
 
 logger = logging.getLogger(__name__)
 
+# Staging directory of the image/document upload endpoints
+TEMP_UPLOADS_DIR = Path("agent-api/data/temp_uploads")
+
+
+def resolve_data_dir(base_path: Optional[Path] = None) -> Path:
+    """
+    Resolve the directory holding one sub-directory per run.
+
+    Args:
+        base_path: Run store base path (defaults to ./data)
+
+    Returns:
+        ``base_path`` if it exists, otherwise ``agent-api/data`` (server started
+        from the repository root)
+    """
+    data_dir = Path(base_path or "data")
+    if not data_dir.exists():
+        data_dir = Path("agent-api/data")
+    return data_dir
+
 
 class RunStore:
     """In-memory run store with optional JSON persistence."""
@@ -160,8 +180,7 @@ class RunStore:
         # Convert RunState enum to string
         context_dict["state"] = context.state.value
         
-        with open(file_path, "w") as f:
-            json.dump(context_dict, f, indent=2, default=str)
+        write_artifact(file_path, context_dict)
         
         logger.debug(f"Saved run context: {file_path}")
     
@@ -180,8 +199,7 @@ class RunStore:
             return None
         
         try:
-            with open(file_path) as f:
-                data = json.load(f)
+            data = read_artifact(file_path)
             
             # Convert state string back to enum
             if "state" in data:
@@ -5,12 +5,15 @@ This service automatically generates test cases as pages are discovered,
 providing real-time visibility into what will be tested.
 """
 
-import json
 import logging
 from typing import Dict, List, Any
 from pathlib import Path
 from datetime import datetime
 
+from app.services.test_case_index import get_test_case_index_cache
+from app.services.event_bus import get_event_bus
+from app.services.artifact_io import read_artifact, write_artifact
+
 logger = logging.getLogger(__name__)
 
 
@@ -372,8 +375,10 @@ class TestCaseGenerator:
             "all_test_cases": test_cases
         }
 
-        with open(test_cases_file, "w") as f:
-            json.dump(data, f, indent=2)
+        write_artifact(test_cases_file, data)
+
+        # Selection index is rebuilt lazily from this data on the next execute-tests call
+        get_test_case_index_cache().prime(run_id, test_cases_file, data)
 
         logger.info(f"[{run_id}] Saved {len(test_cases)} test cases to {test_cases_file}")
 
@@ -394,11 +399,10 @@ class TestCaseGenerator:
         existing_ids = set()
         if test_cases_file.exists():
             try:
-                with open(test_cases_file, "r") as f:
-                    existing_data = json.load(f)
-                    all_test_cases = existing_data.get("all_test_cases", [])
-                    # Track existing test case IDs to prevent duplicates
-                    existing_ids = {tc.get("id") for tc in all_test_cases if tc.get("id")}
+                existing_data = read_artifact(test_cases_file)
+                all_test_cases = existing_data.get("all_test_cases", [])
+                # Track existing test case IDs to prevent duplicates
+                existing_ids = {tc.get("id") for tc in all_test_cases if tc.get("id")}
             except Exception as e:
                 logger.warning(f"[{run_id}] Failed to load existing test cases: {e}")
 
@@ -425,23 +429,18 @@ class TestCaseGenerator:
         test_case: Dict[str, Any]
     ):
         """Emit event for newly generated test case."""
-        events_file = Path(artifacts_path) / "events.jsonl"
-
-        event = {
-            "timestamp": datetime.utcnow().isoformat() + "Z",
-            "type": "test_case_generated",
-            "data": {
+        get_event_bus(run_id, artifacts_path).emit(
+            "test_case_generated",
+            {
                 "test_case_id": test_case.get("id"),
                 "test_case_name": test_case.get("name"),
                 "test_type": test_case.get("type"),
                 "priority": test_case.get("priority"),
                 "page_name": test_case.get("page_name"),
                 "page_url": test_case.get("page_url")
-            }
-        }
-
-        with open(events_file, "a") as f:
-            f.write(json.dumps(event) + "\n")
+            },
+            source="generation"
+        )
 
     # Helper methods
 
@@ -0,0 +1,205 @@
+"""Per-run test case index for fast selection by ID."""
+
+import copy
+import logging
+import re
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, Any, List, Optional, Tuple
+
+from app.services.artifact_io import read_artifact
+
+logger = logging.getLogger(__name__)
+
+# Separators used in generated test IDs (e.g. "TC_LOGIN_001", "scenario-3-2")
+_ID_SEPARATORS = re.compile(r"[_\-.]")
+
+
+def _test_case_id(tc: Dict[str, Any]) -> str:
+    return tc.get("id") or tc.get("test_id") or ""
+
+
+def flatten_scenarios(test_cases_data: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Flatten test_cases.json scenarios into one ordered list of test cases."""
+    all_test_cases: List[Dict[str, Any]] = []
+    for scenario in test_cases_data.get("scenarios", []):
+        all_test_cases.extend(scenario.get("test_cases", []))
+    return all_test_cases
+
+
+class TestCaseIndex:
+    """
+    Lookup structure over a run's test cases.
+
+    Resolves a requested ID with the same precedence the execute endpoint has
+    always used (exact, case-insensitive, ID suffix, then name), but the first
+    three are dictionary lookups. Only IDs that miss every index fall back to
+    a scan.
+    """
+
+    def __init__(self, test_cases: List[Dict[str, Any]]):
+        self.test_cases = test_cases
+        self._exact: Dict[str, int] = {}
+        self._casefolded: Dict[str, int] = {}
+        self._suffixes: Dict[str, int] = {}
+
+        for position, tc in enumerate(test_cases):
+            tc_id = _test_case_id(tc)
+            if not tc_id:
+                continue
+            self._exact.setdefault(tc_id, position)
+            self._casefolded.setdefault(tc_id.casefold(), position)
+            for suffix in self._id_suffixes(tc_id):
+                self._suffixes.setdefault(suffix, position)
+
+    @classmethod
+    def from_test_cases_data(cls, test_cases_data: Dict[str, Any]) -> "TestCaseIndex":
+        return cls(flatten_scenarios(test_cases_data))
+
+    @staticmethod
+    def _id_suffixes(tc_id: str) -> List[str]:
+        """Every separator-aligned suffix of an ID ("A_B_C" -> "A_B_C", "B_C", "C")."""
+        suffixes = [tc_id]
+        for match in _ID_SEPARATORS.finditer(tc_id):
+            suffix = tc_id[match.end():]
+            if suffix:
+                suffixes.append(suffix)
+        return suffixes
+
+    def __len__(self) -> int:
+        return len(self.test_cases)
+
+    def find(self, requested_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Resolve one requested ID.
+
+        Returns:
+            (test case, strategy) where strategy is "exact", "case_insensitive",
+            "partial" or "name"; (None, None) when nothing matches
+        """
+        position = self._exact.get(requested_id)
+        if position is not None:
+            return self.test_cases[position], "exact"
+
+        position = self._casefolded.get(requested_id.casefold())
+        if position is not None:
+            return self.test_cases[position], "case_insensitive"
+
+        # Format: feature_name_test_id or scenario_X_Y -> match on the trailing part
+        parts = requested_id.split("_")
+        if len(parts) > 1:
+            id_part = parts[-1]
+            position = self._suffixes.get(id_part)
+            if position is not None:
+                return self.test_cases[position], "partial"
+            for tc in self.test_cases:
+                tc_id = _test_case_id(tc)
+                if id_part in tc_id:
+                    return tc, "partial"
+
+        name_lower = requested_id.lower()
+        for tc in self.test_cases:
+            tc_name = (tc.get("name") or tc.get("test_name") or "").lower()
+            if name_lower in tc_name or tc_name in name_lower:
+                return tc, "name"
+
+        return None, None
+
+    def select(self, requested_ids: List[str]) -> Tuple[List[Dict[str, Any]], List[str]]:
+        """
+        Resolve requested IDs in order.
+
+        Selected test cases are deep copies, so callers can enrich them
+        (e.g. add steps) without mutating the cached index.
+
+        Returns:
+            (selected test cases, IDs that could not be matched)
+        """
+        selected: List[Dict[str, Any]] = []
+        unmatched: List[str] = []
+        for requested_id in requested_ids:
+            tc, _ = self.find(requested_id)
+            if tc is None:
+                unmatched.append(requested_id)
+            else:
+                selected.append(copy.deepcopy(tc))
+        return selected, unmatched
+
+
+class TestCaseIndexCache:
+    """
+    In-memory cache of test case indexes keyed by run.
+
+    Entries are primed whenever test_cases.json is saved and validated against
+    the file's mtime/size on lookup, so edits from other writers are picked up.
+    The index itself is built lazily on first lookup, which keeps incremental
+    saves during discovery O(1) here.
+    """
+
+    def __init__(self, max_runs: int = 16):
+        self.max_runs = max_runs
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def _stamp(test_cases_file: Path) -> Optional[Tuple[int, int]]:
+        try:
+            stat = test_cases_file.stat()
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+
+    def prime(self, run_id: str, test_cases_file: Path, test_cases_data: Dict[str, Any]) -> None:
+        """Record freshly saved test case data for a run."""
+        with self._lock:
+            self._entries[run_id] = {
+                "file": str(test_cases_file),
+                "stamp": self._stamp(test_cases_file),
+                "data": test_cases_data,
+                "index": None,
+            }
+            self._entries.move_to_end(run_id)
+            while len(self._entries) > self.max_runs:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, run_id: str) -> None:
+        with self._lock:
+            self._entries.pop(run_id, None)
+
+    def get(self, run_id: str, test_cases_file: Path) -> Optional[TestCaseIndex]:
+        """Get the index for a run, (re)loading test_cases.json only if it changed."""
+        stamp = self._stamp(test_cases_file)
+        if stamp is None:
+            self.invalidate(run_id)
+            return None
+
+        with self._lock:
+            entry = self._entries.get(run_id)
+            if entry and (entry["file"] != str(test_cases_file) or entry["stamp"] != stamp):
+                entry = None
+
+        if entry is None:
+            test_cases_data = read_artifact(test_cases_file)
+            self.prime(run_id, test_cases_file, test_cases_data)
+            with self._lock:
+                entry = self._entries[run_id]
+
+        if entry["index"] is None:
+            entry["index"] = TestCaseIndex.from_test_cases_data(entry["data"])
+            entry["data"] = None  # The index keeps the test case dicts
+            logger.info(f"[{run_id}] Built test case index with {len(entry['index'])} test cases")
+
+        with self._lock:
+            if run_id in self._entries:
+                self._entries.move_to_end(run_id)
+        return entry["index"]
+
+
+# Global test case index cache
+_test_case_index_cache = TestCaseIndexCache()
+
+
+def get_test_case_index_cache() -> TestCaseIndexCache:
+    """Get global test case index cache instance."""
+    return _test_case_index_cache
@@ -1,6 +1,5 @@
 """Test executor service for executing test plans."""
 
-import json
 import re
 import time
 import asyncio
@@ -12,6 +11,9 @@ from urllib.parse import urlparse
 
 from app.models.run_state import RunState
 from app.models.run_context import Question
+from app.services.metrics import ACTIVE_EXECUTIONS, QUEUE_DEPTH
+from app.services.event_bus import get_event_bus, close_event_bus
+from app.services.artifact_io import write_artifact, compress_run_artifacts
 
 logger = logging.getLogger(__name__)
 
@@ -32,16 +34,9 @@ class TestExecutor:
     """Service for executing test plans."""
     
     def _emit_event(self, run_id: str, artifacts_path: str, event_type: str, data: Dict[str, Any]):
-        """Emit a test execution event to the events.jsonl file."""
+        """Publish a test execution event on the run's event bus (written to events.jsonl)."""
         try:
-            event = {
-                "timestamp": datetime.utcnow().isoformat() + "Z",
-                "type": event_type,
-                "data": data
-            }
-            events_file = Path(artifacts_path) / "events.jsonl"
-            with open(events_file, "a", encoding="utf-8") as f:
-                f.write(json.dumps(event, default=str) + "\n")
+            get_event_bus(run_id, artifacts_path).emit(event_type, data, source="execution")
         except Exception as e:
             logger.warning(f"[{run_id}] Failed to emit event: {e}")
     
@@ -67,6 +62,9 @@ class TestExecutor:
                 - next_state: RunState (REPORT_GENERATE or DONE)
                 - question: Optional[Question] (if unsafe deletes detected)
         """
+        ACTIVE_EXECUTIONS.inc()
+        # This run's share of the shared queue gauge (runs overlap, so only inc/dec it)
+        queued_tests = 0
         try:
             tests = test_plan.get("tests", [])
             total_tests = len(tests)
@@ -138,6 +136,8 @@ class TestExecutor:
             })
             
             for idx, test in enumerate(tests):
+                QUEUE_DEPTH.labels("execution_tests").inc(total_tests - idx - queued_tests)
+                queued_tests = total_tests - idx
                 test_id = test.get('id', f'TEST-{idx}')
                 test_name = test.get('name', 'Unknown')
                 steps_count = len(test.get("steps", []))
@@ -221,8 +221,7 @@ class TestExecutor:
             
             # Save report to JSON file
             report_file = artifacts_dir / "report.json"
-            with open(report_file, "w") as f:
-                json.dump(report, f, indent=2, default=str)
+            write_artifact(report_file, report)
             
             logger.info(f"[{run_id}] ===== TEST EXECUTION COMPLETED =====")
             logger.info(f"[{run_id}] Summary: {report['passed']} passed, {report['failed']} failed, {report['skipped']} skipped")
@@ -260,8 +259,7 @@ class TestExecutor:
             artifacts_dir = Path(artifacts_path)
             artifacts_dir.mkdir(parents=True, exist_ok=True)
             report_file = artifacts_dir / "report.json"
-            with open(report_file, "w") as f:
-                json.dump(report, f, indent=2, default=str)
+            write_artifact(report_file, report)
             
             return {
                 "report": report,
@@ -269,6 +267,15 @@ class TestExecutor:
                 "question": None,
                 "unsafe_deletes": None
             }
+
+        finally:
+            ACTIVE_EXECUTIONS.dec()
+            QUEUE_DEPTH.labels("execution_tests").dec(queued_tests)
+            await close_event_bus(run_id, artifacts_path)
+            try:
+                await asyncio.to_thread(compress_run_artifacts, artifacts_path)
+            except Exception as e:
+                logger.warning(f"[{run_id}] Failed to compress execution artifacts: {e}")
     
     def _check_unsafe_deletes(self, test_plan: Dict[str, Any], run_id: str) -> List[Dict[str, Any]]:
         """Check for unsafe DELETE operations."""
@@ -1184,17 +1191,16 @@ class TestExecutor:
             if network_logs:
                 network_file = artifacts_dir / f"test_{test_index:03d}_step_{step_index:03d}_network.json"
                 try:
-                    with open(network_file, "w") as f:
-                        json.dump({
-                            "step_index": step_index,
-                            "test_index": test_index,
-                            "page_url": page.url,
-                            "network_logs": network_logs,
-                            "network_errors": network_errors,
-                            "total_requests": len([l for l in network_logs if l.get("type") == "request"]),
-                            "total_responses": len([l for l in network_logs if l.get("type") == "response"]),
-                            "error_count": len(network_errors)
-                        }, f, indent=2, default=str)
+                    write_artifact(network_file, {
+                        "step_index": step_index,
+                        "test_index": test_index,
+                        "page_url": page.url,
+                        "network_logs": network_logs,
+                        "network_errors": network_errors,
+                        "total_requests": len([l for l in network_logs if l.get("type") == "request"]),
+                        "total_responses": len([l for l in network_logs if l.get("type") == "response"]),
+                        "error_count": len(network_errors)
+                    })
                     
                     step_result["network_info"] = {
                         "network_logs_file": str(network_file.relative_to(artifacts_dir)),
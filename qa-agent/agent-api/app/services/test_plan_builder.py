@@ -1,6 +1,5 @@
 """Test plan builder service for generating test plans based on user intent."""
 
-import json
 import logging
 from pathlib import Path
 from typing import Dict, Any, List, Optional, Set
@@ -8,6 +7,7 @@ from urllib.parse import urlparse
 
 from app.models.run_state import RunState
 from app.models.run_context import Question, QuestionOption
+from app.services.artifact_io import read_artifact, write_artifact
 
 logger = logging.getLogger(__name__)
 
@@ -45,8 +45,7 @@ class TestPlanBuilder:
             if not discovery_file.exists():
                 raise FileNotFoundError("discovery.json not found")
             
-            with open(discovery_file) as f:
-                discovery_data = json.load(f)
+            discovery_data = read_artifact(discovery_file)
             
             base_url = discovery_data.get("base_url", "")
             pages = discovery_data.get("pages", [])
@@ -125,8 +124,7 @@ class TestPlanBuilder:
             
             # Save test plan to JSON file
             plan_file = discovery_dir / "test_plan.json"
-            with open(plan_file, "w") as f:
-                json.dump(test_plan, f, indent=2, default=str)
+            write_artifact(plan_file, test_plan)
             
             logger.info(f"[{run_id}] Test plan generated: {test_plan['total_tests']} tests")
             
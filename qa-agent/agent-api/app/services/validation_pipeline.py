@@ -0,0 +1,264 @@
+"""
+Validation Pipeline - Single-visit validation of discovered pages.
+
+Validators register as stages. For every page the pipeline captures one DOM
+snapshot and runs the selected stages against the already loaded page, so
+each page is loaded and interacted with once. Stages record what they
+exercised in a shared observation store (feature -> outcome); later
+consumers (interaction testing, health checks) read the store instead of
+re-navigating to the page and repeating the same interactions.
+"""
+
+import logging
+from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+# Canonical feature names used in the observation store
+FEATURE_ALIASES = {
+    "sorting": "sort",
+    "crud operations": "crud",
+    "bulk operations": "bulk_operations",
+}
+
+# One round trip: counts of everything the validators and health checks look for
+DOM_SNAPSHOT_SCRIPT = """
+() => {
+    const count = (selector) => {
+        try { return document.querySelectorAll(selector).length; } catch (e) { return 0; }
+    };
+    return {
+        tables: count("table, [role='table']"),
+        rows: count("table tbody tr, [role='row']"),
+        headers: count("table thead th, [role='columnheader']"),
+        search_inputs: count("input[type='search'], input[placeholder*='search' i], input[aria-label*='search' i], [role='searchbox']"),
+        filter_controls: count("select, [role='combobox'], [data-testid*='filter']"),
+        sortable_headers: count("th[aria-sort], th.sortable, th[class*='sort']"),
+        pagination_controls: count("[aria-label*='pagination' i], .pagination, [class*='paginat'], [data-testid*='pagination']"),
+        forms: count("form"),
+        buttons: count("button"),
+        links: count("a[href]")
+    };
+}
+"""
+
+
+def canonical_feature(name: str) -> str:
+    """Normalize validator feature names ("Sorting", "CRUD Operations", ...) to store keys."""
+    key = (name or "").strip().lower()
+    return FEATURE_ALIASES.get(key, key.replace(" ", "_"))
+
+
+@dataclass
+class PageVisit:
+    """State shared by all stages validating one loaded page."""
+    page: Any
+    page_info: Dict[str, Any]
+    run_id: str
+    artifacts_path: Any
+    snapshot: Dict[str, Any] = field(default_factory=dict)
+    observations: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    results: Dict[str, Any] = field(default_factory=dict)
+
+    @property
+    def url(self) -> str:
+        return self.page_info.get("url", "")
+
+    def observe(self, feature: str, status: str, source: str, **details) -> None:
+        """Record the outcome of exercising a feature (see ``record_observation``)."""
+        record_observation(self.observations, feature, status, source, **details)
+
+
+def record_observation(
+    observations: Dict[str, Dict[str, Any]],
+    feature: str,
+    status: str,
+    source: str,
+    **details
+) -> None:
+    """
+    Record the outcome of exercising a feature in an observation store.
+
+    The first real outcome wins; a "skipped" observation is replaced by a later
+    one, since a skipped feature is exercised again by the next consumer.
+    """
+    key = canonical_feature(feature)
+    existing = observations.get(key)
+    if existing is not None and (existing.get("status") != "skipped" or status == "skipped"):
+        return
+    observations[key] = {
+        "status": status,
+        "source": source,
+        **details
+    }
+
+
+def get_observations(page_info: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """Observation store of a page visited through the pipeline (created empty if missing)."""
+    return page_info.setdefault("observations", {})
+
+
+def was_exercised(page_info: Dict[str, Any], feature: str) -> bool:
+    """Whether a feature of the page was already interacted with during its visit."""
+    observation = page_info.get("observations", {}).get(canonical_feature(feature))
+    return bool(observation) and observation.get("status") != "skipped"
+
+
+class ValidationStage(ABC):
+    """A validator run as part of a page visit."""
+
+    name: str = ""
+    result_key: str = ""  # page_info key the stage's report is stored under
+
+    def applies(self, visit: PageVisit) -> bool:
+        return True
+
+    @abstractmethod
+    async def run(self, visit: PageVisit) -> Dict[str, Any]:
+        """Validate the loaded page and record observations on ``visit``."""
+
+
+class LiveValidationStage(ValidationStage):
+    """Runs ``LiveValidator.validate_page_live`` on the visit."""
+
+    name = "live"
+    result_key = "validation_results"
+
+    def __init__(self, live_validator):
+        self.validator = live_validator
+
+    async def run(self, visit: PageVisit) -> Dict[str, Any]:
+        results = await self.validator.validate_page_live(
+            page=visit.page,
+            page_info=visit.page_info,
+            run_id=visit.run_id,
+            artifacts_path=visit.artifacts_path
+        )
+        for validation in results.get("validations", []):
+            visit.observe(
+                validation.get("type", ""),
+                validation.get("status", "pending"),
+                self.name,
+                reason=validation.get("reason") or validation.get("failure_reason") or validation.get("error")
+            )
+        return results
+
+
+class ProductionValidationStage(ValidationStage):
+    """Runs ``ProductionValidator.validate_page_production`` on the visit."""
+
+    name = "production"
+    result_key = "production_validation"
+
+    def __init__(self, production_validator):
+        self.validator = production_validator
+
+    async def run(self, visit: PageVisit) -> Dict[str, Any]:
+        results = await self.validator.validate_page_production(
+            page=visit.page,
+            page_info=visit.page_info,
+            run_id=visit.run_id,
+            artifacts_path=visit.artifacts_path
+        )
+        for feature in results.get("features_tested", []):
+            visit.observe(
+                feature.get("feature", ""),
+                feature.get("status", "pending"),
+                self.name,
+                score=feature.get("score")
+            )
+        return results
+
+
+class ValidationPipeline:
+    """Run registered validation stages against a single visit of each page."""
+
+    def __init__(self, stages: Optional[List[ValidationStage]] = None):
+        self.stages: Dict[str, ValidationStage] = {}
+        for stage in stages or []:
+            self.register(stage)
+
+    def register(self, stage: ValidationStage) -> None:
+        """Register a stage (replacing one with the same name)."""
+        if stage.name in self.stages:
+            logger.warning(f"Validation stage {stage.name} already registered. Overwriting.")
+        self.stages[stage.name] = stage
+
+    async def capture_snapshot(self, page) -> Dict[str, Any]:
+        """Count the page's tables, controls and forms in one evaluation."""
+        try:
+            return await page.evaluate(DOM_SNAPSHOT_SCRIPT)
+        except Exception as e:
+            logger.debug(f"DOM snapshot failed: {e}")
+            return {}
+
+    async def run(
+        self,
+        page,
+        page_info: Dict[str, Any],
+        run_id: str,
+        artifacts_path: Any,
+        stages: Optional[List[str]] = None
+    ) -> PageVisit:
+        """
+        Validate an already loaded page with the selected stages.
+
+        Each stage's report is stored on ``page_info`` under its ``result_key``
+        (``{"error": ...}`` if the stage raised), next to the shared
+        ``dom_snapshot`` and ``observations``.
+
+        Args:
+            page: Playwright page, already navigated to the page being validated
+            page_info: Discovered page metadata (updated in place)
+            run_id: Discovery run ID
+            artifacts_path: Artifacts directory passed through to the validators
+            stages: Names of the stages to run (default: all, in registration order)
+
+        Returns:
+            The page visit with snapshot, observations and stage results
+        """
+        visit = PageVisit(
+            page=page,
+            page_info=page_info,
+            run_id=run_id,
+            artifacts_path=artifacts_path,
+            observations=get_observations(page_info)
+        )
+        visit.snapshot = await self.capture_snapshot(page)
+        page_info["dom_snapshot"] = visit.snapshot
+
+        for name in stages or list(self.stages):
+            stage = self.stages.get(name)
+            if stage is None:
+                logger.warning(f"[{run_id}] Unknown validation stage: {name}")
+                continue
+            if not stage.applies(visit):
+                continue
+            try:
+                result = await stage.run(visit)
+            except Exception as e:
+                logger.error(f"[{run_id}] ❌ {stage.name} validation error: {e}", exc_info=True)
+                result = {"error": str(e)}
+            visit.results[stage.name] = result
+            page_info[stage.result_key] = result
+
+        logger.debug(
+            f"[{run_id}] Validated {visit.url} with stages {list(visit.results)}; "
+            f"observed features: {list(visit.observations)}"
+        )
+        return visit
+
+
+__all__ = [
+    "PageVisit",
+    "ValidationStage",
+    "LiveValidationStage",
+    "ProductionValidationStage",
+    "ValidationPipeline",
+    "canonical_feature",
+    "get_observations",
+    "record_observation",
+    "was_exercised",
+]
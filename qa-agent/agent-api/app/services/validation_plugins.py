@@ -10,7 +10,8 @@ import sys
 from app.services.validation_schema import (
     FeatureValidationSchema,
     ValidationRule,
-    ValidationSchemaRegistry
+    ValidationSchemaRegistry,
+    get_validation_schema_registry
 )
 
 logger = logging.getLogger(__name__)
@@ -88,10 +89,16 @@ class ValidationPlugin(ABC):
 
 
 class ValidationPluginManager:
-    """Manage loading and registration of validation plugins."""
+    """Manage loading and registration of validation plugins.
+
+    Uses the shared registry (``get_validation_schema_registry``) unless one is
+    given. The shared registry loads the plugins directory itself when it is
+    first built and is frozen afterwards, so plugins whose schema it already
+    holds only add their detector; new schemas need an unfrozen registry.
+    """
 
     def __init__(self, schema_registry: Optional[ValidationSchemaRegistry] = None):
-        self.schema_registry = schema_registry or ValidationSchemaRegistry()
+        self.schema_registry = schema_registry or get_validation_schema_registry()
         self.plugins: Dict[str, ValidationPlugin] = {}
         logger.info("ValidationPluginManager initialized")
 
@@ -100,6 +107,9 @@ class ValidationPluginManager:
 
         Args:
             plugin: ValidationPlugin instance to register
+
+        Raises:
+            RuntimeError: If the plugin brings a new schema and the registry is frozen
         """
         feature_type = plugin.get_feature_type()
 
@@ -108,9 +118,10 @@ class ValidationPluginManager:
 
         self.plugins[feature_type] = plugin
 
-        # Register schema with registry
+        # Register schema with registry (a frozen registry already built from the plugins directory has it)
         schema = plugin.get_validation_schema()
-        self.schema_registry.register_schema(schema)
+        if not (self.schema_registry.frozen and self.schema_registry.get_schema(feature_type)):
+            self.schema_registry.register_schema(schema)
 
         logger.info(f"Registered plugin: {feature_type} with {len(schema.validation_rules)} rules")
 
@@ -1,7 +1,8 @@
 """Validation Schema Framework - Comprehensive validation rules for test case generation."""
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Optional, Any
+from dataclasses import dataclass, field, replace
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Any, Tuple
 import logging
 
 logger = logging.getLogger(__name__)
@@ -36,12 +37,32 @@ class FeatureValidationSchema:
     coverage_requirements: Dict[str, int]  # Minimum validations needed
 
 
+# Rule attributes indexed by the registry
+RULE_INDEX_FIELDS = ("category", "severity", "assertion_type")
+
+
 class ValidationSchemaRegistry:
-    """Central registry of all validation schemas."""
+    """
+    Central registry of all validation schemas.
 
-    def __init__(self):
+    Rules are indexed by feature and by every combination of category,
+    severity and assertion type as schemas are registered, so lookups such as
+    "critical rules of the search feature" are a single dictionary access.
+    Once ``freeze()`` is called the registry is read-only: schemas are stored
+    as copies with tuple rule lists and all lookups return immutable views,
+    so one instance can be shared by the whole process (see
+    ``get_validation_schema_registry``).
+    """
+
+    def __init__(self, load_defaults: bool = True):
         self._schemas: Dict[str, FeatureValidationSchema] = {}
-        self._load_default_schemas()
+        self._index: Dict[Tuple[Optional[str], ...], List[ValidationRule]] = {}  # Appended per registration
+        self._index_dirty = False  # Lookup views lag behind ``_index``
+        self._rule_index: Dict[Tuple[Optional[str], ...], Tuple[ValidationRule, ...]] = {}
+        self._groups: Dict[Tuple[str, Optional[str]], Mapping[str, Tuple[ValidationRule, ...]]] = {}
+        self._frozen = False
+        if load_defaults:
+            self._load_default_schemas()
 
     def _load_default_schemas(self):
         """Load all default validation schemas."""
@@ -52,24 +73,136 @@ class ValidationSchemaRegistry:
         logger.info(f"Loaded {len(self._schemas)} default validation schemas")
 
     def register_schema(self, schema: FeatureValidationSchema):
-        """Register a validation schema."""
+        """Register a validation schema.
+
+        Raises:
+            RuntimeError: If the registry has been frozen
+        """
+        if self._frozen:
+            raise RuntimeError(
+                f"Validation schema registry is frozen; cannot register schema: {schema.feature_type}"
+            )
+        replacing = schema.feature_type in self._schemas
         self._schemas[schema.feature_type] = schema
+        if replacing:
+            # The old rules are spread over the index; re-registration is rare, so rebuild
+            self._rebuild_index()
+        else:
+            self._index_schema(schema)
         logger.info(f"Registered schema: {schema.feature_type} with {len(schema.validation_rules)} rules")
 
+    def _index_schema(self, schema: FeatureValidationSchema) -> None:
+        """Index a schema's rules under (feature, category, severity, assertion_type), None meaning any."""
+        for rule in schema.validation_rules:
+            values = (schema.feature_type,) + tuple(getattr(rule, name) for name in RULE_INDEX_FIELDS)
+            for mask in range(1 << len(values)):
+                key = tuple(value if mask & (1 << pos) else None for pos, value in enumerate(values))
+                self._index.setdefault(key, []).append(rule)
+        self._index_dirty = True
+
+    def _rebuild_index(self) -> None:
+        """Re-index every registered schema from scratch."""
+        self._index = {}
+        for schema in self._schemas.values():
+            self._index_schema(schema)
+        self._index_dirty = True
+
+    def _refresh_views(self) -> None:
+        """Build the tuple lookups and grouped views once after a batch of registrations."""
+        if not self._index_dirty:
+            return
+        self._index_dirty = False
+        self._rule_index = {key: tuple(rules) for key, rules in self._index.items()}
+
+        # Grouped views: (attribute, feature or None) -> attribute value -> rules
+        groups: Dict[Tuple[str, Optional[str]], Dict[str, Tuple[ValidationRule, ...]]] = {}
+        for key, rules in self._rule_index.items():
+            set_positions = [pos for pos in range(1, len(key)) if key[pos] is not None]
+            if not set_positions and key[0] is not None:
+                groups.setdefault(("feature_type", None), {})[key[0]] = rules
+            elif len(set_positions) == 1:
+                position = set_positions[0]
+                groups.setdefault((RULE_INDEX_FIELDS[position - 1], key[0]), {})[key[position]] = rules
+        self._groups = {key: MappingProxyType(group) for key, group in groups.items()}
+
+    def freeze(self) -> "ValidationSchemaRegistry":
+        """Make the registry read-only and return it."""
+        if not self._frozen:
+            self._refresh_views()
+            self._schemas = MappingProxyType({
+                feature_type: replace(
+                    schema,
+                    validation_rules=tuple(schema.validation_rules),
+                    detection_strategy=MappingProxyType(dict(schema.detection_strategy)),
+                    coverage_requirements=MappingProxyType(dict(schema.coverage_requirements))
+                )
+                for feature_type, schema in self._schemas.items()
+            })
+            self._rule_index = MappingProxyType(self._rule_index)
+            self._index = {}  # Staging lists are not needed once read-only
+            self._frozen = True
+            logger.info(
+                f"Validation schema registry frozen with {len(self._schemas)} schemas "
+                f"and {len(self.get_rules())} rules"
+            )
+        return self
+
+    @property
+    def frozen(self) -> bool:
+        return self._frozen
+
     def get_schema(self, feature_type: str) -> Optional[FeatureValidationSchema]:
         """Get validation schema by feature type."""
         return self._schemas.get(feature_type)
 
     def get_all_schemas(self) -> Dict[str, FeatureValidationSchema]:
         """Get all registered schemas."""
-        return self._schemas.copy()
+        return dict(self._schemas)
 
     def get_all_validation_rules(self) -> List[ValidationRule]:
         """Get all validation rules from all schemas."""
-        all_rules = []
-        for schema in self._schemas.values():
-            all_rules.extend(schema.validation_rules)
-        return all_rules
+        return list(self.get_rules())
+
+    def get_rules(
+        self,
+        feature_type: Optional[str] = None,
+        category: Optional[str] = None,
+        severity: Optional[str] = None,
+        assertion_type: Optional[str] = None
+    ) -> Tuple[ValidationRule, ...]:
+        """Rules matching every given attribute, in schema order (precomputed lookup).
+
+        Args:
+            feature_type: Feature the rules belong to
+            category: Rule category (positive, negative, edge, boundary)
+            severity: Rule severity (critical, high, medium, low)
+            assertion_type: Rule assertion type
+
+        Returns:
+            Tuple of matching rules (empty if none)
+        """
+        self._refresh_views()
+        return self._rule_index.get((feature_type, category, severity, assertion_type), ())
+
+    def _group(self, field_name: str, feature_type: Optional[str] = None) -> Mapping[str, Tuple[ValidationRule, ...]]:
+        self._refresh_views()
+        return self._groups.get((field_name, feature_type), MappingProxyType({}))
+
+    def rules_by_feature(self) -> Mapping[str, Tuple[ValidationRule, ...]]:
+        """Read-only view of rules grouped by feature type."""
+        return self._group("feature_type")
+
+    def rules_by_category(self, feature_type: Optional[str] = None) -> Mapping[str, Tuple[ValidationRule, ...]]:
+        """Read-only view of rules grouped by category (optionally within one feature)."""
+        return self._group("category", feature_type)
+
+    def rules_by_severity(self, feature_type: Optional[str] = None) -> Mapping[str, Tuple[ValidationRule, ...]]:
+        """Read-only view of rules grouped by severity (optionally within one feature)."""
+        return self._group("severity", feature_type)
+
+    def rules_by_assertion_type(self, feature_type: Optional[str] = None) -> Mapping[str, Tuple[ValidationRule, ...]]:
+        """Read-only view of rules grouped by assertion type (optionally within one feature)."""
+        return self._group("assertion_type", feature_type)
 
 
 # =============================================================================
@@ -927,6 +1060,31 @@ LISTING_VALIDATION_SCHEMA = FeatureValidationSchema(
 )
 
 
+# =============================================================================
+# SHARED REGISTRY
+# =============================================================================
+
+_validation_schema_registry: Optional[ValidationSchemaRegistry] = None
+
+
+def get_validation_schema_registry() -> ValidationSchemaRegistry:
+    """Get the process-wide, frozen validation schema registry.
+
+    Built on first use from the default schemas plus every plugin found in the
+    plugins directory, then frozen.
+    """
+    global _validation_schema_registry
+    if _validation_schema_registry is None:
+        registry = ValidationSchemaRegistry()
+        try:
+            from app.services.validation_plugins import discover_and_load_plugins
+            discover_and_load_plugins(schema_registry=registry)
+        except Exception as e:
+            logger.warning(f"Failed to load validation plugins: {e}")
+        _validation_schema_registry = registry.freeze()
+    return _validation_schema_registry
+
+
 # =============================================================================
 # MODULE EXPORTS
 # =============================================================================
@@ -935,6 +1093,7 @@ __all__ = [
     "ValidationRule",
     "FeatureValidationSchema",
     "ValidationSchemaRegistry",
+    "get_validation_schema_registry",
     "SEARCH_VALIDATION_SCHEMA",
     "PAGINATION_VALIDATION_SCHEMA",
     "FILTER_VALIDATION_SCHEMA",
@@ -0,0 +1,140 @@
+#!/usr/bin/env python3
+"""
+Unit tests for PostgreSQL catalog introspection.
+
+Uses a fake asyncpg pool that answers the catalog queries with canned
+pg_catalog rows, so no database server is needed.
+"""
+
+import asyncio
+
+from app.services.database_connection_manager import (
+    PG_COLUMNS_QUERY,
+    PG_FOREIGN_KEYS_QUERY,
+    PG_INDEXES_QUERY,
+    PG_TABLES_QUERY,
+    DatabaseConnectionManager
+)
+
+CATALOG_ROWS = {
+    PG_TABLES_QUERY: [
+        {"schema": "public", "table_name": "orders", "table_oid": 2, "estimated_rows": 1200, "size": "96 kB"},
+        {"schema": "public", "table_name": "users", "table_oid": 1, "estimated_rows": -1, "size": "8192 bytes"},
+    ],
+    PG_COLUMNS_QUERY: [
+        {"table_oid": 1, "column_name": "id", "data_type": "integer", "nullable": False,
+         "column_default": "nextval('users_id_seq'::regclass)"},
+        {"table_oid": 1, "column_name": "email", "data_type": "character varying(255)", "nullable": True,
+         "column_default": None},
+        {"table_oid": 2, "column_name": "id", "data_type": "bigint", "nullable": False, "column_default": None},
+        {"table_oid": 2, "column_name": "user_id", "data_type": "integer", "nullable": False, "column_default": None},
+        # Column of a table outside the listed ones (e.g. dropped meanwhile) is ignored
+        {"table_oid": 99, "column_name": "ghost", "data_type": "text", "nullable": True, "column_default": None},
+    ],
+    PG_INDEXES_QUERY: [
+        {"table_oid": 1, "index_name": "users_email_key", "is_unique": True, "is_primary": False,
+         "definition": "CREATE UNIQUE INDEX users_email_key ON public.users USING btree (email)"},
+        {"table_oid": 1, "index_name": "users_pkey", "is_unique": True, "is_primary": True,
+         "definition": "CREATE UNIQUE INDEX users_pkey ON public.users USING btree (id)"},
+    ],
+    PG_FOREIGN_KEYS_QUERY: [
+        {"table_oid": 2, "constraint_name": "orders_user_id_fkey", "referenced_schema": "public",
+         "referenced_table": "users", "columns": ["user_id"], "referenced_columns": ["id"]},
+    ],
+}
+
+
+class FakePool:
+    """Stand-in for an asyncpg Pool answering the catalog queries."""
+
+    def __init__(self):
+        self.queries = []
+
+    def acquire(self):
+        raise AssertionError("introspection should use pool.fetch")
+
+    async def fetch(self, query, *args):
+        self.queries.append(query)
+        await asyncio.sleep(0)
+        return CATALOG_ROWS[query]
+
+    async def close(self):
+        pass
+
+
+def _manager(pool, ttl=300.0):
+    manager = DatabaseConnectionManager(introspection_ttl=ttl)
+    manager.connections[1] = pool
+    manager.connection_types[1] = "postgresql"
+    return manager
+
+
+def test_introspection_maps_catalog_rows():
+    """Catalog rows are grouped into tables with columns, indexes and foreign keys."""
+    pool = FakePool()
+    schema = asyncio.run(_manager(pool).get_schema(1))
+
+    assert sorted(pool.queries) == sorted(CATALOG_ROWS)
+    assert "introspected_at" in schema
+    orders, users = schema["tables"]
+
+    assert (orders["schema"], orders["name"], orders["size"], orders["estimated_rows"]) == ("public", "orders", "96 kB", 1200)
+    assert users["estimated_rows"] == 0  # reltuples is -1 for never-analyzed tables
+    assert users["columns"] == [
+        {"name": "id", "type": "integer", "nullable": False, "default": "nextval('users_id_seq'::regclass)"},
+        {"name": "email", "type": "character varying(255)", "nullable": True, "default": None},
+    ]
+    assert [c["name"] for c in orders["columns"]] == ["id", "user_id"]
+    assert users["indexes"][1] == {
+        "name": "users_pkey",
+        "unique": True,
+        "primary": True,
+        "definition": "CREATE UNIQUE INDEX users_pkey ON public.users USING btree (id)",
+    }
+    assert orders["indexes"] == []
+    assert orders["foreign_keys"] == [{
+        "name": "orders_user_id_fkey",
+        "columns": ["user_id"],
+        "referenced_schema": "public",
+        "referenced_table": "users",
+        "referenced_columns": ["id"],
+    }]
+    assert users["foreign_keys"] == []
+
+
+def test_schema_cached_within_ttl():
+    """A second get_schema within the TTL, or a concurrent one, does not query again."""
+    pool = FakePool()
+    manager = _manager(pool)
+
+    async def scenario():
+        first, second = await asyncio.gather(manager.get_schema(1), manager.get_schema(1))
+        third = await manager.get_schema(1)
+        columns = await manager.get_columns(1, "public", "orders")
+        tables = await manager.list_tables(1)
+        return first, second, third, columns, tables
+
+    first, second, third, columns, tables = asyncio.run(scenario())
+    assert len(pool.queries) == 4
+    assert first is second is third
+    assert [c["name"] for c in columns] == ["id", "user_id"]
+    assert [t["name"] for t in tables] == ["orders", "users"]
+    assert "columns" not in tables[0]
+
+
+def test_schema_refreshed_after_ttl_or_invalidation():
+    """Expired, refreshed or invalidated results are introspected again."""
+    pool = FakePool()
+    expired = _manager(pool, ttl=0)
+
+    async def scenario():
+        await expired.get_schema(1)
+        await expired.get_schema(1)
+        cached = _manager(pool)
+        await cached.get_schema(1)
+        await cached.get_schema(1, refresh=True)
+        cached.invalidate_schema(1)
+        await cached.get_schema(1)
+
+    asyncio.run(scenario())
+    assert len(pool.queries) == 5 * 4
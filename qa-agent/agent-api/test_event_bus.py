@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the per-run event bus.
+
+Checks that events.jsonl receives every event exactly once and in publish
+order while several producers publish at the same time.
+"""
+
+import asyncio
+import json
+import threading
+
+from app.services.event_bus import EventBus, close_event_bus, get_event_bus
+
+
+def _read_events(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_concurrent_producers_keep_publish_order(tmp_path):
+    """Events from concurrent coroutines land in the file in publish order."""
+    bus = EventBus("run1", tmp_path / "events.jsonl", batch_size=8, max_pending=32, flush_interval=0.01)
+    published = []
+    bus.subscribe(lambda event: published.append((event["data"]["producer"], event["data"]["seq"])))
+
+    async def producer(name, count):
+        for seq in range(count):
+            bus.emit("progress", {"producer": name, "seq": seq}, source=name)
+            if seq % 5 == 0:
+                await asyncio.sleep(0)
+
+    async def scenario():
+        await asyncio.gather(*(producer(f"p{i}", 200) for i in range(5)))
+        await bus.close()
+
+    asyncio.run(scenario())
+
+    written = [(e["data"]["producer"], e["data"]["seq"]) for e in _read_events(tmp_path / "events.jsonl")]
+    assert len(written) == 5 * 200
+    assert written == published
+    assert bus.published == bus.written == 1000
+    # Producers really interleaved
+    assert written[:200] != [("p0", seq) for seq in range(200)]
+
+
+def test_thread_and_coroutine_producers(tmp_path):
+    """Producers on worker threads and on the loop share one ordered stream per producer."""
+    artifacts = tmp_path / "run2"
+
+    def thread_producer(name, count):
+        bus = get_event_bus("run2", artifacts)
+        for seq in range(count):
+            bus.emit("thread_progress", {"producer": name, "seq": seq}, source="health_check")
+
+    async def scenario():
+        bus = get_event_bus("run2", artifacts)
+        threads = [threading.Thread(target=thread_producer, args=(f"t{i}", 300)) for i in range(3)]
+        for thread in threads:
+            thread.start()
+        for seq in range(300):
+            bus.emit("loop_progress", {"producer": "loop", "seq": seq})
+            await asyncio.sleep(0)
+        await asyncio.gather(*(asyncio.to_thread(thread.join) for thread in threads))
+        await close_event_bus("run2", artifacts)
+        assert get_event_bus("run2", artifacts) is not bus
+
+    asyncio.run(scenario())
+
+    events = _read_events(artifacts / "events.jsonl")
+    assert len(events) == 4 * 300
+    for producer in ("loop", "t0", "t1", "t2"):
+        sequence = [e["data"]["seq"] for e in events if e["data"]["producer"] == producer]
+        assert sequence == list(range(300))
@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the watch-backed Kubernetes service cache.
+
+A fake CoreV1Api answers the initial listing and a fake ``watch.Watch``
+streams events pushed by the test, standing in for the API server.
+"""
+
+import asyncio
+import queue
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from app.services import k8s_discovery_service
+from app.services.k8s_discovery_service import K8sDiscoveryService
+
+
+def _service(name, port, resource_version, labels=None):
+    return SimpleNamespace(
+        metadata=SimpleNamespace(
+            name=name,
+            labels=labels or {},
+            resource_version=resource_version,
+            creation_timestamp=None
+        ),
+        spec=SimpleNamespace(
+            ports=[SimpleNamespace(port=port)],
+            cluster_ip="10.0.0.1",
+            type="ClusterIP",
+            selector={"app": name}
+        )
+    )
+
+
+class FakeCoreV1Api:
+    """Lists the initial services of a namespace."""
+
+    def __init__(self, services):
+        self.services = services
+        self.list_calls = 0
+
+    def list_namespaced_service(self, namespace, **kwargs):
+        self.list_calls += 1
+        return SimpleNamespace(items=list(self.services), metadata=SimpleNamespace(resource_version="100"))
+
+    def read_namespaced_service(self, name, namespace):
+        raise AssertionError("services should be served from the watch cache")
+
+
+class FakeWatch:
+    """Streams the events the test puts on ``FakeWatch.events`` until stopped."""
+
+    events: "queue.Queue" = queue.Queue()
+    instances = []
+
+    def __init__(self):
+        self.stopped = False
+        self.finished = False
+        self.kwargs = None
+        FakeWatch.instances.append(self)
+
+    def stream(self, func, **kwargs):
+        self.kwargs = kwargs
+        try:
+            while not self.stopped:
+                try:
+                    yield FakeWatch.events.get(timeout=0.02)
+                except queue.Empty:
+                    continue
+        finally:
+            self.finished = True
+
+    def stop(self):
+        self.stopped = True
+
+
+@pytest.fixture
+def discovery(monkeypatch):
+    FakeWatch.events = queue.Queue()
+    FakeWatch.instances = []
+    monkeypatch.setattr(k8s_discovery_service.watch, "Watch", FakeWatch)
+    service = K8sDiscoveryService(use_watch=True, cache_ttl=30)
+    service.k8s_loaded = True
+    service.v1 = FakeCoreV1Api([
+        _service("orders-postgres", 5432, "90"),
+        _service("cache-redis", 6379, "91"),
+        _service("frontend", 80, "92"),
+    ])
+    return service
+
+
+async def _wait_for(condition, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "condition not reached"
+        await asyncio.sleep(0.01)
+
+
+def test_watch_events_update_cached_view(discovery):
+    """ADDED, MODIFIED and DELETED events are applied without listing again."""
+    async def scenario():
+        found = await discovery.discover_database_services("shop")
+        assert sorted(s["service_name"] for s in found) == ["cache-redis", "orders-postgres"]
+        cache = discovery._caches["shop"]
+        await _wait_for(lambda: cache.watching)
+        assert FakeWatch.instances[0].kwargs["resource_version"] == "100"
+
+        FakeWatch.events.put({"type": "ADDED", "object": _service("users-mongo", 27017, "101")})
+        FakeWatch.events.put({"type": "MODIFIED", "object": _service("orders-postgres", 5433, "102")})
+        FakeWatch.events.put({"type": "DELETED", "object": _service("cache-redis", 6379, "103")})
+        await _wait_for(lambda: cache.resource_version == "103")
+
+        found = {s["service_name"]: s for s in await discovery.discover_database_services("shop")}
+        assert sorted(found) == ["orders-postgres", "users-mongo"]
+        assert found["orders-postgres"]["port"] == 5433
+        assert found["users-mongo"]["db_type"] == "mongodb"
+        assert found["users-mongo"]["host"] == "users-mongo.shop.svc.cluster.local"
+        assert await discovery.get_service_info("cache-redis", "shop") is None
+        assert (await discovery.get_service_info("orders-postgres", "shop"))["port"] == 5433
+        assert discovery.v1.list_calls == 1
+
+        await discovery.close()
+
+    asyncio.run(scenario())
+
+
+def test_stop_joins_the_watch(discovery):
+    """Invalidating stops the watch thread before a new one starts; close joins the last one."""
+    async def scenario():
+        await discovery.discover_database_services("shop")
+        cache = discovery._caches["shop"]
+        await _wait_for(lambda: cache.watching)
+        first_task, first_watch = cache.task, FakeWatch.instances[0]
+
+        discovery.invalidate("shop")
+        await asyncio.wait_for(first_task, timeout=5)
+        assert first_watch.stopped and first_watch.finished
+        assert cache.watcher is None
+        assert not cache.watching
+
+        # The next lookup re-lists and starts a fresh watch
+        await discovery.discover_database_services("shop")
+        assert discovery.v1.list_calls == 2
+        await _wait_for(lambda: cache.watching)
+        second_task, second_watch = cache.task, FakeWatch.instances[1]
+        assert second_task is not first_task
+
+        await discovery.close()
+        assert second_task.done()
+        assert second_watch.finished
+        assert discovery._caches == {}
+
+    asyncio.run(scenario())
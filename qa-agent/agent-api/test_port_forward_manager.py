@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the kubectl port-forward manager.
+
+A small script stands in for kubectl: it records each start, prints
+kubectl's "Forwarding from" line and stays alive until terminated.
+"""
+
+import asyncio
+import sys
+
+import pytest
+
+from app.services import port_forward_manager
+from app.services.port_forward_manager import PortForwardManager
+
+FAKE_KUBECTL = """#!{python}
+import os, sys, time
+with open(os.environ["FAKE_KUBECTL_LOG"], "a") as log:
+    log.write(" ".join(sys.argv[1:]) + "\\n")
+local_port, remote_port = sys.argv[-1].split(":")
+print(f"Forwarding from 127.0.0.1:{{local_port}} -> {{remote_port}}", flush=True)
+time.sleep(60)
+"""
+
+
+@pytest.fixture
+def fake_kubectl(tmp_path, monkeypatch):
+    script = tmp_path / "kubectl"
+    script.write_text(FAKE_KUBECTL.format(python=sys.executable))
+    script.chmod(0o755)
+    log = tmp_path / "kubectl.log"
+    log.touch()
+    monkeypatch.setenv("FAKE_KUBECTL_LOG", str(log))
+    monkeypatch.setattr(port_forward_manager, "KUBECTL_BINARY", str(script))
+    monkeypatch.setattr(port_forward_manager, "PORT_FORWARD_RESTART_BACKOFF", 0.05)
+    return log
+
+
+def _starts(log):
+    return log.read_text().splitlines()
+
+
+def test_forward_is_shared_and_stopped_by_last_release(fake_kubectl):
+    """The second acquire reuses the process; only the last release stops it."""
+    async def scenario():
+        manager = PortForwardManager(38000, 38100, ready_timeout=5)
+        first = await manager.start_port_forward("postgres", "db", 5432)
+        assert first is not None
+        assert manager.is_port_forward_active(first)
+        process = manager.active_forwards[first].process
+
+        second = await manager.start_port_forward("postgres", "db", 5432)
+        assert second == first
+        assert manager.active_forwards[first].process is process
+        assert manager.get_active_forwards()[0]["users"] == 2
+        assert len(_starts(fake_kubectl)) == 1
+        assert _starts(fake_kubectl)[0].endswith(f"svc/postgres {first}:5432")
+
+        assert await manager.stop_port_forward(first)
+        assert manager.is_port_forward_active(first)
+        assert process.returncode is None
+
+        assert await manager.stop_port_forward(first)
+        assert process.returncode is not None
+        assert not manager.is_port_forward_active(first)
+        assert first not in manager.used_ports
+        assert manager.get_active_forwards() == []
+
+    asyncio.run(scenario())
+
+
+def test_concurrent_acquires_start_one_process(fake_kubectl):
+    """Acquires racing for the same service port wait for one kubectl process."""
+    async def scenario():
+        manager = PortForwardManager(38000, 38100, ready_timeout=5)
+        ports = await asyncio.gather(*(manager.start_port_forward("mongo", "db", 27017) for _ in range(3)))
+        assert len(set(ports)) == 1
+        assert len(_starts(fake_kubectl)) == 1
+        await manager.cleanup_all()
+
+    asyncio.run(scenario())
+
+
+def test_dead_forward_is_restarted(fake_kubectl):
+    """A forward whose process dies while in use is restarted on the same local port."""
+    async def scenario():
+        manager = PortForwardManager(38000, 38100, ready_timeout=5)
+        local_port = await manager.start_port_forward("postgres", "db", 5432)
+        forward = manager.active_forwards[local_port]
+        dead = forward.process
+        dead.kill()
+        await dead.wait()
+
+        for _ in range(100):
+            if forward.process is not dead and manager.is_port_forward_active(local_port):
+                break
+            await asyncio.sleep(0.05)
+
+        assert forward.process is not dead
+        assert manager.is_port_forward_active(local_port)
+        assert forward.restarts == 1
+        assert len(_starts(fake_kubectl)) == 2
+        assert _starts(fake_kubectl)[1].endswith(f"{local_port}:5432")
+
+        await manager.cleanup_all()
+        assert forward.process.returncode is not None
+
+    asyncio.run(scenario())
@@ -0,0 +1,77 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the retention service's policy selection.
+
+Runs are laid out in a temporary data directory with back-dated mtimes;
+sweeps are dry runs so no run records are touched.
+"""
+
+import asyncio
+import os
+import time
+
+from app.services.artifact_io import write_artifact
+from app.services.retention_service import RetentionService
+
+DAY = 86400
+
+
+def _make_run(data_dir, run_id, age_seconds, state="DONE", base_url="https://shop.example"):
+    run_dir = data_dir / run_id
+    run_dir.mkdir()
+    if state is not None:
+        write_artifact(run_dir / "run_context.json", {"run_id": run_id, "base_url": base_url, "state": state})
+    (run_dir / "screenshot.png").write_bytes(b"x" * 1024)
+    stamp = time.time() - age_seconds
+    for path in list(run_dir.iterdir()) + [run_dir]:
+        os.utime(path, (stamp, stamp))
+    return run_dir
+
+
+def _service(data_dir, **policy):
+    service = RetentionService(data_dir=data_dir, temp_upload_dirs=[data_dir / "temp_uploads"], interval_seconds=0)
+    service.active_grace_hours = 6
+    for name, value in policy.items():
+        setattr(service, name, value)
+    return service
+
+
+def test_max_age_skips_runs_inside_grace_window(tmp_path):
+    """Runs active within the grace window survive even a zero max age."""
+    _make_run(tmp_path, "recent", 3600)
+    _make_run(tmp_path, "old", 10 * DAY)
+    service = _service(tmp_path, max_age_days=0.01)
+
+    report = asyncio.run(service.sweep(dry_run=True))
+
+    assert report.runs_scanned == 2
+    assert report.runs_deleted == ["old"]
+    assert (tmp_path / "old").exists()
+
+
+def test_non_terminal_runs_are_never_collected(tmp_path):
+    """Idle runs still in progress are skipped by every policy; finished ones are not."""
+    _make_run(tmp_path, "waiting", 30 * DAY, state="TEST_EXECUTE")
+    _make_run(tmp_path, "discovering", 30 * DAY, state="WAIT_LOGIN_INPUT")
+    _make_run(tmp_path, "failed", 20 * DAY, state="FAILED")
+    _make_run(tmp_path, "done", 10 * DAY, state="DONE")
+    _make_run(tmp_path, "legacy", 40 * DAY, state=None)
+    service = _service(tmp_path, max_age_days=1, keep_runs_per_base_url=1, disk_quota_mb=0.001)
+
+    report = asyncio.run(service.sweep(dry_run=True))
+
+    assert sorted(report.runs_deleted) == ["done", "failed", "legacy"]
+
+
+def test_keep_last_skips_runs_inside_grace_window(tmp_path):
+    """Only runs past the grace window are dropped beyond the per-base-URL limit."""
+    _make_run(tmp_path, "newest", 60)
+    _make_run(tmp_path, "recent", 3600)
+    _make_run(tmp_path, "older", 2 * DAY)
+    _make_run(tmp_path, "oldest", 3 * DAY)
+    _make_run(tmp_path, "other-site", 4 * DAY, base_url="https://blog.example")
+    service = _service(tmp_path, keep_runs_per_base_url=1)
+
+    report = asyncio.run(service.sweep(dry_run=True))
+
+    assert sorted(report.runs_deleted) == ["older", "oldest"]
@@ -0,0 +1,65 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the validation pipeline observation store.
+
+Tests how stage and interaction outcomes are recorded without a browser.
+"""
+
+from app.models.health_check import HealthCheckStatus, HealthCheckType
+from app.services.health_check_executor import HealthCheckExecutor
+from app.services.validation_pipeline import (
+    PageVisit,
+    get_observations,
+    record_observation,
+    was_exercised
+)
+
+
+def _visit(page_info):
+    return PageVisit(
+        page=None,
+        page_info=page_info,
+        run_id="run1",
+        artifacts_path=None,
+        observations=get_observations(page_info)
+    )
+
+
+def test_first_real_outcome_wins():
+    """A later outcome does not overwrite a passed or failed observation."""
+    page_info = {"url": "https://example.com/users"}
+    visit = _visit(page_info)
+
+    visit.observe("Sorting", "failed", "live", reason="order unchanged")
+    visit.observe("sort", "passed", "production")
+    record_observation(get_observations(page_info), "sort", "passed", "interactions")
+
+    observation = page_info["observations"]["sort"]
+    assert observation["status"] == "failed"
+    assert observation["source"] == "live"
+    assert observation["reason"] == "order unchanged"
+
+
+def test_skipped_then_passed():
+    """A feature skipped by the live stage and tested by interactions reports as passed."""
+    page_info = {"url": "https://example.com/users"}
+    visit = _visit(page_info)
+
+    visit.observe("Search", "skipped", "live", reason="search input hidden")
+    assert not was_exercised(page_info, "search")
+
+    # Interactions phase runs the feature because it was not exercised
+    record_observation(get_observations(page_info), "search", "passed", "interactions")
+    assert was_exercised(page_info, "search")
+    assert page_info["observations"]["search"] == {"status": "passed", "source": "interactions"}
+
+    # A later skip does not hide the result again
+    visit.observe("search", "skipped", "production")
+    assert page_info["observations"]["search"]["status"] == "passed"
+
+    status, details, error = HealthCheckExecutor()._resolve_check(
+        HealthCheckType.SEARCH, {"search_inputs": 1}, page_info["observations"]
+    )
+    assert status == HealthCheckStatus.PASSED
+    assert details["source"] == "interactions"
+    assert error is None
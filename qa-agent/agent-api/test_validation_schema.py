@@ -0,0 +1,81 @@
+#!/usr/bin/env python3
+"""
+Unit tests for the validation schema registry.
+
+Checks that the precomputed rule indexes agree with plain scans of the
+registered schemas.
+"""
+
+from dataclasses import replace
+from itertools import product
+
+import pytest
+
+from app.services.validation_schema import (
+    SEARCH_VALIDATION_SCHEMA,
+    ValidationSchemaRegistry
+)
+
+
+def _scan(registry, feature_type=None, category=None, severity=None, assertion_type=None):
+    """The list scan the index replaced."""
+    rules = []
+    for schema in registry.get_all_schemas().values():
+        if feature_type is not None and schema.feature_type != feature_type:
+            continue
+        for rule in schema.validation_rules:
+            if category is not None and rule.category != category:
+                continue
+            if severity is not None and rule.severity != severity:
+                continue
+            if assertion_type is not None and rule.assertion_type != assertion_type:
+                continue
+            rules.append(rule)
+    return rules
+
+
+def test_registry_counts_match_schemas():
+    """Rule and schema counts agree with the registered schemas."""
+    registry = ValidationSchemaRegistry()
+    schemas = registry.get_all_schemas()
+
+    assert set(schemas) == {"search", "pagination", "filter", "listing"}
+    assert len(registry.get_all_validation_rules()) == sum(len(s.validation_rules) for s in schemas.values())
+    for feature_type, rules in registry.rules_by_feature().items():
+        assert len(rules) == len(schemas[feature_type].validation_rules)
+
+
+def test_index_lookups_match_list_scans():
+    """Every attribute combination returns the same rules, in the same order, as a scan."""
+    registry = ValidationSchemaRegistry()
+    rules = registry.get_all_validation_rules()
+    features = [None] + list(registry.get_all_schemas())
+    categories = [None] + sorted({r.category for r in rules})
+    severities = [None] + sorted({r.severity for r in rules})
+    assertion_types = [None] + sorted({r.assertion_type for r in rules})
+
+    for combination in product(features, categories, severities, assertion_types):
+        assert list(registry.get_rules(*combination)) == _scan(registry, *combination)
+
+    for feature_type in features:
+        for category, grouped in registry.rules_by_category(feature_type).items():
+            assert list(grouped) == _scan(registry, feature_type, category=category)
+        for severity, grouped in registry.rules_by_severity(feature_type).items():
+            assert list(grouped) == _scan(registry, feature_type, severity=severity)
+        for assertion_type, grouped in registry.rules_by_assertion_type(feature_type).items():
+            assert list(grouped) == _scan(registry, feature_type, assertion_type=assertion_type)
+
+
+def test_reregistration_and_freeze():
+    """Replacing a schema drops its old rules; a frozen registry rejects registrations."""
+    registry = ValidationSchemaRegistry()
+    trimmed = replace(SEARCH_VALIDATION_SCHEMA, validation_rules=SEARCH_VALIDATION_SCHEMA.validation_rules[:2])
+    registry.register_schema(trimmed)
+
+    assert list(registry.get_rules("search")) == list(trimmed.validation_rules)
+    assert list(registry.get_rules()) == _scan(registry)
+
+    registry.freeze()
+    assert list(registry.get_rules()) == _scan(registry)
+    with pytest.raises(RuntimeError):
+        registry.register_schema(SEARCH_VALIDATION_SCHEMA)
@@ -3,10 +3,14 @@
 Clean up duplicate test cases from existing test_cases.json files.
 """
 
-import json
 from pathlib import Path
 import sys
 
+# Add app to path
+sys.path.insert(0, str(Path(__file__).parent / "agent-api"))
+
+from app.services.artifact_io import read_artifact, write_artifact, compress_artifact
+
 def cleanup_duplicates(run_id):
     """Remove duplicate test cases from a run's test_cases.json file."""
 
@@ -17,8 +21,7 @@ def cleanup_duplicates(run_id):
         return False
 
     # Load existing data
-    with open(test_cases_file, "r") as f:
-        data = json.load(f)
+    data = read_artifact(test_cases_file)
 
     all_test_cases = data.get("all_test_cases", [])
     original_count = len(all_test_cases)
@@ -96,9 +99,9 @@ def cleanup_duplicates(run_id):
     data["total_test_cases"] = new_count
     data["scenarios"] = list(scenarios.values())
 
-    # Save cleaned data
-    with open(test_cases_file, "w") as f:
-        json.dump(data, f, indent=2)
+    # Save cleaned data (finished runs keep their configured compression)
+    write_artifact(test_cases_file, data)
+    compress_artifact(test_cases_file)
 
     print(f"\n💾 Saved cleaned test cases to: {test_cases_file}")
     return True
@@ -10,13 +10,13 @@ Example:
 """
 
 import sys
-import json
 from pathlib import Path
 
 # Add app to path
 sys.path.insert(0, str(Path(__file__).parent / "agent-api"))
 
 from app.services.test_case_generator import get_test_case_generator
+from app.services.artifact_io import read_artifact
 
 
 def main():
@@ -38,8 +38,7 @@ def main():
         print(f"Error: discovery.json not found for run {run_id}")
         sys.exit(1)
 
-    with open(discovery_file, "r") as f:
-        discovery_data = json.load(f)
+    discovery_data = read_artifact(discovery_file)
 
     pages = discovery_data.get("pages", [])
 